@@ -4,7 +4,8 @@ import pandas as pd
 from math import ceil
 from datetime import date
 from pathlib import Path
-from db import get_conn, init_db
+from db import ident, init_db, query_df
+from app_core.search_index import search_index_for
 
 # ===== Optional helpers (safe fallbacks) =====
 try:
@@ -24,13 +25,10 @@ init_db()
 
 # ===== DB helpers =====
 def load_table(name: str) -> pd.DataFrame:
-    con = get_conn()
     try:
-        return pd.read_sql_query(f"SELECT * FROM {name}", con)
+        return query_df(f"SELECT * FROM {ident(name)}")   # koneksi dari pool (db.get_pool)
     except Exception:
         return pd.DataFrame()
-    finally:
-        con.close()
 
 # ===== Auto-export rekap_df.csv =====
 def _export_rekap_csv(df: pd.DataFrame):
@@ -63,17 +61,15 @@ def _fingerprint(df: pd.DataFrame):
 def _to_dt(series: pd.Series) -> pd.Series:
     return pd.to_datetime(series.astype(str), errors="coerce", dayfirst=True)
 
-def _normalize_searchable_text(df: pd.DataFrame) -> pd.Series:
-    obj_cols = [c for c in df.columns if pd.api.types.is_object_dtype(df[c]) or pd.api.types.is_string_dtype(df[c])]
-    if not obj_cols:
-        return pd.Series([""] * len(df), index=df.index)
-    combo = df[obj_cols].fillna("").astype(str).agg(" ".join, axis=1)
-    return combo.str.lower()
-
 def _filter_rekap(df: pd.DataFrame, date_field: str, start: date | None, end: date | None, q: str) -> pd.DataFrame:
     if df.empty:
         return df
-    tmp = df.copy()
+    tmp = df
+
+    # Search: semua kata harus muncul (indeks teks bersama, dibangun sekali per isi rekap)
+    q = (q or "").strip()
+    if q:
+        tmp = tmp[search_index_for(df).mask(q, all_words=True)]
 
     # Filter tanggal
     if date_field in tmp.columns:
@@ -83,16 +79,6 @@ def _filter_rekap(df: pd.DataFrame, date_field: str, start: date | None, end: da
         if end:
             tmp = tmp[dts <= (pd.to_datetime(end) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1))]
 
-    # Search sederhana: semua kata harus muncul
-    q = (q or "").strip().lower()
-    if q:
-        hay = _normalize_searchable_text(tmp)
-        words = [w for w in q.split() if w]
-        mask = pd.Series(True, index=tmp.index)
-        for w in words:
-            mask &= hay.str.contains(w, na=False)
-        tmp = tmp[mask]
-
     return tmp
 
 def _sort_df(df: pd.DataFrame, sort_col: str | None, ascending: bool) -> pd.DataFrame:
@@ -145,7 +131,8 @@ with st.container():
     end_date   = d2.date_input("Sampai", value=max_d if isinstance(max_d, date) else None, key="rekap_end")
 
     # Pencarian + ukuran halaman + urutan
-    q = c3.text_input("🔎 Cari", value=st.session_state.get("rekap_q", ""), placeholder="Nomor, nama, klasifikasi, dll.")
+    q = c3.text_input("🔎 Cari", value=st.session_state.get("rekap_q", ""), placeholder="Nomor, nama, klasifikasi, dll.",
+                     help="Semua kata harus muncul. Akhiri dengan * untuk awalan nomor perkara (mis. 12/Pdt.G*).")
     st.session_state["rekap_q"] = q
 
     size_col, sort_col = c4.columns([1, 2])
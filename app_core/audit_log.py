@@ -0,0 +1,403 @@
+# app_core/audit_log.py
+# ==== Audit log append-only (JSON lines, segmen berotasi) ====
+# Pengganti data/audit_log.csv yang dibaca + ditulis ulang penuh (plus 2 backup) setiap simpan:
+# - entri ditulis sebagai 1 baris JSON ke segmen data/audit/audit-YYYYMMDD[.N].jsonl
+#   (rotasi harian; segmen > MAX_SEGMENT_BYTES dilanjutkan ke .1, .2, ...)
+# - skema tetap AUDIT_FIELDS; kunci lain masuk map `extra` (kolom baru tidak mengubah skema)
+# - append() hanya menaruh entri di buffer; thread flusher menulis tiap FLUSH_SECS
+#   (satu write O_APPEND per segmen) → simpan perkara tidak menunggu disk
+# - tail(n) membaca dari ujung segmen terbaru mundur, berhenti setelah n entri
+# - segmen di luar KEEP_DAYS hari terbaru dipindah ke data/audit/archive/*.jsonl.gz (dikompres,
+#   tidak dihapus; pecahan ukuran .1, .2, ... tidak mengurangi jumlah hari yang disimpan)
+# audit_log.csv lama diimpor sekali sebagai segmen audit-00000000.jsonl (file CSV tidak diubah);
+# selesainya impor dicatat di berkas penanda → tidak diimpor ulang walau segmennya sudah diarsip.
+# APP_STORAGE=sqlite → SqliteAuditLog: entri langsung ke tabel _audit di berkas backend (ikut
+# transaksi multi-tabel); segmen JSONL yang sudah ada diimpor sekali.
+from __future__ import annotations
+import os, json, re, threading, atexit, io, gzip, shutil
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable
+import pandas as pd
+import streamlit as st
+
+from app_core import sqlite_backend
+from app_core.sqlite_backend import sqlite_tx
+from app_core.write_coordinator import path_lock
+
+AUDIT_FIELDS = [
+    "ts", "nomor_perkara", "tgl_register", "ketua", "jenis", "klasifikasi",
+    "mode_beban", "beta", "tau", "L1", "L2", "gap", "Lmax", "Lmin",
+    "cooldown_reason", "cd_days", "non_cd_count", "reset_after_save",
+    "cuti_hari_ini", "cuti_tgl_rencana", "under_cd_before",
+]
+MAX_SEGMENT_BYTES = 4 * 1024 * 1024
+KEEP_DAYS = 400                # hari (bukan segmen) yang tetap aktif; lebih lama → arsip .gz
+FLUSH_SECS = 1.0
+_LEGACY_SEGMENT = "audit-00000000.jsonl"
+_LEGACY_MARKER = ".legacy_imported"
+_ARCHIVE_DIR = "archive"
+_SEG_RE = re.compile(r"^audit-(\d{8})(?:\.(\d+))?\.jsonl$")
+
+# ---------- Serialisasi ----------
+def _jsonable(v):
+    if v is None:
+        return None
+    if isinstance(v, (pd.Timestamp, datetime)):
+        return pd.Timestamp(v).isoformat()
+    if isinstance(v, date):
+        return v.isoformat()   # simpan tanggal saja untuk date
+    if hasattr(v, "item"):     # numpy scalar → python scalar
+        try:
+            v = v.item()
+        except Exception:
+            pass
+    if isinstance(v, float) and v != v:
+        return None            # NaN → null
+    if isinstance(v, (str, int, float, bool)):
+        return v
+    return str(v)
+
+def to_record(entry: dict) -> dict:
+    """Entri bebas → rekaman skema tetap + `extra` (kunci di luar AUDIT_FIELDS)."""
+    e = dict(entry or {})
+    rec = {f: _jsonable(e.pop(f, None)) for f in AUDIT_FIELDS}
+    if rec["ts"] is None:
+        rec["ts"] = datetime.now().isoformat()
+    rec["extra"] = {str(k): _jsonable(v) for k, v in e.items()}
+    return rec
+
+def _flatten(recs: list[dict]) -> pd.DataFrame:
+    rows = []
+    for r in recs:
+        row = {f: r.get(f) for f in AUDIT_FIELDS}
+        for k, v in (r.get("extra") or {}).items():
+            row.setdefault(k, v)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=None if rows else AUDIT_FIELDS)
+
+# ---------- Segmen ----------
+def _segments(audit_dir: Path) -> list[Path]:
+    """Segmen urut kronologis (tanggal, lalu nomor lanjutan)."""
+    out = []
+    for p in audit_dir.glob("audit-*.jsonl"):
+        m = _SEG_RE.match(p.name)
+        if m:
+            out.append(((m.group(1), int(m.group(2) or 0)), p))
+    return [p for _, p in sorted(out)]
+
+def _archived(audit_dir: Path) -> list[Path]:
+    """Segmen arsip (.jsonl.gz) urut kronologis."""
+    out = []
+    for p in (audit_dir / _ARCHIVE_DIR).glob("audit-*.jsonl.gz"):
+        m = _SEG_RE.match(p.name[:-3])
+        if m:
+            out.append(((m.group(1), int(m.group(2) or 0)), p))
+    return [p for _, p in sorted(out)]
+
+def _read_all(audit_dir: Path) -> list[dict]:
+    """Seluruh entri: arsip lalu segmen aktif (kronologis)."""
+    recs: list[dict] = []
+    for seg in _archived(audit_dir) + _segments(audit_dir):
+        try:
+            with (gzip.open(seg, "rb") if seg.suffix == ".gz" else open(seg, "rb")) as f:
+                recs.extend(_parse(f))
+        except (FileNotFoundError, OSError, EOFError):
+            continue
+    return recs
+
+def _tail_lines(p: Path, n: int, block: int = 64 * 1024) -> list[bytes]:
+    """n baris terakhir sebuah file, dibaca mundur per blok."""
+    with open(p, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos, buf = f.tell(), b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = [ln for ln in buf.split(b"\n") if ln.strip()]
+    return lines[-n:] if n > 0 else []
+
+def _parse(lines: Iterable[bytes]) -> list[dict]:
+    out = []
+    for ln in lines:
+        try:
+            out.append(json.loads(ln))
+        except Exception:
+            continue   # baris rusak (mis. crash saat tulis) dilewati
+    return out
+
+class AuditLog:
+    """Sink audit per direktori: buffer di memori + thread flusher."""
+
+    def __init__(self, audit_dir: Path, legacy_csv: Path | None = None):
+        self.dir = Path(audit_dir)
+        self.legacy_csv = Path(legacy_csv) if legacy_csv else None
+        self._buf: list[dict] = []
+        self._cv = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self.flushes = 0
+        self._imported = False
+
+    # ---------- tulis ----------
+    def append(self, entry: dict) -> None:
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict]) -> None:
+        recs = [to_record(e) for e in entries or []]
+        if not recs:
+            return
+        with self._cv:
+            self._buf.extend(recs)
+            self._ensure_thread()
+            self._cv.notify()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="audit-flusher", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cv:
+                while not self._buf and not self._closed:
+                    self._cv.wait()
+                if self._closed and not self._buf:
+                    return
+            # beri waktu entri lain menumpuk → satu write untuk beberapa simpan
+            with self._cv:
+                self._cv.wait_for(lambda: self._closed, timeout=FLUSH_SECS)
+            try:
+                self.flush()
+            except Exception:
+                pass   # audit gagal jangan ganggu alur utama; dicoba lagi di putaran berikut
+
+    def flush(self) -> int:
+        """Tulis buffer ke segmen aktif. Return jumlah entri yang ditulis."""
+        with self._cv:
+            recs, self._buf = self._buf, []
+        if not recs:
+            return 0
+        try:
+            payload = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in recs).encode("utf-8")
+            self.dir.mkdir(parents=True, exist_ok=True)
+            with path_lock(self.dir / "audit"):
+                self._import_legacy()
+                seg = self._active_segment(len(payload))
+                fd = os.open(seg.as_posix(), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, payload)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self._prune()
+        except Exception:
+            with self._cv:   # kembalikan ke depan buffer
+                self._buf[:0] = recs
+            raise
+        self.flushes += 1
+        return len(recs)
+
+    def _active_segment(self, incoming: int) -> Path:
+        day = date.today().strftime("%Y%m%d")
+        segs = [p for p in _segments(self.dir) if p.name.startswith(f"audit-{day}")]
+        if not segs:
+            return self.dir / f"audit-{day}.jsonl"
+        last = segs[-1]
+        try:
+            size = last.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size + incoming > MAX_SEGMENT_BYTES:
+            m = _SEG_RE.match(last.name)
+            return self.dir / f"audit-{day}.{int(m.group(2) or 0) + 1}.jsonl"
+        return last
+
+    def _prune(self):
+        """Segmen di luar KEEP_DAYS hari terbaru → arsip .gz (dipanggil di bawah lock)."""
+        segs = _segments(self.dir)
+        days = sorted({_SEG_RE.match(p.name).group(1) for p in segs})
+        if len(days) <= KEEP_DAYS:
+            return
+        keep = set(days[-KEEP_DAYS:])
+        for p in segs:
+            if _SEG_RE.match(p.name).group(1) in keep:
+                continue
+            try: self._archive(p)
+            except Exception: pass   # gagal arsip → segmen tetap di tempat, dicoba lagi berikutnya
+
+    def _archive(self, seg: Path):
+        arc = self.dir / _ARCHIVE_DIR
+        arc.mkdir(parents=True, exist_ok=True)
+        dst = arc / (seg.name + ".gz")
+        tmp = dst.with_name(dst.name + ".tmp")
+        with open(seg, "rb") as src, gzip.open(tmp, "wb") as out:
+            shutil.copyfileobj(src, out)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, dst)
+        seg.unlink(missing_ok=True)   # baru dihapus setelah arsipnya utuh
+
+    def _import_legacy(self):
+        """
+        Impor audit_log.csv lama sekali (dipanggil di bawah lock). Selesai → berkas penanda di
+        direktori audit, jadi proses/restart berikutnya tidak mengimpor ulang (segmen impor bisa
+        sudah dipindah ke arsip).
+        """
+        if self._imported:
+            return
+        self._imported = True
+        marker = self.dir / _LEGACY_MARKER
+        if self.legacy_csv is None or marker.exists() or not self.legacy_csv.exists():
+            return
+        seg = self.dir / _LEGACY_SEGMENT
+        if not seg.exists() and not (self.dir / _ARCHIVE_DIR / (_LEGACY_SEGMENT + ".gz")).exists():
+            try:
+                df = pd.read_csv(self.legacy_csv, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+            except Exception:
+                return
+            recs = [to_record({k: (v if v != "" else None) for k, v in row.items()}) for row in df.to_dict("records")]
+            tmp = seg.with_suffix(".tmp")
+            tmp.write_text("".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in recs), encoding="utf-8")
+            os.replace(tmp, seg)
+        marker.write_text(datetime.now().isoformat(), encoding="utf-8")
+
+    def close(self):
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        try:
+            self.flush()
+        except Exception:
+            pass
+
+    # ---------- baca ----------
+    def tail(self, n: int = 50) -> pd.DataFrame:
+        """n entri terbaru (terbaru di atas), termasuk yang masih di buffer."""
+        n = max(0, int(n))
+        with self._cv:
+            pending = list(self._buf)
+        recs = pending[-n:] if n else []
+        if len(recs) < n:
+            if not self._imported:
+                try:
+                    with path_lock(self.dir / "audit"):
+                        self._import_legacy()
+                except Exception:
+                    pass
+            need = n - len(recs)
+            older: list[dict] = []
+            for seg in reversed(_segments(self.dir)):
+                try:
+                    older = _parse(_tail_lines(seg, need - len(older))) + older
+                except FileNotFoundError:
+                    continue
+                if len(older) >= need:
+                    break
+            recs = older[-need:] + recs
+        return _flatten(list(reversed(recs)))
+
+    def export_csv(self) -> bytes:
+        """Seluruh riwayat sebagai CSV (hanya saat diunduh)."""
+        try:
+            self.flush()
+        except Exception:
+            pass
+        buf = io.StringIO()
+        _flatten(_read_all(self.dir)).to_csv(buf, index=False)
+        return buf.getvalue().encode("utf-8-sig")
+
+    def stats(self) -> dict:
+        segs = _segments(self.dir)
+        return {"segmen": len(segs), "bytes": sum(p.stat().st_size for p in segs if p.exists()),
+                "arsip": len(_archived(self.dir)), "buffer": len(self._buf), "flush": self.flushes}
+
+class SqliteAuditLog:
+    """Audit di tabel SQLite backend: append = INSERT (ikut transaksi thread ini bila ada)."""
+
+    def __init__(self, backend, audit_dir: Path, legacy_csv: Path | None = None):
+        self.be = backend   # tabel _audit dibuat SqliteBackend.__init__ (di luar transaksi)
+        self._files = AuditLog(audit_dir, legacy_csv)   # hanya untuk impor riwayat lama
+        self._imported = False
+        self._import_files()
+
+    def _import_files(self):
+        """
+        Impor riwayat file lama sekali. Ditunda bila thread ini sedang di dalam transaksi
+        (rollback transaksi itu akan ikut membatalkan impor, padahal objek ini tetap dipakai).
+        """
+        if self._imported:
+            return
+        con = self.be.connection()
+        if con.in_transaction:
+            return
+        self._imported = True
+        with sqlite_tx(con):
+            if con.execute("SELECT 1 FROM _tables WHERE name='_audit'").fetchone():
+                return
+            recs: list[dict] = []
+            if self._files.dir.exists() or self._files.legacy_csv:
+                try:
+                    with path_lock(self._files.dir / "audit"):
+                        self._files._import_legacy()
+                except Exception:
+                    pass
+                recs = _read_all(self._files.dir)
+            self._insert(con, recs)
+            con.execute("INSERT INTO _tables (name, ver) VALUES ('_audit', 'imported')")
+
+    @staticmethod
+    def _insert(con, recs: list[dict]) -> None:
+        con.executemany("INSERT INTO _audit (ts, rec) VALUES (?,?)",
+                        [(r.get("ts"), json.dumps(r, ensure_ascii=False, separators=(",", ":"))) for r in recs])
+
+    def append(self, entry: dict) -> None:
+        self.append_many([entry])
+
+    def append_many(self, entries: Iterable[dict]) -> None:
+        recs = [to_record(e) for e in entries or []]
+        if not recs:
+            return
+        self._import_files()
+        con = self.be.connection()
+        with sqlite_tx(con):
+            self._insert(con, recs)
+
+    def flush(self) -> int:
+        return 0   # tidak ada buffer
+
+    def close(self):
+        pass
+
+    def _recs(self, sql: str, params=()) -> list[dict]:
+        self._import_files()
+        out = []
+        for (raw,) in self.be.connection().execute(sql, params):
+            try:
+                out.append(json.loads(raw))
+            except Exception:
+                continue
+        return out
+
+    def tail(self, n: int = 50) -> pd.DataFrame:
+        """n entri terbaru (terbaru di atas)."""
+        return _flatten(self._recs("SELECT rec FROM _audit ORDER BY seq DESC LIMIT ?", (max(0, int(n)),)))
+
+    def export_csv(self) -> bytes:
+        buf = io.StringIO()
+        _flatten(self._recs("SELECT rec FROM _audit ORDER BY seq")).to_csv(buf, index=False)
+        return buf.getvalue().encode("utf-8-sig")
+
+    def stats(self) -> dict:
+        n = self.be.connection().execute("SELECT COUNT(*) FROM _audit").fetchone()[0]
+        return {"segmen": 0, "bytes": 0, "buffer": 0, "flush": 0, "baris": int(n)}
+
+@st.cache_resource(show_spinner=False)
+def get_audit_log(audit_dir: str = "data/audit", legacy_csv: str | None = "data/audit_log.csv") -> AuditLog:
+    if sqlite_backend.enabled():
+        return SqliteAuditLog(sqlite_backend.get_sqlite_backend(), Path(audit_dir), Path(legacy_csv) if legacy_csv else None)
+    log = AuditLog(Path(audit_dir), Path(legacy_csv) if legacy_csv else None)
+    atexit.register(log.close)   # sisa buffer ditulis saat proses berhenti
+    return log
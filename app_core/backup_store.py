@@ -0,0 +1,370 @@
+# app_core/backup_store.py
+# ==== Backup content-addressed + dedup (satu store untuk semua snapshot) ====
+# Pengganti dua mekanisme salinan penuh (data/backups/<stem>.<ts>.csv keep=30 dan
+# data/_backup/<file>/<ts>.ext max_keep=10) yang menghasilkan puluhan MB salinan nyaris sama:
+# - isi file dipotong jadi chunk berbatas baris (content-defined: batas ditentukan isi baris,
+#   sehingga sisipan/penambahan baris tidak menggeser chunk lain)
+# - chunk disimpan terkompresi zlib di <dir>/objects/<h[:2]>/<sha256> → chunk yang sama
+#   hanya disimpan sekali, lintas snapshot dan lintas file
+# - snapshot = manifest JSON kecil (<dir>/manifests/<file>/<ts>.json) berisi daftar chunk;
+#   isi identik dengan snapshot terakhir → tidak membuat snapshot baru
+# - retensi berbasis waktu: N terbaru + 1/jam, 1/hari, 1/minggu; chunk yatim dihapus (GC)
+# - restore(path, at) → isi file per timestamp (snapshot terakhir ≤ at)
+# Pekerjaan hashing/kompresi/tulis berjalan di thread worker; jalur simpan hanya membaca isi + antre.
+from __future__ import annotations
+import os, json, hashlib, queue, threading, zlib, re
+from datetime import datetime, timedelta
+from pathlib import Path
+import pandas as pd
+import streamlit as st
+
+from app_core.write_coordinator import path_lock
+
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+_BOUNDARY_MASK = 0x3F          # ± 1 dari 64 baris menjadi batas (setelah MIN_CHUNK)
+DEFAULT_RETENTION = {"keep_last": 10, "hourly": 48, "daily": 30, "weekly": 26}
+_TS_FMT = "%Y%m%d_%H%M%S_%f"
+
+def _file_key(path: Path) -> str:
+    return Path(path).name
+
+def _sig(p: Path) -> tuple:
+    try:
+        s = p.stat()
+        return (s.st_mtime_ns, s.st_size)
+    except FileNotFoundError:
+        return (0, 0)
+
+def chunk_bytes(data: bytes) -> list[bytes]:
+    """Potong per baris; batas chunk = baris yang crc32-nya cocok mask (min/max ukuran dijaga)."""
+    chunks, cur, size = [], [], 0
+    for line in data.splitlines(keepends=True):
+        cur.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK or (size >= MIN_CHUNK and (zlib.crc32(line) & _BOUNDARY_MASK) == 0):
+            chunks.append(b"".join(cur))
+            cur, size = [], 0
+    if cur:
+        chunks.append(b"".join(cur))
+    return chunks
+
+class BackupStore:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.manifests = self.root / "manifests"
+        self._q: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._last: dict[str, dict] = {}     # file → manifest terakhir (cache)
+        self._queued: dict[str, tuple] = {}  # file → sig isi yang terakhir diantre (bytes ikut di antrean)
+        self.retention = dict(DEFAULT_RETENTION)
+        self.stored_chunks = 0
+        self.reused_chunks = 0
+
+    # ---------- antrean (dipanggil dari jalur simpan) ----------
+    def snapshot_async(self, path: Path, data: bytes | None = None, sig: tuple | None = None) -> None:
+        """
+        Antre snapshot file. data None → isi dibaca SEKARANG (pemanggil memegang lock file), bukan
+        oleh worker nanti: pada tulis beruntun tiap versi antara tetap tercatat, dan sig yang dicatat
+        di _queued selalu sig dari isi yang benar-benar diantre.
+        """
+        path = Path(path)
+        if data is None:
+            sig = _sig(path)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                return
+        elif sig is None:
+            sig = _sig(path)
+        self._queued[_file_key(path)] = sig
+        self._ensure_thread()
+        self._q.put((path, data, sig, datetime.now()))
+
+    def ensure_captured(self, path: Path) -> None:
+        """
+        Sebelum file ditimpa: kalau isi di disk belum tercatat (mis. diubah di luar app / snapshot
+        pertama), baca sekarang dan antre. Umumnya cukup cek stat → tidak ada I/O berat.
+        """
+        path = Path(path)
+        if not path.exists():
+            return
+        sig = _sig(path)
+        if self._queued.get(_file_key(path)) == sig:
+            return   # versi ini sudah diantre (snapshot setelah tulis sebelumnya)
+        last = self.latest(path)
+        if last is not None and tuple(last.get("sig") or ()) == sig:
+            return
+        try:
+            self.snapshot_async(path, path.read_bytes(), sig)
+        except Exception:
+            pass
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="backup-worker", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            path, data, sig, ts = self._q.get()
+            try:
+                self.snapshot(path, data=data, ts=ts, sig=sig)
+            except Exception:
+                pass   # backup gagal jangan ganggu alur utama
+            finally:
+                self._q.task_done()
+
+    def wait_idle(self) -> None:
+        self._q.join()
+
+    # ---------- tulis ----------
+    def _put_chunk(self, chunk: bytes) -> str:
+        h = hashlib.sha256(chunk).hexdigest()
+        p = self.objects / h[:2] / h
+        if p.exists():
+            self.reused_chunks += 1
+            return h
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(p.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(zlib.compress(chunk, 6))
+        os.replace(tmp, p)
+        self.stored_chunks += 1
+        return h
+
+    def snapshot(self, path: Path, data: bytes | None = None, ts: datetime | None = None,
+                 sig: tuple | None = None) -> dict | None:
+        """Simpan snapshot sekarang (sinkron). Return manifest, atau None bila isi tidak berubah."""
+        path = Path(path)
+        if sig is None:
+            sig = _sig(path)
+        if data is None:
+            if not path.exists():
+                return None
+            data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        with path_lock(self.root / "store"):
+            last = self.latest(path)
+            if last is not None and last.get("sha256") == digest:
+                if tuple(last.get("sig") or ()) != sig and sig != (0, 0):
+                    last["sig"] = list(sig)   # isi sama, file ditulis ulang → perbarui sig saja
+                    self._write_manifest(path, last)
+                return None
+            ts = ts or datetime.now()
+            man = {
+                "file": _file_key(path), "path": path.as_posix(), "ts": ts.isoformat(),
+                "size": len(data), "sha256": digest, "sig": list(sig),
+                "chunks": [self._put_chunk(c) for c in chunk_bytes(data)],
+                "name": ts.strftime(_TS_FMT),
+            }
+            self._write_manifest(path, man)
+            self._apply_retention(path)
+            return man
+
+    def _write_manifest(self, path: Path, man: dict) -> None:
+        d = self.manifests / _file_key(path)
+        d.mkdir(parents=True, exist_ok=True)
+        p = d / f"{man['name']}.json"
+        tmp = p.with_suffix(".tmp")
+        tmp.write_text(json.dumps(man, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, p)
+        self._last[_file_key(path)] = man
+
+    # ---------- baca ----------
+    def _manifest_files(self, path: Path) -> list[Path]:
+        d = self.manifests / _file_key(path)
+        return sorted(d.glob("*.json")) if d.exists() else []
+
+    def latest(self, path: Path) -> dict | None:
+        key = _file_key(path)
+        if key in self._last:
+            return self._last[key]
+        files = self._manifest_files(path)
+        man = None
+        if files:
+            try:
+                man = json.loads(files[-1].read_text(encoding="utf-8"))
+            except Exception:
+                man = None
+        self._last[key] = man
+        return man
+
+    def list_snapshots(self, path: Path) -> pd.DataFrame:
+        """Daftar snapshot (terbaru di atas): ts, size, chunks, sha256."""
+        rows = []
+        for f in reversed(self._manifest_files(path)):
+            try:
+                m = json.loads(f.read_text(encoding="utf-8"))
+                rows.append({"ts": pd.Timestamp(m["ts"]), "size": int(m.get("size", 0)),
+                             "chunks": len(m.get("chunks", [])), "sha256": str(m.get("sha256", ""))[:12],
+                             "name": m.get("name", f.stem)})
+            except Exception:
+                continue
+        return pd.DataFrame(rows, columns=["ts", "size", "chunks", "sha256", "name"])
+
+    def _read_chunk(self, h: str) -> bytes:
+        return zlib.decompress((self.objects / h[:2] / h).read_bytes())
+
+    def restore(self, path: Path, at: datetime | str | None = None) -> bytes | None:
+        """Isi file sesuai snapshot terakhir dengan ts ≤ at (None = terbaru)."""
+        at_ts = None if at is None else pd.Timestamp(at)
+        for f in reversed(self._manifest_files(path)):
+            try:
+                m = json.loads(f.read_text(encoding="utf-8"))
+            except Exception:
+                continue
+            if at_ts is not None and pd.Timestamp(m["ts"]) > at_ts:
+                continue
+            data = b"".join(self._read_chunk(h) for h in m.get("chunks", []))
+            if hashlib.sha256(data).hexdigest() != m.get("sha256"):
+                raise ValueError(f"Snapshot {f.name} rusak (hash tidak cocok)")
+            return data
+        return None
+
+    # ---------- retensi + GC ----------
+    def _apply_retention(self, path: Path) -> int:
+        """Pertahankan keep_last terbaru + 1 per jam/hari/minggu (sebanyak konfigurasi). Return jumlah dihapus."""
+        files = self._manifest_files(path)
+        stamps = []
+        for f in files:
+            try:
+                stamps.append((datetime.strptime(f.stem, _TS_FMT), f))
+            except ValueError:
+                continue
+        stamps.sort(key=lambda x: x[0], reverse=True)
+        keep = {f for _, f in stamps[: int(self.retention.get("keep_last", 10))]}
+        buckets = {
+            "hourly": lambda t: t.strftime("%Y%m%d%H"),
+            "daily": lambda t: t.strftime("%Y%m%d"),
+            "weekly": lambda t: tuple(t.isocalendar()[:2]),
+        }
+        for name, keyfn in buckets.items():
+            limit, seen = int(self.retention.get(name, 0)), set()
+            for t, f in stamps:
+                k = keyfn(t)
+                if k in seen:
+                    continue
+                if len(seen) >= limit:
+                    break
+                seen.add(k)
+                keep.add(f)   # snapshot terbaru di bucket tsb
+        removed = 0
+        for _, f in stamps:
+            if f not in keep:
+                try:
+                    f.unlink(missing_ok=True)
+                    removed += 1
+                except Exception:
+                    pass
+        return removed
+
+    def gc(self) -> dict:
+        """Terapkan retensi ke semua file lalu hapus chunk yang tidak dirujuk manifest mana pun."""
+        with path_lock(self.root / "store"):
+            removed = 0
+            refs: set[str] = set()
+            if self.manifests.exists():
+                for d in self.manifests.iterdir():
+                    if d.is_dir():
+                        removed += self._apply_retention(Path(d.name))
+                for f in self.manifests.glob("*/*.json"):
+                    try:
+                        refs.update(json.loads(f.read_text(encoding="utf-8")).get("chunks", []))
+                    except Exception:
+                        continue
+            freed = 0
+            if self.objects.exists():
+                for p in self.objects.glob("*/*"):
+                    if p.name.endswith(".tmp") or p.name in refs:
+                        continue
+                    try:
+                        freed += p.stat().st_size
+                        p.unlink()
+                    except Exception:
+                        pass
+            self._last.clear()
+            return {"manifest_dihapus": removed, "bytes_dibebaskan": freed}
+
+    def stats(self) -> dict:
+        n_obj = size = 0
+        if self.objects.exists():
+            for p in self.objects.glob("*/*"):
+                n_obj += 1
+                try: size += p.stat().st_size
+                except Exception: pass
+        return {"chunk": n_obj, "bytes": size, "antrean": self._q.qsize(),
+                "chunk_baru": self.stored_chunks, "chunk_dipakai_ulang": self.reused_chunks}
+
+    # ---------- impor salinan lama ----------
+    def import_legacy(self, files: list[tuple[Path, Path, datetime]], remove: bool = False) -> int:
+        """files: (target_path, salinan_lama, waktu). Urut lama → baru supaya dedup maksimal."""
+        n = 0
+        for target, src, ts in sorted(files, key=lambda x: x[2]):
+            try:
+                man = self.snapshot_at(target, src.read_bytes(), ts)
+                n += 1 if man is not None else 0
+                if remove:
+                    src.unlink(missing_ok=True)
+            except Exception:
+                continue
+        return n
+
+    def snapshot_at(self, path: Path, data: bytes, ts: datetime) -> dict | None:
+        """Snapshot dengan waktu historis (impor); tidak menyentuh sig file saat ini."""
+        digest = hashlib.sha256(data).hexdigest()
+        with path_lock(self.root / "store"):
+            existing = {f.stem: f for f in self._manifest_files(path)}
+            name = ts.strftime(_TS_FMT)
+            while name in existing:
+                try:
+                    if json.loads(existing[name].read_text(encoding="utf-8")).get("sha256") == digest:
+                        return None   # salinan identik pada detik yang sama (dua mekanisme lama)
+                except Exception:
+                    pass
+                ts = ts + timedelta(microseconds=1)   # isi beda pada detik yang sama → urutkan di belakangnya
+                name = ts.strftime(_TS_FMT)
+            man = {"file": _file_key(path), "path": Path(path).as_posix(), "ts": ts.isoformat(),
+                   "size": len(data), "sha256": digest, "sig": [0, 0],
+                   "chunks": [self._put_chunk(c) for c in chunk_bytes(data)], "name": name}
+            d = self.manifests / _file_key(path)
+            d.mkdir(parents=True, exist_ok=True)
+            (d / f"{name}.json").write_text(json.dumps(man, ensure_ascii=False), encoding="utf-8")
+            self._last.pop(_file_key(path), None)
+            return man
+
+_LEGACY_TS = [("%Y%m%d-%H%M%S", re.compile(r"(\d{8}-\d{6})")), ("%Y%m%d_%H%M%S", re.compile(r"(\d{8}_\d{6})"))]
+
+def _legacy_ts(name: str) -> datetime | None:
+    for fmt, rx in _LEGACY_TS:
+        m = rx.search(name)
+        if m:
+            try:
+                return datetime.strptime(m.group(1), fmt)
+            except ValueError:
+                continue
+    return None
+
+def find_legacy_copies(data_dir: Path, bucket_dir: Path, rolling_dir: Path) -> list[tuple[Path, Path, datetime]]:
+    """Salinan penuh format lama: <bucket_dir>/<file>/<ts>.ext dan <rolling_dir>/<stem>.<ts>.ext."""
+    out = []
+    if bucket_dir.exists():
+        for d in bucket_dir.iterdir():
+            if d.is_dir() and d.name not in {"objects", "manifests"}:
+                for f in d.iterdir():
+                    ts = _legacy_ts(f.name) if f.is_file() else None
+                    if ts:
+                        out.append((data_dir / d.name, f, ts))
+    if rolling_dir.exists():
+        for f in rolling_dir.iterdir():
+            ts = _legacy_ts(f.name) if f.is_file() else None
+            m = re.match(r"^(.+?)\.\d{8}-\d{6}(\.[^.]+)$", f.name)
+            if ts and m:
+                out.append((data_dir / f"{m.group(1)}{m.group(2)}", f, ts))
+    return out
+
+@st.cache_resource(show_spinner=False)
+def get_backup_store(root: str = "data/_backup") -> BackupStore:
+    return BackupStore(Path(root))
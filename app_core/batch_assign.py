@@ -0,0 +1,199 @@
+# app_core/batch_assign.py
+# ==== Staging batch auto-assign (in-memory, per thread/sesi) ====
+# Input batch (puluhan perkara sekaligus) menjalankan pipeline yang SAMA dengan form
+# (pick ketua → rotasi PP/JS → tgl sidang → cooldown/streak → audit), tetapi semua
+# tulisan dibelokkan ke BatchStage selama blok `staging(stage)`:
+# - dokumen JSON (rrpair_token.json, cooldown_v2.json) → salinan kerja di memori
+# - tabel kecil (js_ghoib.csv)                           → DataFrame di memori
+# - baris rekap baru + entri audit                       → list
+# Baris berikutnya membaca keadaan yang sudah diperbarui baris sebelumnya.
+# Setelah preview, commit menulis semuanya sekali (lihat _batch_commit di halaman Input).
+#
+# Thread-local: Streamlit menjalankan tiap sesi di thread sendiri, jadi staging satu
+# sesi tidak terlihat oleh sesi lain.
+from __future__ import annotations
+import copy, io, re, threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+
+_local = threading.local()
+
+BATCH_COLS = ["nomor", "tgl_register", "klasifikasi", "jenis", "metode"]
+JENIS_OPTS = ["Biasa", "ISTBAT", "GHOIB", "ROGATORI", "MAFQUD"]
+METODE_OPTS = ["E-Court", "Manual"]
+
+def _sig(p: Path) -> tuple:
+    try:
+        s = Path(p).stat()
+        return (s.st_mtime_ns, s.st_size)
+    except FileNotFoundError:
+        return (0, 0)
+
+class BatchStage:
+    """Keadaan kerja satu batch. Tidak ada yang menyentuh disk sampai commit."""
+
+    def __init__(self, load_index=None, rekap_version: tuple | None = None):
+        self.load_index = load_index           # salinan LoadIndex (diupdate per baris)
+        self.rekap_version = rekap_version     # versi rekap saat batch disimulasikan
+        self.docs: dict[str, dict] = {}        # path → {"obj","orig","save","sig"}
+        self.tables: dict[str, dict] = {}      # path → {"df","sig"}
+        self.rekap_rows: list[dict] = []
+        self.audits: list[dict] = []
+
+    # ---------- dokumen JSON ----------
+    # sig_fn: penanda versi dokumen untuk cek konflik (default: signature file; dokumen di
+    # StateStore memakai nomor versi namespace karena berkasnya tidak ditulis per simpan)
+    def doc_get(self, path: Path, loader: Callable[[], dict], saver: Callable[[dict], None],
+                sig_fn: Callable[[], object] | None = None) -> dict:
+        key = Path(path).as_posix()
+        if key not in self.docs:
+            sig_fn = sig_fn or (lambda _p=Path(path): _sig(_p))
+            sig = sig_fn()
+            obj = loader()
+            self.docs[key] = {"obj": copy.deepcopy(obj), "orig": copy.deepcopy(obj), "save": saver,
+                              "sig": sig, "sig_fn": sig_fn}
+        return copy.deepcopy(self.docs[key]["obj"])
+
+    def doc_put(self, path: Path, obj: dict, saver: Callable[[dict], None] | None = None,
+                sig_fn: Callable[[], object] | None = None) -> None:
+        key = Path(path).as_posix()
+        ent = self.docs.get(key)
+        if ent is None:
+            # tulis tanpa baca sebelumnya → tetap catat signature untuk cek konflik
+            sig_fn = sig_fn or (lambda _p=Path(path): _sig(_p))
+            ent = self.docs[key] = {"obj": None, "orig": None, "save": saver, "sig": sig_fn(), "sig_fn": sig_fn}
+        ent["obj"] = copy.deepcopy(obj)
+        if saver is not None:
+            ent["save"] = saver
+
+    # ---------- tabel kecil ----------
+    def table_get(self, path: Path) -> pd.DataFrame | None:
+        ent = self.tables.get(Path(path).as_posix())
+        return None if ent is None else ent["df"].copy()
+
+    def table_put(self, path: Path, df: pd.DataFrame) -> None:
+        key = Path(path).as_posix()
+        sig = self.tables[key]["sig"] if key in self.tables else _sig(path)
+        self.tables[key] = {"df": df.copy(), "sig": sig}
+
+    # ---------- commit helpers ----------
+    def conflicts(self, rekap_version_now: tuple | None = None) -> list[str]:
+        """File yang berubah di disk sejak batch disimulasikan (penulis lain)."""
+        out = []
+        if self.rekap_version is not None and rekap_version_now is not None and rekap_version_now != self.rekap_version:
+            out.append("rekap")
+        for key, ent in self.docs.items():
+            if ent.get("sig_fn", lambda _p=Path(key): _sig(_p))() != ent["sig"]:
+                out.append(Path(key).name)
+        for key, ent in self.tables.items():
+            if _sig(Path(key)) != ent["sig"]:
+                out.append(Path(key).name)
+        return out
+
+    def diff_docs(self) -> pd.DataFrame:
+        """Perubahan kunci level-atas dokumen JSON (sebelum → sesudah) untuk preview."""
+        rows = []
+        for key, ent in self.docs.items():
+            before, after = ent.get("orig") or {}, ent.get("obj") or {}
+            for k in sorted(set(before) | set(after), key=str):
+                b, a = before.get(k), after.get(k)
+                if b != a:
+                    rows.append({"file": Path(key).name, "kunci": str(k),
+                                 "sebelum": "-" if b is None else _short(b),
+                                 "sesudah": "-" if a is None else _short(a)})
+        return pd.DataFrame(rows, columns=["file", "kunci", "sebelum", "sesudah"])
+
+def _short(v, n: int = 120) -> str:
+    s = str(v)
+    return s if len(s) <= n else s[: n - 1] + "…"
+
+def active() -> BatchStage | None:
+    return getattr(_local, "stage", None)
+
+@contextmanager
+def staging(stage: BatchStage):
+    prev = active()
+    _local.stage = stage
+    try:
+        yield stage
+    finally:
+        _local.stage = prev
+
+# ---------- Input batch (CSV upload / tempel) ----------
+_HEADER_ALIASES = {
+    "nomor": "nomor", "no": "nomor", "nomor perkara": "nomor", "nomor_perkara": "nomor",
+    "tgl_register": "tgl_register", "tgl register": "tgl_register", "tanggal register": "tgl_register",
+    "tanggal": "tgl_register", "tgl": "tgl_register",
+    "klasifikasi": "klasifikasi", "klas": "klasifikasi",
+    "jenis": "jenis", "jenis perkara": "jenis", "jenis_perkara": "jenis", "proses": "jenis",
+    "metode": "metode",
+}
+
+def _sniff_sep(text: str) -> str:
+    first = next((ln for ln in text.splitlines() if ln.strip()), "")
+    for sep in ("\t", ";", "|", ","):
+        if sep in first:
+            return sep
+    return ","
+
+def _pick_opt(v: str, opts: list[str], default: str) -> str:
+    key = re.sub(r"[^a-z0-9]+", "", str(v).lower())
+    if not key:
+        return default
+    for o in opts:
+        if re.sub(r"[^a-z0-9]+", "", o.lower()) == key:
+            return o
+    return ""
+
+def parse_batch_input(data) -> pd.DataFrame:
+    """
+    Terima teks tempel (CSV/TSV/;) atau bytes file CSV → DataFrame kolom BATCH_COLS + `catatan`.
+    Header opsional; tanpa header dianggap urutan nomor, tgl_register, klasifikasi, jenis, metode.
+    """
+    if isinstance(data, bytes):
+        for enc in ("utf-8-sig", "utf-8", "cp1252"):
+            try:
+                data = data.decode(enc)
+                break
+            except Exception:
+                continue
+    text = str(data or "").replace("\ufeff", "")
+    if not text.strip():
+        return pd.DataFrame(columns=BATCH_COLS + ["catatan"])
+    sep = _sniff_sep(text)
+    raw = pd.read_csv(io.StringIO(text), sep=sep, header=None, dtype=str, keep_default_na=False,
+                      skip_blank_lines=True, engine="python")
+    head = [re.sub(r"\s+", " ", str(c)).strip().lower() for c in raw.iloc[0].tolist()]
+    if any(h in _HEADER_ALIASES for h in head):
+        raw.columns = [_HEADER_ALIASES.get(h, h) for h in head]
+        raw = raw.iloc[1:]
+    else:
+        raw.columns = (BATCH_COLS + [f"x{i}" for i in range(raw.shape[1])])[: raw.shape[1]]
+    for c in BATCH_COLS:
+        if c not in raw.columns:
+            raw[c] = ""
+    out = raw[BATCH_COLS].astype(str).apply(lambda s: s.str.strip()).reset_index(drop=True)
+    out = out[(out != "").any(axis=1)].reset_index(drop=True)
+
+    tgl = pd.to_datetime(out["tgl_register"], errors="coerce", format="ISO8601")
+    miss = tgl.isna() & (out["tgl_register"] != "")
+    if miss.any():
+        tgl = tgl.copy()
+        tgl.loc[miss] = pd.to_datetime(out.loc[miss, "tgl_register"], errors="coerce", dayfirst=True, format="mixed")
+    out["tgl_register"] = tgl.dt.normalize()
+    out["jenis"] = out["jenis"].map(lambda v: _pick_opt(v, JENIS_OPTS, "Biasa"))
+    out["metode"] = out["metode"].map(lambda v: _pick_opt(v, METODE_OPTS, "E-Court"))
+
+    notes = []
+    for _, r in out.iterrows():
+        n = []
+        if not r["nomor"]: n.append("nomor kosong")
+        if pd.isna(r["tgl_register"]): n.append("tgl_register tidak valid")
+        if not r["klasifikasi"]: n.append("klasifikasi kosong")
+        if not r["jenis"]: n.append("jenis tidak dikenal")
+        if not r["metode"]: n.append("metode tidak dikenal")
+        notes.append("; ".join(n))
+    out["catatan"] = notes
+    return out
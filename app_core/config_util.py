@@ -1,54 +1,296 @@
 # app_core/config_util.py
+# ==== Konfigurasi aplikasi (data/config.json): satu sumber default + validator ====
+# Pengganti _DEFAULT_CONFIG/_validate_cfg di halaman Input + salinan lama di modul ini:
+# - validate_cfg: satu validator (default, batas nilai, regex jatuh ke default bila rusak)
+# - AppConfig: objek immutable bertipe; regex jabatan sudah dikompilasi, urutan rotasi pair4
+#   sudah jadi daftar slot (idx_pp, idx_js) + peta urutan
+# - ConfigStore: dimuat sekali per proses, dimuat ulang hanya bila mtime/size config.json
+#   berubah → simpan dari panel admin langsung terlihat di semua sesi & halaman
 from __future__ import annotations
-import json, re
+import copy, json, re, threading
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+import streamlit as st
+
+from app_core.backup_store import DEFAULT_RETENTION
+from app_core.write_coordinator import write_json
+
+CONFIG_PATH = Path("data") / "config.json"
+
+_DEFAULT_JABATAN_REGEX = r"\b(ketua|wakil)\b"
+_PAIR_KEYS = ("P1J1", "P2J1", "P1J2", "P2J2")
+_PAIR_SLOT = {"P1J1": (0, 0), "P2J1": (1, 0), "P1J2": (0, 1), "P2J2": (1, 1)}
 
 _DEFAULT_CONFIG = {
     "rotasi": {
-        "mode": "pair4",
-        "order": ["P1J1","P2J1","P1J2","P2J2"],
-        "increment_on_save": True
+        "mode": "pair4",                           # "pair4" atau "roundrobin"
+        "order": ["P1J1","P2J1","P1J2","P2J2"],    # urutan pair untuk mode pair4
+        "increment_on_save": True                  # naikkan indeks rotasi saat simpan
     },
     "hakim": {
-        "exclude_jabatan_regex": r"\b(ketua|wakil)\b",
-        "dropdown_show_cuti_default": False
+        "exclude_jabatan_regex": _DEFAULT_JABATAN_REGEX,
+        "dropdown_show_cuti_default": False,
+        "cooldown_days": 1,
+        "elastic_beta": 0.20,
+        "elastic_min_gap_cool": 2.0,
+        "elastic_streak_cap": 3
     },
     "tampilan": {
         "tanggal_locale": "id-ID",
         "tanggal_long": True
+    },
+    # beban window + decay
+    "beban": {
+        "window_days": 90,
+        "half_life_days": 30,
+        "use_decay": True,     # True=pakai half-life, False=uniform
+    },
+    # penyimpanan rekap: jurnal append-only + kompaksi berkala
+    "rekap": {
+        "journal": True,
+        "compact_every": 200,
+    },
+    # backup dedup: max_keep snapshot terbaru + 1/jam, 1/hari, 1/minggu
+    "backup": {
+        "enabled": True,
+        "dir": "data/_backup",
+        "max_keep": 10,
+        "hourly": 48,
+        "daily": 30,
+        "weekly": 26,
     }
 }
 
+def default_config() -> dict:
+    return copy.deepcopy(_DEFAULT_CONFIG)
+
 def validate_cfg(cfg: dict) -> dict:
-    out = {**_DEFAULT_CONFIG, **(cfg or {})}
+    out = default_config()
+    out.update(copy.deepcopy(cfg or {}))
+    for sec in ("rotasi", "hakim", "tampilan"):
+        if not isinstance(out.get(sec), dict):
+            out[sec] = default_config()[sec]
     # rotasi
     if out["rotasi"].get("mode") not in {"pair4","roundrobin"}:
         out["rotasi"]["mode"] = "pair4"
-    keys = {"P1J1","P2J1","P1J2","P2J2"}
     order = out["rotasi"].get("order", [])
-    if not isinstance(order, list) or not order or set(order) - keys:
-        out["rotasi"]["order"] = ["P1J1","P2J1","P1J2","P2J2"]
+    if not isinstance(order, list) or not order or set(order) - set(_PAIR_KEYS):
+        out["rotasi"]["order"] = list(_PAIR_KEYS)
     out["rotasi"]["increment_on_save"] = bool(out["rotasi"].get("increment_on_save", True))
     # hakim
     out["hakim"]["dropdown_show_cuti_default"] = bool(out["hakim"].get("dropdown_show_cuti_default", False))
     try:
-        re.compile(out["hakim"].get("exclude_jabatan_regex", r"\b(ketua|wakil)\b"))
-    except re.error:
-        out["hakim"]["exclude_jabatan_regex"] = r"\b(ketua|wakil)\b"
+        re.compile(out["hakim"].get("exclude_jabatan_regex", _DEFAULT_JABATAN_REGEX))
+    except (re.error, TypeError):
+        out["hakim"]["exclude_jabatan_regex"] = _DEFAULT_JABATAN_REGEX
+    cd = out["hakim"].get("cooldown_days", 0)
+    try: cd = max(0, int(cd))
+    except Exception: cd = 0
+    out["hakim"]["cooldown_days"] = cd
+    # backup
+    bk = out.get("backup", {})
+    if not isinstance(bk, dict):
+        bk = {}
+    bk_enabled = bool(bk.get("enabled", True))
+    bk_dir = str(bk.get("dir", "data/_backup")).strip() or "data/_backup"
+    try:
+        bk_keep = max(1, int(bk.get("max_keep", 10)))
+    except Exception:
+        bk_keep = 10
+    bk_ret = {}
+    for k in ("hourly", "daily", "weekly"):
+        try: bk_ret[k] = max(0, int(bk.get(k, DEFAULT_RETENTION[k])))
+        except Exception: bk_ret[k] = DEFAULT_RETENTION[k]
+    out["backup"] = {"enabled": bk_enabled, "dir": bk_dir, "max_keep": bk_keep, **bk_ret}
+    # rekap (jurnal)
+    rk = out.get("rekap", {})
+    if not isinstance(rk, dict):
+        rk = {}
+    try: rk_every = max(1, int(rk.get("compact_every", 200)))
+    except Exception: rk_every = 200
+    out["rekap"] = {"journal": bool(rk.get("journal", True)), "compact_every": rk_every}
+    # elastic beta (0.0—1.0)
+    try:
+        eb = float(out["hakim"].get("elastic_beta", 0.20))
+        if not (0.0 <= eb <= 1.0):
+            eb = 0.20
+    except Exception:
+        eb = 0.20
+    out["hakim"]["elastic_beta"] = eb
     # tampilan
     out["tampilan"]["tanggal_locale"] = out["tampilan"].get("tanggal_locale", "id-ID")
     out["tampilan"]["tanggal_long"] = bool(out["tampilan"].get("tanggal_long", True))
+    # beban
+    b = out.get("beban", {})
+    if not isinstance(b, dict):
+        b = {}
+    try: bwd = max(1, int(b.get("window_days", 90)))
+    except Exception: bwd = 90
+    try: hld = max(1, int(b.get("half_life_days", 30)))
+    except Exception: hld = 30
+    try: mnw = float(b.get("min_weight", 0.05))
+    except Exception: mnw = 0.05
+    out["beban"] = {"window_days": bwd, "half_life_days": hld, "min_weight": mnw, "use_decay": bool(b.get("use_decay", True))}
+    # ambang gap absolut: gap < N ⇒ cooldown
+    try:
+        gabs = float(out["hakim"].get("elastic_min_gap_cool", 2.0))
+        if gabs < 0:
+            gabs = 0.0
+    except Exception:
+        gabs = 2.0
+    out["hakim"]["elastic_min_gap_cool"] = gabs
+    # batas beruntun per reset (min 1)
+    try:
+        streak_cap = int(out["hakim"].get("elastic_streak_cap", 3))
+        if streak_cap < 1:
+            streak_cap = 1
+    except Exception:
+        streak_cap = 3
+    out["hakim"]["elastic_streak_cap"] = streak_cap
     return out
 
-def load_config(path: Path) -> dict:
+def _freeze(v):
+    if isinstance(v, dict):
+        return MappingProxyType({k: _freeze(x) for k, x in v.items()})
+    if isinstance(v, list):
+        return tuple(_freeze(x) for x in v)
+    return v
+
+def _thaw(v):
+    if isinstance(v, Mapping):
+        return {k: _thaw(x) for k, x in v.items()}
+    if isinstance(v, tuple):
+        return [_thaw(x) for x in v]
+    return v
+
+@dataclass(frozen=True)
+class AppConfig:
+    """
+    Config tervalidasi, read-only. Akses lama tetap jalan (cfg.get("hakim", {}).get(...),
+    cfg["rotasi"]["mode"]); kolom bertipe di bawah sudah dihitung sekali saat dimuat.
+    """
+    data: Mapping[str, Any]
+    rotasi_mode: str
+    rotasi_order: tuple[str, ...]
+    rotasi_slots: tuple[tuple[int, int], ...]    # pair4: (idx_pp, idx_js) sesuai urutan
+    rotasi_rank: Mapping[str, int]               # kunci pair → posisi di urutan
+    increment_on_save: bool
+    exclude_jabatan_re: re.Pattern
+    dropdown_show_cuti_default: bool
+    cooldown_days: int
+    elastic_beta: float
+    elastic_min_gap_cool: float
+    elastic_streak_cap: int
+    window_days: int
+    half_life_days: int
+    min_weight: float
+    use_decay: bool
+    rekap_journal: bool
+    compact_every: int
+    sig: tuple = ()
+
+    @classmethod
+    def from_dict(cls, cfg: dict, sig: tuple = ()) -> "AppConfig":
+        v = validate_cfg(cfg)
+        rot, hk, bb, rk = v["rotasi"], v["hakim"], v["beban"], v["rekap"]
+        order = tuple(rot["order"])
+        return cls(
+            data=_freeze(v),
+            rotasi_mode=rot["mode"],
+            rotasi_order=order,
+            rotasi_slots=tuple(_PAIR_SLOT.get(k, (0, 0)) for k in order),
+            rotasi_rank=MappingProxyType({k: i for i, k in reversed(list(enumerate(order)))}),
+            increment_on_save=rot["increment_on_save"],
+            exclude_jabatan_re=re.compile(hk["exclude_jabatan_regex"], re.IGNORECASE),
+            dropdown_show_cuti_default=hk["dropdown_show_cuti_default"],
+            cooldown_days=hk["cooldown_days"],
+            elastic_beta=hk["elastic_beta"],
+            elastic_min_gap_cool=hk["elastic_min_gap_cool"],
+            elastic_streak_cap=hk["elastic_streak_cap"],
+            window_days=bb["window_days"],
+            half_life_days=bb["half_life_days"],
+            min_weight=bb["min_weight"],
+            use_decay=bb["use_decay"],
+            rekap_journal=rk["journal"],
+            compact_every=rk["compact_every"],
+            sig=sig,
+        )
+
+    # ---- akses gaya dict (read-only) ----
+    def get(self, key: str, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str):
+        return self.data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    def to_dict(self) -> dict:
+        """Salinan dict biasa yang boleh diubah (form pengaturan → save_config)."""
+        return _thaw(self.data)
+
+def _sig(path: Path) -> tuple:
+    try:
+        stt = Path(path).stat()
+        return (stt.st_mtime_ns, stt.st_size)
+    except OSError:
+        return (0, 0)
+
+def _read_raw(path: Path) -> dict:
     try:
         if path.exists():
             raw = json.loads(path.read_text(encoding="utf-8"))
-            return validate_cfg(raw)
+            if isinstance(raw, dict):
+                return raw
     except Exception:
         pass
-    return json.loads(json.dumps(_DEFAULT_CONFIG))
+    return {}
+
+class ConfigStore:
+    """AppConfig bersama per proses per file; parse + validasi ulang hanya bila signature file berubah."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: dict[str, AppConfig] = {}
+        self.loads = 0
+
+    def get(self, path: Path = CONFIG_PATH) -> AppConfig:
+        p = Path(path)
+        key = p.resolve().as_posix()
+        sig = _sig(p)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit.sig == sig:
+                return hit
+        cfg = AppConfig.from_dict(_read_raw(p), sig=sig)
+        with self._lock:
+            self._entries[key] = cfg
+            self.loads += 1
+        return cfg
+
+    def invalidate(self, path: Path | None = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(Path(path).resolve().as_posix(), None)
+
+@st.cache_resource(show_spinner=False)
+def get_config_store() -> ConfigStore:
+    return ConfigStore()
+
+def get_app_config(path: Path = CONFIG_PATH) -> AppConfig:
+    return get_config_store().get(path)
+
+def load_config(path: Path) -> dict:
+    return get_app_config(path).to_dict()
 
-def save_config(cfg: dict, path: Path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(validate_cfg(cfg), ensure_ascii=False, indent=2), encoding="utf-8")
+def save_config(cfg: dict | AppConfig, path: Path = CONFIG_PATH, after: Callable[[Path], None] | None = None) -> AppConfig:
+    """Validasi + tulis atomik; cache proses langsung di-reset supaya semua sesi membaca versi baru."""
+    raw = cfg.to_dict() if isinstance(cfg, AppConfig) else cfg
+    write_json(path, validate_cfg(raw), after=after)
+    get_config_store().invalidate(path)
+    return get_app_config(path)
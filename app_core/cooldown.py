@@ -1,33 +1,66 @@
 # ==== cooldown v2 (token-based) ====
+# Disimpan di StateStore namespace "cool" (app_core/state_store.py): baca = hit cache proses,
+# tandai hakim = 1 baris delta. cooldown_v2.json lama diimpor sekali, lalu hanya mirror backup.
 from datetime import date
-import json
 from pathlib import Path
+from app_core import batch_assign
+from app_core.state_store import get_state_store
 
 _COOL_V2_PATH = Path("data/cooldown_v2.json")
+_NS = "cool"
+
+def _sig_ns():
+    return ("state", _NS, get_state_store().version(_NS))
 
 def _cool_v2_load():
-    if _COOL_V2_PATH.exists():
-        try:
-            return json.loads(_COOL_V2_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            pass
-    # default store
-    return {"epoch": 1, "map": {}, "auto_daily": False, "last_reset_date": None}
+    stg = batch_assign.active()
+    if stg is not None:   # batch: baca salinan kerja di memori
+        return stg.doc_get(_COOL_V2_PATH, _cool_v2_load_file, _cool_v2_save_file, sig_fn=_sig_ns)
+    return _cool_v2_load_file()
+
+def _cool_v2_load_file():
+    return get_state_store().doc(_NS)
 
 def _cool_v2_save(store):
-    _COOL_V2_PATH.parent.mkdir(parents=True, exist_ok=True)
-    _COOL_V2_PATH.write_text(json.dumps(store, ensure_ascii=False, indent=2), encoding="utf-8")
+    stg = batch_assign.active()
+    if stg is not None:
+        stg.doc_put(_COOL_V2_PATH, store, _cool_v2_save_file, sig_fn=_sig_ns)
+        return
+    _cool_v2_save_file(store)
+
+def _cool_v2_save_file(store):
+    get_state_store().replace(_NS, store)   # hanya kunci yang berubah yang ditulis
+
+def _cool_v2_active_names() -> set:
+    """Nama hakim yang sedang cooldown pada epoch berjalan (sekali baca untuk satu daftar kandidat)."""
+    if batch_assign.active() is not None:
+        s = _cool_v2_load()
+    else:
+        st_ = get_state_store()
+        s = {"epoch": st_.get(_NS, "epoch", 1), "map": st_.get(_NS, "map", {})}
+    ep = s.get("epoch", 1)
+    return {h for h, e in (s.get("map") or {}).items() if e == ep}
 
 def _cool_v2_is_active(hakim: str) -> bool:
     """Aktif jika hakim ditandai di epoch yang sedang berjalan."""
-    s = _cool_v2_load()
-    return s["map"].get(hakim) == s["epoch"]
+    if batch_assign.active() is not None:
+        s = _cool_v2_load()
+        return s["map"].get(hakim) == s["epoch"]
+    st_ = get_state_store()
+    return (st_.get(_NS, "map", {}) or {}).get(hakim) == st_.get(_NS, "epoch", 1)
 
 def _cool_v2_mark(hakim: str):
     """Tandai hakim ini cooldown pada epoch saat ini."""
-    s = _cool_v2_load()
-    s["map"][hakim] = s["epoch"]
-    _cool_v2_save(s)
+    if batch_assign.active() is not None:
+        s = _cool_v2_load()
+        s["map"][hakim] = s["epoch"]
+        _cool_v2_save(s)
+        return
+    def _mark(s):
+        # terhadap isi terbaru (CAS berversi) → tanda hakim lain dari sesi lain tidak tertimpa
+        s.setdefault("map", {})[hakim] = s.get("epoch", 1)
+        return s
+    get_state_store().update(_NS, _mark)
 
 def _cool_v2_reset_all():
     """Reset global: naikkan epoch → semua tanda otomatis non-aktif."""
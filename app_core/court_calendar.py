@@ -0,0 +1,194 @@
+# app_core/court_calendar.py
+# ==== Kalender hari sidang (vektor, sadar libur) ====
+# Pengganti loop harian `str(d) in libur_set` (maks 120 iterasi per panggilan):
+# - hari libur (libur.csv) disimpan sebagai array numpy datetime64[D]
+# - tabel lookup per hari sidang (ISO 1..7): nxt[w, i] = offset hari pertama ≥ i yang
+#   jatuh di hari w dan bukan libur → satu indexing per tanggal, tanpa loop
+# - compute_tgl_sidang_many(...) menjawab satu kolom sekaligus (picker, debug, hitung ulang rekap)
+#
+# Semantik sama dengan _next_judge_day_strict lama: hari_sidang 0 → tanggal awal apa adanya;
+# tidak ketemu dalam 120 hari → tanggal awal.
+from __future__ import annotations
+import threading
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+SEARCH_DAYS = 120          # batas pencarian (sama seperti versi loop)
+_PAD_DAYS = 5 * 366        # cakupan awal di sekitar data libur / tanggal query
+
+DATE_RULES = {
+    "BIASA": {"start": 8, "end_cap": 14},       # 8–14 hari
+    "ISTBAT": {"start": 21},
+    "GHOIB": {"start": 31, "special_klas": {"CT": 124, "CG": 124}},
+    "ROGATORI": {"start": 124},
+    "MAFQUD": {"start": 246},
+}
+
+def _as_day(v) -> np.datetime64:
+    if isinstance(v, np.datetime64):
+        return v.astype("datetime64[D]")
+    if isinstance(v, datetime):
+        v = v.date()
+    if isinstance(v, date):
+        return np.datetime64(v, "D")
+    ts = pd.to_datetime(v, errors="coerce")
+    return np.datetime64("NaT", "D") if pd.isna(ts) else np.datetime64(pd.Timestamp(ts).date(), "D")
+
+def _as_days(values) -> np.ndarray:
+    s = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, errors="coerce")
+    return s.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+class CourtCalendar:
+    """Lookup 'hari sidang berikutnya yang bukan libur' per hari (ISO 1=Senin .. 7=Minggu)."""
+
+    def __init__(self, holidays: Iterable = ()):
+        hol = _as_days(list(holidays)) if holidays is not None else np.array([], dtype="datetime64[D]")
+        self.holidays = np.unique(hol[~np.isnat(hol)])
+        self._lock = threading.Lock()
+        self.origin = None
+        self.nxt = None
+        if self.holidays.size:
+            self._build(self.holidays[0] - _PAD_DAYS, self.holidays[-1] + _PAD_DAYS)
+        else:
+            today = np.datetime64(date.today(), "D")
+            self._build(today - _PAD_DAYS, today + _PAD_DAYS)
+
+    # ---------- tabel ----------
+    def _build(self, lo: np.datetime64, hi: np.datetime64) -> None:
+        n = int((hi - lo).astype(int)) + 1
+        days = lo + np.arange(n)
+        # 1970-01-01 = Kamis → ISO weekday = ((d + 3) % 7) + 1
+        iso = ((days.astype(np.int64) + 3) % 7) + 1
+        ok = ~np.isin(days, self.holidays)
+        idx = np.arange(n)
+        nxt = np.full((8, n), n, dtype=np.int64)   # baris 0 tidak dipakai (hari_sidang kosong)
+        for w in range(1, 8):
+            pos = np.flatnonzero(ok & (iso == w))
+            if pos.size:
+                k = np.searchsorted(pos, idx)
+                nxt[w] = np.where(k < pos.size, pos[np.minimum(k, pos.size - 1)], n)
+        self.origin, self.nxt = lo, nxt
+        self._origin_ord = date.fromisoformat(str(lo)).toordinal()
+
+    def _ensure(self, lo: np.datetime64, hi: np.datetime64) -> None:
+        with self._lock:
+            end = self.origin + (self.nxt.shape[1] - 1)
+            if lo >= self.origin and hi <= end:
+                return
+            self._build(min(lo, self.origin) - 366, max(hi, end) + 366)
+
+    # ---------- query ----------
+    def next_judge_days(self, starts, weekday_iso) -> np.ndarray:
+        """
+        Vektor: hari sidang pertama ≥ start yang jatuh di weekday_iso dan bukan libur.
+        weekday_iso 0/invalid atau start NaT → start apa adanya; tidak ketemu dalam 120 hari → start.
+        """
+        st = _as_days(starts) if not isinstance(starts, np.ndarray) or starts.dtype != "datetime64[D]" else starts
+        w = np.broadcast_to(np.asarray(weekday_iso, dtype=np.int64), st.shape).copy()
+        out = st.copy()
+        valid = ~np.isnat(st) & (w >= 1) & (w <= 7)
+        if not valid.any():
+            return out
+        sv = st[valid]
+        self._ensure(sv.min(), sv.max() + SEARCH_DAYS)
+        off = (sv - self.origin).astype(np.int64)
+        found = self.nxt[w[valid], off]
+        hit = (found - off) < SEARCH_DAYS
+        out[valid] = np.where(hit, self.origin + found, sv)
+        return out
+
+    def next_judge_day(self, start, weekday_iso: int) -> date:
+        """Versi skalar (kompat dengan _next_judge_day_strict): aritmetika ordinal + 1 lookup."""
+        if not isinstance(start, (date, datetime)) or not weekday_iso:
+            return start
+        d0 = start if not isinstance(start, datetime) else start.date()
+        w = int(weekday_iso)
+        if not 1 <= w <= 7:
+            return d0
+        off = d0.toordinal() - self._origin_ord
+        if off < 0 or off + SEARCH_DAYS >= self.nxt.shape[1]:
+            self._ensure(np.datetime64(d0, "D"), np.datetime64(d0, "D") + SEARCH_DAYS)
+            off = d0.toordinal() - self._origin_ord
+        found = int(self.nxt[w, off])
+        return date.fromordinal(self._origin_ord + found) if found - off < SEARCH_DAYS else d0
+
+@lru_cache(maxsize=16)
+def _calendar_cached(holidays: frozenset) -> CourtCalendar:
+    return CourtCalendar(sorted(str(x) for x in holidays))
+
+def get_calendar(holidays: Iterable) -> CourtCalendar:
+    """Kalender bersama per set libur (set string 'YYYY-MM-DD' seperti libur_set lama; nilai invalid diabaikan)."""
+    if isinstance(holidays, CourtCalendar):
+        return holidays
+    return _calendar_cached(holidays if isinstance(holidays, frozenset) else frozenset(holidays))
+
+def _start_offsets(jenis, klas, rules: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(start, end_cap, punya_aturan) per baris sesuai DATE_RULES."""
+    J = pd.Series(jenis).astype(str).str.strip().str.upper().to_numpy()
+    Kl = pd.Series(klas).astype(str).str.strip().str.upper().to_numpy()
+    n = len(J)
+    start = np.zeros(n, dtype=np.int64)
+    cap = np.full(n, -1, dtype=np.int64)
+    has = np.zeros(n, dtype=bool)
+    for key, rule in rules.items():
+        m = J == key
+        if not m.any():
+            continue
+        has |= m
+        start[m] = int(rule.get("start", 0))
+        for k, v in (rule.get("special_klas") or {}).items():
+            start[m & (Kl == k)] = int(v)
+        if "end_cap" in rule:
+            cap[m] = int(rule["end_cap"])
+    return start, cap, has
+
+def compute_tgl_sidang_many(bases, jenis, weekday, klas="", holidays: Iterable | CourtCalendar = (),
+                            rules: dict | None = None) -> np.ndarray:
+    """
+    Versi vektor dari compute_tgl_sidang untuk satu kolom sekaligus.
+    bases/jenis/weekday/klas boleh skalar atau array sepanjang bases. Return datetime64[D].
+    """
+    cal = holidays if isinstance(holidays, CourtCalendar) else get_calendar(holidays)
+    base = _as_days(np.atleast_1d(np.asarray(bases, dtype=object)) if not isinstance(bases, (pd.Series, np.ndarray)) else bases)
+    n = base.shape[0]
+    bc = lambda v: np.asarray(v).reshape(-1) if np.ndim(v) else np.repeat(np.asarray(v), n)
+    wd = pd.to_numeric(pd.Series(bc(weekday)), errors="coerce").fillna(0).astype(np.int64).to_numpy()
+    start, cap, has = _start_offsets(bc(jenis), bc(klas), rules or DATE_RULES)
+
+    out = base.copy()
+    if not has.any():
+        return out
+    s_day = base + start.astype("timedelta64[D]")
+    d = cal.next_judge_days(s_day, wd)
+    capped = cap >= 0
+    if capped.any():
+        end_cap = base + np.where(capped, cap, 0).astype("timedelta64[D]")
+        over = capped & ~np.isnat(d) & (d > end_cap)
+        if over.any():
+            d = d.copy()
+            d[over] = cal.next_judge_days(end_cap[over], wd[over])
+    out[has] = d[has]
+    return out
+
+def compute_tgl_sidang(base: date, jenis: str, hari_sidang_num: int, holidays: Iterable | CourtCalendar = (),
+                       klasifikasi: str = "", rules: dict | None = None) -> date:
+    """Skalar: sama dengan compute_tgl_sidang lama, dihitung lewat tabel lookup."""
+    J = str(jenis).strip().upper()
+    K = str(klasifikasi).strip().upper()
+    rule = (rules or DATE_RULES).get(J)
+    if not rule: return base
+    start = rule.get("start", 0)
+    if "special_klas" in rule:
+        start = rule["special_klas"].get(K, start)
+    cal = get_calendar(holidays)
+    start_d = base + timedelta(days=start)
+    if "end_cap" in rule:
+        end_cap = base + timedelta(days=rule["end_cap"])
+        d = cal.next_judge_day(start_d, hari_sidang_num)
+        return d if d <= end_cap else cal.next_judge_day(end_cap, hari_sidang_num)
+    return cal.next_judge_day(start_d, hari_sidang_num)
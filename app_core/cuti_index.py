@@ -0,0 +1,135 @@
+# app_core/cuti_index.py
+# ==== Indeks interval cuti hakim (dibangun sekali per versi cuti_hakim.csv) ====
+# Pengganti filter cuti_df per nama di setiap panggilan _is_hakim_cuti:
+# - rentang (mulai, akhir) per kunci nama digabung dulu (aturan sama dengan _merge_ranges
+#   di halaman Data Hakim: bersinggungan/berurutan ≤ 1 hari → satu rentang)
+# - semua rentang disimpan dalam satu array terurut kode_nama·2^32 + hari_mulai
+# - is_on_leave(names, dates) = satu np.searchsorted untuk seluruh kandidat
+from __future__ import annotations
+import threading
+from typing import Callable, Iterable
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+_SHIFT = np.int64(1 << 32)   # ruang hari per kode nama
+_OFF = np.int64(1 << 31)     # hari (offset epoch) bisa negatif → geser ke positif
+_COLS = ["_nama_norm", "nama", "mulai", "akhir"]
+
+def _days(values) -> np.ndarray:
+    """Tanggal (skalar/array) → int64 hari sejak epoch; NaT → nilai NaT int64 (dicek terpisah)."""
+    ser = pd.Series([values]) if pd.api.types.is_scalar(values) else pd.Series(values)
+    ts = pd.to_datetime(ser, errors="coerce")
+    return ts.dt.normalize().to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+_NAT = np.datetime64("NaT", "D").astype(np.int64)
+
+def merge_ranges(df: pd.DataFrame, key_col: str = "_nama_norm") -> pd.DataFrame:
+    """
+    Gabung rentang cuti per kunci (kolom key_col, nama, mulai, akhir) tanpa loop per baris.
+    Rentang berikutnya menyambung bila mulai ≤ akhir_terjauh + 1 hari. Nama tampil = nama baris
+    pertama per kunci setelah urut (mulai, akhir).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=_COLS)
+    d = df.sort_values([key_col, "mulai", "akhir"], kind="mergesort").reset_index(drop=True)
+    codes, _ = pd.factorize(d[key_col], sort=True)
+    codes = codes.astype(np.int64)
+    s = _days(d["mulai"]); e = _days(d["akhir"])
+    # akhir terjauh berjalan; komposit kode·2^32 → otomatis reset tiap pergantian kunci
+    run_end = np.maximum.accumulate(codes * _SHIFT + (e + _OFF)) - codes * _SHIFT - _OFF
+    new = np.ones(len(d), dtype=bool)
+    new[1:] = (codes[1:] != codes[:-1]) | (s[1:] > run_end[:-1] + 1)
+    starts = np.flatnonzero(new)
+    last = np.r_[starts[1:], len(d)] - 1
+    first_of_key = d.groupby(codes, sort=False)["nama"].transform("first")
+    unit = d["mulai"].dtype if pd.api.types.is_datetime64_dtype(d["mulai"]) else "datetime64[ns]"
+    out = pd.DataFrame({
+        "_nama_norm": d[key_col].to_numpy()[starts],
+        "nama": first_of_key.to_numpy()[starts],
+        "mulai": s[starts].astype("datetime64[D]").astype(unit),
+        "akhir": run_end[last].astype("datetime64[D]").astype(unit),
+    })
+    if key_col != "_nama_norm":
+        out = out.rename(columns={"_nama_norm": key_col})
+    return out
+
+class CutiIndex:
+    """Rentang cuti gabungan per kunci nama, siap query vektor (names × dates)."""
+
+    def __init__(self, cuti_df: pd.DataFrame, key_fn: Callable[[str], str]):
+        self._key_fn = key_fn
+        self._memo: dict = {}
+        if cuti_df is None or cuti_df.empty:
+            merged = pd.DataFrame(columns=_COLS)
+        else:
+            tmp = cuti_df[["nama", "mulai", "akhir"]].copy()
+            tmp["_nama_norm"] = tmp["nama"].map(self._key)
+            merged = merge_ranges(tmp[tmp["_nama_norm"] != ""])
+        self.ranges = merged
+        keys = merged["_nama_norm"].to_numpy()
+        self._code = {k: i for i, k in enumerate(pd.unique(keys))}
+        codes = np.array([self._code[k] for k in keys], dtype=np.int64)
+        self._comp = codes * _SHIFT + (_days(merged["mulai"]) + _OFF) if len(merged) else np.empty(0, np.int64)
+        self._end = _days(merged["akhir"]) if len(merged) else np.empty(0, np.int64)
+        self._ncode = codes
+
+    def _key(self, nama) -> str:
+        try:
+            k = self._memo.get(nama)
+        except TypeError:                      # nilai tak ter-hash (mis. list) → bukan nama
+            return ""
+        if k is None:
+            k = self._key_fn(nama) if isinstance(nama, str) and nama.strip() else ""
+            self._memo[nama] = k
+        return k
+
+    def __len__(self) -> int:
+        return len(self._comp)
+
+    def is_on_leave(self, names: Iterable[str], dates) -> np.ndarray:
+        """
+        Array bool: names[i] cuti pada dates[i] (inklusif). dates boleh skalar (berlaku untuk
+        semua nama). Nama kosong / tanggal tidak valid → False.
+        """
+        nm = list(names)
+        n = len(nm)
+        if n == 0 or not len(self._comp):
+            return np.zeros(n, dtype=bool)
+        q = _days(dates)
+        q = np.broadcast_to(q, (n,)) if len(q) == 1 else q
+        codes = np.array([self._code.get(self._key(x), -1) for x in nm], dtype=np.int64)
+        ok = (codes >= 0) & (q != _NAT)
+        comp = codes * _SHIFT + (q + _OFF)
+        pos = np.searchsorted(self._comp, comp, side="right") - 1
+        posc = np.clip(pos, 0, None)
+        hit = ok & (pos >= 0) & (self._ncode[posc] == codes) & (self._end[posc] >= q)
+        return hit
+
+    def on_leave(self, nama: str, tanggal) -> bool:
+        if not nama or tanggal is None:
+            return False
+        return bool(self.is_on_leave([nama], tanggal)[0])
+
+class CutiIndexStore:
+    """Indeks bersama per proses; dibangun ulang bila versi cuti atau indeks nama hakim berubah."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ver = None
+        self._names = None
+        self._idx: CutiIndex | None = None
+        self.rebuilds = 0
+
+    def get(self, ver, name_index, loader: Callable[[], pd.DataFrame]) -> CutiIndex:
+        with self._lock:
+            if self._idx is None or self._ver != ver or self._names is not name_index:
+                self._idx = CutiIndex(loader(), name_index.canonical_key)
+                self._ver = ver
+                self._names = name_index
+                self.rebuilds += 1
+            return self._idx
+
+@st.cache_resource(show_spinner=False)
+def get_cuti_index_store() -> CutiIndexStore:
+    return CutiIndexStore()
@@ -0,0 +1,96 @@
+# app_core/data_context.py
+# ==== DataContext: tabel halaman yang dimaterialisasi lazy ====
+# Pengganti blok "LOAD MASTER CSVs" yang jalan di setiap rerun (hakim/pp/js/libur/SK/rekap
+# dibaca + dinormalisasi ulang tiap interaksi widget):
+# - tiap tabel didaftarkan sebagai (version_fn, loader); belum dibaca sampai ada yang memakai
+# - hasil loader (sudah dinormalisasi) disimpan bersama per proses, per versi data
+#   → normalisasi hanya jalan sekali per perubahan file, bukan sekali per rerun per sesi
+# - satu DataContext per run: versi dicek sekali, objek yang sama dipakai sepanjang run
+# - yang dikembalikan VIEW (seperti TableRegistry) → mutasi halaman tidak bocor ke cache bersama
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Any, Callable
+import pandas as pd
+import streamlit as st
+
+from app_core.registry import _view
+
+class DataContextStore:
+    """Memo bersama per proses: (namespace, nama) → (versi, nilai)."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: dict[tuple, tuple[Any, Any]] = {}
+        self.loads = 0
+        self.hits = 0
+
+    def get(self, key: tuple, ver, loader: Callable[[], Any]):
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] == ver:
+                self.hits += 1
+                return hit[1]
+            val = loader()
+            self._entries[key] = (ver, val)
+            self.loads += 1
+            return val
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "loads": self.loads, "hits": self.hits}
+
+@st.cache_resource(show_spinner=False)
+def get_data_context_store() -> DataContextStore:
+    return DataContextStore()
+
+class DataContext:
+    """
+    Kumpulan tabel lazy milik satu halaman (namespace). Akses: ctx.get("hakim") atau ctx.hakim.
+    Buat ulang per run (murah); memo lintas run ada di DataContextStore.
+    """
+
+    def __init__(self, namespace: str, store: DataContextStore | None = None):
+        self._ns = namespace
+        self._store = store if store is not None else get_data_context_store()
+        self._specs: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {}
+        self._run: dict[str, Any] = {}      # memo per run (identitas stabil sepanjang run)
+        self._ver: dict[str, Any] = {}
+
+    def define(self, name: str, version_fn: Callable[[], Any], loader: Callable[[], Any]) -> "DataContext":
+        self._specs[name] = (version_fn, loader)
+        self._run.pop(name, None)
+        self._ver.pop(name, None)
+        return self
+
+    def version(self, name: str):
+        if name not in self._ver:
+            self._ver[name] = self._specs[name][0]()
+        return self._ver[name]
+
+    def get(self, name: str):
+        if name not in self._run:
+            val = self._store.get((self._ns, name), self.version(name), self._specs[name][1])
+            self._run[name] = _view(val) if isinstance(val, pd.DataFrame) else val
+        return self._run[name]
+
+    def derive(self, name: str, tag: str, fn: Callable[[Any], Any]):
+        """Turunan tabel (mis. indeks) dimemo per versi tabel sumber; tidak di-view-kan."""
+        return self._store.get((self._ns, name, tag), self.version(name), lambda: fn(self.get(name)))
+
+    def loaded(self) -> list[str]:
+        """Nama tabel yang sudah dimaterialisasi pada run ini (untuk debug)."""
+        return list(self._run)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name not in self._specs:
+            raise AttributeError(name)
+        return self.get(name)
+
+def dir_version(path: Path) -> tuple:
+    """Signature direktori (mtime isi daftar file) → kunci memo hasil glob."""
+    try:
+        stt = Path(path).stat()
+        return (stt.st_mtime_ns, stt.st_ino)
+    except OSError:
+        return (0, 0)
@@ -1,14 +1,20 @@
 # app_core/data_io.py
 from __future__ import annotations
-import os, io, json, tempfile
+import os
+from pathlib import Path
 from typing import Tuple
 import pandas as pd
 
+from app_core import sqlite_backend
+from app_core.io_csv import write_table
+
 # ==== Konfigurasi lokasi penyimpanan ====
 # Ubah ke path yang kamu mau (pastikan user punya write permission)
 DATA_DIR = os.environ.get("APP_DATA_DIR", os.path.join(os.getcwd(), "data"))
 
-# Nama file tabel (CSV). Kamu bisa ganti ke .parquet kalau mau.
+# Nama file tabel. Sumber kebenaran = <stem>.parquet bertipe (lihat app_core/io_csv.py), atau
+# tabel SQLite <stem> bila APP_STORAGE=sqlite (app_core/sqlite_backend.py);
+# file .csv di bawah ini hanyalah mirror ekspor yang ditulis ulang setiap save_table.
 FILES = {
     "hakim":       "hakim.csv",
     "pp":          "pp.csv",
@@ -27,49 +33,23 @@ def _path(name: str) -> str:
     fname = FILES.get(name, f"{name}.csv")
     return os.path.join(DATA_DIR, fname)
 
-# ==== Helper aman untuk tulis file (atomic write) ====
-def _atomic_write_csv(df: pd.DataFrame, path: str):
-    tmp_fd, tmp_path = tempfile.mkstemp(prefix="tmp_", suffix=".csv", dir=os.path.dirname(path))
-    os.close(tmp_fd)
-    try:
-        df.to_csv(tmp_path, index=False)
-        # ganti atomik
-        if os.path.exists(path):
-            os.replace(tmp_path, path)
-        else:
-            os.rename(tmp_path, path)
-    finally:
-        try:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-        except Exception:
-            pass
-
 # ==== API publik: save/load ====
 def save_table(df: pd.DataFrame, name: str) -> None:
     """
-    Simpan DataFrame ke CSV permanen.
+    Simpan DataFrame ke store bertipe (parquet) + CSV mirror.
     name: salah satu key di FILES, mis. "sk_majelis", "rekap", dst.
     """
     if not isinstance(df, pd.DataFrame):
         raise ValueError("save_table expects a pandas DataFrame")
-    path = _path(name)
-    _atomic_write_csv(df, path)
-
-def _read_csv_safe(path: str) -> pd.DataFrame:
-    if not os.path.exists(path):
-        return pd.DataFrame()
-    try:
-        return pd.read_csv(path)
-    except Exception:
-        # Fallback: kadang encoding bermasalah
-        with open(path, "rb") as f:
-            raw = f.read()
-        return pd.read_csv(io.BytesIO(raw))
+    write_table(df, Path(_path(name)))
 
 def load_table(name: str) -> pd.DataFrame:
-    """Baca CSV → DataFrame. Kalau belum ada, kembalikan df kosong."""
-    return _read_csv_safe(_path(name))
+    """Baca tabel bertipe → DataFrame. Kalau belum ada, kembalikan df kosong."""
+    from app_core.registry import get_registry   # cache bersama lintas sesi
+    if name == "rekap":
+        # rekap = base snapshot + jurnal append-only
+        return get_registry().rekap(Path(_path(name)))
+    return get_registry().table(Path(_path(name)))
 
 def load_all() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
@@ -81,16 +61,43 @@ def load_all() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame,
     js_ghoib_df = load_table("js_ghoib")
     libur_df    = load_table("libur")
     rekap_df    = load_table("rekap")
-    # parse tanggal kalau ada kolom tgl_*
-    for df in (rekap_df, libur_df):
-        for c in list(df.columns):
-            if c.startswith("tgl_") or c == "tanggal":
-                try:
-                    df[c] = pd.to_datetime(df[c], errors="coerce")
-                except Exception:
-                    pass
+    # kolom tgl_*/tanggal sudah bertipe tanggal dari store → tidak perlu parse ulang
     return hakim_df, pp_df, js_df, js_ghoib_df, libur_df, rekap_df
 
+def rekap_version() -> tuple:
+    """Versi rekap saat ini (kunci cache turunan, mis. PDF instrumen)."""
+    from app_core.registry import get_registry
+    return get_registry().rekap_version(Path(_path("rekap")))
+
+def rekap_range(start=None, end=None, col: str = "tgl_register") -> pd.DataFrame:
+    """
+    Baris rekap dengan start ≤ col ≤ end (tanggal, batas opsional).
+    Mode SQLite: query berindeks (ix_tgl_reg / ix_tgl_sidang) tanpa memuat seluruh rekap.
+    """
+    from app_core.registry import normalize_rekap
+    lo = pd.to_datetime(start).strftime("%Y-%m-%d") if start is not None else None
+    hi = pd.to_datetime(end).strftime("%Y-%m-%d") if end is not None else None
+    p = Path(_path("rekap"))
+    be = sqlite_backend.for_path(p)
+    if be is not None and col in ("tgl_register", "tgl_sidang"):
+        where, params = [], []
+        if lo: where.append(f'"{col}" >= ?'); params.append(lo)
+        if hi: where.append(f'"{col}" <= ?'); params.append(hi)
+        return normalize_rekap(be.select(p, " AND ".join(where), params))
+    df = load_table("rekap")
+    d = pd.to_datetime(df[col], errors="coerce")
+    mask = pd.Series(True, index=df.index)
+    if lo: mask &= d >= pd.Timestamp(lo)
+    if hi: mask &= d <= pd.Timestamp(hi)
+    return df.loc[mask]
+
+def transaction():
+    """
+    Commit multi-tabel atomik (mode SQLite): save_table, entri rekap, rotasi/cooldown dan audit
+    di dalam blok ini ikut satu transaksi. Mode file → tanpa efek.
+    """
+    return sqlite_backend.transaction()
+
 def load_with_sk() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
     Versi lengkap: termasuk SK Majelis.
@@ -1,12 +1,13 @@
 # app_core/helpers.py — versi bersih & tahan banting
 
 from __future__ import annotations
-import re
 import pandas as pd
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
 from io import BytesIO
 from typing import Optional, Tuple, List
 
+from app_core.name_index import name_key, index_for
+
 # =========================
 # KONSTAN & UTIL DASAR
 # =========================
@@ -25,11 +26,7 @@ def _first_col(df: pd.DataFrame, cands: List[str]) -> Optional[str]:
 
 def _norm_tokens(s: str) -> List[str]:
     """Normalisasi nama (buang gelar/simbol), untuk cocokkan alias santai."""
-    if not isinstance(s, str):
-        return []
-    s = s.strip().replace(",", " ").replace(".", " ")
-    s = re.sub(r"\s+", " ", s).strip().lower()
-    return [t for t in s.split() if len(t) > 1 and t not in {"s","h","m","e"}]
+    return [t for t in name_key(s).split() if len(t) > 1]
 
 def _count_perkara_for_ketua(rekap_df: pd.DataFrame, ketua_name: str) -> int:
     """Hitung banyak perkara milik ketua (0-based count untuk rotasi)."""
@@ -73,20 +70,9 @@ def compute_nomor_tipe(nomor, klasifikasi_text, pilihan):
     return (n_base + " " + tipe).strip(), tipe
 
 def next_judge_day(dasar: date, hari_sidang_num: int, libur_dates: set):
-    d = dasar
-    delta = (hari_sidang_num - d.isoweekday()) % 7
-    calon = d + timedelta(days=delta)
-    while True:
-        if calon.isoweekday() >= 6:
-            calon = calon + timedelta(days=(8 - calon.isoweekday()) % 7)
-            delta2 = (hari_sidang_num - calon.isoweekday()) % 7
-            calon = calon + timedelta(days=delta2)
-            continue
-        if calon.strftime("%Y-%m-%d") in libur_dates:
-            calon = calon + timedelta(days=7)
-            continue
-        break
-    return calon
+    # hari sidang (ISO 1..5) pertama >= dasar yang bukan libur — lookup tabel kalender
+    from app_core.court_calendar import get_calendar
+    return get_calendar(libur_dates).next_judge_day(dasar, hari_sidang_num)
 
 def choose_hakim_auto(hakim_df, rekap_df, tanggal_reg: date):
     if hakim_df.empty: return ""
@@ -186,19 +172,12 @@ def _match_row_by_ketua(sk_df: pd.DataFrame, ketua_name: str) -> Optional[pd.Ser
     kcol = _first_col(sk_df, ["ketua","ketua_hakim","hakim_ketua","ketua majelis","nm_ketua","nama_ketua"])
     if not kcol:
         return None
-    tgt = set(_norm_tokens(ketua_name))
-    best = None
-    best_score = -1
-    for _, r in sk_df.iterrows():
-        nm = str(r.get(kcol,""))
-        if not nm:
-            continue
-        toks = set(_norm_tokens(nm))
-        score = len(tgt & toks)
-        if score > best_score:
-            best_score = score
-            best = r
-    return best
+    named = sk_df[sk_df[kcol].astype(str).str.len() > 0]
+    if named.empty:
+        return None
+    # overlap token terbanyak lewat indeks terbalik (seri → baris teratas)
+    pos = index_for(named.reset_index(drop=True), kcol, None).resolve_pos(ketua_name)
+    return named.iloc[pos if pos is not None else 0]   # tanpa overlap → baris pertama (perilaku lama)
 
 def _extract_pp_js_from_sk_row(row: pd.Series) -> Tuple[str,str,str,str]:
     PP1 = ["pp1","pp 1","pp_1","panitera1","panitera_1","panitera"]
@@ -7,19 +7,19 @@ dengan kriteria beban GHOIB paling kecil berdasarkan `rekap`.
 """
 import re
 import pandas as pd
-from db import get_conn
+from db import query_df
+from app_core.stats_cube import StatsCube, rekap_cube
+
+_TTL = 15   # detik; tabel js_ghoib kecil dan jarang berubah
 
 def _norm_flat(s: str) -> str:
     return re.sub(r"\s+", " ", re.sub(r"[^\w]+", " ", str(s or "").lower())).strip()
 
 def _load_js_ghoib(use_aktif: bool = True) -> pd.DataFrame:
-    con = get_conn()
     try:
-        df = pd.read_sql_query("SELECT * FROM js_ghoib", con)
+        df = query_df("SELECT * FROM js_ghoib", ttl=_TTL)   # pool + memo singkat (dipanggil per perkara)
     except Exception:
         df = pd.DataFrame()
-    finally:
-        con.close()
     if use_aktif and not df.empty and "aktif" in df.columns:
         def _flag(v):
             s=str(v).strip().upper()
@@ -30,7 +30,17 @@ def _load_js_ghoib(use_aktif: bool = True) -> pd.DataFrame:
         df = df[df["aktif"].apply(_flag)]
     return df
 
-def choose_js_ghoib_db(rekap_df: pd.DataFrame, use_aktif: bool = True) -> str:
+def _ghoib_counts(rekap_df: pd.DataFrame | None) -> dict:
+    """Beban GHOIB per JS (kunci _norm_flat) dari kubus statistik; rekap_df=None → kubus rekap bersama."""
+    cube = rekap_cube() if rekap_df is None else StatsCube.from_rekap(rekap_df)
+    q = cube.query("js", ("person",), jenis="GHOIB")
+    counts: dict = {}
+    for nm, n in q.items():
+        k = _norm_flat(nm)
+        counts[k] = counts.get(k, 0) + int(n)
+    return counts
+
+def choose_js_ghoib_db(rekap_df: pd.DataFrame | None = None, use_aktif: bool = True) -> str:
     """
     Return nama JS Ghoib dengan beban GHOIB terkecil menurut `rekap`.
     Jika tabel kosong atau tidak ada kandidat, return "".
@@ -42,31 +52,16 @@ def choose_js_ghoib_db(rekap_df: pd.DataFrame, use_aktif: bool = True) -> str:
     candidates = [str(x).strip() for x in master["nama"].dropna().tolist() if str(x).strip()]
     if not candidates:
         return ""
-    # hitung beban dari rekap untuk perkara GHOIB saja
-    counts = {}
-    if isinstance(rekap_df, pd.DataFrame) and not rekap_df.empty and all(c in rekap_df.columns for c in ["js","jenis_perkara"]):
-        r = rekap_df.copy()
-        r["jenis_u"] = r["jenis_perkara"].astype(str).str.upper().str.strip()
-        r = r[r["jenis_u"] == "GHOIB"]
-        if not r.empty:
-            r["js_norm"] = r["js"].astype(str).map(_norm_flat)
-            counts = r.groupby("js_norm").size().to_dict()
+    counts = _ghoib_counts(rekap_df)
     # pilih kandidat dengan beban paling kecil (tie -> alfabet)
     pairs = [(c, counts.get(_norm_flat(c), 0)) for c in candidates]
     pairs.sort(key=lambda x: (x[1], x[0].lower()))
     return pairs[0][0] if pairs else ""
 
 # helper debug opsional
-def debug_js_ghoib(rekap_df: pd.DataFrame, use_aktif: bool = True) -> dict:
+def debug_js_ghoib(rekap_df: pd.DataFrame | None = None, use_aktif: bool = True) -> dict:
     master = _load_js_ghoib(use_aktif=use_aktif)
     cands = [str(x).strip() for x in master.get("nama", pd.Series([])).dropna().tolist() if str(x).strip()]
-    counts = {}
-    if isinstance(rekap_df, pd.DataFrame) and not rekap_df.empty and all(c in rekap_df.columns for c in ["js","jenis_perkara"]):
-        r = rekap_df.copy()
-        r["jenis_u"] = r["jenis_perkara"].astype(str).str.upper().str.strip()
-        r = r[r["jenis_u"] == "GHOIB"]
-        if not r.empty:
-            r["js_norm"] = r["js"].astype(str).map(_norm_flat)
-            counts = r.groupby("js_norm").size().to_dict()
+    counts = _ghoib_counts(rekap_df)
     pick = choose_js_ghoib_db(rekap_df, use_aktif=use_aktif)
     return {"candidates": cands, "counts": counts, "pick": pick, "table": master}
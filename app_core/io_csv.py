@@ -1,10 +1,54 @@
 # app_core/io_csv.py
+# ==== Penyimpanan tabel: Parquet bertipe (sumber kebenaran) + CSV mirror ====
+# - read_table(path_csv): baca <stem>.parquet (tanggal=date32, aktif=bool, __id=string).
+#   CSV hanya dibaca saat impor: parquet belum ada / dibuat versi lama / CSV diubah di luar app.
+#   Impor jalan di bawah path_lock file itu (sama dengan penulis) → tidak menimpa tulisan yang sedang jalan.
+# - write_table(df, path_csv): tulis parquet (atomic) + CSV mirror (ekspor, via mirror_all),
+#   diserialkan lewat penulis tunggal (app_core/write_coordinator.py).
+# - update_table(path_csv, fn): read-modify-write atomik terhadap isi terbaru di disk.
+# - Tanpa pyarrow → otomatis kembali ke CSV (tetap dinormalisasi tipenya).
+# - APP_STORAGE=sqlite → tabel di data/ dibaca/ditulis lewat app_core/sqlite_backend.py (API sama).
 from __future__ import annotations
-import os, shutil, tempfile
+import os, re, json, shutil, tempfile
 from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    _HAVE_ARROW = True
+except Exception:  # pyarrow opsional
+    pa = pq = None
+    _HAVE_ARROW = False
+
+from app_core.mirror_all import mirror_csv
+from app_core.write_coordinator import get_write_coordinator, path_lock, saver
+
+_STORE_META_KEY = b"saef.store"
+_STORE_VERSION = 1
+
+# Kolom bertipe
+DATE_COLS_EXACT = {"tanggal", "tgl", "date", "mulai", "akhir"}
+NON_DATE_COLS = {"tgl_sidang_override"}   # flag 0/1, bukan tanggal
+BOOL_COLS = {"aktif"}
+ID_COLS = {"__id"}
+
+def _is_date_col(c: str) -> bool:
+    c = str(c).strip().lower()
+    if c in NON_DATE_COLS:
+        return False
+    return c.startswith("tgl_") or c in DATE_COLS_EXACT
+
+def _is_active_value(v) -> bool:
+    if isinstance(v, bool):
+        return v
+    s = re.sub(r"[^A-Z0-9]+", "", str(v).strip().upper())
+    if s in {"1","YA","Y","TRUE","T","AKTIF","ON"}: return True
+    if s in {"0","TIDAK","TDK","NO","N","FALSE","F","NONAKTIF","OFF","NONE","NAN",""}: return False
+    try: return float(s) != 0.0
+    except: return False
+
 # Fallback reader with encoding tries
 def _read_csv_raw(path: Path) -> pd.DataFrame:
     if not path.exists(): return pd.DataFrame()
@@ -15,6 +59,209 @@ def _read_csv_raw(path: Path) -> pd.DataFrame:
             continue
     return pd.read_csv(path)
 
+def _to_dates(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        out = s
+    else:
+        out = pd.to_datetime(s, errors="coerce", format="ISO8601")
+        # sisa yang gagal (mis. 27/11/2024) → coba dayfirst
+        miss = out.isna() & s.notna() & (s.astype(str).str.strip() != "")
+        if miss.any():
+            out = out.copy()
+            out.loc[miss] = pd.to_datetime(s[miss].astype(str), errors="coerce", dayfirst=True, format="mixed")
+    out = pd.to_datetime(out, errors="coerce")
+    if getattr(out.dt, "tz", None) is not None:
+        out = out.dt.tz_localize(None)
+    return out.dt.normalize().astype("datetime64[ns]")
+
+def _str_or_na(v):
+    try:
+        if pd.isna(v):
+            return v
+    except (TypeError, ValueError):
+        pass
+    return str(v).strip()
+
+def to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalisasi tipe kolom: tanggal → datetime64 (hari), aktif → bool, __id → string."""
+    if not isinstance(df, pd.DataFrame):
+        return pd.DataFrame()
+    out = df.copy()
+    out.columns = [str(c).replace("\ufeff", "") for c in out.columns]
+    for c in out.columns:
+        if _is_date_col(c):
+            out[c] = _to_dates(out[c])
+        elif c in BOOL_COLS:
+            if not pd.api.types.is_bool_dtype(out[c]):
+                out[c] = out[c].map(_is_active_value).astype(bool)
+        elif c in ID_COLS:
+            s = out[c].map(_str_or_na)
+            out[c] = s.mask(s.map(lambda v: str(v).strip().lower() in {"", "nan", "none", "<na>"}))
+        elif out[c].dtype == object:
+            # kolom campuran (angka+teks) → teks supaya bisa disimpan ke parquet
+            out[c] = out[c].map(_str_or_na)
+    return out
+
+def to_export(df: pd.DataFrame) -> pd.DataFrame:
+    """Bentuk CSV mirror: tanggal ISO (YYYY-MM-DD), bool → 1/0."""
+    out = df.copy()
+    for c in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[c]):
+            out[c] = out[c].dt.strftime("%Y-%m-%d")
+        elif pd.api.types.is_bool_dtype(out[c]):
+            out[c] = out[c].astype(int)
+    return out
+
+# ---------- Parquet ----------
+def parquet_path_for(path: Path) -> Path:
+    return Path(path).with_suffix(".parquet")
+
+def _sig(p: Path) -> list:
+    try:
+        s = p.stat()
+        return [s.st_mtime_ns, s.st_size]
+    except FileNotFoundError:
+        return [0, 0]
+
+def _backend(path):
+    from app_core import sqlite_backend   # impor lambat: sqlite_backend mengimpor modul ini
+    return sqlite_backend.for_path(path)
+
+def table_version(path: Path) -> tuple:
+    """Signature CSV + parquet → kunci cache pembaca."""
+    path = Path(path)
+    be = _backend(path)
+    if be is not None:
+        return ("sqlite", be.version(path))
+    return (tuple(_sig(path)), tuple(_sig(parquet_path_for(path))))
+
+def _store_meta(pqp: Path) -> dict | None:
+    try:
+        md = pq.read_schema(pqp.as_posix()).metadata or {}
+        raw = md.get(_STORE_META_KEY)
+        return json.loads(raw.decode("utf-8")) if raw else None
+    except Exception:
+        return None
+
+def _parquet_is_current(path: Path) -> bool:
+    """Parquet dipakai jika dibuat oleh store ini & CSV belum diubah di luar app."""
+    pqp = parquet_path_for(path)
+    if not pqp.exists():
+        return False
+    meta = _store_meta(pqp)
+    if not meta or int(meta.get("v", 0)) != _STORE_VERSION:
+        return False
+    if not path.exists():
+        return True
+    return list(meta.get("csv", [])) == _sig(path)
+
+def _arrow_table(df: pd.DataFrame, csv_sig: list):
+    fields = []
+    for c in df.columns:
+        s = df[c]
+        if pd.api.types.is_datetime64_any_dtype(s):
+            fields.append(pa.field(c, pa.date32()))
+        elif pd.api.types.is_bool_dtype(s):
+            fields.append(pa.field(c, pa.bool_()))
+        elif c in ID_COLS or s.dtype == object or pd.api.types.is_string_dtype(s):
+            fields.append(pa.field(c, pa.string()))
+        else:
+            fields.append(pa.field(c, pa.from_numpy_dtype(s.dtype)))
+    schema = pa.schema(fields)
+    tbl = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    meta = dict(tbl.schema.metadata or {})
+    meta[_STORE_META_KEY] = json.dumps({"v": _STORE_VERSION, "csv": csv_sig}).encode("utf-8")
+    return tbl.replace_schema_metadata(meta)
+
+def _write_parquet(df: pd.DataFrame, path: Path, csv_sig: list) -> None:
+    pqp = parquet_path_for(path)
+    pqp.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="tmp_", suffix=".parquet", dir=pqp.parent.as_posix())
+    os.close(fd)
+    try:
+        pq.write_table(_arrow_table(df, csv_sig), tmp)
+        os.replace(tmp, pqp.as_posix())
+    finally:
+        try:
+            if os.path.exists(tmp): os.remove(tmp)
+        except Exception:
+            pass
+
+def _read_parquet(path: Path) -> pd.DataFrame:
+    tbl = pq.read_table(parquet_path_for(path).as_posix())
+    tbl = tbl.replace_schema_metadata(None)   # metadata pandas lama tidak dipakai
+    df = tbl.to_pandas(date_as_object=False)
+    for c in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[c]):
+            df[c] = df[c].astype("datetime64[ns]")
+    return df
+
+def read_table(path: Path) -> pd.DataFrame:
+    """Baca tabel bertipe (parquet; impor dari CSV bila perlu)."""
+    path = Path(path)
+    be = _backend(path)
+    if be is not None:
+        return be.read(path)
+    return _read_table_file(path)
+
+def _read_table_file(path: Path) -> pd.DataFrame:
+    if _HAVE_ARROW:
+        if _parquet_is_current(path):
+            try:
+                return _read_parquet(path)
+            except Exception:
+                pass
+        if not path.exists():
+            return pd.DataFrame()
+        # impor CSV → parquet di bawah lock file yang sama dengan penulis: tulisan yang sedang jalan
+        # (mirror CSV sudah, parquet belum) ditunggu lalu parquet-nya dipakai; signature diambil
+        # SEBELUM baca → parquet hanya dicap "terkini" untuk isi CSV yang benar-benar dibaca
+        with path_lock(path):
+            if _parquet_is_current(path):
+                try:
+                    return _read_parquet(path)
+                except Exception:
+                    pass
+            if not path.exists():
+                return pd.DataFrame()
+            sig = _sig(path)
+            df = to_typed(_read_csv_raw(path))
+            if _sig(path) == sig:   # CSV tidak diubah dari luar app selama dibaca
+                try:
+                    _write_parquet(df, path, sig)   # impor → parquet
+                except Exception:
+                    pass
+            return df
+    return to_typed(_read_csv_raw(path))
+
+def _write_table_now(path: Path, df: pd.DataFrame) -> None:
+    path = Path(path)
+    typed = to_typed(df)
+    mirror_csv(to_export(typed), path.as_posix())
+    if _HAVE_ARROW:
+        _write_parquet(typed, path, _sig(path))
+
+def write_table(df: pd.DataFrame, path: Path, after=None) -> None:
+    """
+    Tulis parquet (sumber kebenaran) + CSV mirror (ekspor) lewat penulis tunggal.
+    after(path) opsional dijalankan di bawah lock file yang sama (mis. backup snapshot).
+    """
+    be = _backend(path)
+    if be is not None:   # SQLite menyerialkan penulis sendiri; ikut transaksi thread ini bila ada
+        be.write(path, df, after)
+        return
+    get_write_coordinator().put(path, df, saver(path, _write_table_now, after))
+
+def update_table(path: Path, fn, after=None) -> pd.DataFrame:
+    """Read-modify-write: df_baru = fn(read_table(path)) lalu tulis. Return df_baru."""
+    path = Path(path)
+    be = _backend(path)
+    if be is not None:
+        return be.update(path, fn, after)
+    return get_write_coordinator().update(path, fn, lambda: read_table(path),
+                                          saver(path, _write_table_now, after))
+
+# ---------- API lama (kompat) ----------
 def _atomic_write_csv(df: pd.DataFrame, path: Path):
     path.parent.mkdir(parents=True, exist_ok=True)
     with tempfile.NamedTemporaryFile('w', delete=False, encoding="utf-8-sig", newline='') as tmp:
@@ -24,13 +271,12 @@ def _atomic_write_csv(df: pd.DataFrame, path: Path):
     shutil.move(tmp.name, path.as_posix())
 
 @st.cache_data(show_spinner=False)
-def _read_csv_cached(path_str: str, mtime: float) -> pd.DataFrame:
+def _read_csv_cached(path_str: str, ver: tuple) -> pd.DataFrame:
     p = Path(path_str)
-    return _read_csv_raw(p)
+    return read_table(p)
 
 def read_csv(path: Path) -> pd.DataFrame:
-    mtime = path.stat().st_mtime if path.exists() else 0.0
-    return _read_csv_cached(path.as_posix(), mtime)
+    return _read_csv_cached(Path(path).as_posix(), table_version(path))
 
 def write_csv(df: pd.DataFrame, path: Path):
-    _atomic_write_csv(df, path)
+    write_table(df, path)
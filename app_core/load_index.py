@@ -0,0 +1,251 @@
+# app_core/load_index.py
+# ==== Indeks beban per hakim (dipelihara inkremental) ====
+# Menggantikan scan penuh rekap di setiap auto-pick:
+# - counts[h, d]  : jumlah perkara hakim h yang register pada hari d (d = offset dari day0)
+# - cum[h, d]     : kumulatif counts sampai hari d
+# - first/last    : hari pertama/terakhir per hakim (kunci lower-case, sama seperti scan lama)
+# Query beban (window + decay) = reduksi vektor O(hakim × window_hari), tidak tergantung
+# berapa tahun rekap yang disimpan. Simpan/edit/hapus cukup update satu sel + kumulatif.
+from __future__ import annotations
+from datetime import date
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app_core.versioned_store import VersionedStore
+
+_NO_SEEN = 9999   # nilai default "belum pernah" (sama seperti versi lama)
+
+def _day(v) -> np.datetime64 | None:
+    try:
+        ts = pd.to_datetime(v, errors="coerce")
+    except Exception:
+        return None
+    if ts is None or pd.isna(ts):
+        return None
+    return np.datetime64(pd.Timestamp(ts).date(), "D")
+
+def _name(v) -> str:
+    if v is None:
+        return ""
+    try:
+        if pd.isna(v):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    return str(v).strip()
+
+class LoadIndex:
+    """Matriks hitungan harian per nama hakim (nama = string strip, case-sensitive)."""
+
+    def __init__(self):
+        self.names: list[str] = []
+        self.pos: dict[str, int] = {}
+        self.day0: np.datetime64 | None = None
+        self.counts = np.zeros((0, 0), dtype=np.int32)
+        self.cum = np.zeros((0, 0), dtype=np.int64)
+        self._bounds = None   # cache first/last per kunci lower-case
+
+    # ---------- bangun ----------
+    @classmethod
+    def from_rekap(cls, rekap_df: pd.DataFrame) -> "LoadIndex":
+        idx = cls()
+        if rekap_df is None or rekap_df.empty or "hakim" not in rekap_df.columns or "tgl_register" not in rekap_df.columns:
+            return idx
+        nm = rekap_df["hakim"].map(_name)
+        tg = rekap_df["tgl_register"]
+        if not pd.api.types.is_datetime64_any_dtype(tg):
+            tg = pd.to_datetime(tg, errors="coerce")
+        ok = (nm != "") & tg.notna()
+        if not ok.any():
+            return idx
+        nm = nm[ok]
+        days = tg[ok].values.astype("datetime64[D]")
+        codes, uniq = pd.factorize(nm, sort=False)
+        idx.names = [str(x) for x in uniq]
+        idx.pos = {n: i for i, n in enumerate(idx.names)}
+        idx.day0 = days.min()
+        span = int((days.max() - idx.day0).astype(int)) + 1
+        off = (days - idx.day0).astype(np.int64)
+        counts = np.zeros((len(idx.names), span), dtype=np.int32)
+        np.add.at(counts, (codes, off), 1)
+        idx.counts = counts
+        idx.cum = np.cumsum(counts, axis=1, dtype=np.int64)
+        return idx
+
+    def copy(self) -> "LoadIndex":
+        out = LoadIndex()
+        out.names = list(self.names)
+        out.pos = dict(self.pos)
+        out.day0 = self.day0
+        out.counts = self.counts.copy()
+        out.cum = self.cum.copy()
+        return out
+
+    # ---------- update inkremental ----------
+    def _ensure_day(self, d: np.datetime64) -> int:
+        if self.day0 is None:
+            self.day0 = d
+            self.counts = np.zeros((len(self.names), 1), dtype=np.int32)
+            self.cum = np.zeros((len(self.names), 1), dtype=np.int64)
+            return 0
+        off = int((d - self.day0).astype(int))
+        if off < 0:
+            pad = -off
+            self.counts = np.pad(self.counts, ((0, 0), (pad, 0)))
+            self.cum = np.pad(self.cum, ((0, 0), (pad, 0)))
+            self.day0 = d
+            off = 0
+        elif off >= self.counts.shape[1]:
+            pad = off - self.counts.shape[1] + 1
+            self.counts = np.pad(self.counts, ((0, 0), (0, pad)))
+            last = self.cum[:, -1:] if self.cum.shape[1] else np.zeros((self.cum.shape[0], 1), dtype=np.int64)
+            self.cum = np.concatenate([self.cum, np.repeat(last, pad, axis=1)], axis=1)
+        return off
+
+    def _ensure_name(self, nm: str) -> int:
+        i = self.pos.get(nm)
+        if i is None:
+            i = len(self.names)
+            self.names.append(nm)
+            self.pos[nm] = i
+            width = self.counts.shape[1]
+            self.counts = np.vstack([self.counts, np.zeros((1, width), dtype=np.int32)])
+            self.cum = np.vstack([self.cum, np.zeros((1, width), dtype=np.int64)])
+        return i
+
+    def add(self, hakim, tgl_register, delta: int = 1) -> None:
+        nm, d = _name(hakim), _day(tgl_register)
+        if not nm or d is None:
+            return
+        i = self._ensure_name(nm)
+        off = self._ensure_day(d)
+        self.counts[i, off] += delta
+        self.cum[i, off:] += delta
+        self._bounds = None
+
+    def apply_row(self, row: dict | pd.Series | None, sign: int = 1) -> None:
+        if row is None:
+            return
+        get = row.get if hasattr(row, "get") else (lambda k, default=None: default)
+        self.add(get("hakim", ""), get("tgl_register", None), delta=sign)
+
+    # ---------- query ----------
+    def _now_off(self, now_date) -> int:
+        d = _day(now_date) or np.datetime64(date.today(), "D")
+        return int((d - self.day0).astype(int))
+
+    def weighted_loads(self, now_date, window_days: int = 90, half_life_days: int = 30,
+                       min_weight: float = 0.05, use_decay: bool = True) -> dict[str, float]:
+        """
+        Sama dengan scan lama:
+          age = now - tgl (dipotong bawah 0 → perkara bertanggal > now dihitung umur 0)
+          weight = 0.5 ** (age/half_life) bila use_decay, selain itu 1.0; hanya age ≤ window
+          baris dengan weight < min_weight dibuang.
+        """
+        if self.day0 is None or not self.names:
+            return {}
+        ndays = self.counts.shape[1]
+        now = self._now_off(now_date)
+        window_days = max(0, int(window_days))
+        ages = np.arange(window_days + 1, dtype=float)           # age 0..window
+        if use_decay:
+            w = 0.5 ** (ages / float(half_life_days))
+        else:
+            w = np.ones_like(ages)
+        if min_weight > 0:
+            w = np.where(w >= float(min_weight), w, 0.0)
+        total = np.zeros(len(self.names), dtype=float)
+        # bagian window: hari now-window .. now (dibatasi rentang indeks)
+        lo, hi = max(0, now - window_days), min(ndays - 1, now)
+        if hi >= lo:
+            seg = self.counts[:, lo:hi + 1].astype(float)       # kolom = hari lo..hi
+            age_seg = now - np.arange(lo, hi + 1)               # umur tiap kolom
+            total += seg @ w[age_seg]
+        # perkara bertanggal setelah now → umur 0
+        if now < ndays - 1 and w[0] > 0:
+            after = self.cum[:, -1] - (self.cum[:, now] if now >= 0 else 0)
+            total += after.astype(float) * w[0]
+        return {n: float(v) for n, v in zip(self.names, total) if v > 0}
+
+    def _seen_bounds(self) -> tuple[dict[str, int], dict[str, int]]:
+        """first/last offset per kunci lower-case (gabungan semua ejaan yang sama)."""
+        if self._bounds is not None:
+            return self._bounds
+        has = self.counts > 0
+        first, last = {}, {}
+        if not has.size:
+            return first, last
+        any_ = has.any(axis=1)
+        fi = has.argmax(axis=1)
+        li = has.shape[1] - 1 - has[:, ::-1].argmax(axis=1)
+        for n, ok, f, l in zip(self.names, any_, fi, li):
+            if not ok:
+                continue
+            k = n.lower()
+            first[k] = min(first.get(k, int(f)), int(f))
+            last[k] = max(last.get(k, int(l)), int(l))
+        self._bounds = (first, last)
+        return self._bounds
+
+    def first_seen_days(self, nm: str, now_date) -> int:
+        if self.day0 is None:
+            return _NO_SEEN
+        first, _ = self._seen_bounds()
+        f = first.get(_name(nm).lower())
+        return _NO_SEEN if f is None else int(self._now_off(now_date) - f)
+
+    def last_seen_days(self, nm: str, now_date) -> int:
+        if self.day0 is None:
+            return _NO_SEEN
+        _, last = self._seen_bounds()
+        l = last.get(_name(nm).lower())
+        return _NO_SEEN if l is None else int(self._now_off(now_date) - l)
+
+    def seen_days_many(self, names, now_date) -> pd.DataFrame:
+        """Versi vektor untuk banyak nama: kolom first_seen_days, last_seen_days."""
+        names = list(names)
+        if self.day0 is None:
+            return pd.DataFrame({"first_seen_days": _NO_SEEN, "last_seen_days": _NO_SEEN}, index=names)
+        first, last = self._seen_bounds()
+        now = self._now_off(now_date)
+        keys = [_name(n).lower() for n in names]
+        return pd.DataFrame({
+            "first_seen_days": [now - first[k] if k in first else _NO_SEEN for k in keys],
+            "last_seen_days":  [now - last[k] if k in last else _NO_SEEN for k in keys],
+        }, index=names)
+
+class LoadIndexStore:
+    """Indeks bersama per proses; dibangun ulang hanya bila versi rekap berubah di luar jalur inkremental."""
+
+    _KEY = "rekap"   # satu indeks (rekap utama) → handshake versi VersionedStore dengan kunci tetap
+
+    def __init__(self):
+        self._store = VersionedStore(LoadIndex.from_rekap)
+
+    @property
+    def rebuilds(self) -> int:
+        return self._store.rebuilds
+
+    def get(self, ver: tuple, rekap_loader, version_fn=None) -> LoadIndex:
+        """
+        version_fn (opsional): dibaca lagi setelah rekap_loader; bila versi sudah bergeser (ada simpan
+        di tengah pembacaan) indeks tetap dipakai run ini tapi tidak ditandai ver → tidak ikut apply.
+        """
+        return self._store.get(self._KEY, ver, rekap_loader, version_fn)
+
+    def apply(self, ver_before: tuple, ver_after: tuple, changes: list[tuple[dict | pd.Series | None, int]]) -> None:
+        """
+        Terapkan perubahan (row, +1/-1) bila indeks masih sinkron dengan ver_before,
+        lalu geser versinya ke ver_after. ver_before/ver_after harus pasangan yang dibaca di bawah
+        lock tulis (RekapRepository on_commit). Tidak sinkron → indeks dibuang → rebuild lazy.
+        """
+        self._store.apply(self._KEY, ver_before, ver_after, changes)
+
+    def carry(self, ver_before: tuple, ver_after: tuple) -> None:
+        """Versi berubah tanpa perubahan isi (mis. kompaksi jurnal)."""
+        self._store.carry(self._KEY, ver_before, ver_after)
+
+@st.cache_resource(show_spinner=False)
+def get_load_index_store() -> LoadIndexStore:
+    return LoadIndexStore()
@@ -1,4 +1,6 @@
 # app_core/mirror_all.py
+# CSV di folder data/ adalah mirror ekspor (untuk dibuka di Excel / diunduh user).
+# Sumber kebenaran tabel ada di parquet bertipe (app_core/io_csv.py → write_table memanggil mirror_csv).
 from __future__ import annotations
 import os
 import pandas as pd
@@ -0,0 +1,183 @@
+# app_core/name_index.py
+# ==== Normalisasi nama + indeks token bersama ====
+# Pengganti normalisasi nama yang tersebar (_name_key/_tokset halaman input, utils_data.name_key,
+# rekap_utils.normalize_name, helpers._norm_tokens, _name_key_full Data Hakim, U_name_key Data JS):
+# - name_key(s): satu definisi kunci nama (buang gelar depan/belakang, simbol, huruf tunggal s/h/m/e),
+#   di-memo per string → nama yang sama dari ribuan baris rekap cukup dinormalisasi sekali
+# - NameIndex: dibangun SEKALI per tabel master (nama + alias) →
+#     kunci persis → posisi  (dict)
+#     token → posisi         (indeks terbalik)
+#   resolve(nama) = kunci persis, kalau tidak ada → overlap token terbanyak (seri → baris teratas),
+#   O(jumlah token) alih-alih memindai seluruh master per nama
+# - index_for(df, ...) meng-cache indeks per isi kolom nama/alias (hash vektor pandas),
+#   jadi tabel yang sama dari registry tidak dibangun ulang di setiap rerun
+from __future__ import annotations
+import re, threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Iterable
+import numpy as np
+import pandas as pd
+
+# ---------- Normalisasi ----------
+_PREFIX_RX = re.compile(r"^\s*((drs?|dra|prof|ir|apt|h|hj|kh|ust|ustadz|ustadzah)\.?\s+)+", flags=re.IGNORECASE)
+_SUFFIX_PATTERNS = [
+    r"s\.?\s*h\.?", r"s\.?\s*h\.?\s*i\.?", r"m\.?\s*h\.?", r"m\.?\s*h\.?\s*i\.?",
+    r"s\.?\s*ag", r"m\.?\s*ag", r"m\.?\s*kn", r"m\.?\s*hum", r"s\.?\s*kom",
+    r"s\.?\s*psi", r"s\.?\s*e", r"m\.?\s*m", r"m\.?\s*a", r"llb", r"llm",
+    r"phd", r"se", r"ssi", r"sh", r"mh"
+]
+_SUFFIX_RX = re.compile(r"(,?\s+(" + r"|".join(_SUFFIX_PATTERNS) + r"))+$", flags=re.IGNORECASE)
+_NONWORD_RX = re.compile(r"[^\w\s]")
+_WS_RX = re.compile(r"\s+")
+_ALIAS_SPLIT_RX = re.compile(r"[;,\n]+")
+_DROP_TOKENS = frozenset({"s", "h", "m", "e"})
+
+def clean_text(s: str) -> str:
+    x = str(s or "").replace("\u00A0", " ").strip()
+    x = x.replace(" ,", ",").replace(" .", ".")
+    x = _WS_RX.sub(" ", x).strip()
+    return x
+
+@lru_cache(maxsize=65536)
+def _name_key_cached(s: str) -> str:
+    x = clean_text(s).replace(",", " ")
+    x = _SUFFIX_RX.sub("", x)
+    x = _PREFIX_RX.sub("", x)
+    x = _NONWORD_RX.sub(" ", x)
+    x = _WS_RX.sub(" ", x).strip().lower()
+    return " ".join(t for t in x.split() if t not in _DROP_TOKENS)
+
+def name_key(s) -> str:
+    """Kunci nama kanonik ('Drs. H. Ahmad Fauzi, S.H., M.H.' → 'ahmad fauzi')."""
+    if not isinstance(s, str): return ""
+    return _name_key_cached(s)
+
+@lru_cache(maxsize=65536)
+def _name_tokens_cached(s: str) -> frozenset[str]:
+    return frozenset(_name_key_cached(s).split())
+
+def name_tokens(s) -> frozenset[str]:
+    if not isinstance(s, str): return frozenset()
+    return _name_tokens_cached(s)
+
+def alias_entries(alias_text) -> list[str]:
+    """Isi kolom alias → daftar alias (pemisah ; , atau baris baru)."""
+    if not isinstance(alias_text, str) or not alias_text.strip(): return []
+    return [p.strip() for p in _ALIAS_SPLIT_RX.split(alias_text) if p.strip()]
+
+# ---------- Indeks ----------
+class NameIndex:
+    """Indeks nama + alias satu tabel master. id = label index df (atau nilai id_col)."""
+
+    def __init__(self, entries: Iterable[tuple[Hashable, Iterable[str]]]):
+        self.ids: list[Hashable] = []
+        self.keys: list[str] = []                     # kunci nama utama per posisi
+        self._exact: dict[str, int] = {}
+        self._tokens: list[frozenset[str]] = []
+        self._inv: dict[str, list[int]] = {}
+        for ident, names in entries:
+            pos = len(self.ids)
+            self.ids.append(ident)
+            toks: set[str] = set()
+            first = None
+            for nm in names:
+                k = name_key(nm)
+                if not k: continue
+                if first is None: first = k
+                self._exact.setdefault(k, pos)   # baris teratas menang bila kunci ganda
+                toks.update(k.split())
+            self.keys.append(first or "")
+            fz = frozenset(toks)
+            self._tokens.append(fz)
+            for t in fz:
+                self._inv.setdefault(t, []).append(pos)
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, name_col: str = "nama", alias_col: str | None = "alias",
+                id_col: str | None = None) -> "NameIndex":
+        if df is None or df.empty or name_col not in df.columns:
+            return cls([])
+        names = df[name_col].astype(str).tolist()
+        aliases = df[alias_col].tolist() if alias_col and alias_col in df.columns else [None] * len(df)
+        ids = df[id_col].tolist() if id_col and id_col in df.columns else list(df.index)
+        return cls((i, [n, *alias_entries(a)]) for i, n, a in zip(ids, names, aliases))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- query ----
+    def candidates(self, name: str) -> dict[int, int]:
+        """{posisi: jumlah token sama} untuk semua baris yang berbagi ≥1 token dengan name."""
+        hits: dict[int, int] = {}
+        for t in name_tokens(name):
+            for pos in self._inv.get(t, ()):
+                hits[pos] = hits.get(pos, 0) + 1
+        return hits
+
+    def resolve_pos(self, name: str, fuzzy: bool = True) -> int | None:
+        k = name_key(name)
+        if not k:
+            return None
+        pos = self._exact.get(k)
+        if pos is not None or not fuzzy:
+            return pos
+        hits = self.candidates(name)
+        if not hits:
+            return None
+        return min(hits, key=lambda p: (-hits[p], p))
+
+    def resolve(self, name: str, fuzzy: bool = True):
+        """Nama bebas → id kanonik (None bila tidak cocok). fuzzy=False → hanya kunci persis nama/alias."""
+        pos = self.resolve_pos(name, fuzzy)
+        return None if pos is None else self.ids[pos]
+
+    def canonical_key(self, name: str, fuzzy: bool = False) -> str:
+        """Kunci nama utama baris yang cocok (alias → nama master); tidak cocok → name_key(name)."""
+        pos = self.resolve_pos(name, fuzzy)
+        return self.keys[pos] if pos is not None and self.keys[pos] else name_key(name)
+
+    def resolve_many(self, names: Iterable[str], fuzzy: bool = True) -> list:
+        """Versi kolom: tiap nama unik di-resolve sekali."""
+        memo: dict = {}
+        out = []
+        for nm in names:
+            if nm not in memo:
+                memo[nm] = self.resolve(nm, fuzzy) if isinstance(nm, str) else None
+            out.append(memo[nm])
+        return out
+
+    def tokens_at(self, pos: int) -> frozenset[str]:
+        return self._tokens[pos]
+
+# ---------- Cache per isi tabel ----------
+_INDEX_CACHE_MAX = 32
+_index_cache: "OrderedDict[tuple, NameIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+def _frame_sig(df: pd.DataFrame, cols: list[str]) -> tuple:
+    try:
+        h = pd.util.hash_pandas_object(df[cols].astype(str), index=True).to_numpy()
+        w = np.arange(1, len(h) + 1, dtype=np.uint64)
+        return (len(h), int(h.sum()), int((h * w).sum()))   # jumlah berbobot → peka urutan baris
+    except Exception:
+        return (len(df), id(df))
+
+def index_for(df: pd.DataFrame, name_col: str = "nama", alias_col: str | None = "alias",
+              id_col: str | None = None) -> NameIndex:
+    """NameIndex bersama untuk df; dibangun ulang hanya bila isi kolom nama/alias/id berubah."""
+    if df is None or df.empty or name_col not in df.columns:
+        return NameIndex([])
+    cols = [c for c in (name_col, alias_col, id_col) if c and c in df.columns]
+    key = (tuple(cols), _frame_sig(df, cols))
+    with _index_lock:
+        idx = _index_cache.get(key)
+        if idx is not None:
+            _index_cache.move_to_end(key)
+            return idx
+    idx = NameIndex.from_df(df, name_col, alias_col, id_col)
+    with _index_lock:
+        _index_cache[key] = idx
+        while len(_index_cache) > _INDEX_CACHE_MAX:
+            _index_cache.popitem(last=False)
+    return idx
@@ -0,0 +1,491 @@
+# app_core/pdf_instrumen.py
+# ==== Mesin PDF Batch Instrumen (streaming, lebar kolom ter-cache, worker latar) ====
+# Pengganti build_pdf_per_group lama (Paragraph untuk SETIAP sel, stringWidth atas SEMUA sel,
+# seluruh story di RAM, doc.build di dalam request Streamlit):
+# - baris rekap → tabel string secara vektor (format tanggal per tanggal unik)
+# - lebar kolom: stringWidth di-memo per teks, diukur dari sampel teks terpanjang per kolom
+# - sel yang muat di kolomnya ditulis sebagai string biasa; Paragraph hanya untuk sel yang perlu dibungkus
+# - story dialirkan per grup (judul + tabel + PageBreak) → hanya satu grup yang hidup di memori
+# - render jalan di thread worker (PdfJobs) dengan progres per grup; hasil jadi di-cache per
+#   (rentang, group_by, versi rekap) → unduhan ulang langsung
+# - opsi paralel: tiap grup dirender di proses terpisah (ProcessPoolExecutor; ReportLab terikat GIL),
+#   bagian digabung dengan pypdf + nomor halaman global dicap ulang; timestamp satu untuk semua bagian.
+#   Worker dibuat lewat forkserver/spawn (bukan fork dari server Streamlit yang multi-thread) dan
+#   ditunggu dengan batas waktu; pool macet → dibuang, sisa grup dirender serial.
+#   Mode ZIP: satu PDF per grup (Hal. mulai 1 per grup) untuk dibagikan ke masing-masing JS/PP/Hakim
+from __future__ import annotations
+import os, re, threading, time, traceback, zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from typing import Callable, Iterator
+from xml.sax.saxutils import escape as html_escape
+import pandas as pd
+import streamlit as st
+
+from app_core.helpers import format_tanggal_id
+
+try:
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.pdfbase import pdfmetrics
+    _HAVE_REPORTLAB = True
+except Exception:  # reportlab belum terpasang
+    _HAVE_REPORTLAB = False
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    _HAVE_PYPDF = True
+except Exception:  # pypdf opsional: tanpa pypdf mode gabung paralel → render serial satu dokumen
+    _HAVE_PYPDF = False
+
+HEADERS = [
+    "No.", "Nomor Perkara", "Register", "Klasifikasi P", "Metode",
+    "GHOIB", "ISTBAT", "Hakim", "PP", "JS", "Tanggal Sidang"
+]
+GROUP_COLS = {"JS": "JS", "PP": "PP", "Hakim": "Hakim"}
+FONT, FONT_SIZE, LEADING = "Helvetica", 8, 9
+SAMPLE_PER_COL = 64        # teks terpanjang (jumlah karakter) yang diukur per kolom
+_CELL_PAD = 6              # LEFT+RIGHT padding sel data
+_CACHE_MAX = 8             # PDF jadi yang disimpan
+MAX_WORKERS = 4            # proses render paralel (dibatasi jumlah CPU)
+PART_TIMEOUT = 120         # detik tanpa satu pun grup selesai → pool dianggap macet
+_MARGINS = dict(left=18, right=18, top=24, bottom=24)
+
+def _ensure_reportlab():
+    if not _HAVE_REPORTLAB:
+        raise RuntimeError("reportlab belum terpasang. Jalankan: pip install reportlab")
+
+# ---------- Baris ----------
+def _fmt_dates(s: pd.Series) -> pd.Series:
+    d = pd.to_datetime(s, errors="coerce")
+    uniq = d.dropna().unique()
+    m = {u: format_tanggal_id(pd.Timestamp(u)) for u in uniq}
+    return d.map(m).fillna("")
+
+def build_rows(sub: pd.DataFrame) -> pd.DataFrame:
+    """Rekap terfilter → tabel string kolom HEADERS (kolom 'No.' diisi saat grouping)."""
+    col = lambda c: sub[c].fillna("").astype(str).str.strip() if c in sub.columns else pd.Series("", index=sub.index)
+    jenis = col("jenis_perkara").str.upper()
+    out = pd.DataFrame({
+        "No.": "",
+        "Nomor Perkara": col("nomor_perkara"),
+        "Register": _fmt_dates(sub["tgl_register"]) if "tgl_register" in sub.columns else "",
+        "Klasifikasi P": col("klasifikasi"),
+        "Metode": col("metode"),
+        # MAFQUD & ROGATORI ikut kolom "GHOIB" (tampilkan jenis sebenarnya)
+        "GHOIB": jenis.where(jenis.isin(["GHOIB", "MAFQUD", "ROGATORI"]), ""),
+        "ISTBAT": jenis.where(jenis == "ISTBAT", ""),
+        "Hakim": col("hakim"),
+        "PP": col("pp"),
+        "JS": col("js"),
+        "Tanggal Sidang": _fmt_dates(sub["tgl_sidang"]) if "tgl_sidang" in sub.columns else "",
+    }, index=sub.index)
+    return out[HEADERS].reset_index(drop=True)
+
+def group_rows(rows: pd.DataFrame, group_by: str) -> "OrderedDict[str, pd.DataFrame]":
+    """Kelompokkan per nilai kolom group_by (urut nama, tanpa beda huruf besar); No. = 1..N per grup."""
+    gcol = GROUP_COLS[group_by]
+    key = rows[gcol].where(rows[gcol] != "", f"(Tanpa {group_by})")
+    out: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+    for name in sorted(pd.unique(key), key=lambda s: s.lower()):
+        g = rows[key == name].copy()
+        g["No."] = [str(i) for i in range(1, len(g) + 1)]
+        out[name] = g.reset_index(drop=True)
+    return out
+
+# ---------- Lebar kolom ----------
+@lru_cache(maxsize=65536)
+def text_width(text: str, font: str = FONT, size: float = FONT_SIZE) -> float:
+    _ensure_reportlab()
+    return max((pdfmetrics.stringWidth(line, font, size) for line in text.split("\n")), default=0.0)
+
+def column_widths(groups: dict[str, pd.DataFrame], avail_w: float, pad: float = 20, min_w: float = 40) -> list[float]:
+    """Lebar kolom global dari header + sampel teks terpanjang per kolom (bukan semua sel)."""
+    frames = [g for g in groups.values() if len(g)]
+    allrows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=HEADERS)
+    widths = []
+    for i, h in enumerate(HEADERS):
+        vals = pd.unique(allrows[h].astype(str)) if len(allrows) else []
+        if len(vals) > SAMPLE_PER_COL:
+            vals = sorted(vals, key=len, reverse=True)[:SAMPLE_PER_COL]
+        w = max([text_width(h)] + [text_width(v) for v in vals]) + pad
+        widths.append(max(32 if i == 0 else min_w, w))
+    total = sum(widths)
+    if total > avail_w:
+        scale = avail_w / total
+        widths = [max(32 if i == 0 else min_w, w * scale) for i, w in enumerate(widths)]
+        total2 = sum(widths)
+        if total2 > avail_w:
+            widths = [w * avail_w / total2 for w in widths]
+    return widths
+
+# ---------- Story bertahap ----------
+class _StreamStory(list):
+    """List flowable yang diisi ulang dari generator saat hampir habis (doc.build mengonsumsi dari depan)."""
+
+    def __init__(self, chunks: Iterator[list]):
+        super().__init__()
+        self._chunks = chunks
+
+    def __len__(self):
+        while super().__len__() < 2 and self._chunks is not None:
+            try:
+                self.extend(next(self._chunks))
+            except StopIteration:
+                self._chunks = None
+        return super().__len__()
+
+_TABLE_STYLE = None
+def _table_style():
+    global _TABLE_STYLE
+    if _TABLE_STYLE is None:
+        _TABLE_STYLE = TableStyle([
+            # Header
+            ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#d9edf7")),
+            ("FONTNAME",  (0,0), (-1,0), "Helvetica-Bold"),
+            ("FONTSIZE",  (0,0), (-1,0), 9),
+            ("ALIGN",     (0,0), (-1,0), "CENTER"),
+            ("GRID",      (0,0), (-1,0), 0.5, colors.grey),
+            ("TOPPADDING",    (0,0), (-1,0), 5),
+            ("BOTTOMPADDING", (0,0), (-1,0), 5),
+            ("LEFTPADDING",   (0,0), (-1,0), 6),
+            ("RIGHTPADDING",  (0,0), (-1,0), 6),
+
+            # Data rows (sel string biasa memakai font/leading yang sama dengan Paragraph sel)
+            ("GRID",      (0,1), (-1,-1), 0.5, colors.grey),
+            ("FONTNAME",  (0,1), (-1,-1), FONT),
+            ("FONTSIZE",  (0,1), (-1,-1), FONT_SIZE),
+            ("LEADING",   (0,1), (-1,-1), LEADING),
+            ("VALIGN",    (0,1), (-1,-1), "MIDDLE"),
+
+            # Align per kolom (No. center)
+            ("ALIGN", (0,1), (0,-1), "CENTER"),
+            ("ALIGN", (1,1), (1,-1), "LEFT"),
+            ("ALIGN", (2,1), (2,-1), "CENTER"),
+            ("ALIGN", (3,1), (3,-1), "CENTER"),
+            ("ALIGN", (4,1), (5,-1), "CENTER"),
+            ("ALIGN", (6,1), (8,-1), "LEFT"),
+            ("ALIGN", (9,1), (9,-1), "LEFT"),
+            ("ALIGN", (10,1), (10,-1), "CENTER"),
+
+            ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.whitesmoke, colors.white]),
+            ("TOPPADDING",    (0,1), (-1,-1), 3),
+            ("BOTTOMPADDING", (0,1), (-1,-1), 4),
+            ("LEFTPADDING",   (0,1), (-1,-1), 3),
+            ("RIGHTPADDING",  (0,1), (-1,-1), 3),
+        ])
+    return _TABLE_STYLE
+
+def _styles():
+    styles = getSampleStyleSheet()
+    cell_style = ParagraphStyle(
+        "cell", parent=styles["Normal"], fontName=FONT, fontSize=FONT_SIZE, leading=LEADING,
+        wordWrap="CJK", splitLongWords=True, spaceAfter=0, spaceBefore=0,
+    )
+    head_style = ParagraphStyle(
+        "head", parent=styles["Heading2"], fontName="Helvetica-Bold", fontSize=11, leading=13, spaceAfter=6,
+    )
+    return cell_style, head_style
+
+def _group_flowables(name: str, g: pd.DataFrame, title_prefix: str, label: str, col_widths: list[float],
+                     cell_style, head_style, page_break: bool) -> list:
+    fits = [w - _CELL_PAD for w in col_widths]
+    data = [HEADERS[:]]
+    for row in g.itertuples(index=False, name=None):
+        # Paragraph hanya bila teks lebih lebar dari kolom (perlu dibungkus)
+        data.append([v if text_width(v) <= fits[i] else Paragraph(html_escape(v), cell_style)
+                     for i, v in enumerate(row)])
+    tbl = Table(data, repeatRows=1, colWidths=col_widths)
+    tbl.setStyle(_table_style())
+    out = [Paragraph(f"{title_prefix} – {label}: <b>{html_escape(name)}</b>", head_style), Spacer(1, 4), tbl]
+    if page_break:
+        out.append(PageBreak())
+    return out
+
+def _footer_for(ts: str, page_offset: int = 0, numbered: bool = True):
+    def _footer(canvas, doc):
+        canvas.saveState()
+        w = doc.pagesize[0]
+        canvas.setFont("Helvetica", 8)
+        canvas.drawString(18, 16, f"Dibuat: {ts}")
+        if numbered:
+            canvas.drawRightString(w - 18, 16, f"Hal. {doc.page + page_offset}")
+        canvas.restoreState()
+    return _footer
+
+def render_groups(groups: "OrderedDict[str, pd.DataFrame]", title_prefix: str, label: str, *,
+                  ts: str | None = None, col_widths: list[float] | None = None, page_offset: int = 0,
+                  progress: Callable[[int, int], None] | None = None) -> bytes:
+    """Render grup → PDF (1 grup mulai di halaman baru). Story dialirkan per grup."""
+    return _render(groups, title_prefix, label, ts=ts, col_widths=col_widths,
+                   page_offset=page_offset, progress=progress)[0]
+
+def _render(groups, title_prefix, label, *, ts=None, col_widths=None, page_offset=0,
+            numbered=True, progress=None) -> tuple[bytes, int]:
+    """→ (bytes PDF, jumlah halaman)."""
+    _ensure_reportlab()
+    page_size = landscape(A4)
+    margins = _MARGINS
+    avail_w = page_size[0] - margins["left"] - margins["right"]
+    ts = ts or datetime.now().strftime("%d/%m/%Y %H:%M")
+    widths = col_widths or column_widths(groups, avail_w)
+    cell_style, head_style = _styles()
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=page_size, leftMargin=margins["left"], rightMargin=margins["right"],
+                            topMargin=margins["top"], bottomMargin=margins["bottom"])
+    names = list(groups)
+    total = len(names)
+
+    def _chunks():
+        for gi, name in enumerate(names):
+            if progress is not None:
+                progress(gi, total)
+            yield _group_flowables(name, groups[name], title_prefix, label, widths,
+                                   cell_style, head_style, page_break=gi < total - 1)
+
+    footer = _footer_for(ts, page_offset, numbered)
+    doc.build(_StreamStory(_chunks()), onFirstPage=footer, onLaterPages=footer)
+    if progress is not None:
+        progress(total, total)
+    return buf.getvalue(), doc.page
+
+# ---------- Render per grup (paralel) ----------
+def _render_part(name: str, rows: list[tuple], title_prefix: str, label: str, ts: str,
+                 col_widths: list[float], numbered: bool) -> tuple[bytes, int]:
+    """Dijalankan di proses worker: satu grup → (bytes PDF, jumlah halaman)."""
+    g = pd.DataFrame(rows, columns=HEADERS)
+    return _render(OrderedDict([(name, g)]), title_prefix, label, ts=ts, col_widths=col_widths, numbered=numbered)
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+def _pool() -> ProcessPoolExecutor | None:
+    """
+    Pool proses bersama (dibuat sekali). Start method forkserver (POSIX) atau spawn: proses anak
+    tidak mewarisi lock/thread server Streamlit seperti pada fork; worker (_render_part) cukup
+    diimpor dari modul ini (skrip CLI streamlit sebagai __main__ sudah terjaga `if __name__`).
+    None bila pool tidak bisa dibuat → render serial.
+    """
+    global _POOL
+    import multiprocessing as mp
+    methods = mp.get_all_start_methods()
+    method = "forkserver" if "forkserver" in methods else "spawn" if "spawn" in methods else None
+    if method is None:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None or getattr(_POOL, "_broken", False):
+            try:
+                _POOL = ProcessPoolExecutor(max_workers=max(1, min(MAX_WORKERS, os.cpu_count() or 1)),
+                                            mp_context=mp.get_context(method))
+            except Exception:
+                _POOL = None
+        return _POOL
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    """Buang pool yang macet: batalkan antrean, hentikan proses anak; pool baru dibuat saat dibutuhkan."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    procs = list((getattr(pool, "_processes", None) or {}).values())
+    try:
+        pool.shutdown(wait=False, cancel_futures=True)
+    except Exception:
+        pass
+    for p in procs:
+        try:
+            p.terminate()
+        except Exception:
+            pass
+
+def render_parts(groups: "OrderedDict[str, pd.DataFrame]", title_prefix: str, label: str, *,
+                 ts: str, col_widths: list[float], numbered: bool = True, parallel: bool = True,
+                 progress: Callable[[int, int], None] | None = None,
+                 timeout: float = PART_TIMEOUT) -> "OrderedDict[str, tuple[bytes, int]]":
+    """
+    Tiap grup → PDF sendiri (urutan grup dipertahankan). Tanpa pool / pool gagal / tidak ada grup
+    yang selesai dalam `timeout` detik → sisa grup dirender serial di thread ini.
+    """
+    names = list(groups)
+    total = len(names)
+    args = {n: (n, list(groups[n].itertuples(index=False, name=None)), title_prefix, label, ts, col_widths, numbered)
+            for n in names}
+    parts: dict[str, tuple[bytes, int]] = {}
+    pool = _pool() if parallel and total > 1 else None
+    if pool is not None:
+        try:
+            futs = {pool.submit(_render_part, *args[n]): n for n in names}
+            pending = set(futs)
+            while pending:
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:   # macet (mis. worker deadlock) → jangan menunggu selamanya
+                    _drop_pool(pool)
+                    break
+                for f in done:
+                    try:
+                        parts[futs[f]] = f.result()
+                    except Exception:
+                        continue   # grup ini dirender ulang serial di bawah
+                    if progress is not None:
+                        progress(len(parts), total)
+        except Exception:   # pool rusak / tidak bisa start → lanjut serial untuk sisa grup
+            pass
+    for n in names:
+        if n not in parts:
+            parts[n] = _render_part(*args[n])
+            if progress is not None:
+                progress(len(parts), total)
+    return OrderedDict((n, parts[n]) for n in names)
+
+def _stamp_pages(writer, n_pages: int):
+    """Cap 'Hal. N' global di tiap halaman hasil gabungan (bagian dirender tanpa nomor)."""
+    from reportlab.pdfgen import canvas as rl_canvas
+    buf = BytesIO()
+    w, h = landscape(A4)
+    c = rl_canvas.Canvas(buf, pagesize=(w, h))
+    for i in range(1, n_pages + 1):
+        c.setFont("Helvetica", 8)
+        c.drawRightString(w - 18, 16, f"Hal. {i}")
+        c.showPage()
+    c.save()
+    overlay = PdfReader(BytesIO(buf.getvalue()))
+    for page, ov in zip(writer.pages, overlay.pages):
+        page.merge_page(ov)
+
+def can_merge_parts() -> bool:
+    """pypdf tersedia → PDF gabungan bisa dirender paralel per grup lalu digabung."""
+    return _HAVE_PYPDF
+
+def merge_parts(parts: "OrderedDict[str, tuple[bytes, int]]") -> bytes:
+    """Gabung PDF per grup berurutan + nomor halaman berlanjut (butuh pypdf)."""
+    if not _HAVE_PYPDF:
+        raise RuntimeError("pypdf belum terpasang. Jalankan: pip install pypdf")
+    writer = PdfWriter()
+    for data, _pages in parts.values():
+        for page in PdfReader(BytesIO(data)).pages:
+            writer.add_page(page)
+    _stamp_pages(writer, sum(p for _d, p in parts.values()))
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+_UNSAFE_FN = re.compile(r"[^\w.\- ]+")
+
+def zip_parts(parts: "OrderedDict[str, tuple[bytes, int]]", label: str) -> bytes:
+    """Satu PDF per grup dalam ZIP (nama file berawalan nomor urut supaya unik & terurut)."""
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for i, (name, (data, _pages)) in enumerate(parts.items(), start=1):
+            safe = _UNSAFE_FN.sub("_", name).strip(" ._") or "grup"
+            zf.writestr(f"{i:02d}_{label}_{safe}.pdf", data)
+    return buf.getvalue()
+
+def render_batch(groups: "OrderedDict[str, pd.DataFrame]", title_prefix: str, label: str, *,
+                 ts: str | None = None, output: str = "pdf", parallel: bool = False,
+                 progress: Callable[[int, int], None] | None = None) -> bytes:
+    """Pintu masuk halaman. output 'pdf' (gabungan) | 'zip' (1 PDF per grup).
+
+    Lebar kolom & timestamp dihitung sekali di sini → semua bagian identik tampilannya.
+    Gabungan paralel tanpa pypdf → render serial satu dokumen (hasil sama, hanya tidak paralel).
+    """
+    _ensure_reportlab()
+    ts = ts or datetime.now().strftime("%d/%m/%Y %H:%M")
+    avail_w = landscape(A4)[0] - _MARGINS["left"] - _MARGINS["right"]
+    widths = column_widths(groups, avail_w)
+    if output == "zip":
+        return zip_parts(render_parts(groups, title_prefix, label, ts=ts, col_widths=widths,
+                                      parallel=parallel, progress=progress), label)
+    if parallel and _HAVE_PYPDF and len(groups) > 1:
+        parts = render_parts(groups, title_prefix, label, ts=ts, col_widths=widths, numbered=False,
+                             parallel=True, progress=progress)
+        return merge_parts(parts)
+    return render_groups(groups, title_prefix, label, ts=ts, col_widths=widths, progress=progress)
+
+# ---------- Worker latar + cache hasil ----------
+@dataclass
+class PdfJob:
+    key: tuple
+    status: str = "antre"          # antre | jalan | selesai | gagal
+    done: int = 0
+    total: int = 0
+    result: bytes | None = None
+    error: str = ""
+    started: float = field(default_factory=time.time)
+    finished: float | None = None
+
+    @property
+    def fraction(self) -> float:
+        if self.status == "selesai":
+            return 1.0
+        return (self.done / self.total) if self.total else 0.0
+
+class PdfJobs:
+    """Satu thread render per proses; PDF jadi disimpan per kunci (LRU)."""
+
+    def __init__(self, max_cached: int = _CACHE_MAX):
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[tuple, PdfJob]" = OrderedDict()
+        self._queue: list[tuple[PdfJob, Callable]] = []
+        self._cv = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+        self.max_cached = max_cached
+
+    def get(self, key: tuple) -> PdfJob | None:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def submit(self, key: tuple, render: Callable[[Callable[[int, int], None]], bytes]) -> PdfJob:
+        """render(progress) → bytes. Kunci yang sudah jalan/selesai tidak dirender ulang."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != "gagal":
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = PdfJob(key)
+            self._queue.append((job, render))
+            self._evict()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="pdf-render", daemon=True)
+                self._thread.start()
+            self._cv.notify()
+            return job
+
+    def _evict(self):
+        done = [k for k, j in self._jobs.items() if j.status in ("selesai", "gagal")]
+        while len(self._jobs) > self.max_cached and done:
+            self._jobs.pop(done.pop(0), None)
+
+    def _loop(self):
+        while True:
+            with self._cv:
+                while not self._queue:
+                    self._cv.wait()
+                job, render = self._queue.pop(0)
+            job.status = "jalan"
+
+            def _progress(i, n, _job=job):
+                _job.done, _job.total = i, n
+            try:
+                job.result = render(_progress)
+                job.status = "selesai"
+            except Exception as e:   # gagal render jangan matikan worker
+                job.error = f"{e}\n{traceback.format_exc(limit=3)}"
+                job.status = "gagal"
+            job.finished = time.time()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pdf": sum(1 for j in self._jobs.values() if j.status == "selesai"),
+                    "antre": len(self._queue),
+                    "bytes": sum(len(j.result or b"") for j in self._jobs.values())}
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_jobs() -> PdfJobs:
+    return PdfJobs()
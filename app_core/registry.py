@@ -0,0 +1,158 @@
+# app_core/registry.py
+# ==== TableRegistry: cache tabel bersama (lintas sesi) ====
+# Satu instance per proses (st.cache_resource). Setiap tabel di-parse + dinormalisasi
+# sekali per perubahan file (signature mtime/size CSV + parquet [+ jurnal rekap]),
+# bukan sekali per rerun per sesi.
+#
+# Yang dikembalikan adalah VIEW read-only:
+# - pandas ≥ 3 (copy-on-write): shallow copy → tanpa salin data; mutasi di halaman
+#   otomatis menyalin kolom yang diubah sehingga tabel bersama tetap utuh.
+# - pandas lama (tanpa CoW default): fallback deep copy supaya tetap aman.
+from __future__ import annotations
+import re, threading
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+import streamlit as st
+
+from app_core import rekap_journal
+from app_core.io_csv import read_table, table_version
+
+try:
+    _PANDAS_COW = int(pd.__version__.split(".")[0]) >= 3
+except Exception:
+    _PANDAS_COW = False
+
+# ---------- Skema rekap (tanpa generate __id → hasil deterministik) ----------
+REKAP_NEED = [
+    "__id","nomor_perkara","jenis_perkara","hakim","anggota1","anggota2",
+    "pp","js","tgl_register","tgl_sidang","tgl_sidang_override","metode","klasifikasi"
+]
+
+# header alternatif rekap lama (aturan JS_load_rekap halaman Data JS) → nama baku
+_REKAP_ALIASES = {
+    "pp": "pp", "panitera pengganti": "pp",
+    "js": "js", "jurusita": "js",
+    "metode": "metode", "method": "metode",
+    "jenis_perkara": "jenis_perkara", "jenis": "jenis_perkara",
+}
+
+def _canon_rekap_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename header alias (mis. 'Jurusita' → js, 'Jenis' → jenis_perkara); kolom baku yang sudah ada menang."""
+    ren = {}
+    for c in df.columns:
+        k = re.sub(r"\s+", " ", str(c).replace("\ufeff", "").strip().lower())
+        new = _REKAP_ALIASES.get(k)
+        if new and new != c and new not in df.columns and new not in ren.values():
+            ren[c] = new
+    return df.rename(columns=ren) if ren else df
+
+def normalize_rekap(df: pd.DataFrame) -> pd.DataFrame:
+    """Pastikan kolom rekap lengkap & bertipe (tgl_* datetime, override 0/1)."""
+    if df is None or df.empty:
+        out = pd.DataFrame(columns=REKAP_NEED)
+    else:
+        out = _canon_rekap_columns(df.copy())
+    for c in REKAP_NEED:
+        if c not in out.columns:
+            out[c] = (pd.NaT if c in ("tgl_register","tgl_sidang") else (0 if c=="tgl_sidang_override" else ""))
+    for c in ("tgl_register", "tgl_sidang"):
+        if not pd.api.types.is_datetime64_any_dtype(out[c]):
+            out[c] = pd.to_datetime(out[c], errors="coerce")
+    ovr = out["tgl_sidang_override"]
+    if not (pd.api.types.is_bool_dtype(ovr) or pd.api.types.is_numeric_dtype(ovr)):
+        ovr = ovr.astype(str).str.strip().str.lower().isin(["1", "true", "y", "ya", "t"])
+    out["tgl_sidang_override"] = pd.to_numeric(ovr, errors="coerce").fillna(0).astype(bool).astype(int)
+    return out
+
+def _view(df: pd.DataFrame) -> pd.DataFrame:
+    return df.copy(deep=False) if _PANDAS_COW else df.copy()
+
+class TableRegistry:
+    """Cache DataFrame per file, invalidasi otomatis saat signature file berubah."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: dict[tuple, tuple[tuple, pd.DataFrame]] = {}
+        self._loads = 0
+        self._hits = 0
+
+    def _get(self, key: tuple, ver: tuple, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        return self._get_versioned(key, ver, loader)[1]
+
+    def _get_versioned(self, key: tuple, ver: tuple, loader: Callable[[], pd.DataFrame]) -> tuple[tuple, pd.DataFrame]:
+        """(versi, view) dari entri yang sama → kunci cache turunan selalu cocok dengan isi frame."""
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] == ver:
+                self._hits += 1
+                return hit[0], _view(hit[1])
+        # load DI LUAR lock registry: loader bisa menunggu path_lock file (impor CSV → parquet),
+        # sedangkan penulis memegang path_lock lalu memanggil apply_rekap → urutan lock terbalik.
+        # Versi diambil SEBELUM load: kalau file berubah saat load, panggilan berikutnya load ulang.
+        df = loader()
+        with self._lock:
+            # entri hanya diganti bila belum disentuh thread lain selama load (mis. apply_rekap)
+            if self._entries.get(key) is hit:
+                self._entries[key] = (ver, df)
+            self._loads += 1
+        return ver, _view(df)
+
+    # ---- tabel biasa (master, libur, cuti, sk, js_ghoib, ...) ----
+    def table(self, path: Path, normalize: Callable[[pd.DataFrame], pd.DataFrame] | None = None) -> pd.DataFrame:
+        p = Path(path)
+        key = ("table", p.resolve().as_posix(), getattr(normalize, "__qualname__", None))
+        loader = (lambda: normalize(read_table(p))) if normalize else (lambda: read_table(p))
+        return self._get(key, table_version(p), loader)
+
+    # ---- rekap: base snapshot + jurnal, sudah dinormalisasi skemanya ----
+    def rekap(self, path: Path) -> pd.DataFrame:
+        return self.rekap_versioned(path)[1]
+
+    def rekap_versioned(self, path: Path) -> tuple[tuple, pd.DataFrame]:
+        """(versi, frame rekap) sepasang — dipakai bila versi jadi kunci cache turunan (mis. indeks teks)."""
+        p = Path(path)
+        key = ("rekap", p.resolve().as_posix())
+        return self._get_versioned(key, rekap_journal.version(p),
+                                   lambda: normalize_rekap(rekap_journal.load_rekap(p, read_table)))
+
+    def apply_rekap(self, path: Path, ver_before: tuple, ver_after: tuple, entries: list[dict]) -> pd.DataFrame | None:
+        """
+        Patch frame rekap yang di-cache dengan entri jurnal yang baru saja ditulis (tanpa baca ulang
+        base + jurnal). Hanya bila cache masih di ver_before; kalau tidak → reload lazy seperti biasa.
+        Return view frame baru, atau None bila tidak di-patch.
+        """
+        p = Path(path)
+        key = ("rekap", p.resolve().as_posix())
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None or hit[0] != ver_before:
+                return None
+            try:
+                df = normalize_rekap(rekap_journal.apply_entries(hit[1], entries))
+            except Exception:
+                self._entries.pop(key, None)
+                return None
+            self._entries[key] = (ver_after, df)
+            return _view(df)
+
+    def rekap_version(self, path: Path) -> tuple:
+        """Versi rekap saat ini (dipakai sebagai kunci cache turunan, mis. indeks/ringkasan)."""
+        return rekap_journal.version(Path(path))
+
+    def invalidate(self, path: Path | None = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            target = Path(path).resolve().as_posix()
+            for k in [k for k in self._entries if k[1] == target]:
+                self._entries.pop(k, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"tables": len(self._entries), "loads": self._loads, "hits": self._hits}
+
+@st.cache_resource(show_spinner=False)
+def get_registry() -> TableRegistry:
+    return TableRegistry()
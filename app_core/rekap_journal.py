@@ -0,0 +1,327 @@
+# app_core/rekap_journal.py
+# ==== Jurnal append-only untuk rekap ====
+# Penyimpanan rekap = base snapshot (data/rekap.csv) + jurnal (data/rekap.journal.jsonl).
+# - Simpan/Edit/Hapus cukup menambah 1 baris JSON ke jurnal (di-fsync), tanpa menulis ulang CSV.
+# - Pembaca melihat base + jurnal secara transparan (load_rekap).
+# - Kompaksi berkala melipat jurnal ke base snapshot (lalu jurnal dikosongkan).
+# - Append, kompaksi (lewat penulis tunggal) dan reset memegang path_lock(base) yang sama.
+#
+# Setiap entri membawa __id, sehingga memutar ulang entri yang sama bersifat idempoten
+# (insert = upsert, update = set kolom, delete = hapus). Karena itu urutan baca
+# base → jurnal "compacting" → jurnal aktif selalu benar, termasuk saat kompaksi berjalan.
+# APP_STORAGE=sqlite → entri langsung diterapkan per baris di tabel SQLite (app_core/sqlite_backend.py);
+# "kompaksi" = tulis ulang CSV mirror.
+from __future__ import annotations
+import os, json, uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Iterable
+import pandas as pd
+
+from app_core.write_coordinator import get_write_coordinator, path_lock
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+COMPACTING_SUFFIX = ".journal.compacting.jsonl"
+DEFAULT_COMPACT_EVERY = 200   # kompaksi otomatis setelah N entri jurnal
+
+# ---------- Path ----------
+def journal_path(base_path: Path) -> Path:
+    base_path = Path(base_path)
+    return base_path.with_name(base_path.stem + JOURNAL_SUFFIX)
+
+def _compacting_path(base_path: Path) -> Path:
+    base_path = Path(base_path)
+    return base_path.with_name(base_path.stem + COMPACTING_SUFFIX)
+
+def _stat_sig(p: Path) -> tuple:
+    try:
+        s = p.stat()
+        return (s.st_mtime_ns, s.st_size)
+    except FileNotFoundError:
+        return (0, 0)
+
+def _backend(base_path: Path):
+    from app_core import sqlite_backend   # impor lambat: sqlite_backend mengimpor modul ini
+    return sqlite_backend.for_path(base_path)
+
+def version(base_path: Path) -> tuple:
+    """Signature (mtime_ns, size) base (CSV + parquet) + jurnal → dipakai sebagai kunci cache pembaca."""
+    base_path = Path(base_path)
+    be = _backend(base_path)
+    if be is not None:
+        return ("sqlite", be.version(base_path))
+    return (_stat_sig(base_path), _stat_sig(base_path.with_suffix(".parquet")),
+            _stat_sig(_compacting_path(base_path)), _stat_sig(journal_path(base_path)))
+
+# ---------- Serialisasi nilai ----------
+def _jsonable(v):
+    if v is None:
+        return ""
+    try:
+        if pd.isna(v):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    if isinstance(v, (pd.Timestamp, datetime)):
+        return pd.Timestamp(v).date().isoformat()
+    if isinstance(v, date):
+        return v.isoformat()
+    if hasattr(v, "item"):        # numpy scalar → python scalar
+        try:
+            return v.item()
+        except Exception:
+            pass
+    return v
+
+def _row_jsonable(row: dict) -> dict:
+    return {str(k): _jsonable(v) for k, v in (row or {}).items()}
+
+def _valid_id(v) -> bool:
+    s = str(v).strip().lower()
+    return s not in {"", "nan", "none", "<na>"}
+
+# ---------- Tulis jurnal ----------
+def _append_entries(base_path: Path, entries: Iterable[dict]) -> None:
+    """
+    Tambah entri ke jurnal dalam satu write() O_APPEND, lalu fsync — di bawah path_lock(base) yang
+    sama dengan kompaksi, jadi tidak ada append yang jatuh ke jurnal yang sedang di-rename/dihapus.
+    """
+    be = _backend(base_path)
+    if be is not None:
+        be.apply_entries(base_path, list(entries))
+        return
+    lines = []
+    ts = datetime.now().isoformat(timespec="seconds")
+    for e in entries:
+        rec = {"ts": ts, **e}
+        lines.append(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+    if not lines:
+        return
+    jp = journal_path(base_path)
+    jp.parent.mkdir(parents=True, exist_ok=True)
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+    with path_lock(base_path):
+        fd = os.open(jp.as_posix(), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def append_insert(base_path: Path, row: dict) -> str:
+    """Catat baris baru. __id dibuat jika kosong. Return __id."""
+    rec = _row_jsonable(row)
+    rid = rec.get("__id")
+    if not _valid_id(rid):
+        rid = str(uuid.uuid4())
+    rec["__id"] = str(rid)
+    _append_entries(base_path, [{"op": "insert", "__id": rec["__id"], "row": rec}])
+    return rec["__id"]
+
+def append_inserts(base_path: Path, rows: list[dict]) -> list[str]:
+    """Versi batch append_insert (satu write + satu fsync)."""
+    ids, entries = [], []
+    for row in rows or []:
+        rec = _row_jsonable(row)
+        rid = rec.get("__id")
+        if not _valid_id(rid):
+            rid = str(uuid.uuid4())
+        rec["__id"] = str(rid)
+        ids.append(rec["__id"])
+        entries.append({"op": "insert", "__id": rec["__id"], "row": rec})
+    _append_entries(base_path, entries)
+    return ids
+
+def append_update(base_path: Path, row_id: str, changes: dict) -> None:
+    """Catat perubahan kolom untuk baris __id tertentu."""
+    rec = _row_jsonable(changes)
+    rec.pop("__id", None)
+    _append_entries(base_path, [{"op": "update", "__id": str(row_id), "row": rec}])
+
+def append_delete(base_path: Path, row_id: str) -> None:
+    """Catat penghapusan baris __id tertentu."""
+    _append_entries(base_path, [{"op": "delete", "__id": str(row_id)}])
+
+# ---------- Baca jurnal ----------
+def _read_entries(p: Path) -> list[dict]:
+    if not p.exists():
+        return []
+    out = []
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    e = json.loads(line)
+                except Exception:
+                    # baris terakhir bisa terpotong (crash saat write) → abaikan
+                    continue
+                if isinstance(e, dict) and e.get("op") in {"insert", "update", "delete"} and _valid_id(e.get("__id")):
+                    out.append(e)
+    except Exception:
+        return out
+    return out
+
+def read_entries(base_path: Path) -> list[dict]:
+    """Semua entri jurnal (compacting dulu, lalu jurnal aktif)."""
+    if _backend(base_path) is not None:
+        return []   # entri sudah ada di tabel SQLite
+    return _file_entries(base_path)
+
+def _file_entries(base_path: Path) -> list[dict]:
+    return _read_entries(_compacting_path(base_path)) + _read_entries(journal_path(base_path))
+
+def journal_len(base_path: Path) -> int:
+    be = _backend(base_path)
+    if be is not None:
+        return be.pending(base_path)
+    return len(read_entries(base_path))
+
+def apply_entries(base: pd.DataFrame, entries: list[dict]) -> pd.DataFrame:
+    """Terapkan entri jurnal di atas base (DataFrame mentah). Urutan baris base dipertahankan."""
+    if not entries:
+        return base
+    base = base if isinstance(base, pd.DataFrame) else pd.DataFrame()
+    base_ids = base["__id"].astype(str) if "__id" in base.columns else pd.Series([""] * len(base), index=base.index)
+    known = set(base_ids.tolist())
+
+    deleted: set[str] = set()
+    updates: dict[str, dict] = {}      # untuk baris yang sudah ada di base
+    pending: dict[str, dict] = {}      # baris baru (urutan insert dipertahankan oleh dict)
+    for e in entries:
+        rid = str(e["__id"])
+        op = e["op"]
+        row = e.get("row") or {}
+        if op == "insert":
+            if rid in known:
+                deleted.discard(rid)
+                updates.setdefault(rid, {}).update(row)
+            else:
+                pending[rid] = dict(row)
+        elif op == "update":
+            if rid in pending:
+                pending[rid].update(row)
+            elif rid in known and rid not in deleted:
+                updates.setdefault(rid, {}).update(row)
+        elif op == "delete":
+            pending.pop(rid, None)
+            if rid in known:
+                deleted.add(rid)
+                updates.pop(rid, None)
+
+    out = base
+    if deleted:
+        out = out[~base_ids.isin(deleted)]
+    if updates:
+        out = out.copy()
+        for c in {c for u in updates.values() for c in u}:
+            if c not in out.columns:
+                out[c] = ""
+        pos = pd.Series(range(len(out)), index=out["__id"].astype(str).values)
+        for rid, u in updates.items():
+            if rid not in pos.index:
+                continue
+            i = pos[rid]
+            i = int(i.iloc[0]) if isinstance(i, pd.Series) else int(i)
+            for c, v in u.items():
+                col = out.columns.get_loc(c)
+                if pd.api.types.is_datetime64_any_dtype(out[c]):
+                    v = pd.to_datetime(v, errors="coerce") if v != "" else pd.NaT
+                try:
+                    out.iat[i, col] = v
+                except (TypeError, ValueError):
+                    out[c] = out[c].astype(object)
+                    out.iat[i, col] = v
+    if pending:
+        add = pd.DataFrame(list(pending.values()))
+        # samakan tipe tanggal dengan base (base bisa berasal dari parquet bertipe)
+        for c in add.columns:
+            if c in out.columns and pd.api.types.is_datetime64_any_dtype(out[c]):
+                add[c] = pd.to_datetime(add[c].replace("", None), errors="coerce").astype(out[c].dtype)
+        out = pd.concat([out, add], ignore_index=True) if not out.empty else add
+    return out.reset_index(drop=True)
+
+def load_rekap(base_path: Path, read_base: Callable[[Path], pd.DataFrame]) -> pd.DataFrame:
+    """Base snapshot + jurnal → DataFrame mentah (kolom tanggal masih string)."""
+    base_path = Path(base_path)
+    base = read_base(base_path)
+    return apply_entries(base, read_entries(base_path))
+
+# ---------- Kompaksi ----------
+def compact(base_path: Path,
+            read_base: Callable[[Path], pd.DataFrame],
+            write_base: Callable[[pd.DataFrame, Path], None],
+            min_entries: int = 1,
+            on_compact: Callable[[tuple, tuple], None] | None = None) -> int:
+    """
+    Lipat jurnal ke base snapshot.
+    1) jurnal aktif di-rename ke *.compacting (atomik) → penulis baru menulis ke jurnal kosong
+    2) base + compacting ditulis ulang sebagai base (write_base: atomic + backup)
+    3) file compacting dihapus
+    Seluruh langkah jalan di thread penulis di bawah path_lock(base) → dua sesi yang memicu kompaksi
+    bersamaan tidak saling menimpa base / menghapus compacting milik yang lain. Panjang jurnal dicek
+    ulang setelah lock didapat (< min_entries → sudah dilipat kompaktor lain → 0).
+    on_compact(ver_before, ver_after) dipanggil di bawah lock yang sama bila ada yang dilipat.
+    Return: jumlah entri yang dilipat.
+    """
+    base_path = Path(base_path)
+    be = _backend(base_path)
+    if be is not None:
+        return be.export(base_path)
+    return get_write_coordinator().call(
+        base_path, lambda: _compact_locked(base_path, read_base, write_base, min_entries, on_compact))
+
+def _compact_locked(base_path: Path, read_base, write_base, min_entries: int, on_compact) -> int:
+    jp, cp = journal_path(base_path), _compacting_path(base_path)
+    if not cp.exists() and len(_read_entries(jp)) < max(1, int(min_entries)):
+        return 0
+    ver0 = version(base_path)
+    if jp.exists() and not cp.exists():
+        try:
+            os.replace(jp.as_posix(), cp.as_posix())
+        except Exception:
+            return 0
+    entries = _read_entries(cp)
+    if not entries:
+        try: cp.unlink(missing_ok=True)
+        except Exception: pass
+        return 0
+    merged = apply_entries(read_base(base_path), entries)
+    write_base(merged, base_path)
+    try:
+        cp.unlink(missing_ok=True)
+    except Exception:
+        pass
+    if on_compact is not None:
+        try:
+            on_compact(ver0, version(base_path))
+        except Exception:
+            pass
+    return len(entries)
+
+def maybe_compact(base_path: Path,
+                  read_base: Callable[[Path], pd.DataFrame],
+                  write_base: Callable[[pd.DataFrame, Path], None],
+                  every: int = DEFAULT_COMPACT_EVERY,
+                  on_compact: Callable[[tuple, tuple], None] | None = None) -> int:
+    """Kompaksi hanya jika jumlah entri jurnal ≥ every. Error tidak dilempar."""
+    try:
+        every = max(1, int(every))
+        if journal_len(base_path) >= every:
+            return compact(base_path, read_base, write_base, min_entries=every, on_compact=on_compact)
+    except Exception:
+        pass
+    return 0
+
+def reset(base_path: Path) -> None:
+    """Kosongkan jurnal (dipakai setelah base ditulis ulang penuh dari data gabungan)."""
+    if _backend(base_path) is not None:
+        return   # tidak ada jurnal; berkas jurnal lama dibiarkan
+    with path_lock(base_path):
+        for p in (_compacting_path(base_path), journal_path(base_path)):
+            try:
+                p.unlink(missing_ok=True)
+            except Exception:
+                pass
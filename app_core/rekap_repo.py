@@ -0,0 +1,166 @@
+# app_core/rekap_repo.py
+# ==== RekapRepository: akses per baris rekap lewat primary key __id ====
+# Pengganti pola "baca seluruh rekap → filter __id == x" (_rekap_row_by_id, cek baris sebelum
+# simpan edit) dan reload penuh frame rekap setelah setiap simpan/edit/hapus:
+# - indeks hash __id → posisi baris, dibangun sekali per versi frame rekap
+# - get/insert/update/delete per __id; mutasi = 1 entri jurnal (rekap_journal, delta append-only)
+# - setelah menulis, frame bersama di TableRegistry di-patch dengan entri yang sama
+#   (apply_rekap) → pembaca berikutnya tidak mem-parse ulang base + jurnal
+# - indeks ikut inkremental: insert/update tidak menggeser posisi; delete → indeks dibangun ulang lazy
+# - mutasi mengembalikan baris lama supaya pemanggil bisa memperbarui indeks turunan
+#   (LoadIndex, StatsCube, ringkasan) dengan pola (row, -1)/(row, +1) yang sudah ada
+# - versi rekap sebelum/sesudah dibaca DI BAWAH lock yang sama dengan append (path_lock rekap;
+#   mode sqlite: transaksi tulis) → on_commit(ver_before, ver_after, changes) menerima pasangan
+#   versi yang pasti bersebelahan, tidak tercampur simpan sesi lain
+from __future__ import annotations
+import threading, uuid
+from pathlib import Path
+from typing import Callable
+import pandas as pd
+import streamlit as st
+
+from app_core import rekap_journal, sqlite_backend
+from app_core.registry import get_registry
+from app_core.write_coordinator import path_lock
+
+# on_commit(ver_before, ver_after, [(row, -1/+1), ...]) — dipanggil masih di bawah lock tulis
+OnCommit = Callable[[tuple, tuple, list], None]
+
+class RekapRepository:
+    """Satu file rekap (base + jurnal). Semua method aman dipanggil lintas sesi (satu lock per repo)."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._ver: tuple | None = None
+        self._pos: dict[str, int] = {}
+        self._frame: pd.DataFrame | None = None
+        self.index_builds = 0
+
+    # ---- baca ----
+    def frame(self) -> pd.DataFrame:
+        """Frame rekap ternormalisasi (view read-only dari TableRegistry)."""
+        return get_registry().rekap(self.path)
+
+    def _index(self) -> tuple[pd.DataFrame, dict[str, int]]:
+        reg = get_registry()
+        with self._lock:
+            ver = reg.rekap_version(self.path)
+            if self._frame is None or self._ver != ver:
+                df = reg.rekap(self.path)
+                ids = df["__id"].astype(str).tolist() if "__id" in df.columns else []
+                # __id duplikat (data lama) → posisi pertama menang, sama dengan filter lama .iloc[0]
+                pos: dict[str, int] = {}
+                for i, rid in enumerate(ids):
+                    pos.setdefault(rid, i)
+                self._frame, self._pos, self._ver = df, pos, ver
+                self.index_builds += 1
+            return self._frame, self._pos
+
+    def position(self, row_id) -> int | None:
+        return self._index()[1].get(str(row_id))
+
+    def __contains__(self, row_id) -> bool:
+        return self.position(row_id) is not None
+
+    def get(self, row_id) -> dict | None:
+        """Baris dengan __id tertentu sebagai dict, atau None."""
+        df, pos = self._index()
+        i = pos.get(str(row_id))
+        return None if i is None else df.iloc[i].to_dict()
+
+    # ---- tulis (1 entri jurnal per operasi) ----
+    def _write_lock(self):
+        """Lock yang membungkus append: mode file → path_lock(rekap); mode sqlite → transaksi tulis."""
+        if rekap_journal._backend(self.path) is not None:
+            return sqlite_backend.transaction()
+        return path_lock(self.path)
+
+    def _commit(self, write, entries: list[dict], index_update=None,
+                changes: list | None = None, on_commit: OnCommit | None = None) -> tuple[tuple, tuple]:
+        """Tulis + patch cache. Return (ver_before, ver_after) yang dibaca di bawah lock tulis."""
+        reg = get_registry()
+        with self._lock, self._write_lock():
+            ver0 = reg.rekap_version(self.path)
+            write()
+            ver1 = reg.rekap_version(self.path)
+            patched = reg.apply_rekap(self.path, ver0, ver1, entries)
+            if patched is not None and self._ver == ver0 and index_update is not None:
+                self._frame, self._ver = patched, ver1
+                index_update()
+            else:
+                self._ver = None   # indeks dibangun ulang saat dibutuhkan
+            if on_commit is not None:
+                try:
+                    on_commit(ver0, ver1, list(changes or []))
+                except Exception:
+                    pass   # indeks turunan tidak sinkron → rebuild lazy di pembacaan berikutnya
+            return ver0, ver1
+
+    def insert(self, row: dict, on_commit: OnCommit | None = None) -> str:
+        """Tambah satu baris. __id dibuat bila kosong. Return __id."""
+        return self.insert_many([row], on_commit=on_commit)[0]
+
+    def insert_many(self, rows: list[dict], on_commit: OnCommit | None = None) -> list[str]:
+        """Tambah banyak baris dalam satu write + fsync jurnal. Return daftar __id."""
+        rows = [{**r, "__id": str(r.get("__id")) if rekap_journal._valid_id(r.get("__id")) else str(uuid.uuid4())}
+                for r in rows or []]
+        if not rows:
+            return []
+        ids = [r["__id"] for r in rows]
+        entries = [{"op": "insert", "__id": r["__id"], "row": rekap_journal._row_jsonable(r)} for r in rows]
+
+        def _idx():
+            n0 = len(self._frame) - len(rows)
+            if any(rid in self._pos for rid in ids):   # upsert ke baris yang sudah ada → posisi bisa bergeser
+                self._ver = None
+                return
+            for k, rid in enumerate(ids):
+                self._pos[rid] = n0 + k
+
+        self._commit(lambda: rekap_journal.append_inserts(self.path, rows), entries, _idx,
+                     [(r, +1) for r in rows], on_commit)
+        return ids
+
+    def update(self, row_id, changes: dict, on_commit: OnCommit | None = None) -> dict | None:
+        """Ubah kolom baris __id. Return baris lama (None bila __id tidak ada → tidak menulis)."""
+        with self._lock, self._write_lock():
+            old = self.get(row_id)   # dibaca di bawah lock → baris lama pasti versi ver_before
+            if old is None:
+                return None
+            rec = rekap_journal._row_jsonable(changes)
+            rec.pop("__id", None)
+            self._commit(lambda: rekap_journal.append_update(self.path, str(row_id), changes),
+                         [{"op": "update", "__id": str(row_id), "row": rec}], lambda: None,
+                         [(old, -1), ({**old, **changes}, +1)], on_commit)
+            return old
+
+    def delete(self, row_id, on_commit: OnCommit | None = None) -> dict | None:
+        """Hapus baris __id. Return baris lama (None bila __id tidak ada → tidak menulis)."""
+        with self._lock, self._write_lock():
+            old = self.get(row_id)
+            if old is None:
+                return None
+            self._commit(lambda: rekap_journal.append_delete(self.path, str(row_id)),
+                         [{"op": "delete", "__id": str(row_id)}], None, [(old, -1)], on_commit)
+            return old
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"rows": len(self._pos), "index_builds": self.index_builds}
+
+_repos_lock = threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def _repo_registry() -> dict[str, RekapRepository]:
+    return {}
+
+def get_rekap_repo(path=Path("data/rekap.csv")) -> RekapRepository:
+    """Repository bersama per file rekap (per proses)."""
+    repos = _repo_registry()
+    k = Path(path).resolve().as_posix()
+    with _repos_lock:
+        repo = repos.get(k)
+        if repo is None:
+            repo = repos[k] = RekapRepository(path)
+        return repo
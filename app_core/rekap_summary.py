@@ -0,0 +1,214 @@
+# app_core/rekap_summary.py
+# ==== Ringkasan harian rekap (terwujud, tersimpan di samping data) ====
+# Pengganti agregasi ulang di halaman Rekap setiap interaksi (salin rekap, parse tanggal,
+# kolom E_G/E_P/M_G/M_P per baris, groupby per hari / per majelis):
+# - satu tabel hitungan per (hari, metode, tipe, hakim, pp, js, jenis)
+#     hari   : tgl_register (normalize)
+#     metode : 'E-Court' | 'Manual' (aturan sama dengan _norm_metode halaman Rekap)
+#     tipe   : 'P' bila nomor perkara memuat PDT.P, selain itu 'G' (sama dengan _detect_tipe_from_nomor)
+#     hakim/pp/js : nama apa adanya (strip); jenis: jenis_perkara upper
+# - dipelihara inkremental saat simpan/edit/hapus (SummaryStore = VersionedStore) → tidak ada rebuild
+# - disimpan ke data/<stem>_summary.parquet + versi rekap di metadata → proses baru langsung memakai
+#   ringkasan dari disk bila rekap belum berubah; tanpa pyarrow → hanya di memori
+# - simpan ke disk di thread latar (ditunda PERSIST_DELAY detik): simpan beruntun digabung jadi satu
+#   tulis parquet, jalur simpan perkara tidak menunggu; versi yang dicap = versi isi yang ditulis
+# - ringkasan yang sudah diterbitkan store tidak pernah diubah (apply = salin → terapkan → tukar)
+from __future__ import annotations
+import json, os, tempfile, threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    _HAVE_ARROW = True
+except Exception:  # pyarrow opsional
+    pa = pq = None
+    _HAVE_ARROW = False
+
+from app_core.registry import get_registry
+from app_core.stats_cube import _key_norm
+from app_core.versioned_store import VersionedStore
+
+DIMS = ["day", "metode", "tipe", "hakim", "pp", "js", "jenis"]
+_META_KEY = b"saef.summary"
+_SUMMARY_VERSION = 1
+PERSIST_DELAY = 2.0   # detik; jeda sebelum ringkasan ditulis ke disk
+
+# ---------- Fakta ----------
+def metode_label(s: pd.Series) -> pd.Series:
+    m = s.fillna("").astype(str).str.strip().str.lower()
+    is_e = m.str.contains("e-court", regex=False) | m.str.contains("ecourt", regex=False) | (m == "e")
+    return pd.Series(np.where(is_e, "E-Court", "Manual"), index=s.index)
+
+def tipe_label(nomor: pd.Series) -> pd.Series:
+    s = nomor.fillna("").astype(str).str.upper().str.replace(" ", "", regex=False)
+    return pd.Series(np.where(s.str.contains("PDT.P", regex=False), "P", "G"), index=nomor.index)
+
+def _facts(df: pd.DataFrame) -> pd.DataFrame:
+    n = len(df)
+    col = lambda c: df[c] if c in df.columns else pd.Series([""] * n, index=df.index, dtype=object)
+    txt = lambda c: col(c).fillna("").astype(str).str.strip()
+    return pd.DataFrame({
+        "day": pd.to_datetime(col("tgl_register"), errors="coerce").dt.normalize(),
+        "metode": metode_label(col("metode")),
+        "tipe": tipe_label(col("nomor_perkara")),
+        "hakim": txt("hakim"), "pp": txt("pp"), "js": txt("js"),
+        "jenis": txt("jenis_perkara").str.upper(),
+    }, index=df.index)
+
+class RekapSummary:
+    """Hitungan per sel DIMS (dict untuk update inkremental, DataFrame di-materialisasi saat query)."""
+
+    def __init__(self, cells: dict[tuple, int] | None = None):
+        self.cells: dict[tuple, int] = cells or {}
+        self._frame: pd.DataFrame | None = None
+
+    @classmethod
+    def from_rekap(cls, df: pd.DataFrame) -> "RekapSummary":
+        if df is None or df.empty:
+            return cls()
+        g = _facts(df).groupby(DIMS, dropna=False, sort=False).size()
+        return cls({_key_norm(k): int(v) for k, v in g.items()})
+
+    @classmethod
+    def from_frame(cls, fr: pd.DataFrame) -> "RekapSummary":
+        keys = fr[DIMS].astype(object).where(fr[DIMS].notna(), None).itertuples(index=False, name=None)
+        return cls({_key_norm(k): int(n) for k, n in zip(keys, fr["n"].tolist())})
+
+    def copy(self) -> "RekapSummary":
+        return RekapSummary(dict(self.cells))
+
+    def apply_row(self, row: dict | pd.Series | None, sign: int = 1) -> None:
+        if row is None:
+            return
+        for k, v in _facts(pd.DataFrame([dict(row)])).groupby(DIMS, dropna=False, sort=False).size().items():
+            k = _key_norm(k)
+            n = self.cells.get(k, 0) + sign * int(v)
+            if n > 0: self.cells[k] = n
+            else: self.cells.pop(k, None)
+        self._frame = None
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            cells = self.cells
+            if cells:
+                keys = list(cells)
+                fr = pd.DataFrame(keys, columns=DIMS)
+                fr["day"] = pd.to_datetime(fr["day"], errors="coerce")
+                fr["n"] = np.fromiter(cells.values(), dtype=np.int64, count=len(keys))
+            else:
+                fr = pd.DataFrame({c: pd.Series(dtype=object) for c in DIMS} | {"n": pd.Series(dtype=np.int64)})
+                fr["day"] = pd.to_datetime(fr["day"])
+            self._frame = fr
+        return self._frame
+
+    def query(self, by=("day",), *, start=None, end=None, **eq) -> pd.Series:
+        """Jumlah perkara per kolom `by`; start/end inklusif (hari), eq = filter kolom == nilai."""
+        f = self.frame
+        m = pd.Series(True, index=f.index)
+        if start is not None:
+            m &= f["day"] >= pd.Timestamp(start)
+        if end is not None:
+            m &= f["day"] <= pd.Timestamp(end)
+        for c, v in eq.items():
+            m &= f[c] == v
+        by = list(by)
+        return f.loc[m, by + ["n"]].groupby(by, dropna=False, sort=True)["n"].sum()
+
+# ---------- Persistensi ----------
+def summary_path_for(rekap_path: Path) -> Path:
+    rekap_path = Path(rekap_path)
+    return rekap_path.with_name(f"{rekap_path.stem}_summary.parquet")
+
+def _save(fr: pd.DataFrame, rekap_path: Path, ver: tuple) -> None:
+    if not _HAVE_ARROW:
+        return
+    dst = summary_path_for(rekap_path)
+    tbl = pa.Table.from_pandas(fr, preserve_index=False)
+    meta = dict(tbl.schema.metadata or {})
+    meta[_META_KEY] = json.dumps({"v": _SUMMARY_VERSION, "rekap": ver}).encode("utf-8")
+    fd, tmp = tempfile.mkstemp(prefix="tmp_", suffix=".parquet", dir=dst.parent.as_posix())
+    os.close(fd)
+    try:
+        pq.write_table(tbl.replace_schema_metadata(meta), tmp)
+        os.replace(tmp, dst.as_posix())
+    finally:
+        try:
+            if os.path.exists(tmp): os.remove(tmp)
+        except Exception:
+            pass
+
+def _load(rekap_path: Path, ver: tuple) -> RekapSummary | None:
+    """Ringkasan dari disk bila dibuat untuk versi rekap yang sama; selain itu None."""
+    if not _HAVE_ARROW:
+        return None
+    src = summary_path_for(rekap_path)
+    if not src.exists():
+        return None
+    md = pq.read_schema(src.as_posix()).metadata or {}
+    meta = json.loads(md.get(_META_KEY, b"{}").decode("utf-8"))
+    if int(meta.get("v", 0)) != _SUMMARY_VERSION or json.loads(json.dumps(list(ver))) != meta.get("rekap"):
+        return None
+    fr = pq.read_table(src.as_posix()).to_pandas()
+    fr["day"] = pd.to_datetime(fr["day"], errors="coerce").astype("datetime64[ns]")
+    return RekapSummary.from_frame(fr)
+
+class SummaryStore(VersionedStore):
+    """Ringkasan bersama per proses untuk satu file rekap; versi dicap → ditulis ke disk di latar."""
+
+    def __init__(self, persist_delay: float = PERSIST_DELAY):
+        super().__init__(RekapSummary.from_rekap)
+        self._dirty: set[str] = set()
+        self._timer: threading.Timer | None = None
+        self._delay = persist_delay
+        self.disk_hits = 0
+        self.persists = 0
+
+    def _restore(self, path: Path, ver: tuple) -> RekapSummary | None:
+        s = _load(path, ver)
+        if s is not None:
+            self.disk_hits += 1
+        return s
+
+    def _stamped(self, k: str) -> None:
+        self._schedule(k)
+
+    # ---- simpan ke disk (latar, ditunda) ----
+    def _schedule(self, k: str) -> None:
+        with self._lock:
+            self._dirty.add(k)
+            if self._timer is None:
+                self._timer = threading.Timer(self._delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> int:
+        """Tulis ringkasan yang tertunda sekarang. Snapshot (frame, versi) diambil di bawah lock."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            jobs = [(k, self._obj[k].frame, self._ver[k]) for k in self._dirty
+                    if k in self._obj and self._ver.get(k) is not None]
+            self._dirty.clear()
+        for k, fr, ver in jobs:
+            try:
+                _save(fr, Path(k), ver)
+                self.persists += 1
+            except Exception:
+                pass   # gagal simpan → proses berikutnya membangun ulang
+        return len(jobs)
+
+@st.cache_resource(show_spinner=False)
+def get_summary_store() -> SummaryStore:
+    return SummaryStore()
+
+def rekap_summary(path=Path("data/rekap.csv")) -> RekapSummary:
+    """Ringkasan untuk versi rekap terkini (registry bersama)."""
+    reg = get_registry()
+    return get_summary_store().get(path, reg.rekap_version(path), lambda: reg.rekap(path),
+                                   lambda: reg.rekap_version(path))
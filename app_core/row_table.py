@@ -0,0 +1,72 @@
+# app_core/row_table.py
+# ==== Tabel baris + aksi (satu st.dataframe, bukan widget per baris) ====
+# Pengganti pola "for r in df.iterrows(): st.columns(...) + tombol ✏️/🗑️ per baris"
+# (Rekap harian halaman Input, Data Hakim, Cuti, SK Majelis, Libur):
+# - seluruh halaman tabel = 1 elemen st.dataframe (Arrow) dengan seleksi baris (on_select="rerun")
+# - aksi (Edit/Hapus/...) = satu baris tombol untuk baris terpilih → jumlah widget tetap,
+#   tidak tumbuh dengan jumlah baris (80 baris lama ≈ 1000 widget per rerun)
+# - opsional paginasi internal (page_size) → payload websocket dibatasi per halaman
+# - mengembalikan (aksi, posisi) → pemanggil memakai df.iloc[posisi] seperti r di loop lama
+from __future__ import annotations
+import math
+import pandas as pd
+import streamlit as st
+
+DEFAULT_ACTIONS = {"edit": "✏️ Edit", "delete": "🗑️ Hapus"}
+ROW_HEIGHT = 35   # tinggi baris st.dataframe (px)
+MAX_HEIGHT = 560  # di atas ini tabel scroll di dalam elemen (virtualisasi bawaan grid)
+
+def _pager(key: str, total: int, page_size: int) -> tuple[int, int]:
+    """Kontrol halaman (Prev/Next) → (start, end) baris."""
+    pages = max(1, math.ceil(total / page_size))
+    pk = f"{key}__page"
+    page = min(max(1, int(st.session_state.get(pk, 1))), pages)
+    if pages > 1:
+        c1, c2, c3 = st.columns([1, 2, 1])
+        if c1.button("⬅️ Prev", key=f"{key}__prev", width="stretch", disabled=page <= 1):
+            page -= 1
+        if c3.button("Next ➡️", key=f"{key}__next", width="stretch", disabled=page >= pages):
+            page += 1
+        start = (page - 1) * page_size
+        c2.markdown(
+            f"<div style='text-align:center'>Halaman <b>{page}</b> / <b>{pages}</b> • "
+            f"<i>{start + 1}-{min(start + page_size, total)}</i> dari <b>{total}</b> baris</div>",
+            unsafe_allow_html=True,
+        )
+    st.session_state[pk] = page
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total)
+
+def row_action_table(view: pd.DataFrame, *, key: str, actions: dict[str, str] | None = None,
+                     page_size: int | None = None, column_config: dict | None = None,
+                     label_col: str | None = None) -> tuple[str | None, int | None]:
+    """
+    Tampilkan `view` sebagai satu tabel dengan seleksi satu baris + tombol aksi.
+    Return (nama_aksi, posisi_baris_di_view) saat tombol diklik; selain itu (None, None).
+    """
+    actions = DEFAULT_ACTIONS if actions is None else actions
+    total = len(view)
+    start, end = _pager(key, total, page_size) if page_size else (0, total)
+    page = view.iloc[start:end]
+
+    # key grid ikut halaman & isi → seleksi lama tidak "pindah" ke baris lain setelah hapus/ganti halaman
+    grid_key = f"{key}__grid_{start}_{total}"
+    height = min(MAX_HEIGHT, ROW_HEIGHT * (len(page) + 1) + 3)
+    event = st.dataframe(
+        page, key=grid_key, on_select="rerun", selection_mode="single-row",
+        hide_index=True, width="stretch", height=height, column_config=column_config,
+    )
+    sel = list(getattr(getattr(event, "selection", None), "rows", []) or [])
+    pos = start + int(sel[0]) if sel and int(sel[0]) < len(page) else None
+
+    cols = st.columns([3] + [1] * len(actions))
+    if pos is None:
+        cols[0].caption("Pilih satu baris di tabel untuk Edit/Hapus.")
+    else:
+        lab = view.iloc[pos][label_col] if label_col and label_col in view.columns else view.iloc[pos].iloc[0]
+        cols[0].markdown(f"Dipilih: **{lab}**")
+    clicked = None
+    for c, (name, label) in zip(cols[1:], actions.items()):
+        if c.button(label, key=f"{key}__act_{name}", width="stretch", disabled=pos is None):
+            clicked = name
+    return (clicked, pos) if clicked else (None, None)
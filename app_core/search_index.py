@@ -0,0 +1,220 @@
+# app_core/search_index.py
+# ==== Indeks pencarian teks rekap (dibangun sekali per versi rekap) ====
+# Pengganti pencarian per baris (work.apply(_hit, axis=1) di halaman Rekap,
+# _normalize_searchable_text 4a_Rekap yang menggabung semua kolom per baris setiap rerun):
+# - kolom terindeks: nomor_perkara, hakim, anggota1, anggota2, pp, js, klasifikasi, jenis_perkara
+#   (per kolom: teks lower di-factorize → kode nilai unik per baris; tanpa stringify ulang per rerun)
+# - per kolom: indeks terbalik token alfanumerik → id nilai unik; kosakata token digabung jadi satu
+#   string sehingga "token yang memuat x" = str.find di satu string, bukan loop per baris
+# - cari substring (semantik lama): irisan token kueri → kandidat nilai unik; kueri satu token sudah
+#   persis, selain itu dicek str.contains pada kandidat; hasil ke baris = satu take vektor ok[codes]
+# - awalan nomor perkara: array nomor terurut + searchsorted ("12/Pdt.G*")
+# - nama ternormalisasi: token name_key (gelar dibuang) per kolom nama → "Drs. H. Ahmad" cocok "Ahmad, S.H."
+# - search_index_for(df, key) meng-cache indeks per kunci (mis. versi rekap) / isi kolom
+from __future__ import annotations
+import re, threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from app_core.name_index import name_tokens
+
+FIELDS = ["nomor_perkara", "hakim", "anggota1", "anggota2", "pp", "js", "klasifikasi", "jenis_perkara"]
+NAME_FIELDS = ["hakim", "anggota1", "anggota2", "pp", "js"]
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+_SEP = "\n"
+_MEMO_MAX = 64
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+def _postings(values, tokenize) -> dict[str, np.ndarray]:
+    """Nilai unik ke-j → token-tokennya; hasil token → array id nilai unik (bukan posisi baris)."""
+    post: dict[str, list[int]] = {}
+    for j, u in enumerate(values):
+        for t in tokenize(u):
+            if t:
+                post.setdefault(t, []).append(j)
+    return {t: np.asarray(ids, dtype=np.int64) for t, ids in post.items()}
+
+class _FieldIndex:
+    """Satu kolom: kode nilai unik per baris + indeks terbalik token → id nilai unik.
+
+    Semua pencocokan dikerjakan di level nilai unik (nama hakim berulang ribuan kali cukup
+    dicek sekali), lalu dipetakan ke baris dengan satu take vektor: ok[codes].
+    """
+
+    def __init__(self, s: pd.Series):
+        codes, uniq = pd.factorize(s.str.lower())
+        self.codes = codes
+        self.uniq = pd.Series(uniq, dtype="string")
+        self.post = _postings(self.uniq.tolist(), lambda u: set(_TOKEN_SPLIT.split(u)))
+        # kosakata digabung: offset awal tiap token → token_id lewat searchsorted
+        self.vocab = list(self.post)
+        self.blob = _SEP.join(self.vocab)
+        self.starts = np.cumsum([0] + [len(t) + 1 for t in self.vocab[:-1]]) if self.vocab else _EMPTY
+
+    def _with_token_containing(self, sub: str) -> np.ndarray:
+        """Mask nilai unik yang punya token memuat sub."""
+        m = np.zeros(len(self.uniq), dtype=bool)
+        offs = []
+        i = self.blob.find(sub)
+        while i != -1:
+            offs.append(i)
+            i = self.blob.find(sub, i + 1)
+        if offs:
+            tids = np.unique(np.searchsorted(self.starts, np.asarray(offs), side="right") - 1)
+            for t in tids:
+                m[self.post[self.vocab[t]]] = True
+        return m
+
+    def substring(self, phrase: str) -> np.ndarray:
+        """Mask baris yang teksnya memuat phrase (phrase sudah lower)."""
+        subs = [t for t in _TOKEN_SPLIT.split(phrase) if t]
+        ok = None
+        for t in sorted(set(subs), key=len, reverse=True):
+            ok = self._with_token_containing(t) if ok is None else ok & self._with_token_containing(t)
+            if not ok.any():
+                return np.zeros(len(self.codes), dtype=bool)
+        if subs != [phrase]:   # kueri satu token alfanumerik → hasil posting sudah persis; selain itu cek
+            ids = np.arange(len(self.uniq)) if ok is None else np.flatnonzero(ok)
+            ok = np.zeros(len(self.uniq), dtype=bool)
+            if len(ids):
+                ok[ids] = self.uniq.iloc[ids].str.contains(phrase, regex=False).to_numpy(dtype=bool)
+        return ok[self.codes] if len(ok) else np.zeros(len(self.codes), dtype=bool)
+
+class _NameIndex:
+    """Token name_key per nilai unik kolom nama → cocok tanpa gelar/tanda baca."""
+
+    def __init__(self, s: pd.Series):
+        self.codes, uniq = pd.factorize(s)
+        self.toks = [name_tokens(u) for u in uniq]
+        self.post = _postings(self.toks, lambda ts: ts)
+
+    def match(self, qt: frozenset) -> np.ndarray:
+        ok = np.ones(len(self.toks), dtype=bool)
+        for t in qt:
+            m = np.zeros(len(self.toks), dtype=bool)
+            m[self.post.get(t, _EMPTY)] = True
+            ok &= m
+        return ok[self.codes] if len(ok) else np.zeros(len(self.codes), dtype=bool)
+
+class SearchIndex:
+    """Indeks satu frame rekap. Hasil berupa posisi baris (0..n-1) terurut."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        self.index = df.index
+        self.row_ids = df["__id"].astype(str).to_numpy() if "__id" in df.columns else None
+        self.fields: dict[str, _FieldIndex] = {}
+        self.name_fields: dict[str, _NameIndex] = {}
+        for f in FIELDS:
+            s = (df[f] if f in df.columns else pd.Series("", index=df.index)).fillna("").astype(str).str.strip()
+            self.fields[f] = _FieldIndex(s)
+            if f in NAME_FIELDS:
+                self.name_fields[f] = _NameIndex(s)
+        # awalan nomor perkara: nomor lower terurut + urutan posisinya
+        nomor = self.fields["nomor_perkara"].uniq.to_numpy(dtype=object)[self.fields["nomor_perkara"].codes]
+        self._nomor_order = np.argsort(nomor, kind="stable")
+        self._nomor_sorted = nomor[self._nomor_order]
+        self._memo: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+    # ---- kueri (mask boolean panjang n) ----
+    def substring_mask(self, phrase: str, fields=None) -> np.ndarray:
+        """Baris yang salah satu kolomnya memuat phrase (case-insensitive), sama dengan filter lama."""
+        phrase = str(phrase or "").strip().lower()
+        if not phrase:
+            return np.ones(self.n, dtype=bool)
+        m = np.zeros(self.n, dtype=bool)
+        for f in (fields or FIELDS):
+            if f in self.fields:
+                m |= self.fields[f].substring(phrase)
+        return m
+
+    def nomor_prefix(self, prefix: str) -> np.ndarray:
+        """Posisi baris yang nomor_perkara-nya diawali prefix (searchsorted pada nomor terurut)."""
+        p = str(prefix or "").strip().lower()
+        lo = np.searchsorted(self._nomor_sorted, p, side="left")
+        hi = np.searchsorted(self._nomor_sorted, p + "\uffff", side="left")
+        return np.sort(self._nomor_order[lo:hi])
+
+    def names_mask(self, query: str, fields=None) -> np.ndarray:
+        """Baris dengan kolom nama yang memuat semua token name_key kueri (gelar/tanda baca diabaikan)."""
+        m = np.zeros(self.n, dtype=bool)
+        qt = name_tokens(str(query or ""))
+        if qt:
+            for f in (fields or NAME_FIELDS):
+                if f in self.name_fields:
+                    m |= self.name_fields[f].match(qt)
+        return m
+
+    def search(self, q: str, fields=None, all_words: bool = False, names: bool = True) -> np.ndarray:
+        """
+        Kueri halaman:
+          'xxx*'          → awalan nomor perkara
+          all_words=False → seluruh kueri sebagai substring satu kolom (filter Rekap lama)
+          all_words=True  → tiap kata harus muncul (di kolom mana pun; pencarian 4a_Rekap lama)
+        names=True menambahkan kecocokan nama ternormalisasi. Hasil = posisi baris terurut.
+        """
+        q = str(q or "").strip()
+        key = (q.lower(), tuple(fields or ()), all_words, names)
+        hit = self._memo.get(key)
+        if hit is not None:
+            self._memo.move_to_end(key)
+            return hit
+        if not q:
+            out = np.arange(self.n)
+        elif q.endswith("*") and len(q) > 1:
+            out = self.nomor_prefix(q[:-1])
+        else:
+            if all_words:
+                m = np.ones(self.n, dtype=bool)
+                for w in q.lower().split():
+                    m &= self.substring_mask(w, fields)
+            else:
+                m = self.substring_mask(q, fields)
+            name_fields = NAME_FIELDS if fields is None else [f for f in fields if f in NAME_FIELDS]
+            if names and name_fields:
+                m |= self.names_mask(q, name_fields)
+            out = np.flatnonzero(m)
+        self._memo[key] = out
+        while len(self._memo) > _MEMO_MAX:
+            self._memo.popitem(last=False)
+        return out
+
+    def mask(self, q: str, **kw) -> np.ndarray:
+        """Versi boolean (panjang n) dari search()."""
+        m = np.zeros(self.n, dtype=bool)
+        m[self.search(q, **kw)] = True
+        return m
+
+    def ids(self, pos: np.ndarray) -> list:
+        """Posisi → __id baris (atau label index bila tidak ada kolom __id)."""
+        return list(self.row_ids[pos]) if self.row_ids is not None else list(self.index[pos])
+
+# ---------- Cache ----------
+_CACHE_MAX = 4
+_cache: "OrderedDict[tuple, SearchIndex]" = OrderedDict()
+_lock = threading.Lock()
+
+def _frame_sig(df: pd.DataFrame) -> tuple:
+    cols = [c for c in FIELDS if c in df.columns]
+    try:
+        h = pd.util.hash_pandas_object(df[cols].astype(str), index=True).to_numpy()
+        w = np.arange(1, len(h) + 1, dtype=np.uint64)
+        return (tuple(cols), len(h), int(h.sum()), int((h * w).sum()))
+    except Exception:
+        return (tuple(cols), len(df), id(df))
+
+def search_index_for(df: pd.DataFrame, key: tuple | None = None) -> SearchIndex:
+    """SearchIndex bersama; key (mis. ('rekap', path, versi)) menghindari hashing isi frame."""
+    k = ("key", key, len(df)) if key is not None else ("sig", _frame_sig(df))
+    with _lock:
+        idx = _cache.get(k)
+        if idx is not None:
+            _cache.move_to_end(k)
+            return idx
+    idx = SearchIndex(df)
+    with _lock:
+        _cache[k] = idx
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return idx
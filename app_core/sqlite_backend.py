@@ -0,0 +1,443 @@
+# app_core/sqlite_backend.py
+# ==== Backend SQLite (WAL): penyimpanan tabel ketiga selain file (parquet/CSV) dan MySQL ====
+# Pengganti parquet + CSV per tabel (io_csv) dan jurnal rekap JSONL bila APP_STORAGE=sqlite:
+# - satu berkas data/saef.sqlite (APP_SQLITE_PATH untuk lokasi lain); mode WAL → pembaca tidak
+#   pernah memblokir penulis; satu koneksi per thread
+# - API tetap lewat io_csv (read_table/write_table/update_table/table_version) dan rekap_journal
+#   (entri insert/update/delete, version) → data_io, TableRegistry, RekapRepository, halaman tidak berubah
+# - rekap: baris ditulis per __id (bukan tulis ulang tabel) + indeks yang sama dengan db.init_db
+#   (ix_tgl_reg, ix_tgl_sidang, ix_hakim); sk_majelis: ix_hari, ix_ketua → select() = query berindeks
+# - transaction(): commit multi-tabel atomik (rekap + rotasi/cooldown StateStore + js_ghoib + audit
+#   memakai koneksi yang sama); tulisan lain di thread yang sama otomatis bergabung (SAVEPOINT)
+# - impor sekali dari parquet/CSV (+ jurnal rekap lama) saat tabel belum ada; CSV tetap ditulis
+#   sebagai mirror ekspor, dan CSV yang diubah di luar app diimpor ulang (seperti io_csv)
+# Catatan: WAL butuh semua proses di satu mesin; bila data/ ada di share jaringan, letakkan
+# berkas SQLite di disk lokal server lewat APP_SQLITE_PATH.
+from __future__ import annotations
+import itertools, json, os, re, sqlite3, threading, uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+import pandas as pd
+import streamlit as st
+
+from app_core import io_csv, rekap_journal
+from app_core.mirror_all import mirror_csv
+
+STORAGE = os.environ.get("APP_STORAGE", "file").strip().lower()   # "file" | "sqlite"
+DATA_DIR = Path(os.environ.get("APP_DATA_DIR", "data"))
+DB_NAME = "saef.sqlite"
+ROW_KEY = "__id"
+
+# indeks per tabel (nama → kolom), disamakan dengan skema MySQL di db.init_db
+INDEXES: dict[str, dict[str, str]] = {
+    "rekap": {"ix_rekap_id": ROW_KEY, "ix_tgl_reg": "tgl_register",
+              "ix_tgl_sidang": "tgl_sidang", "ix_hakim": "hakim"},
+    "sk_majelis": {"ix_hari": "hari", "ix_ketua": "ketua"},
+}
+# skema tabel yang menumpang di berkas backend (StateStore: kv/meta, audit: _audit). Dibuat sekali
+# di SqliteBackend.__init__ dengan koneksi yang belum membuka transaksi → DDL tidak ikut ter-rollback
+# bila objek pemakainya kebetulan pertama kali dibuat di dalam transaction() yang gagal.
+STATE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS kv (ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+    " PRIMARY KEY (ns, key)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS meta (ns TEXT PRIMARY KEY, ver INTEGER NOT NULL,"
+    " json_sig TEXT NOT NULL DEFAULT '')",
+)
+AUDIT_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS _audit (seq INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, rec TEXT NOT NULL)",
+)
+_SQL_TYPE = {"date": "TEXT", "bool": "INTEGER", "int": "INTEGER", "float": "REAL", "text": "TEXT"}
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_sp_seq = itertools.count(1)
+
+def enabled() -> bool:
+    return STORAGE == "sqlite"
+
+# ---------- transaksi (dipakai juga oleh StateStore) ----------
+@contextmanager
+def sqlite_tx(con: sqlite3.Connection, immediate: bool = True):
+    """BEGIN [IMMEDIATE] … COMMIT; di dalam transaksi lain → SAVEPOINT (ikut commit/rollback luar)."""
+    if con.in_transaction:
+        sp = f"sp{next(_sp_seq)}"
+        con.execute(f"SAVEPOINT {sp}")
+        try:
+            yield con
+        except BaseException:
+            con.execute(f"ROLLBACK TO {sp}")
+            con.execute(f"RELEASE {sp}")
+            raise
+        con.execute(f"RELEASE {sp}")
+        return
+    con.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+
+# ---------- konversi nilai ----------
+def _q(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _kind(s: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return "date"
+    if pd.api.types.is_bool_dtype(s):
+        return "bool"
+    if pd.api.types.is_integer_dtype(s):
+        return "int"
+    if pd.api.types.is_float_dtype(s):
+        return "float"
+    return "text"
+
+def _kind_for_name(col: str) -> str:
+    if io_csv._is_date_col(col):
+        return "date"
+    return "bool" if col in io_csv.BOOL_COLS else "text"
+
+def _cell(v, kind: str):
+    """Nilai tunggal (entri jurnal / dict baris) → nilai kolom SQLite."""
+    try:
+        if v is None or pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if hasattr(v, "item"):
+        try: v = v.item()
+        except Exception: pass
+    if kind == "date":
+        if isinstance(v, str) and not v.strip():
+            return None
+        ts = pd.to_datetime(v, errors="coerce")
+        return None if pd.isna(ts) else ts.strftime("%Y-%m-%d")
+    if kind == "bool":
+        return int(io_csv._is_active_value(v))
+    if isinstance(v, (int, float, str)):
+        return v
+    return str(v)
+
+def _column_values(s: pd.Series, kind: str) -> list:
+    """Kolom DataFrame bertipe → list nilai SQLite (vektor, NaN/NaT → NULL)."""
+    if kind == "date":
+        out = s.dt.strftime("%Y-%m-%d")
+    elif kind == "bool":
+        out = s.astype(int)
+    else:
+        out = s
+    out = out.astype(object)
+    return out.where(out.notna(), None).tolist()
+
+def _restore(df: pd.DataFrame, cols: list[tuple[str, str]]) -> pd.DataFrame:
+    """Hasil SELECT → tipe kolom semula (sama dengan parquet io_csv)."""
+    kinds = dict(cols)
+    for c in df.columns:
+        k = kinds.get(c) or _kind_for_name(c)
+        if k == "date":
+            df[c] = pd.to_datetime(df[c], errors="coerce", format="ISO8601").astype("datetime64[ns]")
+        elif k == "bool":
+            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int).astype(bool)
+        elif k == "int":
+            n = pd.to_numeric(df[c], errors="coerce")
+            df[c] = n.astype("int64") if not n.isna().any() else n
+        elif k == "float":
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(float)
+    return df
+
+def _file_sig(p: Path) -> str:
+    try:
+        s = p.stat()
+        return f"{s.st_mtime_ns}:{s.st_size}"
+    except FileNotFoundError:
+        return ""
+
+class SqliteBackend:
+    """Tabel app di satu berkas SQLite. Aman lintas thread (koneksi per thread) dan lintas proses."""
+
+    def __init__(self, data_dir: Path | str = DATA_DIR, db_path: Path | str | None = None):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._root = self.data_dir.resolve()
+        self.path = Path(db_path or os.environ.get("APP_SQLITE_PATH") or self.data_dir / DB_NAME)
+        self._local = threading.local()
+        self.imports = 0
+        con = self.connection()
+        con.execute("CREATE TABLE IF NOT EXISTS _tables (name TEXT PRIMARY KEY, ver TEXT NOT NULL,"
+                    " csv_sig TEXT NOT NULL DEFAULT '', cols TEXT NOT NULL DEFAULT '[]',"
+                    " pending INTEGER NOT NULL DEFAULT 0)")
+        for ddl in (*STATE_SCHEMA, *AUDIT_SCHEMA):
+            con.execute(ddl)
+
+    # ---------- koneksi & transaksi ----------
+    def connection(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path.as_posix(), timeout=30, isolation_level=None, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    @contextmanager
+    def transaction(self):
+        """Satu transaksi tulis untuk semua tabel (dan StateStore/audit) di thread ini."""
+        con = self.connection()
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        try:
+            with sqlite_tx(con):
+                yield con
+        except BaseException:
+            if self._local.depth == 1:
+                self._local.deferred = {}
+            raise
+        finally:
+            self._local.depth -= 1
+        if self._local.depth == 0:
+            self._flush_deferred()
+
+    def _defer(self, name: str, path, after=None) -> bool:
+        """Di dalam transaction(): CSV mirror (+ after) ditunda sampai commit → berkas yang sudah
+        ditulis tidak tertinggal bila transaksi di-rollback (lalu salah diimpor ulang)."""
+        if not getattr(self._local, "depth", 0):
+            return False
+        d = getattr(self._local, "deferred", None)
+        if d is None:
+            d = self._local.deferred = {}
+        afters = d.setdefault(name, (Path(path), []))[1]
+        if after is not None and after not in afters:
+            afters.append(after)
+        return True
+
+    def _flush_deferred(self) -> None:
+        """CSV mirror + after() dari tulisan di dalam transaksi, dijalankan setelah commit."""
+        jobs, self._local.deferred = getattr(self._local, "deferred", None) or {}, {}
+        con = self.connection()
+        for name, (path, afters) in jobs.items():
+            try:
+                with sqlite_tx(con):
+                    self._mirror(con, name)
+                for fn in afters:
+                    fn(Path(path))
+            except Exception:
+                pass   # mirror gagal tidak membatalkan data yang sudah commit; dicoba lagi di tulis berikutnya
+
+    def in_transaction(self) -> bool:
+        return self.connection().in_transaction
+
+    # ---------- pemetaan path → tabel ----------
+    def name_for(self, path) -> str | None:
+        """Nama tabel untuk berkas data/<nama>.csv|.parquet; None = bukan tabel backend ini."""
+        p = Path(path)
+        if p.suffix.lower() not in (".csv", ".parquet") or not _NAME_RE.match(p.stem) or p.stem.startswith("_"):
+            return None
+        try:
+            if p.resolve().parent != self._root:
+                return None
+        except Exception:
+            return None
+        return p.stem
+
+    def _csv(self, name: str) -> Path:
+        return self.data_dir / f"{name}.csv"
+
+    def _meta(self, con, name: str):
+        row = con.execute("SELECT ver, csv_sig, cols, pending FROM _tables WHERE name=?", (name,)).fetchone()
+        if row is None:
+            return None
+        return {"ver": row[0], "csv_sig": row[1], "cols": [tuple(c) for c in json.loads(row[2])], "pending": int(row[3])}
+
+    def _bump(self, con, name: str, cols: list | None = None, pending: int = 0, csv_sig: str | None = None) -> str:
+        ver = uuid.uuid4().hex   # token acak: versi dari transaksi yang di-rollback tidak pernah dipakai ulang
+        meta = self._meta(con, name)
+        if meta is None:
+            con.execute("INSERT INTO _tables (name, ver, csv_sig, cols, pending) VALUES (?,?,?,?,?)",
+                        (name, ver, csv_sig or "", json.dumps(cols or []), pending))
+            return ver
+        sets, args = ["ver=?", "pending=pending+?"], [ver, pending]
+        if cols is not None:
+            sets.append("cols=?"); args.append(json.dumps(cols))
+        if csv_sig is not None:
+            sets.append("csv_sig=?"); args.append(csv_sig)
+        con.execute(f"UPDATE _tables SET {', '.join(sets)} WHERE name=?", (*args, name))
+        return ver
+
+    # ---------- impor berkas lama ----------
+    def _sync(self, con, name: str) -> dict | None:
+        """Meta tabel; impor dulu bila tabel belum ada atau CSV diubah di luar app."""
+        csv = self._csv(name)
+        meta = self._meta(con, name)
+        sig = _file_sig(csv)
+        if meta is not None and (not sig or sig == meta["csv_sig"]):
+            return meta
+        if meta is None and not sig and not io_csv.parquet_path_for(csv).exists():
+            return None
+        with sqlite_tx(con):
+            # cek ulang di bawah kunci tulis: proses lain bisa sudah mengimpor / menulis mirror
+            meta, sig = self._meta(con, name), _file_sig(csv)
+            if meta is not None and (not sig or sig == meta["csv_sig"]):
+                return meta
+            if meta is None:
+                df = io_csv._read_table_file(csv)
+                if name == "rekap":   # jurnal rekap lama ikut dilipat
+                    df = rekap_journal.apply_entries(df, rekap_journal._file_entries(csv))
+            else:
+                df = io_csv.to_typed(io_csv._read_csv_raw(csv))
+            self._replace(con, name, df, csv_sig=sig)
+            self.imports += 1
+            return self._meta(con, name)
+
+    # ---------- baca ----------
+    def version(self, path) -> str:
+        """Token versi tabel (kunci cache TableRegistry/indeks turunan)."""
+        name = self.name_for(path)
+        meta = self._sync(self.connection(), name)
+        return meta["ver"] if meta else ""
+
+    def read(self, path) -> pd.DataFrame:
+        """Seluruh tabel (urutan baris = urutan tulis), bertipe seperti parquet."""
+        return self.select(path)
+
+    def select(self, path, where: str = "", params=(), order: str = "rowid") -> pd.DataFrame:
+        """SELECT * … WHERE <where> (pakai ? untuk parameter). Filter kolom berindeks tidak memindai tabel."""
+        name = self.name_for(path)
+        con = self.connection()
+        self._sync(con, name)
+        with sqlite_tx(con, immediate=False):   # snapshot: meta & baris dari commit yang sama
+            meta = self._meta(con, name)
+            if meta is None or not meta["cols"]:
+                return pd.DataFrame()
+            sql = f"SELECT * FROM {_q(name)}" + (f" WHERE {where}" if where else "") + (f" ORDER BY {order}" if order else "")
+            df = pd.read_sql_query(sql, con, params=tuple(params))
+        return _restore(df, meta["cols"])
+
+    # ---------- tulis tabel penuh ----------
+    def _replace(self, con, name: str, df: pd.DataFrame, csv_sig: str | None = None) -> pd.DataFrame:
+        typed = io_csv.to_typed(df)
+        cols = [(str(c), _kind(typed[c])) for c in typed.columns]
+        con.execute(f"DROP TABLE IF EXISTS {_q(name)}")
+        # tabel tanpa kolom tetap dibuat (SQLite butuh ≥ 1 kolom); dibaca sebagai DataFrame kosong
+        con.execute(f"CREATE TABLE {_q(name)} ({', '.join(f'{_q(c)} {_SQL_TYPE[k]}' for c, k in cols) or '_empty'})")
+        if cols and len(typed):
+            vals = [_column_values(typed[c], k) for c, k in cols]
+            con.executemany(f"INSERT INTO {_q(name)} VALUES ({','.join('?' * len(cols))})", zip(*vals))
+        self._ensure_indexes(con, name, [c for c, _ in cols])
+        con.execute("UPDATE _tables SET pending=0 WHERE name=?", (name,))
+        self._bump(con, name, cols=cols, csv_sig=csv_sig)
+        return typed
+
+    def _ensure_indexes(self, con, name: str, columns: list[str]) -> None:
+        for ix, col in INDEXES.get(name, {}).items():
+            if col in columns:
+                con.execute(f"CREATE INDEX IF NOT EXISTS {_q(ix)} ON {_q(name)} ({_q(col)})")
+
+    def _mirror(self, con, name: str, typed: pd.DataFrame | None = None) -> None:
+        """CSV ekspor (di dalam transaksi tulis → signature tercatat tanpa celah impor ulang)."""
+        csv = self._csv(name)
+        if typed is None:
+            typed = self.select(csv)
+        mirror_csv(io_csv.to_export(typed), csv.as_posix())
+        con.execute("UPDATE _tables SET csv_sig=?, pending=0 WHERE name=?", (_file_sig(csv), name))
+
+    def write(self, path, df: pd.DataFrame, after=None) -> None:
+        """Ganti isi tabel + CSV mirror. after(path) seperti io_csv.write_table."""
+        self.update(path, lambda _cur: df, after, _read=False)
+
+    def update(self, path, fn, after=None, _read: bool = True) -> pd.DataFrame:
+        """Read-modify-write di bawah kunci tulis: df_baru = fn(isi terbaru). Return df_baru."""
+        name = self.name_for(path)
+        con = self.connection()
+        with sqlite_tx(con):
+            new = fn(self.select(path) if _read else None)
+            typed = self._replace(con, name, new)
+            deferred = self._defer(name, path, after)
+            if not deferred:
+                self._mirror(con, name, typed)
+        if not deferred and after is not None:
+            after(Path(path))
+        return new
+
+    # ---------- tulis per baris (entri jurnal rekap) ----------
+    def _ensure_columns(self, con, name: str, meta: dict | None, columns) -> list[tuple[str, str]]:
+        cols = list(meta["cols"]) if meta else []
+        have = {c for c, _ in cols}
+        new = [(str(c), _kind_for_name(str(c))) for c in dict.fromkeys(columns) if str(c) not in have]
+        if not new:
+            return cols
+        if meta is None:
+            cols = new
+            con.execute(f"CREATE TABLE IF NOT EXISTS {_q(name)} ({', '.join(f'{_q(c)} {_SQL_TYPE[k]}' for c, k in cols)})")
+        else:
+            for c, k in new:
+                con.execute(f"ALTER TABLE {_q(name)} ADD COLUMN {_q(c)} {_SQL_TYPE[k]}")
+            cols += new
+        self._ensure_indexes(con, name, [c for c, _ in cols])
+        return cols
+
+    def apply_entries(self, path, entries: list[dict]) -> None:
+        """Terapkan entri gaya rekap_journal (insert = upsert per __id, update, delete) dalam satu transaksi."""
+        entries = [e for e in entries or [] if rekap_journal._valid_id(e.get(ROW_KEY))]
+        if not entries:
+            return
+        name = self.name_for(path)
+        con = self.connection()
+        with sqlite_tx(con):
+            meta = self._sync(con, name)
+            cols = self._ensure_columns(con, name, meta,
+                                        [ROW_KEY, *(k for e in entries for k in (e.get("row") or {}))])
+            kinds = dict(cols)
+            t = _q(name)
+            for e in entries:
+                rid, row = str(e[ROW_KEY]), dict(e.get("row") or {})
+                row.pop(ROW_KEY, None)
+                if e["op"] == "delete":
+                    con.execute(f"DELETE FROM {t} WHERE {_q(ROW_KEY)}=?", (rid,))
+                    continue
+                vals = tuple(_cell(v, kinds[c]) for c, v in row.items())
+                if e["op"] == "insert" and con.execute(f"SELECT 1 FROM {t} WHERE {_q(ROW_KEY)}=? LIMIT 1",
+                                                       (rid,)).fetchone() is None:
+                    names = [ROW_KEY, *row]
+                    con.execute(f"INSERT INTO {t} ({', '.join(map(_q, names))}) VALUES ({','.join('?' * len(names))})",
+                                (rid, *vals))
+                elif row:   # update, atau insert ke __id yang sudah ada (upsert)
+                    sets = ", ".join(f"{_q(c)}=?" for c in row)
+                    con.execute(f"UPDATE {t} SET {sets} WHERE {_q(ROW_KEY)}=?", (*vals, rid))
+            self._bump(con, name, cols=cols, pending=len(entries))
+
+    def pending(self, path) -> int:
+        """Jumlah entri sejak CSV mirror terakhir (padanan panjang jurnal)."""
+        meta = self._sync(self.connection(), self.name_for(path))
+        return meta["pending"] if meta else 0
+
+    def export(self, path) -> int:
+        """Tulis ulang CSV mirror dari isi tabel (padanan kompaksi jurnal). Return entri yang dilipat."""
+        name = self.name_for(path)
+        con = self.connection()
+        with sqlite_tx(con):
+            meta = self._sync(con, name)
+            if not meta or not meta["pending"]:
+                return 0
+            if not self._defer(name, path):
+                self._mirror(con, name)
+            return meta["pending"]
+
+    def stats(self) -> dict:
+        rows = self.connection().execute("SELECT name, pending FROM _tables ORDER BY name").fetchall()
+        return {"path": self.path.as_posix(), "tables": {n: p for n, p in rows}, "imports": self.imports}
+
+@st.cache_resource(show_spinner=False)
+def get_sqlite_backend() -> SqliteBackend:
+    return SqliteBackend()
+
+def for_path(path) -> SqliteBackend | None:
+    """Backend yang menangani berkas `path`, atau None (mode file / berkas di luar data/)."""
+    if not enabled():
+        return None
+    be = get_sqlite_backend()
+    return be if be.name_for(path) else None
+
+def transaction():
+    """Transaksi multi-tabel (mode sqlite); mode file → tanpa efek."""
+    return get_sqlite_backend().transaction() if enabled() else nullcontext()
+
+def in_transaction() -> bool:
+    return enabled() and get_sqlite_backend().in_transaction()
@@ -0,0 +1,299 @@
+# app_core/state_store.py
+# ==== StateStore: keadaan kecil (rotasi PP/JS, cooldown, streak) di SQLite + cache proses ====
+# Pengganti dokumen JSON yang dibaca-parse ulang per pemakaian dan ditulis ulang utuh per simpan
+# (rrpair_token.json, cooldown_v2.json: _cool_v2_is_active per kandidat, _rr_get_idx, _rr_save
+# + backup snapshot setiap simpan):
+# - satu objek per proses (st.cache_resource); dokumen di-cache per namespace + nomor versi
+#   → lookup = hit dict; cek versi = 1 SELECT kecil (melihat tulisan proses lain)
+# - persistensi SQLite (WAL): 1 baris per kunci level-atas; kunci "split" (mis. streak per hari,
+#   map cooldown per hakim) disimpan 1 baris per sub-kunci → simpan = tulis delta baris yang berubah
+# - tulis berversi: cas(ns, versi_diharapkan, ...) atomik (BEGIN IMMEDIATE); update(fn) = baca →
+#   ubah → cas, diulang bila ada penulis lain di antaranya
+# - JSON lama diimpor sekali; setelah itu hanya jadi mirror ekspor (paling sering tiap
+#   MIRROR_EVERY detik, untuk backup). JSON yang diganti dari luar (mis. dipulihkan dari backup)
+#   terdeteksi lewat signature file dan diimpor ulang.
+# - APP_STORAGE=sqlite → tabel kv/meta ada di berkas backend yang sama (koneksi dibagi), sehingga
+#   tulis rotasi/cooldown ikut transaksi multi-tabel sqlite_backend.transaction()
+from __future__ import annotations
+import copy, json, os, sqlite3, tempfile, threading, time
+from pathlib import Path
+from typing import Any, Callable
+import streamlit as st
+
+from app_core import sqlite_backend
+from app_core.sqlite_backend import sqlite_tx
+
+DATA_DIR = Path("data")
+DB_NAME = "state.sqlite"
+MIRROR_EVERY = 300   # detik
+_SEP = "\x1f"        # pemisah kunci split (tidak muncul di nama/tanggal)
+_CAS_RETRIES = 20
+
+# namespace → berkas JSON lama, kunci yang di-split per sub-kunci, dokumen default
+NAMESPACES: dict[str, dict] = {
+    "rr":   {"json": "rrpair_token.json", "split": ("streak",), "default": {}},
+    "cool": {"json": "cooldown_v2.json", "split": ("map",),
+             "default": {"epoch": 1, "map": {}, "auto_daily": False, "last_reset_date": None}},
+}
+
+class CasConflict(RuntimeError):
+    """Versi namespace sudah berubah sejak dibaca."""
+
+def _dumps(v) -> str:
+    return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+
+def _file_sig(p: Path) -> str:
+    try:
+        s = p.stat()
+        return f"{s.st_mtime_ns}:{s.st_size}"
+    except FileNotFoundError:
+        return ""
+
+def _to_rows(ns: str, doc: dict) -> dict[str, str]:
+    split = NAMESPACES.get(ns, {}).get("split", ())
+    rows: dict[str, str] = {}
+    for k, v in (doc or {}).items():
+        k = str(k)
+        if k in split and isinstance(v, dict):
+            rows[k + _SEP] = _dumps({})          # penanda: kunci split ada (meski kosong)
+            for sk, sv in v.items():
+                rows[f"{k}{_SEP}{sk}"] = _dumps(sv)
+        else:
+            rows[k] = _dumps(v)
+    return rows
+
+def _from_rows(rows) -> dict:
+    doc: dict[str, Any] = {}
+    for k, raw in rows:
+        v = json.loads(raw)
+        if _SEP in k:
+            top, sub = k.split(_SEP, 1)
+            d = doc.setdefault(top, {})
+            if sub:
+                d[sub] = v
+        else:
+            doc[k] = v
+    return doc
+
+class StateStore:
+    """Dokumen keadaan per namespace; aman lintas thread (koneksi SQLite per thread) dan lintas proses."""
+
+    def __init__(self, data_dir: Path | str = DATA_DIR, mirror_every: float = MIRROR_EVERY,
+                 connect: Callable[[], sqlite3.Connection] | None = None):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.data_dir / DB_NAME
+        self._connect = connect   # koneksi per thread milik pemanggil (mis. SqliteBackend.connection)
+        self.mirror_every = float(mirror_every)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._cache: dict[str, tuple[int, dict]] = {}
+        self._mirrored: dict[str, float] = {}
+        self._export_hook: Callable[[Path], None] | None = None
+        self.loads = 0
+        self.writes = 0
+        if connect is None:
+            # berkas sendiri; koneksi bersama → skema sudah dibuat SqliteBackend.__init__ (di luar transaksi)
+            con = self._conn()
+            for ddl in sqlite_backend.STATE_SCHEMA:
+                con.execute(ddl)
+
+    # ---------- koneksi ----------
+    def _conn(self) -> sqlite3.Connection:
+        if self._connect is not None:
+            return self._connect()
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path.as_posix(), timeout=10, isolation_level=None, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def _json_path(self, ns: str) -> Path | None:
+        name = NAMESPACES.get(ns, {}).get("json")
+        return self.data_dir / name if name else None
+
+    def _meta(self, ns: str) -> tuple[int, str] | None:
+        row = self._conn().execute("SELECT ver, json_sig FROM meta WHERE ns=?", (ns,)).fetchone()
+        return None if row is None else (int(row[0]), str(row[1]))
+
+    # ---------- impor JSON lama ----------
+    def _maybe_import(self, ns: str, meta: tuple[int, str] | None) -> tuple[int, str] | None:
+        jp = self._json_path(ns)
+        if jp is None:
+            return meta
+        sig = _file_sig(jp)
+        if meta is not None and (not sig or sig == meta[1]):
+            return meta
+        if meta is None and not sig:
+            return meta
+        con = self._conn()
+        with sqlite_tx(con):
+            # cek ulang di bawah kunci tulis: proses lain bisa saja sudah mengimpor / mengekspor mirror
+            cur, sig = self._meta(ns), _file_sig(jp)
+            doc = None
+            if sig and (cur is None or cur[1] != sig):
+                try:
+                    doc = json.loads(jp.read_text(encoding="utf-8"))
+                except Exception:
+                    doc = None
+            if not isinstance(doc, dict):
+                return cur
+            con.execute("DELETE FROM kv WHERE ns=?", (ns,))
+            con.executemany("INSERT INTO kv (ns, key, value) VALUES (?,?,?)",
+                            [(ns, k, v) for k, v in _to_rows(ns, doc).items()])
+            ver = (cur[0] if cur else 0) + 1
+            con.execute("INSERT INTO meta (ns, ver, json_sig) VALUES (?,?,?) "
+                        "ON CONFLICT(ns) DO UPDATE SET ver=excluded.ver, json_sig=excluded.json_sig", (ns, ver, sig))
+        self._mirrored[ns] = time.monotonic()
+        return (ver, sig)
+
+    # ---------- baca ----------
+    def _doc(self, ns: str) -> tuple[int, dict]:
+        """(versi, dokumen ter-cache). Dokumen JANGAN diubah pemanggil."""
+        meta = self._maybe_import(ns, self._meta(ns))
+        ver = meta[0] if meta else 0
+        with self._lock:
+            hit = self._cache.get(ns)
+            if hit is not None and hit[0] == ver:
+                return hit
+        con = self._conn()
+        outer = con.in_transaction
+        with sqlite_tx(con, immediate=False):   # snapshot baca: versi & baris dari commit yang sama
+            meta = self._meta(ns)
+            ver = meta[0] if meta else 0
+            rows = con.execute("SELECT key, value FROM kv WHERE ns=?", (ns,)).fetchall()
+        doc = _from_rows(rows) if (rows or meta) else copy.deepcopy(NAMESPACES.get(ns, {}).get("default", {}))
+        with self._lock:
+            if not outer:   # isi transaksi luar yang belum commit tidak di-cache (bisa di-rollback)
+                self._cache[ns] = (ver, doc)
+            self.loads += 1
+        return ver, doc
+
+    def version(self, ns: str) -> int:
+        return self._doc(ns)[0]
+
+    def doc(self, ns: str) -> dict:
+        """Salinan dokumen (aman diubah; simpan lewat replace/update)."""
+        return copy.deepcopy(self._doc(ns)[1])
+
+    def get(self, ns: str, key: str, default=None):
+        """Nilai kunci level-atas dari cache (hit dict; anggap read-only)."""
+        return self._doc(ns)[1].get(key, default)
+
+    # ---------- tulis ----------
+    def cas(self, ns: str, expect_ver: int | None, set_rows: dict[str, str], del_rows=()) -> int:
+        """Tulis baris (ns,key) bila versi namespace masih expect_ver (None = tanpa cek). Return versi baru."""
+        con = self._conn()
+        with sqlite_tx(con):
+            cur = self._meta(ns)
+            ver = cur[0] if cur else 0
+            if expect_ver is not None and ver != expect_ver:
+                raise CasConflict(f"{ns}: versi {ver} ≠ {expect_ver}")
+            if del_rows:
+                con.executemany("DELETE FROM kv WHERE ns=? AND key=?", [(ns, k) for k in del_rows])
+            if set_rows:
+                con.executemany("INSERT INTO kv (ns, key, value) VALUES (?,?,?) "
+                                "ON CONFLICT(ns, key) DO UPDATE SET value=excluded.value",
+                                [(ns, k, v) for k, v in set_rows.items()])
+            if cur is None:   # namespace baru: catat juga signature JSON lama supaya tidak diimpor menimpa
+                jp = self._json_path(ns)
+                con.execute("INSERT INTO meta (ns, ver, json_sig) VALUES (?,?,?)",
+                            (ns, ver + 1, _file_sig(jp) if jp else ""))
+            else:
+                con.execute("UPDATE meta SET ver=? WHERE ns=?", (ver + 1, ns))
+        with self._lock:
+            self.writes += 1
+        if not con.in_transaction:   # di dalam transaksi luar: mirror menunggu tulis berikutnya
+            self._maybe_mirror(ns)
+        return ver + 1
+
+    def update(self, ns: str, fn: Callable[[dict], dict | None]) -> dict:
+        """Read-modify-write dokumen: hanya baris yang berubah yang ditulis. Return dokumen baru."""
+        for _ in range(_CAS_RETRIES):
+            ver, cur = self._doc(ns)
+            new = copy.deepcopy(cur)
+            out = fn(new)
+            new = new if out is None else out
+            old_rows, new_rows = _to_rows(ns, cur), _to_rows(ns, new)
+            set_rows = {k: v for k, v in new_rows.items() if old_rows.get(k) != v}
+            del_rows = [k for k in old_rows if k not in new_rows]
+            if not set_rows and not del_rows:
+                return new
+            try:
+                nv = self.cas(ns, ver, set_rows, del_rows)
+            except CasConflict:
+                continue
+            with self._lock:
+                if self._conn().in_transaction:
+                    self._cache.pop(ns, None)
+                else:
+                    self._cache[ns] = (nv, new)
+            return new
+        raise CasConflict(f"{ns}: terlalu banyak penulis bersamaan")
+
+    def replace(self, ns: str, doc: dict) -> None:
+        """Simpan dokumen utuh (delta terhadap isi tersimpan)."""
+        self.update(ns, lambda _cur: copy.deepcopy(doc))
+
+    def set(self, ns: str, key: str, value) -> None:
+        """Set satu kunci level-atas (tanpa menimpa kunci lain)."""
+        def _set(d):
+            d[str(key)] = value
+        self.update(ns, _set)
+
+    # ---------- mirror JSON (backup) ----------
+    def set_export_hook(self, fn: Callable[[Path], None] | None) -> None:
+        """fn(path_json) dipanggil setelah mirror JSON ditulis (mis. snapshot backup)."""
+        self._export_hook = fn
+
+    def _maybe_mirror(self, ns: str) -> None:
+        now = time.monotonic()
+        if now - self._mirrored.get(ns, 0.0) < self.mirror_every:
+            return
+        self._mirrored[ns] = now
+        try:
+            self.export_json(ns)
+        except Exception:
+            pass   # mirror gagal tidak mengganggu simpan
+
+    def export_json(self, ns: str) -> Path | None:
+        """Tulis dokumen ke berkas JSON lama (atomic) + catat signature supaya tidak diimpor ulang."""
+        jp = self._json_path(ns)
+        if jp is None:
+            return None
+        con = self._conn()
+        # kunci tulis selama ekspor: tidak ada commit lain di antara baca dokumen, ganti berkas,
+        # dan catat signature → proses lain tidak salah mengimpor ulang mirror yang basi
+        with sqlite_tx(con):
+            rows = con.execute("SELECT key, value FROM kv WHERE ns=?", (ns,)).fetchall()
+            doc = _from_rows(rows)
+            fd, tmp = tempfile.mkstemp(prefix=jp.name + ".", suffix=".tmp", dir=jp.parent.as_posix())
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(doc, f, ensure_ascii=False, indent=2)
+                os.replace(tmp, jp.as_posix())
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+            con.execute("UPDATE meta SET json_sig=? WHERE ns=?", (_file_sig(jp), ns))
+        hook = self._export_hook
+        if hook is not None:
+            try:
+                hook(jp)
+            except Exception:
+                pass
+        return jp
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"namespaces": {ns: v for ns, (v, _) in self._cache.items()},
+                    "loads": self.loads, "writes": self.writes}
+
+@st.cache_resource(show_spinner=False)
+def get_state_store() -> StateStore:
+    if sqlite_backend.enabled():
+        be = sqlite_backend.get_sqlite_backend()
+        return StateStore(be.data_dir, connect=be.connection)
+    return StateStore()
@@ -0,0 +1,153 @@
+# app_core/stats_cube.py
+# ==== Kubus statistik perkara: orang × peran × metode × jenis × hari ====
+# Pengganti hitungan "berapa perkara per orang" yang masing-masing memindai rekap sendiri
+# (beban Hakim/JS, picker JS Ghoib, rekap per majelis) dengan filter berbeda-beda:
+# - satu agregat terwujud per versi rekap: hitungan per (peran, orang, metode, jenis, verzet, hari)
+#     peran  : hakim | anggota (anggota1+anggota2) | pp | js
+#     orang  : nama apa adanya (strip) → pencocokan master tetap lewat NameIndex di pemanggil
+#     metode : lower, 'ecourt'/'e court' → 'e-court' (nilai lain disimpan apa adanya)
+#     jenis  : jenis_perkara upper; verzet: klasifikasi == VERZET; hari: tgl_register
+# - query(...) = filter + groupby di atas kubus (ribuan sel), bukan puluhan ribu baris rekap
+# - StatsStore (VersionedStore) dipelihara inkremental (apply) saat simpan/edit/hapus;
+#   versi rekap berubah di luar jalur itu → dibangun ulang lazy
+# - kubus yang sudah diterbitkan store tidak pernah diubah: apply menerapkan perubahan ke salinan
+#   lalu menukar objeknya → frame/query dari sesi lain aman tanpa lock
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app_core.registry import get_registry
+from app_core.versioned_store import VersionedStore
+
+ROLES: dict[str, tuple[str, ...]] = {
+    "hakim": ("hakim",),
+    "anggota": ("anggota1", "anggota2"),
+    "pp": ("pp",),
+    "js": ("js",),
+}
+DIMS = ["role", "person", "metode", "jenis", "verzet", "day"]
+
+def _metode(s: pd.Series) -> pd.Series:
+    m = s.fillna("").astype(str).str.strip().str.lower()
+    return m.replace({"ecourt": "e-court", "e court": "e-court"})
+
+def _facts(df: pd.DataFrame) -> pd.DataFrame:
+    """Baris rekap → baris fakta (satu per peran yang terisi kolomnya)."""
+    n = len(df)
+    col = lambda c: df[c] if c in df.columns else pd.Series([""] * n, index=df.index, dtype=object)
+    metode = _metode(col("metode"))
+    jenis = col("jenis_perkara").fillna("").astype(str).str.strip().str.upper()
+    verzet = col("klasifikasi").fillna("").astype(str).str.strip().str.upper() == "VERZET"
+    day = pd.to_datetime(col("tgl_register"), errors="coerce").dt.normalize() if "tgl_register" in df.columns \
+        else pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    parts = []
+    for role, cols in ROLES.items():
+        for c in cols:
+            if c not in df.columns:
+                continue
+            parts.append(pd.DataFrame({
+                "role": role, "person": df[c].fillna("").astype(str).str.strip(),
+                "metode": metode, "jenis": jenis, "verzet": verzet, "day": day,
+            }))
+    if not parts:
+        return pd.DataFrame(columns=DIMS)
+    return pd.concat(parts, ignore_index=True)
+
+class StatsCube:
+    """Hitungan per sel DIMS; dict untuk update inkremental, DataFrame di-materialisasi saat query."""
+
+    def __init__(self, cells: dict[tuple, int] | None = None, rows: int = 0, verzet_rows: int = 0):
+        self.cells: dict[tuple, int] = cells or {}
+        self.rows = rows                 # jumlah baris rekap
+        self.verzet_rows = verzet_rows   # baris VERZET
+        self._frame: pd.DataFrame | None = None
+
+    @classmethod
+    def from_rekap(cls, df: pd.DataFrame) -> "StatsCube":
+        if df is None or df.empty:
+            return cls()
+        f = _facts(df)
+        g = f.groupby(DIMS, dropna=False, sort=False).size()
+        cells = {tuple(_key_norm(k)): int(v) for k, v in g.items()}
+        vz = int((df["klasifikasi"].fillna("").astype(str).str.strip().str.upper() == "VERZET").sum()) \
+            if "klasifikasi" in df.columns else 0
+        return cls(cells, rows=len(df), verzet_rows=vz)
+
+    def copy(self) -> "StatsCube":
+        return StatsCube(dict(self.cells), self.rows, self.verzet_rows)
+
+    # ---- inkremental ----
+    def apply_row(self, row: dict | pd.Series | None, sign: int = 1) -> None:
+        if row is None:
+            return
+        one = pd.DataFrame([dict(row)])
+        for k, v in _facts(one).groupby(DIMS, dropna=False, sort=False).size().items():
+            k = tuple(_key_norm(k))
+            n = self.cells.get(k, 0) + sign * int(v)
+            if n > 0: self.cells[k] = n
+            else: self.cells.pop(k, None)
+        self.rows += sign
+        if str(dict(row).get("klasifikasi", "") or "").strip().upper() == "VERZET":
+            self.verzet_rows += sign
+        self._frame = None
+
+    # ---- query ----
+    @property
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            cells = self.cells
+            if cells:
+                keys = list(cells)
+                fr = pd.DataFrame(keys, columns=DIMS)
+                fr["day"] = pd.to_datetime(fr["day"], errors="coerce")
+                fr["n"] = np.fromiter(cells.values(), dtype=np.int64, count=len(keys))
+            else:
+                fr = pd.DataFrame({c: pd.Series(dtype=object) for c in DIMS} | {"n": pd.Series(dtype=np.int64)})
+            self._frame = fr
+        return self._frame
+
+    def query(self, role: str, by: Iterable[str] = ("person",), *, jenis: str | Iterable[str] | None = None,
+              metode: str | Iterable[str] | None = None, exclude_verzet: bool = False,
+              start=None, end=None) -> pd.Series:
+        """Jumlah perkara untuk `role`, dikelompokkan per kolom `by` (subset DIMS). start/end inklusif."""
+        f = self.frame
+        m = f["role"] == role
+        if jenis is not None:
+            m &= f["jenis"].isin([jenis] if isinstance(jenis, str) else list(jenis))
+        if metode is not None:
+            m &= f["metode"].isin([metode] if isinstance(metode, str) else list(metode))
+        if exclude_verzet:
+            m &= ~f["verzet"].astype(bool)
+        if start is not None:
+            m &= f["day"] >= pd.Timestamp(start)
+        if end is not None:
+            m &= f["day"] <= pd.Timestamp(end)
+        by = list(by)
+        sub = f.loc[m, by + ["n"]]
+        if not by:
+            return pd.Series({"n": int(sub["n"].sum())})
+        return sub.groupby(by, dropna=False, sort=False)["n"].sum()
+
+def _key_norm(k: tuple) -> tuple:
+    """NaT/NaN → None supaya kunci dict stabil (NaN != NaN)."""
+    return tuple(None if (v is None or (not isinstance(v, str) and pd.isna(v))) else
+                 (pd.Timestamp(v) if isinstance(v, (pd.Timestamp, np.datetime64)) else v) for v in k)
+
+class StatsStore(VersionedStore):
+    """Kubus bersama per proses untuk satu file rekap (handshake versi: VersionedStore)."""
+
+    def __init__(self):
+        super().__init__(StatsCube.from_rekap)
+
+@st.cache_resource(show_spinner=False)
+def get_stats_store() -> StatsStore:
+    return StatsStore()
+
+def rekap_cube(path=Path("data/rekap.csv")) -> StatsCube:
+    """Kubus untuk versi rekap terkini (registry bersama)."""
+    reg = get_registry()
+    return get_stats_store().get(path, reg.rekap_version(path), lambda: reg.rekap(path),
+                                 lambda: reg.rekap_version(path))
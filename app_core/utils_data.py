@@ -1,13 +1,15 @@
 # app_core/utils_data.py
 from __future__ import annotations
 import re, uuid
-from datetime import date, timedelta, datetime
+from datetime import date
 from pathlib import Path
 from typing import Iterable
 import pandas as pd
 import streamlit as st
 
 from .helpers import HARI_MAP, format_tanggal_id  # pakai punyamu
+from .court_calendar import get_calendar, compute_tgl_sidang as _compute_tgl_sidang_cal
+from .name_index import name_tokens
 
 # ===== [1] DRY: header-like & aktif parsing =====
 HEADER_TOKENS = {
@@ -28,33 +30,9 @@ def is_active_value(v) -> bool:
     except: return False
 
 # ===== [1] DRY: name cleaning =====
-_PREFIX_RX = re.compile(r"^\s*((drs?|dra|prof|ir|apt|h|hj|kh|ust|ustadz|ustadzah)\.?\s+)+", flags=re.IGNORECASE)
-_SUFFIX_PATTERNS = [
-    r"s\.?\s*h\.?", r"s\.?\s*h\.?\s*i\.?", r"m\.?\s*h\.?", r"m\.?\s*h\.?\s*i\.?",
-    r"s\.?\s*ag", r"m\.?\s*ag", r"m\.?\s*kn", r"m\.?\s*hum", r"s\.?\s*kom",
-    r"s\.?\s*psi", r"s\.?\s*e", r"m\.?\s*m", r"m\.?\s*a", r"llb", r"llm",
-    r"phd", r"se", r"ssi", r"sh", r"mh"
-]
-_SUFFIX_RX = re.compile(r"(,?\s+(" + r"|".join(_SUFFIX_PATTERNS) + r"))+$", flags=re.IGNORECASE)
-
-def clean_text(s: str) -> str:
-    x = str(s or "").replace("\u00A0", " ").strip()
-    x = x.replace(" ,", ",").replace(" .", ".")
-    x = re.sub(r"\s+", " ", x).strip()
-    return x
-
-def name_key(s: str) -> str:
-    if not isinstance(s, str): return ""
-    x = clean_text(s).replace(",", " ")
-    x = _SUFFIX_RX.sub("", x)
-    x = _PREFIX_RX.sub("", x)
-    x = re.sub(r"[^\w\s]", " ", x)
-    x = re.sub(r"\s+", " ", x).strip().lower()
-    toks = [t for t in x.split() if t not in {"s","h","m","e"}]
-    return " ".join(toks)
-
+# normalisasi tunggal ada di app_core/name_index.py (di-memo, dipakai semua halaman)
 def toktok(s: str) -> set[str]:
-    return set([t for t in name_key(s).split() if t])
+    return set(name_tokens(s))
 
 def majelis_rank(s: str) -> int:
     m = re.search(r"(\d+)", str(s))
@@ -103,32 +81,12 @@ DATE_RULES = {
     "MAFQUD": {"start": 246},
 }
 
+# lookup via kalender numpy (court_calendar) — tanpa loop harian
 def next_judge_day_strict(start_date: date, hari_sidang_num: int, libur_set: set[str]) -> date:
-    if not isinstance(start_date, (date, datetime)) or not hari_sidang_num:
-        return start_date
-    target_py = (hari_sidang_num - 1) % 7  # Mon=0..Sun=6
-    d0 = start_date if isinstance(start_date, date) else start_date.date()
-    for i in range(0, 120):
-        d = d0 + timedelta(days=i)
-        if d.weekday() != target_py: continue
-        if str(d) in libur_set: continue
-        return d
-    return d0
+    return get_calendar(libur_set).next_judge_day(start_date, hari_sidang_num)
 
 def compute_tgl_sidang(base: date, jenis: str, hari_sidang_num: int, libur_set: set[str], klasifikasi: str = "") -> date:
-    J = str(jenis).strip().upper()
-    K = str(klasifikasi).strip().upper()
-    rule = DATE_RULES.get(J)
-    if not rule: return base
-    start = rule.get("start", 0)
-    if J == "GHOIB" and "special_klas" in rule:
-        start = rule["special_klas"].get(K, start)
-    start_d = base + timedelta(days=start)
-    if "end_cap" in rule:
-        end_cap = base + timedelta(days=rule["end_cap"])
-        d = next_judge_day_strict(start_d, hari_sidang_num, libur_set)
-        return d if d <= end_cap else next_judge_day_strict(end_cap, hari_sidang_num, libur_set)
-    return next_judge_day_strict(start_d, hari_sidang_num, libur_set)
+    return _compute_tgl_sidang_cal(base, jenis, hari_sidang_num, libur_set, klasifikasi, rules=DATE_RULES)
 
 # ===== [7] Indexer untuk hakim_df (hemat waktu) =====
 _hakim_index_cache = None
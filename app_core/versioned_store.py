@@ -0,0 +1,81 @@
+# app_core/versioned_store.py
+# ==== VersionedStore: turunan rekap bersama per proses, ikut versi rekap ====
+# Satu pola untuk indeks beban, kubus statistik dan ringkasan harian (sebelumnya disalin per modul):
+# - get(path, ver, loader): objek turunan untuk versi rekap `ver`; beda versi → dibangun ulang
+#   dari rekap (build). version_fn dicek lagi setelah load: versi bergeser → objek tidak dicap ver
+# - apply(path, ver_before, ver_after, changes): handshake versi dari lock tulis (RekapRepository
+#   on_commit). Masih di ver_before → perubahan diterapkan; sudah di ver_after → dibiarkan;
+#   selain itu dibuang → rebuild lazy
+# - objek yang sudah diterbitkan tidak pernah diubah: apply = copy() → apply_row() → tukar
+# Objek turunan cukup punya copy() dan apply_row(row, sign).
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Any, Callable
+import pandas as pd
+
+Changes = list[tuple[dict | pd.Series | None, int]]
+
+class VersionedStore:
+    """Objek turunan per file rekap, dicap versi rekap asalnya."""
+
+    def __init__(self, build: Callable[[pd.DataFrame], Any]):
+        self._lock = threading.RLock()
+        self._build = build
+        self._ver: dict[str, tuple | None] = {}
+        self._obj: dict[str, Any] = {}
+        self.rebuilds = 0
+
+    # ---- hook subclass ----
+    def _restore(self, path: Path, ver: tuple):
+        """Sumber lain sebelum build (mis. berkas di disk); None → build dari rekap."""
+        return None
+
+    def _stamped(self, k: str) -> None:
+        """Dipanggil (di bawah lock) saat objek baru dicap versi: hasil build atau apply."""
+
+    # ---- akses ----
+    def get(self, path, ver: tuple, rekap_loader, version_fn=None):
+        """version_fn (opsional): dicek lagi setelah rekap_loader; versi bergeser → tidak dicap ver."""
+        k = Path(path).as_posix()
+        with self._lock:
+            if k in self._obj and self._ver.get(k) == ver:
+                return self._obj[k]
+            try:
+                obj = self._restore(Path(path), ver)
+            except Exception:
+                obj = None
+            if obj is None:
+                obj = self._build(rekap_loader())
+                self.rebuilds += 1
+                if version_fn is not None and version_fn() != ver:
+                    ver = None   # ada simpan di tengah pembacaan → isi belum tentu = ver
+                else:
+                    self._stamped(k)
+            self._obj[k], self._ver[k] = obj, ver
+            return obj
+
+    def apply(self, path, ver_before: tuple, ver_after: tuple, changes: Changes) -> None:
+        """
+        Terapkan (row, +1/-1) bila objek masih di ver_before (pasangan versi dari lock tulis,
+        RekapRepository on_commit). Sudah di ver_after → biarkan; selain itu dibuang → rebuild lazy.
+        """
+        k = Path(path).as_posix()
+        with self._lock:
+            if k not in self._obj or (self._ver.get(k) == ver_after and ver_after != ver_before):
+                return   # kosong, atau sudah dibangun dari isi ver_after
+            if self._ver.get(k) != ver_before or ver_after == ver_before:
+                self._obj.pop(k, None)
+                self._ver.pop(k, None)
+                return
+            if changes:
+                obj = self._obj[k].copy()   # salinan → pembaca objek lama tidak melihatnya berubah
+                for row, sign in changes:
+                    obj.apply_row(row, sign)
+                self._obj[k] = obj
+            self._ver[k] = ver_after
+            self._stamped(k)
+
+    def carry(self, path, ver_before: tuple, ver_after: tuple) -> None:
+        """Versi berubah tanpa perubahan isi (mis. kompaksi jurnal)."""
+        self.apply(path, ver_before, ver_after, [])
@@ -0,0 +1,98 @@
+# app_core/workload.py
+# ==== Beban (E-Court/Manual/Ghoib) per baris master, dari kubus statistik ====
+# Pengganti loop rdx.iterrows() di Data Hakim dan groupby sendiri di Data JS:
+# - hitungan diambil dari StatsCube (orang × metode × jenis), bukan memindai rekap
+# - nama orang di kubus → posisi master: tiap nama UNIK di-resolve sekali lewat NameIndex
+# - daftar nama tak cocok (nama kosong / tidak cocok) ikut keluar dari pipeline yang sama
+# - hasil di-cache per (versi rekap, isi master, peran) → rerun tanpa perubahan data tidak menghitung ulang
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app_core.name_index import NameIndex, index_for
+from app_core.registry import get_registry
+from app_core.stats_cube import StatsCube, rekap_cube
+
+_CACHE_MAX = 8
+
+@dataclass(frozen=True)
+class Workload:
+    counts: pd.DataFrame      # index = posisi baris master; kolom E-Court, Manual, Ghoib, Total
+    unmatched: pd.DataFrame   # nama, alasan, jumlah (urut jumlah terbanyak)
+    total_rekap: int
+    total_dihitung: int
+
+def compute_workload(master: pd.DataFrame, cube: StatsCube, role: str = "hakim",
+                     exclude_verzet: bool = True, index: NameIndex | None = None) -> Workload:
+    """Hitung beban per baris master (posisi 0..n-1) untuk `role` dari kubus statistik."""
+    master = master.reset_index(drop=True)
+    idx = index if index is not None else index_for(master)
+    n = len(master)
+    by_pm = cube.query(role, ("person", "metode"), exclude_verzet=exclude_verzet)
+    ghoib = cube.query(role, ("person",), jenis="GHOIB", exclude_verzet=exclude_verzet)
+
+    e = np.zeros(n, dtype=np.int64)
+    m = np.zeros(n, dtype=np.int64)
+    g = np.zeros(n, dtype=np.int64)
+    unmatched = pd.DataFrame(columns=["nama", "alasan", "jumlah"])
+    if len(by_pm):
+        persons = by_pm.index.get_level_values("person").astype(str)
+        uniq = pd.unique(persons)
+        pos_of = {u: idx.resolve_pos(u) for u in uniq}
+        pos = np.array([-1 if pos_of[p] is None else pos_of[p] for p in persons], dtype=np.int64)
+        cnt = by_pm.to_numpy(dtype=np.int64)
+        # metode selain 'manual' dihitung e-court (sama seperti normalisasi lama)
+        is_manual = by_pm.index.get_level_values("metode").astype(str) == "manual"
+        hit = pos >= 0
+        m = np.bincount(pos[hit & is_manual], weights=cnt[hit & is_manual], minlength=n)[:n].astype(np.int64)
+        e = np.bincount(pos[hit & ~is_manual], weights=cnt[hit & ~is_manual], minlength=n)[:n].astype(np.int64)
+        if len(ghoib):
+            gp = np.array([-1 if pos_of.get(p) is None else pos_of[p] for p in ghoib.index.astype(str)], dtype=np.int64)
+            gh = gp >= 0
+            g = np.bincount(gp[gh], weights=ghoib.to_numpy(dtype=np.int64)[gh], minlength=n)[:n].astype(np.int64)
+        if (~hit).any():
+            um = (pd.DataFrame({"nama": persons[~hit], "jumlah": cnt[~hit]})
+                  .groupby("nama", sort=False, as_index=False)["jumlah"].sum())
+            um["alasan"] = np.where(um["nama"].str.strip() == "", "nama kosong", "tidak cocok")
+            unmatched = (um[["nama", "alasan", "jumlah"]]
+                         .sort_values(["jumlah", "nama"], ascending=[False, True], kind="stable")
+                         .reset_index(drop=True))
+    counts = pd.DataFrame({"E-Court": e, "Manual": m, "Ghoib": g})
+    counts["Total"] = counts["E-Court"] + counts["Manual"]
+    dihitung = cube.rows - (cube.verzet_rows if exclude_verzet else 0)
+    return Workload(counts, unmatched, cube.rows, dihitung)
+
+class WorkloadCache:
+    """Hasil compute_workload per (file rekap, versi rekap, indeks master, peran); LRU kecil per proses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple[NameIndex, Workload]]" = OrderedDict()
+        self.builds = 0
+
+    def get(self, rekap_path, master: pd.DataFrame, role: str = "hakim", exclude_verzet: bool = True) -> Workload:
+        master = master.reset_index(drop=True)
+        idx = index_for(master)   # objek sama selama isi nama/alias master sama
+        rekap_path = Path(rekap_path)
+        key = (rekap_path.as_posix(), get_registry().rekap_version(rekap_path), id(idx), role, exclude_verzet)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] is idx:
+                self._entries.move_to_end(key)
+                return hit[1]
+        wl = compute_workload(master, rekap_cube(rekap_path), role, exclude_verzet, index=idx)
+        with self._lock:
+            self._entries[key] = (idx, wl)
+            self.builds += 1
+            while len(self._entries) > _CACHE_MAX:
+                self._entries.popitem(last=False)
+        return wl
+
+@st.cache_resource(show_spinner=False)
+def get_workload_cache() -> WorkloadCache:
+    return WorkloadCache()
@@ -0,0 +1,318 @@
+# app_core/write_coordinator.py
+# ==== Koordinator tulis: lock per file + satu thread penulis ====
+# Pengganti _file_lock lama (polling O_EXCL tiap 100 ms, timeout 5 dtk, rebut lock > 15 menit):
+# - path_lock(path): RLock per file di dalam proses + advisory lock fcntl.flock di file
+#   "<nama>.lock" antar proses (blocking, dilepas otomatis oleh OS bila proses mati).
+#   Tanpa fcntl (Windows) → fallback file lock O_EXCL seperti versi lama.
+# - WriteCoordinator: semua tulisan (tabel parquet/CSV, dokumen JSON) masuk antrean terbatas
+#   dan dieksekusi berurutan oleh SATU thread penulis. Pemanggil menunggu hasilnya
+#   (tulisan sudah di disk saat fungsi kembali), jadi tidak ada perubahan semantik.
+# - Job yang menumpuk untuk file yang sama dijalankan dalam satu kali ambil lock:
+#     put    → isi akhir (yang terakhir menang)
+#     update → read-modify-write terhadap isi TERBARU (mis. rotasi/cooldown) → simpan
+#              dua petugas bersamaan tidak saling menimpa kunci masing-masing
+#   lalu file ditulis sekali.
+from __future__ import annotations
+import os, json, queue, threading, time, tempfile
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+import streamlit as st
+
+try:
+    import fcntl   # POSIX
+    _HAVE_FCNTL = True
+except Exception:  # Windows / lingkungan tanpa fcntl
+    fcntl = None
+    _HAVE_FCNTL = False
+
+QUEUE_MAX = 256          # batas antrean (pemanggil menunggu bila penuh → backpressure)
+BATCH_MAX = 64           # job maksimum yang diambil per putaran
+_STALE_LOCK_SECS = 900   # fallback O_EXCL: lock basi (> 15 menit) boleh diambil alih
+
+def _key(path) -> str:
+    try:
+        return Path(path).resolve().as_posix()
+    except Exception:
+        return Path(path).as_posix()
+
+def lock_path_for(path) -> Path:
+    p = Path(path)
+    return p.with_suffix(p.suffix + ".lock")
+
+# ---------- Lock per file ----------
+_local_locks: dict[str, threading.RLock] = {}
+_local_locks_guard = threading.Lock()
+_held = threading.local()   # hitungan re-entrant per thread → flock cukup diambil sekali
+
+def _local_lock(key: str) -> threading.RLock:
+    with _local_locks_guard:
+        lk = _local_locks.get(key)
+        if lk is None:
+            lk = _local_locks[key] = threading.RLock()
+        return lk
+
+class path_lock:
+    """
+    Lock eksklusif satu file (antar thread + antar proses).
+    timeout=None → tunggu sampai dapat; angka → TimeoutError bila lewat.
+    """
+    def __init__(self, path, timeout: float | None = None):
+        self.path = Path(path)
+        self.key = _key(path)
+        self.lock_path = lock_path_for(path)
+        self.timeout = timeout
+
+    def __enter__(self):
+        lk = _local_lock(self.key)
+        if not lk.acquire(timeout=-1 if self.timeout is None else self.timeout):
+            raise TimeoutError(f"Lock {self.lock_path.name} masih aktif")
+        depth = getattr(_held, "depth", None)
+        if depth is None:
+            depth = _held.depth = {}
+        if depth.get(self.key, 0) == 0:
+            try:
+                self._acquire_os()
+            except BaseException:
+                lk.release()
+                raise
+        depth[self.key] = depth.get(self.key, 0) + 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        depth = _held.depth
+        depth[self.key] -= 1
+        try:
+            if depth[self.key] == 0:
+                depth.pop(self.key, None)
+                self._release_os()
+        finally:
+            _local_lock(self.key).release()
+
+    # ---- lock OS ----
+    def _acquire_os(self):
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        if _HAVE_FCNTL:
+            fd = os.open(self.lock_path.as_posix(), os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                if self.timeout is None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    self._poll(lambda: fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB), (BlockingIOError, PermissionError))
+            except BaseException:
+                os.close(fd)
+                raise
+            _held.fds = getattr(_held, "fds", {})
+            _held.fds[self.key] = fd
+            return
+        # fallback: file .lock O_EXCL (cocok untuk network share tanpa flock)
+        def _try():
+            fd = os.open(self.lock_path.as_posix(), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+        def _steal_if_stale():
+            try:
+                if time.time() - self.lock_path.stat().st_mtime > _STALE_LOCK_SECS:
+                    self.lock_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+        self._poll(_try, (FileExistsError,), on_wait=_steal_if_stale)
+        _held.excl = getattr(_held, "excl", set())
+        _held.excl.add(self.key)
+
+    def _poll(self, attempt: Callable[[], None], busy: tuple, on_wait: Callable[[], None] | None = None):
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        delay = 0.005
+        while True:
+            try:
+                attempt()
+                return
+            except busy:
+                if on_wait is not None:
+                    on_wait()
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Lock {self.lock_path.name} masih aktif")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.2)   # backoff eksponensial, bukan 100 ms tetap
+
+    def _release_os(self):
+        fds = getattr(_held, "fds", {})
+        fd = fds.pop(self.key, None)
+        if fd is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+            return
+        excl = getattr(_held, "excl", set())
+        if self.key in excl:
+            excl.discard(self.key)
+            try:
+                self.lock_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+# ---------- Penulis tunggal ----------
+@dataclass
+class _Job:
+    path: Path
+    kind: str                                  # "call" | "put" | "update"
+    fn: Any                                    # call: fn() ; put: isi ; update: fn(isi) → isi
+    load: Callable[[], Any] | None = None
+    save: Callable[[Any], None] | None = None
+    fut: Future = field(default_factory=Future)
+
+class WriteCoordinator:
+    """Satu thread penulis per proses; job per file dikelompokkan dan dijalankan di bawah path_lock."""
+
+    def __init__(self, maxsize: int = QUEUE_MAX):
+        self._q: queue.Queue[_Job] = queue.Queue(maxsize=maxsize)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self.jobs = 0
+        self.writes = 0
+        self.rounds = 0
+
+    # ---- API ----
+    def call(self, path, fn: Callable[[], Any]) -> Any:
+        """Jalankan fn() di thread penulis dengan lock file `path`. Return hasil fn."""
+        return self._run(_Job(Path(path), "call", fn))
+
+    def put(self, path, obj, save: Callable[[Any], None]) -> None:
+        """Tulis isi penuh lewat save(obj). Beberapa put berurutan → yang terakhir saja ditulis."""
+        self._run(_Job(Path(path), "put", obj, save=save))
+
+    def update(self, path, fn: Callable[[Any], Any], load: Callable[[], Any], save: Callable[[Any], None]) -> Any:
+        """Read-modify-write atomik: isi = fn(load()) lalu save(isi). Return isi baru."""
+        return self._run(_Job(Path(path), "update", fn, load=load, save=save))
+
+    def stats(self) -> dict:
+        return {"antrean": self._q.qsize(), "job": self.jobs, "tulis": self.writes, "putaran": self.rounds,
+                "lock": "fcntl" if _HAVE_FCNTL else "file .lock"}
+
+    # ---- internal ----
+    def _in_writer(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def _ensure_thread(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="write-coordinator", daemon=True)
+                self._thread.start()
+
+    def _run(self, job: _Job):
+        if self._in_writer():
+            # dipanggil dari dalam job lain (mis. save → write_table) → jalankan langsung
+            self._execute(job.path, [job])
+        else:
+            self._ensure_thread()
+            self._q.put(job)
+        return job.fut.result()
+
+    def _loop(self):
+        while True:
+            first = self._q.get()
+            batch = [first]
+            while len(batch) < BATCH_MAX:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            self.rounds += 1
+            groups: dict[str, list[_Job]] = {}
+            for j in batch:
+                groups.setdefault(_key(j.path), []).append(j)
+            for jobs in groups.values():
+                self._execute(jobs[0].path, jobs)
+
+    def _execute(self, path: Path, jobs: list[_Job]):
+        self.jobs += len(jobs)
+        try:
+            with path_lock(path):
+                state, have, save, waiting = None, False, None, []
+
+                def _flush():
+                    nonlocal state, have, save, waiting
+                    if have and save is not None:
+                        save(state)
+                        self.writes += 1
+                    for j, res in waiting:
+                        j.fut.set_result(res)
+                    state, have, save, waiting = None, False, None, []
+
+                for j in jobs:
+                    try:
+                        if j.kind == "call":
+                            _flush()
+                            j.fut.set_result(j.fn())
+                            self.writes += 1
+                        elif j.kind == "put":
+                            state, have, save = j.fn, True, j.save
+                            waiting.append((j, None))
+                        else:  # update
+                            if not have or save is not j.save:
+                                _flush()
+                                state, have, save = j.load(), True, j.save
+                            state = j.fn(state)
+                            waiting.append((j, state))
+                    except BaseException as e:
+                        if not j.fut.done():
+                            j.fut.set_exception(e)
+                try:
+                    _flush()
+                except BaseException as e:
+                    for j, _ in waiting:
+                        if not j.fut.done():
+                            j.fut.set_exception(e)
+        except BaseException as e:   # gagal ambil lock, dsb.
+            for j in jobs:
+                if not j.fut.done():
+                    j.fut.set_exception(e)
+
+@st.cache_resource(show_spinner=False)
+def get_write_coordinator() -> WriteCoordinator:
+    return WriteCoordinator()
+
+# ---------- Helper umum ----------
+def _write_json_now(path: Path, obj) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent.as_posix())
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path.as_posix())
+    finally:
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        except Exception:
+            pass
+
+_savers: dict[tuple, Callable] = {}
+
+def saver(path, write: Callable[[Path, Any], None], after: Callable[[Path], None] | None = None) -> Callable[[Any], None]:
+    """
+    Saver stabil per (file, write, after): write(path, isi) lalu after(path).
+    Objek yang sama → job update berurutan untuk file itu digabung jadi satu kali tulis.
+    """
+    p = Path(path)
+    k = (_key(p), write, after)
+    fn = _savers.get(k)
+    if fn is None:
+        def fn(o, _p=p):
+            write(_p, o)
+            if after is not None:
+                after(_p)
+        _savers[k] = fn
+    return fn
+
+def write_json(path, obj, after: Callable[[Path], None] | None = None) -> None:
+    """Tulis dokumen JSON (atomic) lewat penulis tunggal; after(path) dijalankan di bawah lock yang sama."""
+    get_write_coordinator().put(path, obj, saver(path, _write_json_now, after))
+
+def update_json(path, fn: Callable[[Any], Any], load: Callable[[], Any],
+                after: Callable[[Path], None] | None = None) -> Any:
+    """Read-modify-write dokumen JSON terhadap isi terbaru di disk (tanpa menimpa perubahan penulis lain)."""
+    return get_write_coordinator().update(path, fn, load, saver(path, _write_json_now, after))
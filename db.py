@@ -3,7 +3,13 @@
 from __future__ import annotations
 
 import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterable, Sequence
 
 import pymysql
 from pymysql.cursors import DictCursor
@@ -56,6 +62,13 @@ DB_NAME = (
     or _get_secret("DB_NAME", _get_secret("MYSQL_DB", "saef"))
 )
 
+# Pool koneksi (per proses): jumlah koneksi maksimum, lama menunggu slot, umur maksimum koneksi,
+# dan jeda idle sebelum koneksi di-ping ulang saat diambil
+DB_POOL_SIZE = int(_env("DB_POOL_SIZE", _get_secret("DB_POOL_SIZE", 8)))
+DB_POOL_TIMEOUT = float(_env("DB_POOL_TIMEOUT", _get_secret("DB_POOL_TIMEOUT", 10)))
+DB_POOL_RECYCLE = float(_env("DB_POOL_RECYCLE", _get_secret("DB_POOL_RECYCLE", 3600)))
+DB_POOL_PING_AFTER = float(_env("DB_POOL_PING_AFTER", _get_secret("DB_POOL_PING_AFTER", 30)))
+
 # Direktori app (kalau butuh simpan cache/file pendukung lain)
 try:
     from platformdirs import user_data_dir  # type: ignore
@@ -77,12 +90,39 @@ def debug_db_target():
 
 
 # ------------------------------------------------------------
-# Koneksi DB
+# Koneksi DB (pool)
 # ------------------------------------------------------------
-def get_conn() -> pymysql.connections.Connection:
-    """
-    Return koneksi pymysql. Caller bertanggung jawab menutup (con.close()).
-    """
+# Dulu get_conn() membuka koneksi TCP baru + 2 SET per panggilan, lalu langsung ditutup
+# pemanggil → tiap load tabel = handshake MySQL baru; banyak petugas bersamaan = connect storm.
+# Sekarang:
+# - koneksi dibuat sekali (SET sesi dijalankan saat dibuat) lalu dipakai ulang dari pool
+# - jumlah koneksi dibatasi DB_POOL_SIZE; permintaan berikutnya menunggu slot (DB_POOL_TIMEOUT)
+# - health check: koneksi yang idle > DB_POOL_PING_AFTER detik di-ping sebelum dipakai,
+#   umur > DB_POOL_RECYCLE detik diganti; koneksi putus dibuang dan diganti koneksi baru
+# - get_conn() tetap ada (kompatibel): con.close() mengembalikan koneksi ke pool
+# Koneksi dianggap putus hanya untuk CR_SERVER_GONE_ERROR (2006), CR_SERVER_LOST (2013),
+# CR_SERVER_LOST_EXTENDED (2055) dan InterfaceError (socket sudah tertutup). OperationalError
+# lain (deadlock 1213, lock wait timeout 1205, ...) → koneksi masih sehat, kembali ke pool.
+_DB_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+_BROKEN_ERRNOS = frozenset({2006, 2013, 2055})
+
+class PoolTimeout(pymysql.err.OperationalError):
+    """Semua koneksi pool sedang dipakai lebih lama dari DB_POOL_TIMEOUT."""
+
+def _is_broken(exc: BaseException | None) -> bool:
+    """True bila error berarti koneksi MySQL putus (bukan sekadar query gagal)."""
+    if exc is None or isinstance(exc, PoolTimeout):
+        return False
+    if isinstance(exc, pymysql.err.InterfaceError):
+        return True
+    if isinstance(exc, pymysql.err.OperationalError):
+        try:
+            return int(exc.args[0]) in _BROKEN_ERRNOS
+        except (IndexError, TypeError, ValueError):
+            return False
+    return False
+
+def _connect() -> pymysql.connections.Connection:
     conn = pymysql.connect(
         host=DB_HOST,
         port=DB_PORT,
@@ -100,8 +140,274 @@ def get_conn() -> pymysql.connections.Connection:
     with conn.cursor() as cur:
         cur.execute("SET SESSION sql_mode = 'STRICT_ALL_TABLES';")
         cur.execute("SET NAMES utf8mb4 COLLATE utf8mb4_unicode_ci;")
+    conn.commit()
     return conn
 
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+class PooledConnection:
+    """
+    Proxy koneksi pymysql dari pool. Semua atribut diteruskan ke koneksi asli;
+    close() mengembalikan koneksi ke pool (bukan menutup socket).
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn, born: float):
+        self._pool, self._conn, self._born = pool, conn, born
+        self._broken = False
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise pymysql.err.InterfaceError(0, "Koneksi sudah dikembalikan ke pool")
+        return getattr(conn, name)
+
+    def mark_broken(self) -> None:
+        self._broken = True
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool._release(conn, self._born, self._broken)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if _is_broken(exc):
+            self._broken = True
+        self.close()
+        return False
+
+class ConnectionPool:
+    """Pool koneksi pymysql thread-safe (LIFO: koneksi paling hangat dipakai dulu)."""
+
+    def __init__(self, size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 recycle: float = DB_POOL_RECYCLE, ping_after: float = DB_POOL_PING_AFTER, connect=_connect):
+        self.size, self.timeout, self.recycle, self.ping_after = max(1, int(size)), timeout, recycle, ping_after
+        self._connect = connect
+        self._idle: deque = deque()   # (conn, born, last_used)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def acquire(self) -> PooledConnection:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(2013, f"Pool DB penuh ({self.size} koneksi) > {self.timeout:.0f} detik")
+        try:
+            while True:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    conn = self._connect()
+                    with self._lock:
+                        self.created += 1
+                    return PooledConnection(self, conn, time.monotonic())
+                conn, born, last = item
+                now = time.monotonic()
+                if now - born > self.recycle:
+                    self._discard(conn)
+                    continue
+                if now - last > self.ping_after:
+                    try:
+                        conn.ping(reconnect=False)   # reconnect=True akan kehilangan SET sesi
+                    except Exception:
+                        self._discard(conn)
+                        continue
+                with self._lock:
+                    self.reused += 1
+                return PooledConnection(self, conn, born)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _discard(self, conn) -> None:
+        _close_quietly(conn)
+        with self._lock:
+            self.discarded += 1
+
+    def _release(self, conn, born: float, broken: bool) -> None:
+        try:
+            if not broken:
+                try:
+                    conn.rollback()   # transaksi yang tidak di-commit pemanggil tidak terbawa ke pemakai berikutnya
+                except Exception:
+                    broken = True
+            if broken:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, born, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _, _ in idle:
+            _close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle), "created": self.created,
+                    "reused": self.reused, "discarded": self.discarded}
+
+def _new_pool() -> ConnectionPool:
+    return ConnectionPool()
+
+if st is not None:
+    _pool_resource = st.cache_resource(show_spinner=False)(_new_pool)
+else:
+    _pool_resource = None
+_pool_singleton: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Pool bersama per proses (st.cache_resource bila ada Streamlit)."""
+    global _pool_singleton
+    if _pool_resource is not None:
+        try:
+            return _pool_resource()
+        except Exception:
+            pass
+    with _pool_lock:
+        if _pool_singleton is None:
+            _pool_singleton = _new_pool()
+        return _pool_singleton
+
+def get_conn() -> PooledConnection:
+    """
+    Return koneksi dari pool. Caller tetap menutup (con.close()) → koneksi kembali ke pool.
+    """
+    return get_pool().acquire()
+
+@contextmanager
+def connection():
+    """with connection() as con: ... → koneksi dipinjam dari pool lalu dikembalikan."""
+    con = get_conn()
+    try:
+        yield con
+    except _DB_ERRORS as e:
+        if _is_broken(e):
+            con.mark_broken()
+        raise
+    finally:
+        con.close()
+
+@contextmanager
+def transaction():
+    """Satu transaksi: commit bila blok selesai, rollback bila error. Cache query di-reset setelah commit."""
+    with connection() as con:
+        try:
+            yield con
+            con.commit()
+        except BaseException:
+            try:
+                con.rollback()
+            except Exception:
+                con.mark_broken()
+            raise
+    invalidate_query_cache()
+
+
+# ------------------------------------------------------------
+# Query layer (parameterized)
+# ------------------------------------------------------------
+# Nilai SELALU lewat parameter %s (di-escape driver), tidak pernah di-format ke string SQL.
+# Nama tabel/kolom (tidak bisa jadi parameter) divalidasi lewat ident().
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,63}$")
+_query_cache: dict[tuple, tuple[float, Any]] = {}
+_query_cache_lock = threading.Lock()
+_QUERY_CACHE_MAX = 128
+
+def ident(name: str) -> str:
+    """Validasi + quote identifier (nama tabel/kolom) → `name`."""
+    s = str(name or "")
+    if not _IDENT_RE.match(s):
+        raise ValueError(f"Identifier SQL tidak valid: {name!r}")
+    return f"`{s}`"
+
+def invalidate_query_cache() -> None:
+    with _query_cache_lock:
+        _query_cache.clear()
+
+def _run(fn, retry: bool):
+    """Jalankan fn(con); error koneksi putus → satu kali coba lagi dengan koneksi baru (hanya untuk baca)."""
+    try:
+        with connection() as con:
+            return fn(con)
+    except _DB_ERRORS as e:
+        if not retry or not _is_broken(e):
+            raise
+        with connection() as con:
+            return fn(con)
+
+def query_all(sql: str, params: Sequence | dict | None = None) -> list[dict]:
+    def _q(con):
+        with con.cursor() as cur:
+            cur.execute(sql, params)
+            return list(cur.fetchall())
+    return _run(_q, retry=True)
+
+def query_one(sql: str, params: Sequence | dict | None = None) -> dict | None:
+    rows = query_all(sql, params)
+    return rows[0] if rows else None
+
+def query_df(sql: str, params: Sequence | dict | None = None, ttl: float = 0):
+    """
+    SELECT → DataFrame. ttl > 0 → hasil di-memo per (sql, params) selama ttl detik
+    (dibuang lebih awal oleh execute/transaction di proses yang sama).
+    """
+    import pandas as pd
+    key = None
+    if ttl > 0:
+        try:
+            key = (sql, tuple(sorted(params.items())) if isinstance(params, dict) else tuple(params or ()))
+            hash(key)
+        except TypeError:   # parameter list/dict bersarang → tanpa memo
+            key = None
+    if key is not None:
+        with _query_cache_lock:
+            hit = _query_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < ttl:
+            return hit[1].copy()
+
+    def _q(con):
+        with con.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            cols = [d[0] for d in (cur.description or ())]
+        return pd.DataFrame(list(rows), columns=cols)
+
+    df = _run(_q, retry=True)
+    if key is not None:
+        with _query_cache_lock:
+            _query_cache[key] = (time.monotonic(), df)
+            while len(_query_cache) > _QUERY_CACHE_MAX:
+                _query_cache.pop(next(iter(_query_cache)))
+        return df.copy()
+    return df
+
+def execute(sql: str, params: Sequence | dict | None = None) -> int:
+    """Satu statement tulis dalam transaksi sendiri. Return rowcount."""
+    with transaction() as con:
+        with con.cursor() as cur:
+            return cur.execute(sql, params)
+
+def executemany(sql: str, seq_params: Iterable[Sequence | dict]) -> int:
+    """Statement yang sama untuk banyak baris (batch driver) dalam satu transaksi. Return rowcount."""
+    rows = list(seq_params)
+    if not rows:
+        return 0
+    with transaction() as con:
+        with con.cursor() as cur:
+            return cur.executemany(sql, rows)
+
 
 # ------------------------------------------------------------
 # Bootstrap schema
@@ -247,11 +553,8 @@ def init_db() -> None:
 def ping_ok() -> bool:
     """Tes koneksi cepat; True kalau bisa ping server."""
     try:
-        conn = get_conn()
-        try:
-            conn.ping(reconnect=True)
+        with connection() as conn:
+            conn.ping(reconnect=False)
             return True
-        finally:
-            conn.close()
     except Exception:
         return False
@@ -1,54 +1,127 @@
 import pandas as pd
 from typing import Iterable, Tuple, Any
-from db import get_conn
+from db import ident, query_df, execute, transaction
 
-def load_table(name: str) -> pd.DataFrame:
-    con = get_conn()
+def load_table(name: str, ttl: float = 0) -> pd.DataFrame:
+    """SELECT * tabel (urut id) lewat pool; ttl > 0 → hasil di-memo sebentar per proses."""
     try:
-        df = pd.read_sql_query(f"SELECT * FROM {name} ORDER BY id;", con)
-        return df
+        return query_df(f"SELECT * FROM {ident(name)} ORDER BY id", ttl=ttl)
     except Exception:
         return pd.DataFrame()
-    finally:
-        con.close()
 
-def save_table(name: str, df: pd.DataFrame):
-    con = get_conn()
+# ---------- Sinkron massal (diff) ----------
+# save_table dulu: DELETE seluruh tabel + to_sql ulang (to_sql tidak jalan di koneksi pymysql mentah).
+# Sekarang: DataFrame hasil edit dibandingkan dengan isi tabel saat ini per id →
+#   baris id hilang      → DELETE ... WHERE id IN (...)
+#   baris id berubah     → INSERT (id, ...) ... ON DUPLICATE KEY UPDATE (executemany)
+#   baris baru (id kosong) → INSERT ... ON DUPLICATE KEY UPDATE (bentrok kolom unik → update)
+# semuanya dalam satu transaksi; biaya tulis = jumlah baris yang berubah, bukan ukuran tabel.
+_CHUNK = 500
+
+def _py(v):
+    """Nilai DataFrame → nilai parameter driver (NaN/NaT → None, numpy → python, Timestamp → date/datetime)."""
+    if v is None:
+        return None
     try:
-        cur = con.cursor()
-        cur.execute("BEGIN;")
-        cur.execute(f"DELETE FROM {name};")
-        cols = [c for c in df.columns if c != "id"]
-        df_to_write = df[cols].copy() if "id" in df.columns else df.copy()
-        df_to_write = df_to_write.where(pd.notnull(df_to_write), None)
-        df_to_write.to_sql(name, con, if_exists="append", index=False)
-        con.commit()
-    except Exception:
-        con.rollback()
-        raise
-    finally:
-        con.close()
+        if pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(v, pd.Timestamp):
+        return v.date() if v == v.normalize() else v.to_pydatetime()
+    if hasattr(v, "item"):
+        try:
+            v = v.item()
+        except Exception:
+            pass
+    if isinstance(v, float) and v.is_integer():
+        return int(v)   # kolom int yang jadi float karena baris baru NaN di editor
+    return v
+
+def _as_id(v):
+    v = _py(v)
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return None
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return None
+
+def diff_table(current: pd.DataFrame, edited: pd.DataFrame, key: str = "id") -> dict:
+    """
+    Bandingkan tabel saat ini dengan hasil edit (per kolom key).
+    Return {"columns", "upserts": [baris dgn id], "inserts": [baris tanpa id], "deletes": [id]}.
+    """
+    cur = current if isinstance(current, pd.DataFrame) else pd.DataFrame()
+    edited = edited if isinstance(edited, pd.DataFrame) else pd.DataFrame()
+    if len(cur.columns):
+        cols = [c for c in cur.columns if c != key and c in edited.columns]
+    else:
+        cols = [c for c in edited.columns if c != key]
+    cur_rows: dict[int, tuple] = {}
+    if key in cur.columns and len(cur):
+        for rec in cur[[key] + cols].itertuples(index=False, name=None):
+            rid = _as_id(rec[0])
+            if rid is not None:
+                cur_rows[rid] = tuple(_py(v) for v in rec[1:])
+    upserts, inserts, seen = [], [], set()
+    ed = edited.reindex(columns=[key] + cols) if key in edited.columns else edited.reindex(columns=cols)
+    has_key = key in edited.columns
+    for rec in ed.itertuples(index=False, name=None):
+        rid = _as_id(rec[0]) if has_key else None
+        vals = tuple(_py(v) for v in (rec[1:] if has_key else rec))
+        if rid is None:
+            if any(v not in (None, "") for v in vals):   # baris kosong dari editor diabaikan
+                inserts.append(vals)
+            continue
+        seen.add(rid)
+        if cur_rows.get(rid) != vals:
+            upserts.append((rid,) + vals)
+    deletes = [rid for rid in cur_rows if rid not in seen]
+    return {"columns": cols, "upserts": upserts, "inserts": inserts, "deletes": deletes}
+
+def _upsert_sql(table: str, cols: list[str]) -> str:
+    upd = ",".join(f"{ident(c)}=VALUES({ident(c)})" for c in cols if c != "id") or f"{ident(cols[0])}={ident(cols[0])}"
+    return (f"INSERT INTO {ident(table)} ({','.join(ident(c) for c in cols)}) "
+            f"VALUES ({','.join(['%s'] * len(cols))}) ON DUPLICATE KEY UPDATE {upd}")
+
+def sync_table(name: str, edited: pd.DataFrame, current: pd.DataFrame | None = None, key: str = "id") -> dict:
+    """
+    Samakan tabel `name` dengan `edited` hanya lewat baris yang berubah (satu transaksi).
+    current = isi tabel yang menjadi dasar edit (default: dibaca dari DB).
+    Return jumlah {"inserted", "updated", "deleted"}.
+    """
+    if current is None:
+        current = load_table(name)
+    d = diff_table(current, edited, key=key)
+    cols = d["columns"]
+    with transaction() as con:
+        with con.cursor() as cur:
+            ids = d["deletes"]
+            for i in range(0, len(ids), _CHUNK):
+                part = ids[i:i + _CHUNK]
+                cur.execute(f"DELETE FROM {ident(name)} WHERE {ident(key)} IN ({','.join(['%s'] * len(part))})", part)
+            if d["upserts"]:
+                sql = _upsert_sql(name, [key] + cols)
+                for i in range(0, len(d["upserts"]), _CHUNK):
+                    cur.executemany(sql, d["upserts"][i:i + _CHUNK])
+            if d["inserts"] and cols:
+                sql = _upsert_sql(name, cols)
+                for i in range(0, len(d["inserts"]), _CHUNK):
+                    cur.executemany(sql, d["inserts"][i:i + _CHUNK])
+    return {"inserted": len(d["inserts"]), "updated": len(d["upserts"]), "deleted": len(d["deletes"])}
+
+def save_table(name: str, df: pd.DataFrame) -> dict:
+    """Kompatibel dengan pemanggil lama: isi tabel menjadi df (via sync_table, bukan hapus-semua)."""
+    return sync_table(name, df)
 
 def upsert(table: str, columns: Iterable[str], values: Tuple[Any, ...], unique_col: str = "nama"):
     cols = list(columns)
-    placeholders = ",".join(["?"] * len(cols))
-    set_clause = ",".join([f"{c}=excluded.{c}" for c in cols if c != unique_col])
-    sql = f"""
-    INSERT INTO {table} ({",".join(cols)})
-    VALUES ({placeholders})
-    ON CONFLICT({unique_col}) DO UPDATE SET {set_clause};
-    """
-    con = get_conn()
-    try:
-        con.execute(sql, values)
-        con.commit()
-    finally:
-        con.close()
+    placeholders = ",".join(["%s"] * len(cols))
+    set_clause = ",".join([f"{ident(c)}=VALUES({ident(c)})" for c in cols if c != unique_col])
+    sql = (f"INSERT INTO {ident(table)} ({','.join(ident(c) for c in cols)}) VALUES ({placeholders}) "
+           f"ON DUPLICATE KEY UPDATE {set_clause or f'{ident(unique_col)}={ident(unique_col)}'}")
+    execute(sql, tuple(values))
 
 def delete_by_id(table: str, row_id: int):
-    con = get_conn()
-    try:
-        con.execute(f"DELETE FROM {table} WHERE id=?;", (row_id,))
-        con.commit()
-    finally:
-        con.close()
+    execute(f"DELETE FROM {ident(table)} WHERE id=%s", (row_id,))
@@ -6,13 +6,31 @@
 # 4) ⚙️ Pengaturan • Rotasi PP/JS, filter hakim, preferensi tampilan, maintenance
 
 from __future__ import annotations
-import os, re, json, shutil, tempfile, uuid, time
+import os, re, uuid
 from datetime import date, datetime, timedelta
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import streamlit as st
-from app_core.cooldown import _COOL_V2_PATH, _cool_v2_load, _cool_v2_save, _cool_v2_is_active, _cool_v2_mark, _cool_v2_reset_all, _cool_v2_toggle_auto_daily, _cool_v2_maybe_auto_reset_today
+from app_core.cooldown import _COOL_V2_PATH, _cool_v2_load, _cool_v2_save, _cool_v2_active_names, _cool_v2_mark, _cool_v2_reset_all, _cool_v2_toggle_auto_daily, _cool_v2_maybe_auto_reset_today
 from app_core.login import _ensure_auth
+from app_core import rekap_journal, batch_assign, sqlite_backend
+from app_core.audit_log import get_audit_log
+from app_core.backup_store import get_backup_store, find_legacy_copies, DEFAULT_RETENTION
+from app_core.io_csv import read_table, write_table, table_version
+from app_core.config_util import AppConfig, get_config_store, save_config as _save_app_config
+from app_core.write_coordinator import path_lock, get_write_coordinator, saver
+from app_core.registry import get_registry
+from app_core.data_context import DataContext, dir_version, get_data_context_store
+from app_core.rekap_repo import get_rekap_repo
+from app_core.state_store import get_state_store
+from app_core.load_index import LoadIndex, get_load_index_store
+from app_core.cuti_index import get_cuti_index_store
+from app_core.stats_cube import get_stats_store, rekap_cube
+from app_core.rekap_summary import get_summary_store
+from app_core.row_table import row_action_table
+from app_core import court_calendar
+from app_core.name_index import clean_text, name_key, name_tokens, index_for
 # masih butuh helpers original
 from app_core.helpers import HARI_MAP, format_tanggal_id, compute_nomor_tipe
 
@@ -34,9 +52,9 @@ _RR_JSON = DATA_DIR / "rrpair_token.json"
 COURT_CODE = "PA.JT"  # kode pengadilan untuk nomor perkara
 
 # === [BACKUP & LOCK] ===
-BACKUP_DIR = DATA_DIR / "backups"
-BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-AUDIT_LOG_CSV = DATA_DIR / "audit_log.csv"
+BACKUP_DIR = DATA_DIR / "backups"   # salinan penuh format lama (bisa diimpor ke store)
+AUDIT_LOG_CSV = DATA_DIR / "audit_log.csv"   # lama; diimpor sekali ke data/audit/
+AUDIT_DIR = DATA_DIR / "audit"
 
 _ensure_auth()
 
@@ -65,43 +83,69 @@ def _backup_dir() -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def _backup_bucket_for(path: Path) -> Path:
-    """Folder bucket per file: <backup_dir>/<nama_file>/"""
-    base = _backup_dir()
-    b = base / path.name
-    b.mkdir(parents=True, exist_ok=True)
-    return b
+def _backup_store():
+    """Store backup dedup (content-addressed) di folder backup; retensi dari config."""
+    store = get_backup_store(_backup_dir().as_posix())
+    try:
+        bk = get_config().get("backup", {})
+        store.retention = {
+            "keep_last": int(bk.get("max_keep", DEFAULT_RETENTION["keep_last"])),
+            "hourly": int(bk.get("hourly", DEFAULT_RETENTION["hourly"])),
+            "daily": int(bk.get("daily", DEFAULT_RETENTION["daily"])),
+            "weekly": int(bk.get("weekly", DEFAULT_RETENTION["weekly"])),
+        }
+    except Exception:
+        pass
+    return store
+
+def _backup_capture(path: Path):
+    """Sebelum file ditimpa: pastikan isi saat ini sudah ada di store (cek stat; baca hanya bila belum)."""
+    if not _backup_enabled():
+        return
+    try:
+        _backup_store().ensure_captured(path)
+    except Exception:
+        pass  # backup gagal jangan ganggu alur utama
 
 def _backup_snapshot(path: Path):
-    """Simpan 1 snapshot dari file 'path' (jika ada), lalu prune melebihi max_keep."""
+    """Antre 1 snapshot dari file 'path' ke worker backup (hash/kompresi/dedup di luar jalur simpan)."""
     if not _backup_enabled():
         return
     try:
-        if not path.exists():
-            return
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        dst = _backup_bucket_for(path) / f"{ts}{path.suffix or ''}"
-        shutil.copy2(path.as_posix(), dst.as_posix())
-        _backup_prune(path)
+        if Path(path).exists():
+            _backup_store().snapshot_async(Path(path))
     except Exception:
         # supaya tidak mengganggu alur write utama
         pass
 
-def _backup_list(path: Path) -> list[Path]:
-    b = _backup_bucket_for(path)
-    files = sorted([p for p in b.glob("*") if p.is_file()], key=lambda p: p.stat().st_mtime, reverse=True)
-    return files
+# mirror JSON StateStore (rotasi/cooldown, berkala) ikut di-snapshot seperti write_json biasa
+get_state_store().set_export_hook(_backup_snapshot)
 
-def _backup_prune(path: Path):
-    """Hapus snapshot lama melebihi max_keep."""
-    try:
-        max_keep = int(get_config().get("backup", {}).get("max_keep", 10))
-    except Exception:
-        max_keep = 10
-    files = _backup_list(path)
-    for p in files[max_keep:]:
-        try: p.unlink(missing_ok=True)
-        except Exception: pass
+def _backup_list(path: Path) -> pd.DataFrame:
+    return _backup_store().list_snapshots(path)
+
+def _backup_prune(path: Path | None = None) -> dict:
+    """Terapkan retensi (N terbaru + per jam/hari/minggu) lalu hapus chunk yatim."""
+    return _backup_store().gc()
+
+def _backup_restore(path: Path, at) -> bool:
+    """Kembalikan isi file ke snapshot terakhir ≤ at. Isi sekarang di-snapshot dulu (bisa di-undo)."""
+    path = Path(path)
+    store = _backup_store()
+    data = store.restore(path, at)
+    if data is None:
+        return False
+    def _do():
+        store.ensure_captured(path)
+        tmp = path.with_name(path.name + ".restore.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        if _is_rekap_path(path):
+            rekap_journal.reset(rekap_csv_path)   # base dipulihkan → jurnal setelahnya dibuang
+        store.snapshot_async(path)
+    # CSV berubah di luar write_table → parquet diimpor ulang otomatis saat dibaca
+    get_write_coordinator().call(path, _do)
+    return True
 
 def _human_size(n: int) -> str:
     for unit in ["B","KB","MB","GB"]:
@@ -110,39 +154,24 @@ def _human_size(n: int) -> str:
         n /= 1024.0
     return f"{n:.1f} TB"
 
+def _audit_log():
+    return get_audit_log(AUDIT_DIR.as_posix(), AUDIT_LOG_CSV.as_posix())
+
 def _append_audit(entry: dict) -> None:
     """
-    Tambah 1 baris audit ke data/audit_log.csv.
-    entry boleh berisi datetime/date/str/number; datetime akan diserialisasi ISO.
-    Kolom bersifat fleksibel: kolom baru akan otomatis ditambahkan.
+    Tambah 1 entri audit (JSON lines append-only di data/audit/, lihat app_core/audit_log.py).
+    entry boleh berisi datetime/date/str/number; kunci di luar skema tetap masuk `extra`.
     """
-    try:
-        rec = dict(entry or {})
-        # Normalisasi nilai agar aman ditulis ke CSV
-        def _norm(v):
-            if isinstance(v, pd.Timestamp):
-                return v.isoformat()
-            if isinstance(v, datetime):
-                return v.isoformat()
-            if isinstance(v, date):
-                # simpan tanggal saja untuk date
-                return pd.to_datetime(v).date().isoformat()
-            return v
-        rec = {k: _norm(v) for k, v in rec.items()}
-
-        new_row = pd.DataFrame([rec])
-
-        if AUDIT_LOG_CSV.exists():
-            cur = _read_csv(AUDIT_LOG_CSV)
-            # Gabungkan kolom (union), susun agar kolom lama tetap di depan
-            all_cols = list(dict.fromkeys(list(cur.columns) + list(new_row.columns)))
-            cur = cur.reindex(columns=all_cols)
-            new_row = new_row.reindex(columns=all_cols)
-            out = pd.concat([cur, new_row], ignore_index=True)
-        else:
-            out = new_row
+    stg = batch_assign.active()
+    if stg is not None:   # batch: dikumpulkan, ditulis sekali saat commit
+        stg.audits.append(dict(entry or {}))
+        return
+    _append_audits([entry])
 
-        _write_csv(out, AUDIT_LOG_CSV)
+def _append_audits(entries: list[dict]) -> None:
+    """Versi banyak entri dari _append_audit (masuk buffer, ditulis thread flusher)."""
+    try:
+        _audit_log().append_many(entries)
     except Exception as e:
         # Jangan sampai logging bikin alur utama gagal
         try:
@@ -150,214 +179,65 @@ def _append_audit(entry: dict) -> None:
         except Exception:
             pass
 
-def _rolling_backups(path: Path, keep: int = 30):
-    """Buat backup timestamped setiap kali nulis; simpan maksimal 'keep' file per target."""
-    try:
-        if not path.exists(): 
-            return
-        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-        base = path.stem
-        ext = path.suffix or ".csv"
-        tgt = BACKUP_DIR / f"{base}.{ts}{ext}"
-        shutil.copy2(path.as_posix(), tgt.as_posix())
-        # hapus yang tua
-        prefix = f"{base}."
-        olds = sorted([p for p in BACKUP_DIR.glob(f"{base}.*{ext}") if p.name.startswith(prefix)])
-        if len(olds) > keep:
-            for p in olds[:len(olds)-keep]:
-                p.unlink(missing_ok=True)
-    except Exception:
-        pass  # backup gagal jangan ganggu alur utama
-
-class _file_lock:
-    """Lock sederhana pakai file .lock (cocok untuk network share)."""
-    def __init__(self, path: Path, timeout: float = 5.0):
-        self.path = Path(path)
-        self.lock_path = self.path.with_suffix(self.path.suffix + ".lock")
-        self.timeout = timeout
-        self._fh = None
-    def __enter__(self):
-        start = datetime.now()
-        while True:
-            try:
-                # O_CREAT|O_EXCL: gagal jika file sudah ada
-                self._fh = os.open(self.lock_path.as_posix(), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-                os.write(self._fh, str(os.getpid()).encode())
-                return self
-            except FileExistsError:
-                if (datetime.now() - start).total_seconds() > self.timeout:
-                    # timeout: coba paksa ambil alih jika lock sudah basi (>15 menit)
-                    try:
-                        age = datetime.now().timestamp() - self.lock_path.stat().st_mtime
-                        if age > 900:  # 15 menit
-                            self.lock_path.unlink(missing_ok=True)
-                            continue
-                        raise TimeoutError(f"Lock {self.lock_path.name} masih aktif")
-                    except FileNotFoundError:
-                        continue
-                else:
-                    time.sleep(0.1)
-    def __exit__(self, exc_type, exc, tb):
-        try:
-            if self._fh is not None:
-                os.close(self._fh)
-            self.lock_path.unlink(missing_ok=True)
-        except Exception:
-            pass
-
-
 def _read_csv_raw(path: Path) -> pd.DataFrame:
-    if not path.exists(): return pd.DataFrame()
-    for enc in ("utf-8-sig", "utf-8", "cp1252"):
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            continue
-    return pd.read_csv(path)
+    # store bertipe: parquet sebagai sumber kebenaran, CSV hanya mirror/impor
+    return read_table(path)
 
-@st.cache_data(show_spinner=False)
-def _read_csv_cached(path_str: str, mtime: float) -> pd.DataFrame:
-    return _read_csv_raw(Path(path_str))
+def _is_rekap_path(path: Path) -> bool:
+    try:
+        return Path(path).resolve() == rekap_csv_path.resolve()
+    except Exception:
+        return False
 
 def _read_csv(path: Path) -> pd.DataFrame:
-    mtime = path.stat().st_mtime if path.exists() else 0.0
-    return _read_csv_cached(path.as_posix(), mtime)
+    stg = batch_assign.active()
+    if stg is not None and not _is_rekap_path(path):
+        staged = stg.table_get(path)   # batch: tabel yang sudah diubah baris sebelumnya
+        if staged is not None:
+            return staged
+    # TableRegistry: parse sekali per perubahan file, dibagi ke semua sesi (view read-only)
+    reg = get_registry()
+    if _is_rekap_path(path):
+        return reg.rekap(path)   # base snapshot + jurnal append-only
+    return reg.table(path)
+
+def _write_with_backups(path: Path, df: pd.DataFrame):
+    # dijalankan di thread penulis, di bawah lock file `path`
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _backup_capture(path)   # sebelum nulis: isi lama sudah/di-snapshot (dedup, umumnya cukup cek stat)
+    write_table(df, path)   # parquet bertipe + CSV mirror
+    _backup_snapshot(path)  # setelah nulis: diantre ke worker backup
 
 def _atomic_write_csv(df: pd.DataFrame, path: Path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with _file_lock(path, timeout=5.0):
-        # sebelum nulis: bikin backup yang lama (kalau ada)
-        _rolling_backups(path, keep=30)
-        with tempfile.NamedTemporaryFile('w', delete=False, encoding="utf-8-sig", newline='') as tmp:
-            df.to_csv(tmp.name, index=False, encoding="utf-8-sig")
-            tmp.flush()
-            os.fsync(tmp.fileno())
-        shutil.move(tmp.name, path.as_posix())
-        _backup_snapshot(path)
+    if sqlite_backend.in_transaction():
+        # transaksi SQLite terbuka di thread ini → tulis langsung supaya ikut commit/rollback-nya
+        _write_with_backups(path, df)
+        return
+    # write coordinator: antre ke penulis tunggal, lock fcntl per file (tanpa polling/timeout)
+    get_write_coordinator().put(path, df, saver(path, _write_with_backups))
+
+def _update_csv(path: Path, fn) -> pd.DataFrame:
+    """Read-modify-write tabel terhadap isi terbaru di disk (tidak menimpa tulisan sesi lain)."""
+    if sqlite_backend.in_transaction():   # kunci tulis SQLite sudah dipegang transaksi ini
+        df = fn(_read_csv_raw(path))
+        _write_with_backups(path, df)
+        return df
+    return get_write_coordinator().update(path, fn, lambda: _read_csv_raw(path), saver(path, _write_with_backups))
 
 def _write_csv(df: pd.DataFrame, path: Path):
+    stg = batch_assign.active()
+    if stg is not None and not _is_rekap_path(path):
+        stg.table_put(path, df)   # batch: tulis saat commit
+        return
     _atomic_write_csv(df, path)
 
-# ---------- [4] Config: default + validator ----------
-_DEFAULT_CONFIG = {
-    "rotasi": {
-        "mode": "pair4",                           # "pair4" atau "roundrobin"
-        "order": ["P1J1","P2J1","P1J2","P2J2"],    # urutan pair untuk mode pair4
-        "increment_on_save": True                  # naikkan indeks rotasi saat simpan
-    },
-    "hakim": {
-        "exclude_jabatan_regex": r"\b(ketua|wakil)\b",
-        "dropdown_show_cuti_default": False,
-        "cooldown_days": 1,
-        "elastic_beta": 0.20,             # ← tambahkan
-        "elastic_min_gap_cool": 2.0,      # ← tambahkan
-        "elastic_streak_cap": 3           # ← kalau belum ada, tambahkan
-    },
-    "tampilan": {
-        "tanggal_locale": "id-ID",
-        "tanggal_long": True
-    },
-    # beban window + decay
-    "beban": {
-        "window_days": 90,
-        "half_life_days": 30,
-        "use_decay": True,     # <-- baru: True=pakai half-life, False=uniform
-    }
-}
-
-def _validate_cfg(cfg: dict) -> dict:
-    out = {**_DEFAULT_CONFIG, **(cfg or {})}
-    # rotasi
-    if out["rotasi"].get("mode") not in {"pair4","roundrobin"}:
-        out["rotasi"]["mode"] = "pair4"
-    keys = {"P1J1","P2J1","P1J2","P2J2"}
-    order = out["rotasi"].get("order", [])
-    if not isinstance(order, list) or not order or set(order) - keys:
-        out["rotasi"]["order"] = ["P1J1","P2J1","P1J2","P2J2"]
-    out["rotasi"]["increment_on_save"] = bool(out["rotasi"].get("increment_on_save", True))
-    # hakim
-    out["hakim"]["dropdown_show_cuti_default"] = bool(out["hakim"].get("dropdown_show_cuti_default", False))
-    try:
-        re.compile(out["hakim"].get("exclude_jabatan_regex", r"\b(ketua|wakil)\b"))
-    except re.error:
-        out["hakim"]["exclude_jabatan_regex"] = r"\b(ketua|wakil)\b"
-    cd = out["hakim"].get("cooldown_days", 0)
-    try: cd = max(0, int(cd))
-    except: cd = 0
-    out["hakim"]["cooldown_days"] = cd
-    # backup
-    bk = out.get("backup", {})
-    bk_enabled = bool(bk.get("enabled", True))
-    bk_dir = str(bk.get("dir", "data/_backup")).strip() or "data/_backup"
-    try:
-        bk_keep = max(1, int(bk.get("max_keep", 10)))
-    except Exception:
-        bk_keep = 10
-    out["backup"] = {"enabled": bk_enabled, "dir": bk_dir, "max_keep": bk_keep}
-
-
-    # (BARU) elastic beta (0.0—1.0)
-    try:
-        eb = float(out["hakim"].get("elastic_beta", 0.20))
-        if not (0.0 <= eb <= 1.0):
-            eb = 0.20
-    except Exception:
-        eb = 0.20
-    
-    # tampilan
-    out["tampilan"]["tanggal_locale"] = out["tampilan"].get("tanggal_locale", "id-ID")
-    out["tampilan"]["tanggal_long"] = bool(out["tampilan"].get("tanggal_long", True))
-    # beban
-    b = out.get("beban", {})
-    try: bwd = max(1, int(b.get("window_days", 90)))
-    except: bwd = 90
-    try: hld = max(1, int(b.get("half_life_days", 30)))
-    except: hld = 30
-    try: mnw = float(b.get("min_weight", 0.05))
-    except: mnw = 0.05
-    out["beban"] = {"window_days": bwd, "half_life_days": hld, "min_weight": mnw, "use_decay": bool(b.get("use_decay", True)),}  # <-- baru
-    
-    # (BARU) ambang gap absolut: gap < N ⇒ cooldown
-    try:
-        gabs = float(out["hakim"].get("elastic_min_gap_cool", 2.0))
-        if gabs < 0:
-            gabs = 0.0
-    except Exception:
-        gabs = 2.0
-    out["hakim"]["elastic_min_gap_cool"] = gabs
-    
-    # (BARU) batas beruntun per reset (min 1)
-    try:
-        streak_cap = int(out["hakim"].get("elastic_streak_cap", 3))
-        if streak_cap < 1:
-            streak_cap = 1
-    except Exception:
-        streak_cap = 3
-    out["hakim"]["elastic_streak_cap"] = streak_cap
-    
-    return out
-def _load_config_file(path: Path) -> dict:
-    try:
-        if path.exists():
-            raw = json.loads(path.read_text(encoding="utf-8"))
-            return _validate_cfg(raw)
-    except Exception:
-        pass
-    return json.loads(json.dumps(_DEFAULT_CONFIG))
-
-def _save_config_file(cfg: dict, path: Path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(_validate_cfg(cfg), ensure_ascii=False, indent=2), encoding="utf-8")
-    _backup_snapshot(path)
-
-def get_config() -> dict:
-    if "_app_cfg" not in st.session_state:
-        st.session_state["_app_cfg"] = _load_config_file(CONFIG_PATH)
-    return st.session_state["_app_cfg"]
+# ---------- [4] Config: default + validator (app_core/config_util.py) ----------
+# AppConfig immutable bersama per proses; dimuat ulang hanya bila config.json berubah.
+def get_config() -> AppConfig:
+    return get_config_store().get(CONFIG_PATH)
 
 def save_config(cfg: dict):
-    _save_config_file(cfg, CONFIG_PATH)
-    st.session_state["_app_cfg"] = _load_config_file(CONFIG_PATH)
+    _save_app_config(cfg, CONFIG_PATH, after=_backup_snapshot)
 
 # ---------- [3] Rekap schema + primary key __id ----------
 REKAP_NEED = [
@@ -369,7 +249,7 @@ def _ensure_rekap_schema(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
         out = pd.DataFrame(columns=REKAP_NEED)
     else:
-        out = df.copy()
+        out = df.copy(deep=False)   # copy-on-write: kolom yang diubah saja yang disalin
 
     for c in REKAP_NEED:
         if c not in out.columns:
@@ -379,35 +259,131 @@ def _ensure_rekap_schema(df: pd.DataFrame) -> pd.DataFrame:
     if "__id" not in out.columns:
         out["__id"] = [str(uuid.uuid4()) for _ in range(len(out))]
     else:
-        def _need_id(v):
-            s = str(v).strip().lower()
-            return (s == "") or (s in {"nan", "none"})
-        mask = out["__id"].apply(_need_id)
+        mask = out["__id"].astype(str).str.strip().str.lower().isin(["", "nan", "none", "<na>"])
         if mask.any():
             n = int(mask.sum())
+            out["__id"] = out["__id"].astype("string")
             out.loc[mask, "__id"] = [str(uuid.uuid4()) for _ in range(n)]
 
-    # types
-    out["tgl_register"] = pd.to_datetime(out["tgl_register"], errors="coerce")
-    out["tgl_sidang"]   = pd.to_datetime(out["tgl_sidang"], errors="coerce")
-    out["tgl_sidang_override"] = out["tgl_sidang_override"].apply(
-        lambda x: int(bool(int(str(x)) if str(x).isdigit() else str(x).lower() in {"1","true","y","ya","t"}))
-    )
+    # types (dari store sudah bertipe → to_datetime hanya jalan jika belum datetime)
+    for c in ("tgl_register", "tgl_sidang"):
+        if not pd.api.types.is_datetime64_any_dtype(out[c]):
+            out[c] = pd.to_datetime(out[c], errors="coerce")
+    ovr = out["tgl_sidang_override"]
+    if pd.api.types.is_bool_dtype(ovr) or pd.api.types.is_numeric_dtype(ovr):
+        out["tgl_sidang_override"] = pd.to_numeric(ovr, errors="coerce").fillna(0).astype(bool).astype(int)
+    else:
+        out["tgl_sidang_override"] = ovr.apply(
+            lambda x: int(bool(int(str(x)) if str(x).isdigit() else str(x).lower() in {"1","true","y","ya","t"}))
+        )
     return out
 
-def _export_rekap_csv(df: pd.DataFrame):
+def _write_rekap_base(df: pd.DataFrame, path: Path = rekap_csv_path):
     df2 = _ensure_rekap_schema(df.copy())
     for c in ["tgl_register","tgl_sidang"]:
         df2[c] = pd.to_datetime(df2[c], errors="coerce").dt.date.astype("string")
-    _write_csv(df2, rekap_csv_path)
+    _write_csv(df2, path)
+
+def _export_rekap_csv(df: pd.DataFrame):
+    """Tulis ulang penuh (df sudah berisi base + jurnal) → jurnal dikosongkan."""
+    _write_rekap_base(df, rekap_csv_path)
+    rekap_journal.reset(rekap_csv_path)
+
+def _rekap_rewrite(fn) -> None:
+    """
+    Mode tanpa jurnal: baca rekap terbaru → fn(df) → tulis ulang penuh + kosongkan jurnal dalam SATU
+    lock (mode file: job penulis di bawah path_lock rekap; mode sqlite: transaksi tulis)
+    → dua sesi yang menyimpan bersamaan tidak saling menimpa baris.
+    """
+    def _job():
+        _export_rekap_csv(fn(_ensure_rekap_schema(_read_csv(rekap_csv_path))))
+    if sqlite_backend.enabled():
+        with sqlite_backend.transaction():   # bergabung bila sudah di dalam transaksi (batch)
+            _job()
+        return
+    get_write_coordinator().call(rekap_csv_path, _job)
+
+# ---------- Rekap: tulis via jurnal append-only ----------
+def _rekap_journal_on() -> bool:
+    try:
+        return get_config().rekap_journal
+    except Exception:
+        return True
+
+def _rekap_maybe_compact():
+    try:
+        every = get_config().compact_every
+    except Exception:
+        every = 200
+    rekap_journal.maybe_compact(rekap_csv_path, _read_csv_raw, _write_rekap_base, every=every,
+                                on_compact=_rekap_carry)
+
+def _rekap_carry(ver0: tuple, ver1: tuple):
+    """on_compact: isi rekap tidak berubah → indeks turunan cukup ikut versi baru (dibaca di bawah lock)."""
+    try: get_load_index_store().carry(ver0, ver1)
+    except Exception: pass
+    try: get_stats_store().carry(rekap_csv_path, ver0, ver1)
+    except Exception: pass
+    try: get_summary_store().carry(rekap_csv_path, ver0, ver1)
+    except Exception: pass
+
+# ---------- Indeks beban (dipelihara inkremental saat simpan/edit/hapus) ----------
+def _load_index() -> LoadIndex:
+    """Indeks beban bersama untuk rekap_csv_path (rebuild hanya bila rekap berubah di luar app)."""
+    reg = get_registry()
+    return get_load_index_store().get(reg.rekap_version(rekap_csv_path), lambda: reg.rekap(rekap_csv_path),
+                                      lambda: reg.rekap_version(rekap_csv_path))
+
+def _load_index_apply(ver0: tuple, ver1: tuple, changes: list):
+    """on_commit RekapRepository: (ver0, ver1) dibaca di bawah lock append → pasti bersebelahan."""
+    try:
+        get_load_index_store().apply(ver0, ver1, changes)
+    except Exception:
+        pass
+    try:   # kubus statistik ikut inkremental (rebuild lazy bila tidak sinkron)
+        get_stats_store().apply(rekap_csv_path, ver0, ver1, changes)
+    except Exception:
+        pass
+    try:   # ringkasan harian (halaman Rekap) ikut inkremental; ditulis ke disk di thread latar
+        get_summary_store().apply(rekap_csv_path, ver0, ver1, changes)
+    except Exception:
+        pass
 
-# ===== Row background helpers (zebra striping) =====
-ROW_BG = ("#f9fbff", "#fff9f2")  # biru muda & oranye muda
-def _bg_wrap(html: str, bg: str) -> str:
-    return f"<div style='background:{bg};padding:6px 8px;border-radius:6px'>{html}</div>"
-def _txt_pill(text: str) -> str:
-    t = (text or "-")
-    return f"<span style='font-size:0.95rem'>{t}</span>"
+def _rekap_insert(row: dict) -> str:
+    """Tambah 1 baris rekap (1 entri jurnal, bukan tulis ulang CSV). Return __id."""
+    stg = batch_assign.active()
+    if stg is not None:   # batch: tampung + update indeks beban salinan
+        rid = str(row.get("__id")) if rekap_journal._valid_id(row.get("__id")) else str(uuid.uuid4())
+        stg.rekap_rows.append({**row, "__id": rid})
+        if stg.load_index is not None:
+            stg.load_index.apply_row(row, +1)
+        return rid
+    if not _rekap_journal_on():
+        rid = str(row.get("__id")) if rekap_journal._valid_id(row.get("__id")) else str(uuid.uuid4())
+        _rekap_rewrite(lambda cur: pd.concat([cur, pd.DataFrame([{**row, "__id": rid}])], ignore_index=True))
+        return rid
+    rid = get_rekap_repo(rekap_csv_path).insert(row, on_commit=_load_index_apply)
+    _rekap_maybe_compact()
+    return rid
+
+def _rekap_update(row_id: str, changes: dict):
+    if not _rekap_journal_on():
+        def _apply(base: pd.DataFrame) -> pd.DataFrame:
+            mask = base["__id"].astype(str) == str(row_id)
+            for k, v in changes.items():
+                base.loc[mask, k] = v
+            return base
+        _rekap_rewrite(_apply)
+        return
+    get_rekap_repo(rekap_csv_path).update(row_id, changes, on_commit=_load_index_apply)
+    _rekap_maybe_compact()
+
+def _rekap_delete(row_id: str):
+    if not _rekap_journal_on():
+        _rekap_rewrite(lambda base: base[base["__id"].astype(str) != str(row_id)])
+        return
+    get_rekap_repo(rekap_csv_path).delete(row_id, on_commit=_load_index_apply)
+    _rekap_maybe_compact()
 
 # ---------- [1,5,7,9] DRY utils + rules tanggal ----------
 HEADER_TOKENS = {
@@ -426,33 +402,12 @@ def _is_active_value(v) -> bool:
     try: return float(s) != 0.0
     except: return False
 
-_PREFIX_RX = re.compile(r"^\s*((drs?|dra|prof|ir|apt|h|hj|kh|ust|ustadz|ustadzah)\.?\s+)+", flags=re.IGNORECASE)
-_SUFFIX_PATTERNS = [
-    r"s\.?\s*h\.?", r"s\.?\s*h\.?\s*i\.?", r"m\.?\s*h\.?", r"m\.?\s*h\.?\s*i\.?",
-    r"s\.?\s*ag", r"m\.?\s*ag", r"m\.?\s*kn", r"m\.?\s*hum", r"s\.?\s*kom",
-    r"s\.?\s*psi", r"s\.?\s*e", r"m\.?\s*m", r"m\.?\s*a", r"llb", r"llm",
-    r"phd", r"se", r"ssi", r"sh", r"mh"
-]
-_SUFFIX_RX = re.compile(r"(,?\s+(" + r"|".join(_SUFFIX_PATTERNS) + r"))+$", flags=re.IGNORECASE)
-
-def _clean_text(s: str) -> str:
-    x = str(s or "").replace("\u00A0", " ").strip()
-    x = x.replace(" ,", ",").replace(" .", ".")
-    x = re.sub(r"\s+", " ", x).strip()
-    return x
-
-def _name_key(s: str) -> str:
-    if not isinstance(s, str): return ""
-    x = _clean_text(s).replace(",", " ")
-    x = _SUFFIX_RX.sub("", x)
-    x = _PREFIX_RX.sub("", x)
-    x = re.sub(r"[^\w\s]", " ", x)
-    x = re.sub(r"\s+", " ", x).strip().lower()
-    toks = [t for t in x.split() if t not in {"s","h","m","e"}]
-    return " ".join(toks)
+# normalisasi nama: satu definisi bersama (memo per string) di app_core/name_index.py
+_clean_text = clean_text
+_name_key = name_key
 
 def _tokset(s: str) -> set[str]:
-    return set([t for t in _name_key(s).split() if t])
+    return set(name_tokens(s))
 
 def _majelis_rank(s: str) -> int:
     m = re.search(r"(\d+)", str(s))
@@ -487,6 +442,10 @@ def _options_from_master(df: pd.DataFrame, prefer_active=True) -> list[str]:
             seen.add(n); out.append(n)
     return out
 
+def _master_options(name: str) -> list[str]:
+    """_options_from_master untuk tabel DataContext (D.pp / D.js), dimemo per versi tabel."""
+    return list(D.derive(name, "options", _options_from_master))
+
 def _weekday_num_from(hari_text: str) -> int:
     try: return int(HARI_MAP.get(str(hari_text), 0))
     except: return 0
@@ -499,32 +458,26 @@ DATE_RULES = {
     "MAFQUD": {"start": 246},
 }
 
+# kalender libur → tabel lookup numpy (app_core.court_calendar), dibangun sekali per set libur
 def _next_judge_day_strict(start_date: date, hari_sidang_num: int, libur_set: set[str]) -> date:
-    if not isinstance(start_date, (date, datetime)) or not hari_sidang_num:
-        return start_date
-    target_py = (hari_sidang_num - 1) % 7  # Mon=0..Sun=6
-    d0 = start_date if isinstance(start_date, date) else start_date.date()
-    for i in range(0, 120):
-        d = d0 + timedelta(days=i)
-        if d.weekday() != target_py: continue
-        if str(d) in libur_set: continue
-        return d
-    return d0
+    return court_calendar.get_calendar(libur_set).next_judge_day(start_date, hari_sidang_num)
 
 def _compute_tgl_sidang(base: date, jenis: str, hari_sidang_num: int, libur_set: set[str], klasifikasi: str = "") -> date:
-    J = str(jenis).strip().upper()
-    K = str(klasifikasi).strip().upper()
-    rule = DATE_RULES.get(J)
-    if not rule: return base
-    start = rule.get("start", 0)
-    if J == "GHOIB" and "special_klas" in rule:
-        start = rule["special_klas"].get(K, start)
-    start_d = base + timedelta(days=start)
-    if "end_cap" in rule:
-        end_cap = base + timedelta(days=rule["end_cap"])
-        d = _next_judge_day_strict(start_d, hari_sidang_num, libur_set)
-        return d if d <= end_cap else _next_judge_day_strict(end_cap, hari_sidang_num, libur_set)
-    return _next_judge_day_strict(start_d, hari_sidang_num, libur_set)
+    return court_calendar.compute_tgl_sidang(base, jenis, hari_sidang_num, libur_set, klasifikasi, rules=DATE_RULES)
+
+def _rencana_many(names: pd.Series, base, jenis: str, klasifikasi: str, libur_set: set[str]) -> pd.Series:
+    """Rencana tgl sidang untuk banyak hakim sekaligus (None bila hari sidang tidak terdata)."""
+    names = pd.Series(names)
+    if names.empty:
+        return pd.Series([], index=names.index, dtype=object)
+    base_d = base if isinstance(base, (datetime, date)) else date.today()
+    base_d = base_d.date() if isinstance(base_d, datetime) else base_d
+    hnum = names.map(_hari_sidang_num_for).fillna(0).astype(int)
+    d = court_calendar.compute_tgl_sidang_many([base_d] * len(names), jenis, hnum.to_numpy(), klasifikasi,
+                                               libur_set, rules=DATE_RULES)
+    out = pd.Series(pd.to_datetime(d), index=names.index, dtype=object)
+    out[(hnum == 0).to_numpy()] = None
+    return out
 
 # ---------- Beban berbobot (window + decay) ----------
 def _weighted_load_counts(
@@ -534,76 +487,42 @@ def _weighted_load_counts(
     half_life_days: int = 30,
     min_weight: float = 0.05,
     use_decay: bool = True,   # <-- baru: mode uniform bila False
+    index: LoadIndex | None = None,
 ) -> dict[str, float]:
     """
     Jika use_decay=True:
       weight = 0.5 ** (age_days / half_life_days)  (hanya jika age_days <= window_days)
     Jika use_decay=False:
       weight = 1.0 untuk semua perkara yang jatuh di window.
+    Dihitung dari indeks beban (O(hakim × window)), bukan scan rekap_df;
+    index=None → indeks bersama rekap_csv_path (rekap_df dipertahankan untuk kompatibilitas).
     """
-    if rekap_df is None or rekap_df.empty:
-        return {}
-
-    r = rekap_df.copy()
-    r["hakim_clean"] = r["hakim"].astype(str).str.strip()
-    r = r[r["hakim_clean"] != ""]
-    r["tgl_register"] = pd.to_datetime(r["tgl_register"], errors="coerce")
-    r = r[r["tgl_register"].notna()]
-    if r.empty:
-        return {}
-
-    now_dt = pd.to_datetime(now_date).normalize()
-    r["age_days"] = (now_dt - r["tgl_register"].dt.normalize()).dt.days.clip(lower=0)
-    r = r[r["age_days"] <= int(window_days)]
-    if r.empty:
+    if index is None and (rekap_df is None or rekap_df.empty):
         return {}
+    idx = index if index is not None else _load_index()
+    return idx.weighted_loads(now_date, window_days=int(window_days), half_life_days=int(half_life_days),
+                              min_weight=float(min_weight), use_decay=bool(use_decay))
 
-    if use_decay:
-        r["weight"] = (0.5 ** (r["age_days"] / float(half_life_days))).astype(float)
-    else:
-        r["weight"] = 1.0  # <-- semua sama
-
-    if min_weight > 0:
-        r = r[r["weight"] >= float(min_weight)]
-        if r.empty:
-            return {}
-
-    wsum = r.groupby("hakim_clean")["weight"].sum()
-    return wsum.to_dict()
 
-
-def _last_seen_days_for(nm: str, rekap_df: pd.DataFrame, now_date) -> int:
-    if rekap_df is None or rekap_df.empty:
-        return 9999
-    r2 = rekap_df[rekap_df["hakim"].astype(str).str.strip().str.lower() == str(nm).strip().lower()].copy()
-    if r2.empty:
+def _last_seen_days_for(nm: str, rekap_df: pd.DataFrame, now_date, index: LoadIndex | None = None) -> int:
+    if index is None and (rekap_df is None or rekap_df.empty):
         return 9999
-    r2["tgl_register"] = pd.to_datetime(r2["tgl_register"], errors="coerce")
-    r2 = r2[r2["tgl_register"].notna()]
-    if r2.empty:
-        return 9999
-    last_dt = r2["tgl_register"].max().normalize()
-    now_dt = pd.to_datetime(now_date).normalize()
-    return int((now_dt - last_dt).days)
-
-# pre-index hakim_df (di-set setelah load)
-_hakim_index_cache = None
-_hakim_df_ref = None
-def _set_hakim_df(df: pd.DataFrame):
-    global _hakim_df_ref, _hakim_index_cache
-    _hakim_df_ref = df.copy() if isinstance(df, pd.DataFrame) else None
-    _hakim_index_cache = None
+    idx = index if index is not None else _load_index()
+    return idx.last_seen_days(nm, now_date)
+
+# pre-index hakim_df (dimemo per versi hakim_df di DataContext)
+def _hakim_by_nama(df: pd.DataFrame) -> pd.DataFrame | None:
+    if df is None or df.empty or "nama" not in df.columns:
+        return None
+    return df.set_index("nama")
 def _hakim_index():
-    global _hakim_index_cache
-    if _hakim_index_cache is None and _hakim_df_ref is not None and not _hakim_df_ref.empty and "nama" in _hakim_df_ref.columns:
-        _hakim_index_cache = _hakim_df_ref.set_index("nama")
-    return _hakim_index_cache
+    return D.derive("hakim", "by_nama", _hakim_by_nama)
 def _hari_sidang_num_for(nama_hakim: str) -> int:
     try:
         idx = _hakim_index()
         if idx is None: return 0
         row = idx.loc[nama_hakim]
-        hari_text = str(row["hari_sidang"] if "hari_sidang" in _hakim_df_ref.columns else row.get("hari",""))
+        hari_text = str(row["hari_sidang"] if "hari_sidang" in idx.columns else row.get("hari",""))
         return _weekday_num_from(hari_text)
     except:
         return 0
@@ -612,24 +531,46 @@ def _hari_sidang_num_for(nama_hakim: str) -> int:
 def K(ns: str, name: str) -> str:
     return f"{ns}::{name}"
 
-# ---------- Cooldown (persist di _RR_JSON) ----------
+# ---------- Cooldown (persist di StateStore namespace "rr"; dulu _RR_JSON) ----------
+# Lookup rotasi/cooldown/streak = hit cache proses; simpan = delta baris (CAS berversi).
+# _RR_JSON hanya mirror berkala untuk backup (diimpor ulang bila dipulihkan).
+_RR_NS = "rr"
+
+def _rr_sig():
+    return ("state", _RR_NS, get_state_store().version(_RR_NS))
 def _rr_load():
-    if _RR_JSON.exists():
-        try: return json.loads(_RR_JSON.read_text(encoding="utf-8"))
-        except Exception: return {}
-    return {}
+    stg = batch_assign.active()
+    if stg is not None:
+        return stg.doc_get(_RR_JSON, _rr_load_file, _rr_save_file, sig_fn=_rr_sig)
+    return _rr_load_file()
+def _rr_load_file():
+    return get_state_store().doc(_RR_NS)
 def _rr_save(obj):
-    _RR_JSON.parent.mkdir(parents=True, exist_ok=True)
-    _RR_JSON.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
-    # backup rrpair_token.json
-    _backup_snapshot(_RR_JSON)
+    stg = batch_assign.active()
+    if stg is not None:
+        stg.doc_put(_RR_JSON, obj, _rr_save_file, sig_fn=_rr_sig)
+        return
+    _rr_save_file(obj)
+def _rr_save_file(obj):
+    get_state_store().replace(_RR_NS, obj)   # hanya kunci yang berubah yang ditulis
+def _rr_get(key: str, default=None):
+    """Nilai satu kunci rotasi/cooldown (batch: salinan kerja; selain itu hit cache store)."""
+    if batch_assign.active() is not None:
+        return _rr_load().get(key, default)
+    return get_state_store().get(_RR_NS, key, default)
+def _rr_update(fn):
+    """Ubah dokumen rotasi terhadap isi terbaru; batch → salinan kerja."""
+    if batch_assign.active() is not None:
+        obj = _rr_load() or {}
+        _rr_save(fn(obj) or obj)
+        return
+    get_state_store().update(_RR_NS, fn)
 
 def _cool_key(nama: str) -> str:
     return f"cooldown::{_name_key(nama)}"
 
 def _cool_load_date(nama: str):
-    obj = _rr_load()
-    item = obj.get(_cool_key(nama), {})
+    item = _rr_get(_cool_key(nama), {}) or {}
     d = item.get("last_pick")  # "YYYY-MM-DD"
     try:
         return pd.to_datetime(d).normalize().date() if d else None
@@ -637,22 +578,16 @@ def _cool_load_date(nama: str):
         return None
 
 def _cool_save_date(nama: str, day: date):
-    obj = _rr_load()
-    obj[_cool_key(nama)] = {"last_pick": str(pd.to_datetime(day).normalize().date())}
-    _rr_save(obj)
+    val = {"last_pick": str(pd.to_datetime(day).normalize().date())}
+    _rr_update(lambda obj: {**obj, _cool_key(nama): val})
 
 # ====== Cooldown helpers: reset, τ decision (relatif), dan streak cap ======
 def _cool_reset_all():
-    """Hapus semua cooldown::<...> dan reset streak harian di rrpair_token.json."""
-    obj = _rr_load() or {}
-    # hapus semua kunci cooldown::<...>
-    for k in list(obj.keys()):
-        if k.startswith("cooldown::"):
-            obj.pop(k, None)
-    # reset streak map (per hari)
-    if "streak" in obj:
-        obj.pop("streak", None)
-    _rr_save(obj)
+    """Hapus semua cooldown::<...> dan reset streak harian di store rotasi."""
+    def _reset(obj):
+        # hapus semua kunci cooldown::<...> + reset streak map (per hari)
+        return {k: v for k, v in obj.items() if not k.startswith("cooldown::") and k != "streak"}
+    _rr_update(_reset)
 
 def _elastic_should_cooldown(
     chosen_name: str,
@@ -701,29 +636,25 @@ def _streak_force_cooldown_on_save(chosen_name: str, day: date, cap: int) -> boo
     Struktur: obj["streak"][YYYY-MM-DD] = {"last": name, "count": n}
     """
     try:
-        obj = _rr_load() or {}
         dkey = str(pd.to_datetime(day).normalize().date())
-        st_map = obj.get("streak", {})
-        cur = st_map.get(dkey, {"last": "", "count": 0})
-
-
-        last = str(cur.get("last", "")).strip()
-        cnt = int(cur.get("count", 0))
-
-
-        if _name_key(last) == _name_key(chosen_name):
-            cnt += 1
-        else:
-            last = chosen_name
-            cnt = 1
-
-
-        st_map[dkey] = {"last": last, "count": cnt}
-        obj["streak"] = st_map
-        _rr_save(obj)
-
-
-        return cnt >= int(cap)
+        res = {}
+
+        def _bump(obj):
+            st_map = obj.setdefault("streak", {})
+            cur = st_map.get(dkey, {"last": "", "count": 0})
+            last = str(cur.get("last", "")).strip()
+            cnt = int(cur.get("count", 0))
+            if _name_key(last) == _name_key(chosen_name):
+                cnt += 1
+            else:
+                last = chosen_name
+                cnt = 1
+            st_map[dkey] = {"last": last, "count": cnt}   # hanya baris streak hari ini yang ditulis
+            res["cnt"] = cnt
+            return obj
+
+        _rr_update(_bump)
+        return res.get("cnt", 0) >= int(cap)
     except Exception:
         return False
 
@@ -733,18 +664,24 @@ def _streak_force_cooldown_on_save(chosen_name: str, day: date, cap: int) -> boo
 
 
 # ====================== LOAD MASTER CSVs ====================
-hakim_df = _read_csv(DATA_DIR / "hakim_df.csv")
-pp_df    = _read_csv(DATA_DIR / "pp_df.csv")
-js_df    = _read_csv(DATA_DIR / "js_df.csv")
-
-libur_df = _read_csv(DATA_DIR / "libur.csv")
-if not libur_df.empty:
-    cand = None
-    for c in ["tanggal","tgl","date","hari_libur"]:
-        if c in libur_df.columns:
-            cand = c; break
+# Lazy (app_core/data_context.py): tabel baru dibaca + dinormalisasi saat pertama dipakai,
+# lalu dimemo per versi file → rerun karena widget tidak mengulang parse/normalisasi.
+# Akses: D.hakim, D.pp, D.js, D.libur, D.sk, D.rekap.
+def _master_table(path: Path):
+    """(version_fn, loader) tabel master lewat TableRegistry."""
+    return (lambda: table_version(path)), (lambda: get_registry().table(path))
+
+def _normalize_libur(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    cand = next((c for c in ["tanggal","tgl","date","hari_libur"] if c in df.columns), None)
     if cand and cand != "tanggal":
-        libur_df = libur_df.rename(columns={cand:"tanggal"})
+        df = df.rename(columns={cand:"tanggal"})
+    return df
+
+def _hakim_name_index():
+    """NameIndex master hakim (nama + alias); dibangun ulang hanya bila versi hakim_df berubah."""
+    return D.derive("hakim", "name_index", index_for)
 
 def _standardize_cols(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty: return pd.DataFrame()
@@ -771,51 +708,69 @@ def _standardize_cols(df: pd.DataFrame) -> pd.DataFrame:
             out[c] = out[c].astype(str).map(_clean_text)
     return out
 
-def _load_sk_csv_only() -> tuple[pd.DataFrame, str]:
-    candidates = [DATA_DIR / "sk_df.csv", DATA_DIR / "sk_majelis.csv", DATA_DIR / "sk.csv"]
-    if DATA_DIR.exists():
-        for p in DATA_DIR.glob("*.csv"):
-            if "sk" in p.name.lower() and p not in candidates:
-                candidates.append(p)
-    for p in candidates:
-        df = _standardize_cols(_read_csv(p))
+def _sk_candidates() -> tuple[Path, ...]:
+    """File SK kandidat; glob data/ hanya diulang bila isi direktori berubah."""
+    def _scan():
+        candidates = [DATA_DIR / "sk_df.csv", DATA_DIR / "sk_majelis.csv", DATA_DIR / "sk.csv"]
+        if DATA_DIR.exists():
+            for p in sorted(DATA_DIR.glob("*.csv")):
+                if "sk" in p.name.lower() and p not in candidates:
+                    candidates.append(p)
+        return tuple(candidates)
+    return get_data_context_store().get(("input", "_sk_glob"), dir_version(DATA_DIR), _scan)
+
+def _load_sk_csv_only() -> pd.DataFrame:
+    """SK pertama yang punya kolom ketua; sumbernya di attrs["src"]."""
+    for p in _sk_candidates():
+        df = _standardize_cols(get_registry().table(p))
         if not df.empty and "ketua" in df.columns:
-            return df, f"CSV: {p.as_posix()}"
-    return pd.DataFrame(), "CSV (tidak ada)"
+            df.attrs["src"] = f"CSV: {p.as_posix()}"
+            return df
+    out = pd.DataFrame()
+    out.attrs["src"] = "CSV (tidak ada)"
+    return out
 
-sk_df, sk_src = _load_sk_csv_only()
-rekap_df = _ensure_rekap_schema(_read_csv(rekap_csv_path))
+def _data_context() -> DataContext:
+    ctx = DataContext("input")
+    for name, fname in (("hakim", "hakim_df.csv"), ("pp", "pp_df.csv"), ("js", "js_df.csv")):
+        ctx.define(name, *_master_table(DATA_DIR / fname))
+    libur_ver, libur_load = _master_table(DATA_DIR / "libur.csv")
+    ctx.define("libur", libur_ver, lambda: _normalize_libur(libur_load()))
+    ctx.define("sk", lambda: tuple(table_version(p) for p in _sk_candidates()), _load_sk_csv_only)
+    ctx.define("rekap", lambda: get_registry().rekap_version(rekap_csv_path),
+               lambda: _ensure_rekap_schema(get_registry().rekap(rekap_csv_path)))
+    return ctx
 
-hakim_src = "CSV: data/hakim_df.csv" if not hakim_df.empty else "CSV (kosong)"
-pp_src    = "CSV: data/pp_df.csv"    if not pp_df.empty    else "CSV (kosong)"
-js_src    = "CSV: data/js_df.csv"    if not js_df.empty    else "CSV (kosong)"
-libur_src = "CSV: data/libur.csv"    if not libur_df.empty else "CSV (kosong)"
-rekap_src = "CSV: data/rekap.csv"    if not rekap_df.empty else "CSV (kosong)"
+D = _data_context()
 
 with st.expander("🗂️ Sumber data",expanded=False):
+    def _src(df: pd.DataFrame, label: str) -> str:
+        return f"CSV: {label}" if not df.empty else "CSV (kosong)"
     st.caption(
     "🗂️ Sumber data → "
-    f"**SK**: {sk_src} • "
-    f"**Hakim**: {hakim_src} • "
-    f"**PP**: {pp_src} • "
-    f"**JS**: {js_src} • "
-    f"**Libur**: {libur_src} • "
-    f"**Rekap**: {rekap_src}"
+    f"**SK**: {D.sk.attrs.get('src', 'CSV (tidak ada)')} • "
+    f"**Hakim**: {_src(D.hakim, 'data/hakim_df.csv')} • "
+    f"**PP**: {_src(D.pp, 'data/pp_df.csv')} • "
+    f"**JS**: {_src(D.js, 'data/js_df.csv')} • "
+    f"**Libur**: {_src(D.libur, 'data/libur.csv')} • "
+    f"**Rekap**: {_src(D.rekap, 'data/rekap.csv')}"
     )
 
-# set indexer cache untuk hakim
-_set_hakim_df(hakim_df)
-
 # --- helper ambil jabatan dari master hakim_df ---
 _JBTN_COLS = ["jabatan", "posisi", "role", "status_jabatan"]  # sesuaikan kolom di hakim_df.csv
+def _mask_jabatan_khusus(jabatan: pd.Series) -> pd.Series:
+    """True untuk jabatan khusus (regex config, sudah dikompilasi case-insensitive di AppConfig)."""
+    return jabatan.astype(str).str.contains(get_config().exclude_jabatan_re, na=False)
+
 def _get_jabatan_for(nama: str) -> str:
     try:
-        if not isinstance(hakim_df, pd.DataFrame) or hakim_df.empty or "nama" not in hakim_df.columns:
+        idx = _hakim_index()
+        if idx is None:
             return ""
-        jcol = next((c for c in _JBTN_COLS if c in hakim_df.columns), None)
+        jcol = next((c for c in _JBTN_COLS if c in idx.columns), None)
         if not jcol:
             return ""
-        return str(hakim_df.set_index("nama").loc[nama, jcol])
+        return str(idx.loc[nama, jcol])
     except Exception:
         return ""
 
@@ -861,14 +816,25 @@ def _load_cuti_df(mtime: float | None = None) -> pd.DataFrame:
     df["_nama_norm"] = df["nama"].map(_name_key)
     return df[["nama","mulai","akhir","_nama_norm"]]
 
-def _is_hakim_cuti(nama: str, tanggal: pd.Timestamp, cuti_df: pd.DataFrame) -> bool:
+def _cuti_index():
+    """
+    Indeks interval cuti bersama (app_core.cuti_index), dibangun sekali per versi cuti_hakim.csv.
+    Kunci nama lewat indeks master hakim → cuti yang ditulis dengan alias tetap terbaca.
+    """
+    mt = _cuti_mtime()
+    return get_cuti_index_store().get(mt, _hakim_name_index(), lambda: _load_cuti_df(mt))
+
+def _is_hakim_cuti(nama: str, tanggal: pd.Timestamp) -> bool:
     """True jika 'nama' cuti pada 'tanggal' (inklusif)."""
-    if not nama or cuti_df is None or cuti_df.empty or tanggal is None:
-        return False
-    t = pd.to_datetime(tanggal).normalize()
-    nn = _name_key(nama)
-    sub = cuti_df[cuti_df["_nama_norm"] == nn]
-    return bool(((sub["mulai"] <= t) & (t <= sub["akhir"])).any())
+    return _cuti_index().on_leave(nama, tanggal)
+
+def _cuti_mask(names: pd.Series, *dates) -> np.ndarray:
+    """Vektor: True bila names[i] cuti pada salah satu tanggal (skalar atau kolom sejajar names)."""
+    idx = _cuti_index()
+    out = np.zeros(len(names), dtype=bool)
+    for d in dates:
+        out |= idx.is_on_leave(names, d)
+    return out
 
 # ================== JS Ghoib (csv) =====================
 def _load_js_ghoib_csv() -> pd.DataFrame:
@@ -916,37 +882,40 @@ def _choose_js_ghoib_db(rekap_df: pd.DataFrame, use_aktif: bool = True) -> str:
             nm = str(cand.iloc[0]["nama"]).strip()
             return "" if _is_header_like(nm) else nm
 
-    if isinstance(js_df, pd.DataFrame) and not js_df.empty:
-        name_col = next((c for c in ["nama","js","Nama","NAMA"] if c in js_df.columns), None)
+    if isinstance(D.js, pd.DataFrame) and not D.js.empty:
+        name_col = next((c for c in ["nama","js","Nama","NAMA"] if c in D.js.columns), None)
         if name_col:
-            tmp = js_df[[name_col]].copy()
+            tmp = D.js[[name_col]].copy()
             tmp[name_col] = tmp[name_col].astype(str).map(lambda s: s.strip())
             tmp = tmp[~tmp[name_col].map(_is_header_like)]
-            if "aktif" in js_df.columns and use_aktif:
-                js_df["_aktif__"] = js_df["aktif"].apply(_is_active_value)
-                tmp = tmp.join(js_df["_aktif__"])
+            if "aktif" in D.js.columns and use_aktif:
+                D.js["_aktif__"] = D.js["aktif"].apply(_is_active_value)
+                tmp = tmp.join(D.js["_aktif__"])
                 tmp = tmp[tmp["_aktif__"] == True]
             names = sorted(tmp[name_col].dropna().unique().tolist())
             if names:
                 return names[0]
 
-    if isinstance(rekap_df, pd.DataFrame) and not rekap_df.empty and all(c in rekap_df.columns for c in ["js","jenis_perkara"]):
-        r = rekap_df.copy()
-        r["jenis_u"] = r["jenis_perkara"].astype(str).str.upper().str.strip()
-        r = r[r["jenis_u"] == "GHOIB"]
-        r["js_clean"] = r["js"].astype(str).map(lambda s: s.strip())
-        r = r[~r["js_clean"].map(_is_header_like)]
-        if not r.empty:
-            counts = r["js_clean"].str.lower().value_counts().to_dict()
-            names = sorted(set(r["js_clean"].tolist()))
-            best = sorted(names, key=lambda nm: (counts.get(nm.lower(), 0), nm.lower()))[0]
-            return best
+    # fallback terakhir: JS dengan beban GHOIB terkecil menurut kubus statistik rekap
+    q = rekap_cube(rekap_csv_path).query("js", ("person",), jenis="GHOIB")
+    q = q[[bool(nm) and not _is_header_like(nm) for nm in q.index.astype(str)]]
+    if len(q):
+        counts: dict[str, int] = {}
+        for nm, n in q.items():
+            counts[nm.lower()] = counts.get(nm.lower(), 0) + int(n)
+        return sorted(q.index.astype(str), key=lambda nm: (counts.get(nm.lower(), 0), nm.lower()))[0]
     return ""
 
 def _bump_js_ghoib(name: str, delta: int = 1):
-    """Aman menambah/mengurangi jml_ghoib (atomic write)."""
+    """Aman menambah/mengurangi jml_ghoib (read-modify-write atomik lewat penulis tunggal)."""
     p = DATA_DIR / "js_ghoib.csv"
-    df = _read_csv(p)
+    if batch_assign.active() is not None:
+        _write_csv(_bump_js_ghoib_df(_read_csv(p), name, delta), p)
+        return
+    _update_csv(p, lambda df: _bump_js_ghoib_df(df, name, delta))
+
+def _bump_js_ghoib_df(df: pd.DataFrame, name: str, delta: int) -> pd.DataFrame:
+    df = df.copy()
     name_col = next((c for c in df.columns if "nama" in c.lower()), "nama") if not df.empty else "nama"
     cnt_col  = next((c for c in df.columns if ("ghoib" in c.lower()) or (c.lower() in {"jml","jumlah"})), "jml_ghoib") if not df.empty else "jml_ghoib"
     if df.empty:
@@ -959,40 +928,37 @@ def _bump_js_ghoib(name: str, delta: int = 1):
             df = pd.concat([df, pd.DataFrame([{name_col: name, cnt_col: max(0, delta), "aktif": 1}])], ignore_index=True)
         else:
             df.loc[m, cnt_col] = pd.to_numeric(df.loc[m, cnt_col], errors="coerce").fillna(0) + delta
-    _write_csv(df, p)
+    return df
 
 # ================== ROTASI via JSON ========================
 def _rr_key_per_ketua(ketua: str) -> str:
     norm = re.sub(r"[^a-z0-9]+", "-", _name_key(ketua)).strip("-")
     return f"rrpair::per_ketua::{norm or 'unknown'}"
 def _rr_get_idx(rrkey: str) -> int:
-    obj = _rr_load()
-    try: return int(obj.get(rrkey, {}).get("idx", 0))
+    try: return int((_rr_get(rrkey, {}) or {}).get("idx", 0))
     except Exception: return 0
 def _rr_set_idx(rrkey: str, idx: int, meta: dict | None = None):
-    obj = _rr_load()
-    obj[rrkey] = {"idx": int(idx), "meta": (meta or {})}
-    _RR_JSON.parent.mkdir(parents=True, exist_ok=True)
-    _rr_save(obj)
+    val = {"idx": int(idx), "meta": (meta or {})}
+    # ubah satu kunci terhadap isi terbaru → rotasi ketua lain (sesi lain) tidak tertimpa
+    _rr_update(lambda obj: {**obj, rrkey: val})
 
 # ================== PICK KETUA & SK ========================
+def _sk_ketua_index(sk: pd.DataFrame):
+    df = _standardize_cols(sk).reset_index(drop=True)
+    return df, (index_for(df, "ketua", None) if "ketua" in df.columns else None)
+
 def _best_sk_row_for_ketua(sk: pd.DataFrame, ketua: str) -> pd.Series | None:
     if sk is None or sk.empty or not ketua: return None
-    df = _standardize_cols(sk)
-    if "ketua" not in df.columns: return None
-    df["__ketua_key"] = df["ketua"].astype(str).map(_name_key)
-    df["__ketua_tok"] = df["__ketua_key"].map(lambda s: set(s.split()))
-    target = _tokset(ketua)
-    if not target: return None
-    cand = df[df["__ketua_tok"].apply(lambda s: len(s & target) > 0)].copy()
-    if cand.empty:
-        key = _name_key(ketua)
-        cand = df[df["__ketua_key"] == key].copy()
-        if cand.empty:
-            return None
-    cand["__overlap"] = cand["__ketua_tok"].apply(lambda s: len(s & target))
-    cand["__aktif"] = df.get("aktif", pd.Series([True]*len(df))).apply(_is_active_value) if "aktif" in df.columns else True
-    cand["__rank"] = df.get("majelis", pd.Series([""]*len(df))).astype(str).map(_majelis_rank) if "majelis" in df.columns else 10**9
+    # SK halaman (D.sk): standarisasi + indeks token ketua dimemo per versi SK
+    df, idx = D.derive("sk", "ketua_index", _sk_ketua_index) if sk is D.sk else _sk_ketua_index(sk)
+    if idx is None: return None
+    # kandidat = baris yang berbagi token dengan nama ketua
+    hits = idx.candidates(ketua)
+    if not hits: return None
+    cand = df.iloc[sorted(hits)].copy()
+    cand["__overlap"] = [hits[p] for p in sorted(hits)]
+    cand["__aktif"] = cand["aktif"].apply(_is_active_value) if "aktif" in cand.columns else True
+    cand["__rank"] = cand["majelis"].astype(str).map(_majelis_rank) if "majelis" in cand.columns else 10**9
     cand = cand.sort_values(["__aktif","__overlap","__rank"], ascending=[False, False, True], kind="stable")
     return cand.iloc[0]
 
@@ -1002,33 +968,16 @@ def _pick_ketua_by_beban(
     tgl_register_input,          # datetime.date
     jenis: str,                  # "Biasa"/"ISTBAT"/"GHOIB"/...
     klasifikasi: str,            # klas_final
-    libur_df: pd.DataFrame
+    libur_df: pd.DataFrame,
+    load_index: LoadIndex | None = None,   # None → indeks bersama (simulasi batch memakai salinan)
 ) -> tuple[str, pd.Series | None]:
     """Pilih ketua otomatis sesuai aturan + beban rekap (window+decay) + exclude cuti + cooldown."""
     if hakim_df is None or hakim_df.empty or "nama" not in hakim_df.columns:
         return "", None
 
-    cfg = get_config()
-    # jaga-jaga kalau config lama belum punya section "beban"
-    if "beban" not in cfg or not isinstance(cfg["beban"], dict):
-        cfg["beban"] = _DEFAULT_CONFIG["beban"].copy()
-    special_re = cfg.get("hakim", {}).get("exclude_jabatan_regex", r"\b(ketua|wakil)\b")
+    cfg = get_config()   # section "beban" selalu lengkap (validate_cfg)
     libur_set = _libur_set_from_df(libur_df)
 
-    def _rencana_tgl_sidang(nama_hakim: str):
-        hnum = _hari_sidang_num_for(nama_hakim)
-        if hnum == 0:
-            return None
-        base_d = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
-        d = _compute_tgl_sidang(
-            base=base_d if isinstance(base_d, date) else base_d.date(),
-            jenis=jenis,
-            hari_sidang_num=hnum,
-            libur_set=libur_set,
-            klasifikasi=klasifikasi
-        )
-        return pd.to_datetime(d) if d else None
-
     df = hakim_df.copy()
     df["__aktif"] = df.get("aktif", 1).apply(_is_active_value)
     df = df[df["__aktif"] == True]
@@ -1037,25 +986,19 @@ def _pick_ketua_by_beban(
 
     jcol = next((c for c in _JBTN_COLS if c in df.columns), None)
     if jcol:
-        mask_spesial = df[jcol].astype(str).str.contains(special_re, case=False, regex=True, na=False)
-        df = df[~mask_spesial]
+        df = df[~_mask_jabatan_khusus(df[jcol])]
     if df.empty:
         return "", None
 
     df["__nama"] = df["nama"].astype(str).map(str.strip)
-    df["__rencana"] = df["__nama"].map(_rencana_tgl_sidang)
+    df["__rencana"] = _rencana_many(df["__nama"], tgl_register_input, jenis, klasifikasi, libur_set)
     df = df[df["__rencana"].notna()]
     if df.empty:
         return "", None
 
     # exclude CUTI hari ini dan pada tanggal rencana
-    cuti_df = _load_cuti_df(_cuti_mtime())
-    if not cuti_df.empty:
-        today_pd = pd.to_datetime(date.today()).normalize()
-        df = df[~df.apply(
-            lambda r: (_is_hakim_cuti(r["__nama"], r["__rencana"], cuti_df) or _is_hakim_cuti(r["__nama"], today_pd, cuti_df)),
-            axis=1
-        )]
+    today_pd = pd.to_datetime(date.today()).normalize()
+    df = df[~_cuti_mask(df["__nama"], df["__rencana"], today_pd)]
     if df.empty:
         return "", None
 
@@ -1063,14 +1006,15 @@ def _pick_ketua_by_beban(
     # beban berbobot
     now_for_load = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
     dyn_window = _window_days_last_prev_to_today(now_for_load)
-    bcfg = cfg.get("beban", {})
+    lidx = load_index if load_index is not None else _load_index()
     counts = _weighted_load_counts(
         rekap_df=rekap_df,
         now_date=now_for_load,
         window_days=int(dyn_window), 
-        half_life_days=int(bcfg.get("half_life_days", 30)),
-        min_weight=float(bcfg.get("min_weight", 0.05)),
-        use_decay=bool(bcfg.get("use_decay", True)),
+        half_life_days=cfg.half_life_days,
+        min_weight=cfg.min_weight,
+        use_decay=cfg.use_decay,
+        index=lidx,
     )
     df["__load"] = df["__nama"].map(lambda n: float(counts.get(n, 0.0)))
 
@@ -1097,21 +1041,8 @@ def _pick_ketua_by_beban(
                 df.loc[m, "__load"] = df.loc[m, "__load"] + float(bonus)
 
     # ===== Grace: kurangi beban 0.30 untuk hakim yang first_seen <= 60 hari =====
-    def _first_seen_days(nm: str) -> int:
-        if rekap_df is None or rekap_df.empty:
-            return 9999
-        r2 = rekap_df[rekap_df["hakim"].astype(str).str.strip().str.lower() == str(nm).strip().lower()].copy()
-        if r2.empty:
-            return 9999
-        r2["tgl_register"] = pd.to_datetime(r2["tgl_register"], errors="coerce")
-        r2 = r2[r2["tgl_register"].notna()]
-        if r2.empty:
-            return 9999
-        first_dt = r2["tgl_register"].min().normalize()
-        now_dt = pd.to_datetime(now_for_load).normalize()
-        return int((now_dt - first_dt).days)
-
-    df["__first_seen_days"] = df["__nama"].map(_first_seen_days)
+    seen = lidx.seen_days_many(df["__nama"], now_for_load)
+    df["__first_seen_days"] = seen["first_seen_days"].to_numpy()
     mask_grace = df["__first_seen_days"] <= 90
     if mask_grace.any():
         df.loc[mask_grace, "__load"] = (df.loc[mask_grace, "__load"] - 0.30).clip(lower=0.0)
@@ -1119,10 +1050,10 @@ def _pick_ketua_by_beban(
     # opsional: rapikan batas bawah untuk semua baris
     df["__load"] = df["__load"].clip(lower=0.0)
 
-    df = df[~df["__nama"].map(_cool_v2_is_active)]
+    df = df[~df["__nama"].isin(_cool_v2_active_names())]
     non_cd_count = int(len(df))  # dipakai buat _elastic_ctx di bawah
     # Jika kandidat habis karena cooldown -> reset cooldown lalu rebuild kandidat sekali lagi
-    if df.empty and int(get_config().get("hakim", {}).get("cooldown_days", 0) or 0) > 0:
+    if df.empty and cfg.cooldown_days > 0:
         # 1) reset cooldown (pakai token v2 kalau ada; kalau tidak, pakai legacy)
         try:
             try:
@@ -1139,71 +1070,44 @@ def _pick_ketua_by_beban(
         df = df[df["__aktif"] == True]
         jcol = next((c for c in _JBTN_COLS if c in df.columns), None)
 
-        special_re = (get_config().get("hakim", {}) or {}).get("exclude_jabatan_regex", r"\b(ketua|wakil)\b")
         if jcol:
-            try:
-                mask_spesial = df[jcol].astype(str).str.contains(special_re, case=False, regex=True, na=False)
-            except Exception:
-                mask_spesial = df[jcol].astype(str).str.contains(r"\b(ketua|wakil)\b", case=False, regex=True, na=False)
-            df = df[~mask_spesial]
+            df = df[~_mask_jabatan_khusus(df[jcol])]
 
         if df.empty:
             return "", None  # tidak ada hakim aktif sama sekali
 
         df["__nama"] = df["nama"].astype(str).map(str.strip)
 
-        # hitung rencana tanggal sidang per kandidat (pakai variabel yang sudah ada di fungsi ini)
-        def _rencana_tgl_sidang(nama_hakim: str):
-            hnum = _hari_sidang_num_for(nama_hakim)
-            if hnum == 0:
-                return None
-            base_d = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
-            d = _compute_tgl_sidang(
-                base=(base_d if isinstance(base_d, date) else base_d.date()),
-                jenis=jenis,
-                hari_sidang_num=hnum,
-                libur_set=libur_set,
-                klasifikasi=klasifikasi,
-            )
-            return pd.to_datetime(d) if d else None
-
-        df["__rencana"] = df["__nama"].map(_rencana_tgl_sidang)
+        # hitung rencana tanggal sidang per kandidat (vektor)
+        df["__rencana"] = _rencana_many(df["__nama"], tgl_register_input, jenis, klasifikasi, libur_set)
         df = df[df["__rencana"].notna()]
         if df.empty:
             return "", None  # tidak ada yang punya tanggal rencana
 
         # exclude CUTI (hari ini & pada tanggal rencana) — ulangi supaya konsisten
-        if not cuti_df.empty:
-            today_pd = pd.to_datetime(date.today()).normalize()
-            df = df[~df.apply(
-                lambda r: (
-                    _is_hakim_cuti(r["__nama"], r["__rencana"], cuti_df)
-                    or _is_hakim_cuti(r["__nama"], today_pd,      cuti_df)
-                ),
-                axis=1
-            )]
+        df = df[~_cuti_mask(df["__nama"], df["__rencana"], today_pd)]
         if df.empty:
             return "", None
 
         # >>> optional: bila kamu masih butuh filter lain (mis. jadwal, libur, dsb.), taruh di sini <<<
 
     # ===== Hitung beban & fairness =====
-    bcfg = cfg.get("beban", {})
     counts = _weighted_load_counts(
         rekap_df=rekap_df,
         now_date=now_for_load,
         window_days=int(dyn_window),
-        half_life_days=int(bcfg.get("half_life_days", 30)),
-        min_weight=float(bcfg.get("min_weight", 0.05)),
-        use_decay=bool(bcfg.get("use_decay", True)),   # <-- TAMBAHKAN BARIS INI
+        half_life_days=cfg.half_life_days,
+        min_weight=cfg.min_weight,
+        use_decay=cfg.use_decay,
+        index=lidx,
     )
 
     df["__load"] = df["__nama"].map(lambda n: float(counts.get(n, 0.0)))
-    df["__last_seen_days"] = df["__nama"].map(lambda nm: _last_seen_days_for(nm, rekap_df, now_for_load))
+    df["__last_seen_days"] = lidx.seen_days_many(df["__nama"], now_for_load)["last_seen_days"].to_numpy()
 
     df = df.sort_values(by=["__load", "__last_seen_days", "__nama"], ascending=[True, False, True], kind="stable").reset_index(drop=True)
     ketua = str(df.iloc[0]["__nama"]) if not df.empty else ""
-    sk_row = _best_sk_row_for_ketua(sk_df, ketua) if ketua else None
+    sk_row = _best_sk_row_for_ketua(D.sk, ketua) if ketua else None
 
     # Simpan konteks elastic cooldown (untuk dipakai saat SIMPAN)
     try:
@@ -1223,8 +1127,7 @@ def _pick_ketua_by_beban(
 # ================== ROTASI (pair PP/JS) =====================
 def _pair_combos_from_sk(sk_row: pd.Series) -> list[tuple[str,str]]:
     cfg = get_config()
-    mode = cfg.get("rotasi", {}).get("mode", "pair4")
-    custom_order = cfg.get("rotasi", {}).get("order", ["P1J1","P2J1","P1J2","P2J2"])
+    mode = cfg.rotasi_mode
 
     if not isinstance(sk_row, pd.Series):
         return []
@@ -1252,10 +1155,8 @@ def _pair_combos_from_sk(sk_row: pd.Series) -> list[tuple[str,str]]:
             j = js_opts[i % len(js_opts)]
             combos.append((p, j))
     else:
-        # pair4 (bisa custom order)
-        map_idx = {"P1J1": (0,0), "P2J1": (1,0), "P1J2": (0,1), "P2J2": (1,1)}
-        for key in custom_order:
-            ip, ij = map_idx.get(key, (0,0))
+        # pair4 (bisa custom order): slot (idx_pp, idx_js) sudah dihitung di AppConfig
+        for ip, ij in cfg.rotasi_slots:
             if ip < len(pp_opts) and ij < len(js_opts):
                 combos.append((pp_opts[ip], js_opts[ij]))
 
@@ -1278,8 +1179,7 @@ def _peek_pair(ketua: str, sk_row: pd.Series, jenis: str, rekap_df: pd.DataFrame
     return pp, js
 
 def _consume_pair_on_save_once(ketua: str, sk_row: pd.Series, jenis: str, rekap_df: pd.DataFrame) -> tuple[str,str]:
-    cfg = get_config()
-    inc_on_save = bool(cfg.get("rotasi", {}).get("increment_on_save", True))
+    inc_on_save = get_config().increment_on_save
 
     combos = _pair_combos_from_sk(sk_row)
     key = _rr_key_per_ketua(ketua or "unknown")
@@ -1306,6 +1206,210 @@ def _consume_pair_on_save_once(ketua: str, sk_row: pd.Series, jenis: str, rekap_
     if str(js).strip().lower() in {"js","js1","js2"}: js = ""
     return pp, js
 
+def _after_rekap_save(hakim: str, tgl_register_input, base, nomor_fmt_full: str, jenis: str, klas_final: str):
+    """Langkah setelah baris rekap tersimpan: tanda cooldown v2, cooldown elastis + streak, audit.
+    Dipakai form (1 perkara) dan input batch (per baris, dalam staging)."""
+    try:
+        _cool_v2_mark(hakim)
+    except Exception:
+        pass
+
+    # 2) Cooldown elastis + streak + reset jika tinggal 1 kandidat non-cooldown
+    try:
+        base_for_cool = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
+        ctx = st.session_state.get("_elastic_ctx", {})
+        loads_map = ctx.get("loads", {})
+        chosen = ctx.get("chosen", hakim)
+        non_cd_count = int(ctx.get("non_cd_count", 0))
+
+        loads_series = pd.Series(loads_map) if loads_map else pd.Series(dtype=float)
+        cfg = get_config()
+        beta_cfg = cfg.elastic_beta
+        cap_cfg  = cfg.elastic_streak_cap
+        abs_gap_cfg = cfg.elastic_min_gap_cool
+
+        need_cd_tau = _elastic_should_cooldown(
+            chosen,
+            loads_series,
+            beta=beta_cfg,
+            abs_gap_cool=abs_gap_cfg,   # ← pakai aturan gap absolut
+        )
+
+        need_cd_streak = _streak_force_cooldown_on_save(chosen, base_for_cool, cap=cap_cfg)
+
+        if need_cd_tau or need_cd_streak:
+            _cool_save_date(hakim, base_for_cool)
+
+        # aturan tambahan: jika kandidat non-cooldown yang tersisa cuma 1 → reset semua cooldown
+        if non_cd_count == 1:
+            _cool_reset_all()
+
+    except Exception:
+        # aman: jangan biarkan error di cooldown mengganggu simpan
+        pass
+        # --- AUDIT LOG ---
+    try:
+        ctx = st.session_state.get("_elastic_ctx", {})
+        loads_map = ctx.get("loads", {})
+        chosen = ctx.get("chosen", hakim)
+        non_cd_count = int(ctx.get("non_cd_count", 0))
+        loads_series = pd.Series(loads_map) if loads_map else pd.Series(dtype=float)
+
+        beta_cfg = get_config().elastic_beta
+        mode_beban = "decay" if get_config().use_decay else "uniform"
+
+        # hitung L1, L2, tau, gap (aman jika data minim)
+        L1 = float(loads_series.loc[chosen]) if (chosen in loads_series.index) else float("nan")
+        s_sorted = loads_series.sort_values(ascending=True, kind="stable")
+        L2 = float(s_sorted.iloc[1]) if len(s_sorted) > 1 else float("nan")
+        Lmin = float(s_sorted.iloc[0]) if len(s_sorted) > 0 else float("nan")
+        Lmax = float(s_sorted.iloc[-1]) if len(s_sorted) > 0 else float("nan")
+        tau = beta_cfg * (Lmax - Lmin) if (not pd.isna(Lmax) and not pd.isna(Lmin)) else float("nan")
+        gap = (L2 - L1) if (not pd.isna(L1) and not pd.isna(L2)) else float("nan")
+
+        # reason ringkas
+        reason = []
+        if 'need_cd_streak' in locals() and need_cd_streak: reason.append("streak")
+        if 'need_cd_tau' in locals() and need_cd_tau:       reason.append("tau")
+        reason = ",".join(reason) if reason else ("no_cd" if non_cd_count>1 else "only_one_candidate")
+
+        cd_days_local = get_config().cooldown_days
+        cuti_today = _is_hakim_cuti(hakim, pd.to_datetime(date.today()).normalize())
+
+        _append_audit({
+            "ts": datetime.now(),
+            "nomor_perkara": nomor_fmt_full,
+            "tgl_register": base,           # var 'base' sudah ada di atas (tgl register)
+            "ketua": hakim,
+            "jenis": jenis,
+            "klasifikasi": klas_final,
+            "mode_beban": mode_beban,
+            "beta": beta_cfg,
+            "tau": tau,
+            "L1": L1, "L2": L2, "gap": gap,
+            "cooldown_reason": reason,
+            "cd_days": cd_days_local,
+            "non_cd_count": non_cd_count,
+            "reset_after_save": (non_cd_count == 1),
+            "cuti_hari_ini": bool(cuti_today),
+            "cuti_tgl_rencana": False,
+            "under_cd_before": False,
+        })
+    except Exception:
+        pass
+
+# ================== INPUT BATCH ========================
+def _batch_hari_sidang_num(hakim: str, sk_row) -> int:
+    n = _hari_sidang_num_for(hakim)
+    if n == 0 and isinstance(sk_row, pd.Series):
+        t = str(sk_row.get("hari", "")).strip()
+        if t:
+            n = _weekday_num_from(t)
+    return n
+
+def _batch_simulate(rows: pd.DataFrame) -> tuple[batch_assign.BatchStage, pd.DataFrame]:
+    """
+    Jalankan pipeline form per baris, berurutan, di dalam staging (tanpa tulis disk).
+    Beban, cooldown, streak & token rotasi ikut berubah antar-baris.
+    """
+    stage = batch_assign.BatchStage(
+        load_index=_load_index().copy(),
+        rekap_version=get_registry().rekap_version(rekap_csv_path),
+    )
+    existing = set(D.rekap["nomor_perkara"].astype(str).str.strip().str.upper()) if not D.rekap.empty else set()
+    libur_set = _libur_set_from_df(D.libur)
+    ctx_before = st.session_state.get("_elastic_ctx")
+    out = []
+    with batch_assign.staging(stage):
+        for i, r in rows.reset_index(drop=True).iterrows():
+            res = {"#": i + 1, "nomor_perkara": str(r["nomor"]), "tgl_register": r["tgl_register"],
+                   "hakim": "", "anggota1": "", "anggota2": "", "pp": "", "js": "", "tgl_sidang": pd.NaT, "status": ""}
+            if str(r.get("catatan", "")).strip():
+                res["status"] = f"lewati: {r['catatan']}"
+                out.append(res); continue
+
+            klas = next((k for k in KLAS_OPTS if k.lower() == str(r["klasifikasi"]).strip().lower()), str(r["klasifikasi"]).strip())
+            jenis = str(r["jenis"])
+            tgl_reg = pd.to_datetime(r["tgl_register"]).date()
+            nomor_fmt, _ = compute_nomor_tipe(r["nomor"], klas, "Otomatis")
+            nomor_full = f"{nomor_fmt}/{tgl_reg.year}/{COURT_CODE}"
+            res["nomor_perkara"] = nomor_full
+            if nomor_full.strip().upper() in existing:
+                res["status"] = "lewati: nomor sudah ada"
+                out.append(res); continue
+
+            ketua, sk_row = _pick_ketua_by_beban(
+                D.hakim, D.rekap, tgl_reg, jenis, klas, D.libur, load_index=stage.load_index
+            )
+            if not ketua:
+                res["status"] = "lewati: tidak ada ketua tersedia"
+                out.append(res); continue
+
+            if klas.strip().lower() == "dispensasi":
+                anggota1, anggota2 = "", ""
+            else:
+                anggota1 = str(sk_row.get("anggota1", "")) if isinstance(sk_row, pd.Series) else ""
+                anggota2 = str(sk_row.get("anggota2", "")) if isinstance(sk_row, pd.Series) else ""
+            pp_val, js_val = _consume_pair_on_save_once(ketua, sk_row, jenis, D.rekap)
+            if _is_header_like(pp_val): pp_val = ""
+            if _is_header_like(js_val): js_val = ""
+            tgl_sidang = _compute_tgl_sidang(tgl_reg, jenis, _batch_hari_sidang_num(ketua, sk_row), libur_set, klasifikasi=klas)
+
+            new_row = {
+                "__id": pd.NA,
+                "nomor_perkara": nomor_full,
+                "tgl_register": pd.to_datetime(tgl_reg),
+                "klasifikasi": klas,
+                "jenis_perkara": jenis,
+                "metode": str(r["metode"]),
+                "hakim": ketua,
+                "anggota1": anggota1,
+                "anggota2": anggota2,
+                "pp": pp_val,
+                "js": js_val,
+                "tgl_sidang": pd.to_datetime(tgl_sidang),
+                "tgl_sidang_override": 0,
+            }
+            _rekap_insert(new_row)
+            _after_rekap_save(ketua, tgl_reg, tgl_reg, nomor_full, jenis, klas)
+            existing.add(nomor_full.strip().upper())
+            res.update({"hakim": ketua, "anggota1": anggota1, "anggota2": anggota2, "pp": pp_val, "js": js_val,
+                        "tgl_sidang": pd.to_datetime(tgl_sidang), "status": "ok"})
+            out.append(res)
+    if ctx_before is None:
+        st.session_state.pop("_elastic_ctx", None)
+    else:
+        st.session_state["_elastic_ctx"] = ctx_before
+    return stage, pd.DataFrame(out)
+
+def _batch_commit(stage: batch_assign.BatchStage) -> tuple[bool, str]:
+    """
+    Tulis hasil batch sekaligus: baris rekap (1 entri jurnal batch), token rotasi/cooldown,
+    tabel kecil (js_ghoib) dan audit. Ditolak bila file terkait berubah sejak preview.
+    Mode SQLite: semuanya satu transaksi (gagal di tengah → tidak ada yang tersimpan).
+    """
+    rows = list(stage.rekap_rows)
+    if not rows:
+        return False, "Tidak ada baris yang bisa disimpan."
+    # lock fcntl: batch lain menunggu giliran (tanpa timeout/rebut lock)
+    with path_lock(DATA_DIR / "batch_commit"), sqlite_backend.transaction():
+        conflicts = stage.conflicts(rekap_journal.version(rekap_csv_path))
+        if conflicts:
+            return False, f"Data berubah sejak preview ({', '.join(conflicts)}). Jalankan preview ulang."
+        if _rekap_journal_on():
+            get_rekap_repo(rekap_csv_path).insert_many(rows, on_commit=_load_index_apply)
+        else:
+            _rekap_rewrite(lambda cur: pd.concat([cur, pd.DataFrame(rows)], ignore_index=True))
+        for ent in stage.docs.values():
+            if ent.get("save") is not None and ent.get("obj") is not None:
+                ent["save"](ent["obj"])
+        for key, ent in stage.tables.items():
+            _write_csv(ent["df"], Path(key))
+        if stage.audits:
+            _append_audits(stage.audits)
+    _rekap_maybe_compact()
+    return True, f"{len(rows)} perkara tersimpan."
+
 is_admin = str(st.session_state.get("auth_role", "")).lower() == "admin"
 
 # ---- Susun daftar tab (Pengaturan hanya untuk admin)
@@ -1352,10 +1456,9 @@ with tab1:
             metode_input = st.selectbox("Metode", ["E-Court","Manual"], index=0, key=K("t1", f"metode_{fs}"))
 
             # Ketua (aktif & tidak cuti) — bisa override tampilkan yang cuti
-            cuti_df = _load_cuti_df(_cuti_mtime())
-            libur_set_for_filter = _libur_set_from_df(libur_df)
+            libur_set_for_filter = _libur_set_from_df(D.libur)
 
-            show_cutis_default = get_config().get("hakim", {}).get("dropdown_show_cuti_default", False)
+            show_cutis_default = get_config().dropdown_show_cuti_default
             show_cutis = st.toggle("Tampilkan yang cuti (override)", value=show_cutis_default, key=K("t1","toggle_cuti"))
 
             visible_names: list[str] = []
@@ -1363,31 +1466,20 @@ with tab1:
             cuti_names: list[str] = []
             label_map: dict[str, str] = {}
 
-            if isinstance(hakim_df, pd.DataFrame) and (not hakim_df.empty) and ("nama" in hakim_df.columns):
-                df_sorted = hakim_df.copy()
+            if isinstance(D.hakim, pd.DataFrame) and (not D.hakim.empty) and ("nama" in D.hakim.columns):
+                df_sorted = D.hakim.copy()
                 df_sorted["_aktif_bool"] = df_sorted.get("aktif", 1).apply(_is_active_value)
                 df_sorted = df_sorted[df_sorted["_aktif_bool"] == True]
                 df_sorted["__nama_clean"] = df_sorted["nama"].astype(str).map(str.strip)
                 df_sorted = df_sorted[~df_sorted["__nama_clean"].map(_is_header_like)]
 
-                def _calculated_sidang_date_for(nama_hakim: str):
-                    hari_num = _hari_sidang_num_for(nama_hakim)
-                    if hari_num == 0: return None
-                    base_d = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
-                    # taruh flag di luar call (boleh di tempat lain yang relevan)
-                    is_hakim_tunggal = str(klas_final).strip().lower() == "dispensasi"
-
-                    d = _compute_tgl_sidang(
-                        base=(base_d if isinstance(base_d, date) else base_d.date()),
-                        jenis=jenis,
-                        hari_sidang_num=hari_num,
-                        libur_set=libur_set_for_filter,
-                        klasifikasi=klas_final,
-                    )
-                    return pd.to_datetime(d) if d else None
-
-                df_sorted["__tgl_rencana"] = df_sorted["__nama_clean"].map(_calculated_sidang_date_for)
+                df_sorted["__tgl_rencana"] = _rencana_many(
+                    df_sorted["__nama_clean"], tgl_register_input, jenis, klas_final, libur_set_for_filter
+                )
                 today_pd = pd.to_datetime(date.today()).normalize()
+                cuti_idx = _cuti_index()
+                df_sorted["__cuti_today"] = cuti_idx.is_on_leave(df_sorted["__nama_clean"], today_pd)
+                df_sorted["__cuti_plan"] = cuti_idx.is_on_leave(df_sorted["__nama_clean"], df_sorted["__tgl_rencana"])
 
                 for _, r in df_sorted.sort_values(["__nama_clean"], kind="stable").iterrows():
                     nm = r["__nama_clean"]
@@ -1397,8 +1489,8 @@ with tab1:
                         hidden_reasons[nm] = "Hari sidang tidak terdata di master hakim."
                         continue
 
-                    cuti_today = _is_hakim_cuti(nm, today_pd, cuti_df)
-                    cuti_on_plan = _is_hakim_cuti(nm, tgl, cuti_df)
+                    cuti_today = bool(r["__cuti_today"])
+                    cuti_on_plan = bool(r["__cuti_plan"])
 
                     if cuti_today or cuti_on_plan:
                         reason_parts = []
@@ -1426,9 +1518,9 @@ with tab1:
 
             # fallback dari SK jika kosong total
             if not visible_names:
-                if isinstance(sk_df, pd.DataFrame) and (not sk_df.empty) and ("ketua" in sk_df.columns):
+                if isinstance(D.sk, pd.DataFrame) and (not D.sk.empty) and ("ketua" in D.sk.columns):
                     fallback = (
-                        sk_df["ketua"].astype(str).map(str.strip)
+                        D.sk["ketua"].astype(str).map(str.strip)
                         .replace("", pd.NA).dropna()
                     )
                     fallback = (
@@ -1455,20 +1547,20 @@ with tab1:
             )
 
             # Dropdown PP & JS dari master
-            pp_opts = _options_from_master(pp_df, prefer_active=True)
-            js_opts = _options_from_master(js_df, prefer_active=True)
+            pp_opts = _master_options("pp")
+            js_opts = _master_options("js")
             pp_manual = st.selectbox("PP Manual (opsional)", [""] + pp_opts, key=K("t1", f"pp_manual_{fs}"))
             js_manual = st.selectbox("JS Manual (opsional)", [""] + js_opts, key=K("t1", f"js_manual_{fs}"))
 
         # Tentukan Ketua & SK
         if str(hakim_manual).strip():
             ketua = str(hakim_manual).strip()
-            sk_row = _best_sk_row_for_ketua(sk_df, ketua)
+            sk_row = _best_sk_row_for_ketua(D.sk, ketua)
             if sk_row is None:
                 st.warning("Ketua manual tidak ditemukan di SK. Anggota/PP/JS akan dikosongkan.")
         else:
             ketua, sk_row = _pick_ketua_by_beban(
-                hakim_df, rekap_df, tgl_register_input, jenis, klas_final, libur_df
+                D.hakim, D.rekap, tgl_register_input, jenis, klas_final, D.libur
             )
         hakim = ketua or ""
 
@@ -1488,29 +1580,29 @@ with tab1:
         # Preview PP/JS
         if str(pp_manual).strip():
             pp_preview = pp_manual.strip()
-            js_preview = js_manual.strip() if str(js_manual).strip() else _peek_pair(hakim, sk_row, jenis, rekap_df)[1]
+            js_preview = js_manual.strip() if str(js_manual).strip() else _peek_pair(hakim, sk_row, jenis, D.rekap)[1]
         else:
             if str(js_manual).strip():
-                pp_preview = _peek_pair(hakim, sk_row, jenis, rekap_df)[0]
+                pp_preview = _peek_pair(hakim, sk_row, jenis, D.rekap)[0]
                 js_preview = js_manual.strip()
             else:
-                pp_preview, js_preview = _peek_pair(hakim, sk_row, jenis, rekap_df)
+                pp_preview, js_preview = _peek_pair(hakim, sk_row, jenis, D.rekap)
 
         # Hitung Tgl Sidang (strict)
         base = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
         hari_sidang_num = 0
         if (
-            isinstance(hakim_df, pd.DataFrame)
-            and not hakim_df.empty
+            isinstance(D.hakim, pd.DataFrame)
+            and not D.hakim.empty
             and hakim
-            and "nama" in hakim_df.columns
-            and ("hari_sidang" in hakim_df.columns or "hari" in hakim_df.columns)
+            and "nama" in D.hakim.columns
+            and ("hari_sidang" in D.hakim.columns or "hari" in D.hakim.columns)
         ):
             try:
-                if "hari_sidang" in hakim_df.columns:
-                    hari_text = hakim_df.set_index("nama").loc[hakim, "hari_sidang"]
+                if "hari_sidang" in D.hakim.columns:
+                    hari_text = D.hakim.set_index("nama").loc[hakim, "hari_sidang"]
                 else:
-                    hari_text = hakim_df.set_index("nama").loc[hakim, "hari"]
+                    hari_text = D.hakim.set_index("nama").loc[hakim, "hari"]
                 hari_sidang_num = _weekday_num_from(str(hari_text))
             except Exception:
                 pass
@@ -1519,7 +1611,7 @@ with tab1:
             if hari_text2:
                 hari_sidang_num = _weekday_num_from(hari_text2)
 
-        libur_set = _libur_set_from_df(libur_df)
+        libur_set = _libur_set_from_df(D.libur)
 
         tgl_sidang_auto = _compute_tgl_sidang(
             base.date() if isinstance(base, datetime) else base,
@@ -1584,8 +1676,8 @@ with tab1:
             )
         # — Badge ringkas: mode beban & cooldown —
         cfg_local = get_config()
-        mode_txt = "decay" if bool(cfg_local.get("beban", {}).get("use_decay", True)) else "uniform"
-        cd_days_local = int(cfg_local.get("hakim", {}).get("cooldown_days", 0) or 0)
+        mode_txt = "decay" if cfg_local.use_decay else "uniform"
+        cd_days_local = cfg_local.cooldown_days
 
         badges = []
         if is_hakim_tunggal:
@@ -1606,119 +1698,33 @@ with tab1:
         )
         if simpan:
             # 1) Tentukan PP/JS (tetap seperti sebelumnya)
-            pair_pp, pair_js = _consume_pair_on_save_once(hakim, sk_row, jenis, rekap_df)
-            pp_val = pp_manual.strip() if str(pp_manual).strip() else pair_pp
-            js_val = js_manual.strip() if str(js_manual).strip() else pair_js
-            if _is_header_like(pp_val): pp_val = ""
-            if _is_header_like(js_val): js_val = ""
-
-            new_row = {
-                "__id": pd.NA,
-                "nomor_perkara": nomor_fmt_full,
-                "tgl_register": pd.to_datetime(base),
-                "klasifikasi": klas_final,
-                "jenis_perkara": jenis,
-                "metode": metode_input,
-                "hakim": hakim,
-                "anggota1": anggota1,
-                "anggota2": anggota2,
-                "pp": pp_val,
-                "js": js_val,
-                "tgl_sidang": pd.to_datetime(tgl_sidang_effective),
-                "tgl_sidang_override": int(bool(use_override)),
-            }
-
-            current_csv = _ensure_rekap_schema(_read_csv(rekap_csv_path))
-            rekap_new = pd.concat([current_csv, pd.DataFrame([new_row])], ignore_index=True)
-            _export_rekap_csv(rekap_new)
-
-            try:
-                _cool_v2_mark(hakim)
-            except Exception:
-                pass
-            
-            # 2) Cooldown elastis + streak + reset jika tinggal 1 kandidat non-cooldown
-            try:
-                base_for_cool = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
-                ctx = st.session_state.get("_elastic_ctx", {})
-                loads_map = ctx.get("loads", {})
-                chosen = ctx.get("chosen", hakim)
-                non_cd_count = int(ctx.get("non_cd_count", 0))
-
-                loads_series = pd.Series(loads_map) if loads_map else pd.Series(dtype=float)
-                beta_cfg = float(get_config().get("hakim", {}).get("elastic_beta", 0.20))
-                cap_cfg  = int(get_config().get("hakim", {}).get("elastic_streak_cap", 3))
-                abs_gap_cfg = float(get_config().get("hakim", {}).get("elastic_min_gap_cool", 2.0))
-
-                need_cd_tau = _elastic_should_cooldown(
-                    chosen,
-                    loads_series,
-                    beta=beta_cfg,
-                    abs_gap_cool=abs_gap_cfg,   # ← pakai aturan gap absolut
-                )
-
-                need_cd_streak = _streak_force_cooldown_on_save(chosen, base_for_cool, cap=cap_cfg)
-
-                if need_cd_tau or need_cd_streak:
-                    _cool_save_date(hakim, base_for_cool)
-
-                # aturan tambahan: jika kandidat non-cooldown yang tersisa cuma 1 → reset semua cooldown
-                if non_cd_count == 1:
-                    _cool_reset_all()
-
-            except Exception:
-                # aman: jangan biarkan error di cooldown mengganggu simpan
-                pass
-                # --- AUDIT LOG ---
-            try:
-                ctx = st.session_state.get("_elastic_ctx", {})
-                loads_map = ctx.get("loads", {})
-                chosen = ctx.get("chosen", hakim)
-                non_cd_count = int(ctx.get("non_cd_count", 0))
-                loads_series = pd.Series(loads_map) if loads_map else pd.Series(dtype=float)
-
-                beta_cfg = float(get_config().get("hakim", {}).get("elastic_beta", 0.20))
-                mode_beban = "decay" if bool(get_config().get("beban", {}).get("use_decay", True)) else "uniform"
-
-                # hitung L1, L2, tau, gap (aman jika data minim)
-                L1 = float(loads_series.loc[chosen]) if (chosen in loads_series.index) else float("nan")
-                s_sorted = loads_series.sort_values(ascending=True, kind="stable")
-                L2 = float(s_sorted.iloc[1]) if len(s_sorted) > 1 else float("nan")
-                Lmin = float(s_sorted.iloc[0]) if len(s_sorted) > 0 else float("nan")
-                Lmax = float(s_sorted.iloc[-1]) if len(s_sorted) > 0 else float("nan")
-                tau = beta_cfg * (Lmax - Lmin) if (not pd.isna(Lmax) and not pd.isna(Lmin)) else float("nan")
-                gap = (L2 - L1) if (not pd.isna(L1) and not pd.isna(L2)) else float("nan")
-
-                # reason ringkas
-                reason = []
-                if 'need_cd_streak' in locals() and need_cd_streak: reason.append("streak")
-                if 'need_cd_tau' in locals() and need_cd_tau:       reason.append("tau")
-                reason = ",".join(reason) if reason else ("no_cd" if non_cd_count>1 else "only_one_candidate")
-
-                cd_days_local = int(get_config().get("hakim", {}).get("cooldown_days", 0) or 0)
-                cuti_today = _is_hakim_cuti(hakim, pd.to_datetime(date.today()).normalize(), _load_cuti_df(_cuti_mtime()))
-
-                _append_audit({
-                    "ts": datetime.now(),
+            # mode SQLite: rotasi, rekap, cooldown/streak, js_ghoib & audit satu transaksi
+            with sqlite_backend.transaction():
+                pair_pp, pair_js = _consume_pair_on_save_once(hakim, sk_row, jenis, D.rekap)
+                pp_val = pp_manual.strip() if str(pp_manual).strip() else pair_pp
+                js_val = js_manual.strip() if str(js_manual).strip() else pair_js
+                if _is_header_like(pp_val): pp_val = ""
+                if _is_header_like(js_val): js_val = ""
+
+                new_row = {
+                    "__id": pd.NA,
                     "nomor_perkara": nomor_fmt_full,
-                    "tgl_register": base,           # var 'base' sudah ada di atas (tgl register)
-                    "ketua": hakim,
-                    "jenis": jenis,
+                    "tgl_register": pd.to_datetime(base),
                     "klasifikasi": klas_final,
-                    "mode_beban": mode_beban,
-                    "beta": beta_cfg,
-                    "tau": tau,
-                    "L1": L1, "L2": L2, "gap": gap,
-                    "cooldown_reason": reason,
-                    "cd_days": cd_days_local,
-                    "non_cd_count": non_cd_count,
-                    "reset_after_save": (non_cd_count == 1),
-                    "cuti_hari_ini": bool(cuti_today),
-                    "cuti_tgl_rencana": False,
-                    "under_cd_before": False,
-                })
-            except Exception:
-                pass
+                    "jenis_perkara": jenis,
+                    "metode": metode_input,
+                    "hakim": hakim,
+                    "anggota1": anggota1,
+                    "anggota2": anggota2,
+                    "pp": pp_val,
+                    "js": js_val,
+                    "tgl_sidang": pd.to_datetime(tgl_sidang_effective),
+                    "tgl_sidang_override": int(bool(use_override)),
+                }
+
+                _rekap_insert(new_row)
+
+                _after_rekap_save(hakim, tgl_register_input, base, nomor_fmt_full, jenis, klas_final)
 
             # 3) Update session_state supaya form benar-benar reset, lalu rerun
             try:
@@ -1732,6 +1738,51 @@ with tab1:
             st.rerun()
 
 
+    # ===== INPUT BATCH =====
+    with st.expander("📥 Input Batch (upload CSV / tempel baris)", expanded=False):
+        st.caption("Kolom: nomor, tgl_register, klasifikasi, jenis, metode — header opsional; pemisah koma, titik koma, atau tab. "
+                   "Setiap baris diproses seperti form (ketua otomatis, rotasi PP/JS, cooldown) lalu disimpan sekaligus setelah preview.")
+        up = st.file_uploader("Upload CSV", type=["csv", "txt"], key=K("t1", "batch_file"))
+        pasted = st.text_area("…atau tempel baris", key=K("t1", "batch_text"), height=140,
+                              placeholder="1234;2025-01-06;CG;Biasa;E-Court")
+        if st.button("🔍 Preview batch", width='stretch', key=K("t1", "batch_preview")):
+            rows_in = batch_assign.parse_batch_input(up.getvalue() if up is not None else pasted)
+            if rows_in.empty:
+                st.warning("Tidak ada baris untuk diproses.")
+                st.session_state.pop("_batch_preview", None)
+            else:
+                stage, res = _batch_simulate(rows_in)
+                st.session_state["_batch_preview"] = {"stage": stage, "result": res}
+
+        pv = st.session_state.get("_batch_preview")
+        if pv:
+            stage, res = pv["stage"], pv["result"]
+            n_ok = len(stage.rekap_rows)
+            st.markdown(f"**Preview:** {n_ok} perkara akan disimpan • {len(res) - n_ok} dilewati")
+            view = res.copy()
+            for c in ("tgl_register", "tgl_sidang"):
+                view[c] = view[c].map(lambda x: format_tanggal_id(pd.to_datetime(x)) if pd.notna(x) else "-")
+            st.dataframe(view, hide_index=True, width='stretch')
+            diff = stage.diff_docs()
+            with st.expander(f"Perubahan token rotasi / cooldown ({len(diff)} kunci)", expanded=False):
+                st.dataframe(diff, hide_index=True, width='stretch')
+                if stage.tables:
+                    st.caption("Tabel ikut diperbarui: " + ", ".join(Path(k).name for k in stage.tables))
+                st.caption(f"Audit: {len(stage.audits)} baris")
+            bc1, bc2 = st.columns(2)
+            if bc1.button("✅ Simpan batch", width='stretch', disabled=(n_ok == 0), key=K("t1", "batch_commit")):
+                ok, msg = _batch_commit(stage)
+                if ok:
+                    st.session_state.pop("_batch_preview", None)
+                    st.toast(msg, icon="✅")
+                    st.rerun()
+                else:
+                    st.error(msg)
+            if bc2.button("✖️ Batalkan", width='stretch', key=K("t1", "batch_cancel")):
+                st.session_state.pop("_batch_preview", None)
+                st.rerun()
+
+
 # ------------------ TAB 2: REKAP ------------------------
 with tab2:
     st.subheader("Rekap (berdasarkan Tanggal Register)")
@@ -1749,10 +1800,10 @@ with tab2:
     RF = st.session_state["rekap_form"]
 
     tmp = _ensure_rekap_schema(_read_csv(rekap_csv_path))
-    bad = tmp["__id"].apply(lambda v: str(v).strip().lower() in {"", "nan", "none"}).any()
+    bad = tmp["__id"].astype(str).str.strip().str.lower().isin(["", "nan", "none", "<na>"]).any()
     if bad:
-        _export_rekap_csv(tmp)
-        tmp = _ensure_rekap_schema(tmp)
+        _rekap_rewrite(lambda df: df)   # __id kosong diisi oleh _ensure_rekap_schema terhadap isi terbaru
+        tmp = _ensure_rekap_schema(_read_csv(rekap_csv_path))
 
     if isinstance(tmp, pd.DataFrame) and not tmp.empty:
         default_day = (pd.to_datetime(tmp["tgl_register"].max()).date()
@@ -1770,64 +1821,31 @@ with tab2:
 
         df_filtered = tmp.loc[tmp["tgl_register"].dt.date == filter_date].copy()
 
-        COLS = [0.6, 1.3, 1.1, 1.0, 2.0, 2.0, 1.0, 1.2, 1.2, 1.8, 0.6, 0.6]
-        h = st.columns(COLS)
-        h[0].markdown("**No.**")
-        h[1].markdown("**Nomor**")
-        h[2].markdown("**Register**")
-        h[3].markdown("**Jenis**")
-        h[4].markdown("**Hakim (K)**")
-        h[5].markdown("**Anggota 1**")
-        h[6].markdown("**Anggota 2**")
-        h[7].markdown("**PP**")
-        h[8].markdown("**JS**")
-        h[9].markdown("**Sidang**")
-        h[10].markdown("****")
-        h[11].markdown("****")
-        st.markdown("<hr/>", unsafe_allow_html=True)
-
         if df_filtered.empty:
             st.info("Tidak ada perkara pada tanggal tersebut.")
         else:
-            for i, (_, r) in enumerate(df_filtered.iterrows(), start=1):
-                c = st.columns(COLS)
-                bg = ROW_BG[i % 2]  # selang-seling
-
-                # flag hakim tunggal
-                is_tunggal = str(r.get("klasifikasi","")).strip().lower() == "dispensasi"
-
-                nomor_perkara = str(r.get("nomor_perkara", "")) or "-"
-                tgl_reg = _fmt_id(r.get("tgl_register"))
-                jenis_ = str(r.get("jenis_perkara", "")) or "-"
-                hakim_k = str(r.get("hakim", "")) or "-"
-
-                # anggota: "-" jika Dispensasi (hakim tunggal)
-                a1 = "-" if is_tunggal else (str(r.get("anggota1", "")) or "-")
-                a2 = "-" if is_tunggal else (str(r.get("anggota2", "")) or "-")
-
-                pp_val = str(r.get("pp", "")) or "-"
-                js_val = str(r.get("js", "")) or "-"
-                is_ovr = bool(int(r.get("tgl_sidang_override", 0)))
-                badge = " • override" if is_ovr else ""
-                tgl_sidang_txt = (_fmt_id(r.get("tgl_sidang")) or "-") + badge
-
-                c[0].markdown(_bg_wrap(_txt_pill(str(i)), bg), unsafe_allow_html=True)
-                c[1].markdown(_bg_wrap(_txt_pill(nomor_perkara), bg), unsafe_allow_html=True)
-                c[2].markdown(_bg_wrap(_txt_pill(tgl_reg), bg), unsafe_allow_html=True)
-                c[3].markdown(_bg_wrap(_txt_pill(jenis_), bg), unsafe_allow_html=True)
-                c[4].markdown(_bg_wrap(_txt_pill(hakim_k), bg), unsafe_allow_html=True)
-                c[5].markdown(_bg_wrap(_txt_pill(a1), bg), unsafe_allow_html=True)
-                c[6].markdown(_bg_wrap(_txt_pill(a2), bg), unsafe_allow_html=True)
-                c[7].markdown(_bg_wrap(_txt_pill(pp_val), bg), unsafe_allow_html=True)
-                c[8].markdown(_bg_wrap(_txt_pill(js_val), bg), unsafe_allow_html=True)
-                c[9].markdown(_bg_wrap(_txt_pill(tgl_sidang_txt), bg), unsafe_allow_html=True)
-
+            df_filtered = df_filtered.reset_index(drop=True)
+            txt = lambda c: df_filtered[c].fillna("").astype(str).str.strip().replace("", "-")
+            # anggota: "-" jika Dispensasi (hakim tunggal)
+            is_tunggal = df_filtered["klasifikasi"].fillna("").astype(str).str.strip().str.lower().eq("dispensasi")
+            is_ovr = pd.to_numeric(df_filtered["tgl_sidang_override"], errors="coerce").fillna(0).astype(int).astype(bool)
+            view = pd.DataFrame({
+                "No.": range(1, len(df_filtered) + 1),
+                "Nomor": txt("nomor_perkara"),
+                "Register": df_filtered["tgl_register"].map(_fmt_id),
+                "Jenis": txt("jenis_perkara"),
+                "Hakim (K)": txt("hakim"),
+                "Anggota 1": txt("anggota1").mask(is_tunggal, "-"),
+                "Anggota 2": txt("anggota2").mask(is_tunggal, "-"),
+                "PP": txt("pp"),
+                "JS": txt("js"),
+                "Sidang": df_filtered["tgl_sidang"].map(_fmt_id) + is_ovr.map({True: " • override", False: ""}),
+            })
+            act, pos = row_action_table(view, key=K("t2", "rekap_rows"), label_col="Nomor")
+            if act is not None:
+                r = df_filtered.iloc[pos]
                 raw_id = str(r.get("__id", "")).strip()
-                ui_row_id = raw_id if raw_id.lower() not in {"", "nan", "none"} else f"row{i}"
-                edit_key = K("t2", f"rekap_edit_{ui_row_id}_{i}")
-                del_key  = K("t2", f"rekap_del_{ui_row_id}_{i}")
-
-                if c[10].button("✏️", key=edit_key, width='stretch'):
+                if act == "edit":
                     if raw_id.lower() in {"", "nan", "none"}:
                         st.warning("Baris ini tidak punya __id yang valid. Simpan ulang datanya agar diperbaiki.")
                     else:
@@ -1843,18 +1861,15 @@ with tab2:
                             "js": str(r.get("js","")).strip(),
                             "tgl_register": pd.to_datetime(r.get("tgl_register")).date() if pd.notna(r.get("tgl_register")) else date.today(),
                             "tgl_sidang": pd.to_datetime(r.get("tgl_sidang")).date() if pd.notna(r.get("tgl_sidang")) else date.today(),
-                            "tgl_sidang_override": bool(is_ovr),
+                            "tgl_sidang_override": bool(is_ovr.iloc[pos]),
                         }
                         st.session_state["rekap_form"] = {"visible": True, "row_id": raw_id, "payload": payload}
                         st.rerun()
-
-                if c[11].button("🗑️", key=del_key, width='stretch'):
-                    base = _ensure_rekap_schema(_read_csv(rekap_csv_path))
+                elif act == "delete":
                     if raw_id.lower() in {"", "nan", "none"}:
                         st.warning("Baris ini belum punya __id yang valid. Tidak dapat dihapus sampai diperbaiki.")
                     else:
-                        base = base[base["__id"].astype(str) != raw_id]
-                        _export_rekap_csv(base)
+                        _rekap_delete(raw_id)
                         st.success("Baris rekap dihapus 🗑️")
                         st.rerun()
 
@@ -1892,37 +1907,27 @@ with tab2:
             klas_val  = c2.text_input("Klasifikasi", value=P.get("klasifikasi",""), key=K("t2","rekap_f_klas"))
             tglreg_val = c3.date_input("Tanggal Register", value=P.get("tgl_register", date.today()), key=K("t2","rekap_f_tglreg"))
 
-            show_cutis_default = get_config().get("hakim", {}).get("dropdown_show_cuti_default", False)
+            show_cutis_default = get_config().dropdown_show_cuti_default
             show_cutis = st.toggle("Tampilkan yang cuti (override)", value=show_cutis_default, key=K("t2","show_cuti"))
 
-            libur_set_for_filter = _libur_set_from_df(libur_df)
-            cuti_df_local = _load_cuti_df(_cuti_mtime())
+            libur_set_for_filter = _libur_set_from_df(D.libur)
             visible_names: list[str] = []
             label_map: dict[str, str] = {}
 
-            def _calculated_sidang_date_for(nama_hakim: str):
-                base_d = tglreg_val if isinstance(tglreg_val, (datetime, date)) else date.today()
-                hari_num = _hari_sidang_num_for(nama_hakim)
-                if hari_num == 0:
-                    return None
-                d = _compute_tgl_sidang(
-                    base=(base_d if isinstance(base_d, date) else base_d.date()),
-                    jenis=jenis_val,
-                    hari_sidang_num=hari_num,
-                    libur_set=libur_set_for_filter,
-                    klasifikasi=klas_val,
-                )
-                return pd.to_datetime(d) if d else None
-
-            if isinstance(hakim_df, pd.DataFrame) and (not hakim_df.empty) and ("nama" in hakim_df.columns):
-                df_sorted = hakim_df.copy()
+            if isinstance(D.hakim, pd.DataFrame) and (not D.hakim.empty) and ("nama" in D.hakim.columns):
+                df_sorted = D.hakim.copy()
                 df_sorted["_aktif_bool"] = df_sorted.get("aktif", 1).apply(_is_active_value)
                 df_sorted = df_sorted[df_sorted["_aktif_bool"] == True]
                 df_sorted["__nama_clean"] = df_sorted["nama"].astype(str).map(str.strip)
                 df_sorted = df_sorted[~df_sorted["__nama_clean"].map(_is_header_like)]
-                df_sorted["__tgl_rencana"] = df_sorted["__nama_clean"].map(_calculated_sidang_date_for)
+                df_sorted["__tgl_rencana"] = _rencana_many(
+                    df_sorted["__nama_clean"], tglreg_val, jenis_val, klas_val, libur_set_for_filter
+                )
 
                 today_pd = pd.to_datetime(date.today()).normalize()
+                cuti_idx = _cuti_index()
+                df_sorted["__cuti_today"] = cuti_idx.is_on_leave(df_sorted["__nama_clean"], today_pd)
+                df_sorted["__cuti_plan"] = cuti_idx.is_on_leave(df_sorted["__nama_clean"], df_sorted["__tgl_rencana"])
                 for _, r__ in df_sorted.sort_values(["__nama_clean"], kind="stable").iterrows():
                     nm = r__["__nama_clean"]
                     tgl = r__["__tgl_rencana"]
@@ -1930,8 +1935,8 @@ with tab2:
                     if tgl is None:
                         continue
 
-                    cuti_today = _is_hakim_cuti(nm, today_pd, cuti_df_local)
-                    cuti_on_plan = _is_hakim_cuti(nm, tgl, cuti_df_local)
+                    cuti_today = bool(r__["__cuti_today"])
+                    cuti_on_plan = bool(r__["__cuti_plan"])
 
                     if cuti_today or cuti_on_plan:
                         if not show_cutis:
@@ -1951,9 +1956,9 @@ with tab2:
                     label_map[nm] = nm + extra
                     visible_names.append(nm)
 
-            if not visible_names and isinstance(sk_df, pd.DataFrame) and (not sk_df.empty) and ("ketua" in sk_df.columns):
+            if not visible_names and isinstance(D.sk, pd.DataFrame) and (not D.sk.empty) and ("ketua" in D.sk.columns):
                 fallback = (
-                    sk_df["ketua"].astype(str).map(str.strip)
+                    D.sk["ketua"].astype(str).map(str.strip)
                     .replace("", pd.NA).dropna()
                 )
                 fallback = (
@@ -1984,7 +1989,7 @@ with tab2:
 
             is_tunggal_edit = str(klas_val).strip().lower() == "dispensasi"
 
-            sk_row = _best_sk_row_for_ketua(sk_df, hakim_val) if hakim_val else None
+            sk_row = _best_sk_row_for_ketua(D.sk, hakim_val) if hakim_val else None
             anggota1_auto = (str(sk_row.get("anggota1","")).strip() if isinstance(sk_row, pd.Series) else "")
             anggota2_auto = (str(sk_row.get("anggota2","")).strip() if isinstance(sk_row, pd.Series) else "")
 
@@ -2017,8 +2022,8 @@ with tab2:
             pp_default = (pp_saran if hakim_changed else (P.get("pp","") or pp_saran))
             js_default = (js_saran if hakim_changed else (P.get("js","") or js_saran))
 
-            pp_opts2 = _inject_suggestion(_options_from_master(pp_df, prefer_active=True), pp_default)
-            js_opts2 = _inject_suggestion(_options_from_master(js_df, prefer_active=True), js_default)
+            pp_opts2 = _inject_suggestion(_master_options("pp"), pp_default)
+            js_opts2 = _inject_suggestion(_master_options("js"), js_default)
 
             c6, c7 = st.columns(2)
             pp_val = c6.selectbox(
@@ -2048,24 +2053,23 @@ with tab2:
 
             a1, a2, a3 = st.columns([1,1,1])
             if a1.button("💾 Simpan Perubahan", type="primary", key=K("t2","save"), width='stretch'):
-                base = _ensure_rekap_schema(_read_csv(rekap_csv_path))
-                mask = base["__id"].astype(str) == row_id
-                if not mask.any():
+                if row_id not in get_rekap_repo(rekap_csv_path):
                     st.error("Baris tidak ditemukan (mungkin sudah berubah).")
                 else:
-                    base.loc[mask, "nomor_perkara"] = nomor_val.strip()
-                    base.loc[mask, "metode"]        = metode_val.strip()
-                    base.loc[mask, "jenis_perkara"] = jenis_val.strip()
-                    base.loc[mask, "klasifikasi"]   = klas_val.strip()
-                    base.loc[mask, "hakim"]         = (hakim_val or "").strip()
-                    base.loc[mask, "anggota1"]      = (anggota1_auto or "").strip()
-                    base.loc[mask, "anggota2"]      = (anggota2_auto or "").strip()
-                    base.loc[mask, "pp"]            = (pp_val or "").strip()
-                    base.loc[mask, "js"]            = (js_val or "").strip()
-                    base.loc[mask, "tgl_register"]  = pd.to_datetime(tglreg_val)
-                    base.loc[mask, "tgl_sidang"]    = pd.to_datetime(tglsid_val)
-                    base.loc[mask, "tgl_sidang_override"] = int(bool(ovr_val))
-                    _export_rekap_csv(base)
+                    _rekap_update(row_id, {
+                        "nomor_perkara": nomor_val.strip(),
+                        "metode":        metode_val.strip(),
+                        "jenis_perkara": jenis_val.strip(),
+                        "klasifikasi":   klas_val.strip(),
+                        "hakim":         (hakim_val or "").strip(),
+                        "anggota1":      (anggota1_auto or "").strip(),
+                        "anggota2":      (anggota2_auto or "").strip(),
+                        "pp":            (pp_val or "").strip(),
+                        "js":            (js_val or "").strip(),
+                        "tgl_register":  pd.to_datetime(tglreg_val),
+                        "tgl_sidang":    pd.to_datetime(tglsid_val),
+                        "tgl_sidang_override": int(bool(ovr_val)),
+                    })
                     st.session_state["rekap_form"] = {"visible": False, "row_id": None, "payload": {}}
                     st.success("Perubahan disimpan ✅")
                     st.rerun()
@@ -2075,9 +2079,7 @@ with tab2:
                 st.rerun()
 
             if a3.button("🗑️ Hapus", key=K("t2","delete"), width='stretch'):
-                base = _ensure_rekap_schema(_read_csv(rekap_csv_path))
-                base = base[base["__id"].astype(str) != row_id]
-                _export_rekap_csv(base)
+                _rekap_delete(row_id)
                 st.session_state["rekap_form"] = {"visible": False, "row_id": None, "payload": {}}
                 st.success("Baris dihapus 🗑️")
                 st.rerun()
@@ -2100,7 +2102,7 @@ with tab2:
             show = show.sort_values(by=["jml_ghoib","nama"], ascending=[True, True], kind="stable")
             st.dataframe(show, width='stretch', height=min(360, 52 + 28*len(show)))
 
-            winner = _choose_js_ghoib_db(rekap_df, use_aktif=True)
+            winner = _choose_js_ghoib_db(D.rekap, use_aktif=True)
             if winner:
                 cur = show[show["nama"].str.lower() == winner.lower()]
                 cur_n = None if cur.empty else (cur.iloc[0]["jml_ghoib"] if pd.notna(cur.iloc[0]["jml_ghoib"]) else 0)
@@ -2132,15 +2134,10 @@ if is_admin:
 # ------------------ TAB 4: PENGATURAN -------------------
     with tab4:
         st.subheader("⚙️ Pengaturan Aplikasi")
-        cfg = get_config()
+        cfg = get_config().to_dict()   # salinan yang boleh diubah form (AppConfig read-only)
 
-        # ambil bcfg untuk default UI beban
-        bcfg = cfg.get("beban", _DEFAULT_CONFIG.get("beban", {
-            "window_days": 90,
-            "half_life_days": 30,
-            "min_weight": 0.05,
-            "use_decay": True,
-        }))
+        # ambil bcfg untuk default UI beban (validate_cfg menjamin section lengkap)
+        bcfg = cfg["beban"]
 
         # =================== FORM PENGATURAN (SEMUA INPUT + TOMBOL SAVE DI DALAM) ===================
         with st.form(K("t4","cfg_form")):
@@ -2189,11 +2186,33 @@ if is_admin:
                 key=K("t4","bk_dir")
             )
             bk_keep_ui = st.number_input(
-                "Max snapshot per file",
+                "Snapshot terbaru yang selalu disimpan (per file)",
                 min_value=1, step=1,
                 value=int(bk.get("max_keep", 10)),
                 key=K("t4","bk_keep")
             )
+            bcol = st.columns(3)
+            bk_hourly_ui = bcol[0].number_input("Per jam (jam terakhir)", min_value=0, step=1,
+                                                value=int(bk.get("hourly", DEFAULT_RETENTION["hourly"])), key=K("t4","bk_hourly"))
+            bk_daily_ui = bcol[1].number_input("Per hari (hari terakhir)", min_value=0, step=1,
+                                               value=int(bk.get("daily", DEFAULT_RETENTION["daily"])), key=K("t4","bk_daily"))
+            bk_weekly_ui = bcol[2].number_input("Per minggu (minggu terakhir)", min_value=0, step=1,
+                                                value=int(bk.get("weekly", DEFAULT_RETENTION["weekly"])), key=K("t4","bk_weekly"))
+
+            # ---------- Jurnal rekap ----------
+            rk = cfg.get("rekap", {})
+            rk_journal_ui = st.toggle(
+                "Simpan rekap via jurnal append-only",
+                value=bool(rk.get("journal", True)),
+                help="Simpan/Edit/Hapus cukup menambah 1 entri ke rekap.journal.jsonl; CSV ditulis ulang hanya saat kompaksi.",
+                key=K("t4","rk_journal")
+            )
+            rk_every_ui = st.number_input(
+                "Kompaksi jurnal setiap N entri",
+                min_value=1, step=10,
+                value=int(rk.get("compact_every", 200)),
+                key=K("t4","rk_every")
+            )
 
             st.markdown("---")
 
@@ -2269,6 +2288,13 @@ if is_admin:
             cfg["backup"]["enabled"] = bool(bk_enabled_ui)
             cfg["backup"]["dir"] = str(bk_dir_ui).strip() or "data/_backup"
             cfg["backup"]["max_keep"] = int(bk_keep_ui)
+            cfg["backup"]["hourly"] = int(bk_hourly_ui)
+            cfg["backup"]["daily"] = int(bk_daily_ui)
+            cfg["backup"]["weekly"] = int(bk_weekly_ui)
+
+            cfg.setdefault("rekap", {})
+            cfg["rekap"]["journal"] = bool(rk_journal_ui)
+            cfg["rekap"]["compact_every"] = int(rk_every_ui)
 
             cfg["tampilan"]["tanggal_locale"] = loc
             cfg["tampilan"]["tanggal_long"] = bool(longfmt)
@@ -2283,54 +2309,107 @@ if is_admin:
         tracked_files = [
             ("Rekap", rekap_csv_path),
             ("Config", CONFIG_PATH),
-            ("Rotasi/Cooldown", _RR_JSON),
+            ("Rotasi/Streak", _RR_JSON),
+            ("Cooldown", _COOL_V2_PATH),
             ("JS Ghoib", DATA_DIR / "js_ghoib.csv"),
         ]
         with st.expander("Lihat daftar snapshot per berkas", expanded=False):
             for label, p in tracked_files:
                 st.write(f"**{label}** — `{p.as_posix()}`")
-                if p.exists():
-                    snaps = _backup_list(p)
-                    total = len(snaps)
-                    st.caption(f"{total} snapshot disimpan")
-                    if total:
-                        rows = []
-                        for q in snaps[:10]:  # tampilkan 10 terbaru
-                            try:
-                                sz = q.stat().st_size
-                                mt = datetime.fromtimestamp(q.stat().st_mtime)
-                                rows.append({"Nama": q.name, "Waktu": mt.strftime("%Y-%m-%d %H:%M:%S"), "Ukuran": _human_size(sz)})
-                            except Exception:
-                                rows.append({"Nama": q.name, "Waktu": "-", "Ukuran": "-"})
-                        st.table(rows)
-                    if st.button(f"🧹 Prune >{cfg.get('backup',{}).get('max_keep',10)} snapshot ({label})", key=K("t4", f"bk_prune_{label}")):
+                snaps = _backup_list(p)
+                total = len(snaps)
+                st.caption(f"{total} snapshot disimpan (dedup per chunk)")
+                if total:
+                    view = snaps.head(10).assign(
+                        Waktu=lambda d: d["ts"].dt.strftime("%Y-%m-%d %H:%M:%S"),
+                        Ukuran=lambda d: d["size"].map(_human_size),
+                    )[["Waktu", "Ukuran", "chunks", "sha256"]]
+                    st.table(view)
+                    rc1, rc2 = st.columns([3, 1])
+                    pick = rc1.selectbox("Pulihkan ke snapshot", snaps["name"].tolist(),
+                                         format_func=lambda n, _s=snaps: _s.loc[_s["name"] == n, "ts"].iloc[0].strftime("%Y-%m-%d %H:%M:%S"),
+                                         key=K("t4", f"bk_pick_{label}"))
+                    if rc2.button("♻️ Pulihkan", key=K("t4", f"bk_restore_{label}"), width='stretch'):
                         try:
-                            _backup_prune(p)
-                            st.success("Prune selesai.")
+                            at = snaps.loc[snaps["name"] == pick, "ts"].iloc[0]
+                            ok = _backup_restore(p, at)
+                            st.success("File dipulihkan (isi sebelumnya tetap ada di backup).") if ok else st.warning("Snapshot tidak ditemukan.")
                         except Exception as e:
-                            st.error(f"Gagal prune: {e}")
-                else:
+                            st.error(f"Gagal memulihkan: {e}")
+                elif not p.exists():
                     st.info("File belum ada, belum ada snapshot.")
 
+            bst = _backup_store().stats()
+            st.caption(f"Store: {bst['chunk']} chunk • {_human_size(bst['bytes'])} • antrean worker {bst['antrean']}")
+            gc1, gc2 = st.columns(2)
+            if gc1.button("🧹 Terapkan retensi & hapus chunk yatim", key=K("t4", "bk_gc"), width='stretch'):
+                try:
+                    res = _backup_prune()
+                    st.success(f"Selesai: {res['manifest_dihapus']} snapshot dihapus, {_human_size(res['bytes_dibebaskan'])} dibebaskan.")
+                except Exception as e:
+                    st.error(f"Gagal prune: {e}")
+            legacy = find_legacy_copies(DATA_DIR, _backup_dir(), BACKUP_DIR)
+            if legacy:
+                rm_old = gc2.checkbox(f"Hapus {len(legacy)} salinan lama setelah impor", value=False, key=K("t4", "bk_legacy_rm"))
+                if gc2.button("📦 Impor salinan lama ke store", key=K("t4", "bk_legacy"), width='stretch'):
+                    try:
+                        n = _backup_store().import_legacy(legacy, remove=bool(rm_old))
+                        st.success(f"{n} snapshot unik diimpor dari {len(legacy)} salinan.")
+                    except Exception as e:
+                        st.error(f"Gagal impor: {e}")
+
         st.markdown("---")
         st.markdown("#### Pemeliharaan")
+        jn = rekap_journal.journal_len(rekap_csv_path)
+        cJ1, cJ2 = st.columns([3,1])
+        cJ1.caption(f"Jurnal rekap: {jn} entri belum dilipat ke `{rekap_csv_path.as_posix()}`")
+        if cJ2.button("🗜️ Kompaksi jurnal", key=K("t4","rk_compact"), disabled=(jn == 0), width='stretch'):
+            try:
+                n = rekap_journal.compact(rekap_csv_path, _read_csv_raw, _write_rekap_base, on_compact=_rekap_carry)
+                st.success(f"Kompaksi selesai ({n} entri).")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Gagal kompaksi: {e}")
         cA, cB = st.columns([1,1])
         with cA:
             # Diagnostik mini
             with st.expander("🧰 Diagnostik Data (opsional)"):
                 issues = []
                 need_hakim = ["nama"]
-                miss_hakim = [c for c in need_hakim if c not in hakim_df.columns]
+                miss_hakim = [c for c in need_hakim if c not in D.hakim.columns]
                 if miss_hakim: issues.append(f"Hakim CSV kurang kolom: {miss_hakim}")
-                if not sk_df.empty and "ketua" in sk_df.columns and "nama" in hakim_df.columns:
-                    sk_ketua = set(sk_df["ketua"].astype(str).map(str.strip))
-                    master_nama = set(hakim_df["nama"].astype(str).map(str.strip))
+                if not D.sk.empty and "ketua" in D.sk.columns and "nama" in D.hakim.columns:
+                    sk_ketua = set(D.sk["ketua"].astype(str).map(str.strip))
+                    master_nama = set(D.hakim["nama"].astype(str).map(str.strip))
                     missing = sorted([k for k in sk_ketua if k and k not in master_nama])
                     if missing:
                         issues.append(f"Nama ketua di SK tidak ditemukan di hakim_df: {missing[:10]}{' ...' if len(missing)>10 else ''}")
                 st.write("Masalah terdeteksi:" if issues else "Tidak ditemukan masalah utama.")
                 for it in issues:
                     st.warning(it)
+                rs = get_registry().stats()
+                st.caption(f"Cache tabel bersama: {rs['tables']} tabel • {rs['loads']} parse • {rs['hits']} hit")
+                if sqlite_backend.enabled():
+                    ss = sqlite_backend.get_sqlite_backend().stats()
+                    st.caption(f"Backend SQLite: `{ss['path']}` • {len(ss['tables'])} tabel • impor {ss['imports']}×")
+                li = _load_index()
+                st.caption(f"Indeks beban: {len(li.names)} nama • {li.counts.shape[1]} hari • rebuild {get_load_index_store().rebuilds}×")
+                # hitung ulang tgl sidang seluruh rekap (vektor) → bandingkan dengan yang tersimpan
+                try:
+                    rk = D.rekap[(D.rekap["tgl_sidang_override"] == 0) & D.rekap["tgl_register"].notna() & D.rekap["tgl_sidang"].notna()
+                                  & D.rekap["jenis_perkara"].astype(str).str.strip().str.upper().isin(DATE_RULES.keys())]
+                    nm = rk["hakim"].astype(str).str.strip()
+                    hmap = {n: _hari_sidang_num_for(n) for n in nm.unique()}
+                    hn = nm.map(hmap).fillna(0).astype(int)
+                    calc = court_calendar.compute_tgl_sidang_many(
+                        rk["tgl_register"], rk["jenis_perkara"].to_numpy(), hn.to_numpy(),
+                        rk["klasifikasi"].to_numpy(), _libur_set_from_df(D.libur), rules=DATE_RULES,
+                    )
+                    cek = hn.to_numpy() > 0
+                    beda = int((pd.to_datetime(calc)[cek] != rk["tgl_sidang"].to_numpy()[cek]).sum())
+                    st.caption(f"Cek aturan tgl sidang: {beda} dari {int(cek.sum())} baris (non-override) berbeda dari hitungan ulang")
+                except Exception as e:
+                    st.caption(f"(cek tgl sidang gagal: {e})")
         with cB:
             # --- DEBUG KECIL: Bobot Hakim (window + decay) ---
             with st.expander("🧮 Debug Bobot Hakim (window + decay)", expanded=False):
@@ -2345,7 +2424,7 @@ if is_admin:
                 # hitung bobot (kompatibel dgn versi lama/tanpa min_weight)
                 try:
                     wdict = _weighted_load_counts(
-                        rekap_df=rekap_df,
+                        rekap_df=D.rekap,
                         now_date=ref_date,
                         window_days=int(window_days),
                         half_life_days=int(half_life_days),
@@ -2354,7 +2433,7 @@ if is_admin:
                 except TypeError:
                     # kalau versi lama belum punya argumen min_weight
                     wdict = _weighted_load_counts(
-                        rekap_df=rekap_df,
+                        rekap_df=D.rekap,
                         now_date=ref_date,
                         window_days=int(window_days),
                         half_life_days=int(half_life_days),
@@ -2362,24 +2441,24 @@ if is_admin:
 
                 # siapkan basis daftar hakim yang akan ditampilkan
                 base_hakim = pd.DataFrame()
-                if isinstance(hakim_df, pd.DataFrame) and not hakim_df.empty and "nama" in hakim_df.columns:
-                    base_hakim = hakim_df[["nama"]].copy()
+                if isinstance(D.hakim, pd.DataFrame) and not D.hakim.empty and "nama" in D.hakim.columns:
+                    base_hakim = D.hakim[["nama"]].copy()
                     base_hakim["nama"] = base_hakim["nama"].astype(str).str.strip()
                     base_hakim = base_hakim[~base_hakim["nama"].map(_is_header_like)]
-                    if show_only_active and "aktif" in hakim_df.columns:
-                        base_hakim["_aktif__"] = hakim_df["aktif"].apply(_is_active_value)
+                    if show_only_active and "aktif" in D.hakim.columns:
+                        base_hakim["_aktif__"] = D.hakim["aktif"].apply(_is_active_value)
                         base_hakim = base_hakim[base_hakim["_aktif__"] == True]
                     base_hakim = base_hakim.drop_duplicates(subset=["nama"])
                 else:
                     # fallback: ambil dari rekap
-                    if isinstance(rekap_df, pd.DataFrame) and not rekap_df.empty:
-                        base_hakim = pd.DataFrame({"nama": sorted(set(rekap_df["hakim"].astype(str).str.strip()))})
+                    if isinstance(D.rekap, pd.DataFrame) and not D.rekap.empty:
+                        base_hakim = pd.DataFrame({"nama": sorted(set(D.rekap["hakim"].astype(str).str.strip()))})
 
                 # hitung “last seen”, “cases in window”, “cuti hari ini”
-                if base_hakim.empty or rekap_df.empty:
+                if base_hakim.empty or D.rekap.empty:
                     st.info("Tidak ada data untuk dihitung.")
                 else:
-                    r = rekap_df.copy()
+                    r = D.rekap.copy()
                     r["tgl_register"] = pd.to_datetime(r["tgl_register"], errors="coerce")
                     r = r[r["tgl_register"].notna()]
                     ref_ts = pd.to_datetime(ref_date).normalize()
@@ -2390,13 +2469,12 @@ if is_admin:
                             .groupby("hakim_clean").size().to_dict()
                     )
 
-                    cuti_df_dbg = _load_cuti_df(_cuti_mtime())
                     today_pd = pd.to_datetime(date.today()).normalize()
 
                     base_hakim["bobot"] = base_hakim["nama"].map(lambda nm: float(wdict.get(nm.strip(), 0.0)))
                     base_hakim["cases_window"] = base_hakim["nama"].map(lambda nm: int(win_counts.get(nm.strip(), 0)))
-                    base_hakim["last_seen_days"] = base_hakim["nama"].map(lambda nm: _last_seen_days_for(nm, rekap_df, ref_date))
-                    base_hakim["cuti_hari_ini"] = base_hakim["nama"].map(lambda nm: _is_hakim_cuti(nm, today_pd, cuti_df_dbg))
+                    base_hakim["last_seen_days"] = base_hakim["nama"].map(lambda nm: _last_seen_days_for(nm, D.rekap, ref_date))
+                    base_hakim["cuti_hari_ini"] = _cuti_index().is_on_leave(base_hakim["nama"].astype(str).str.strip(), today_pd)
 
                     # normalisasi share (opsional, biar kebayang proporsi)
                     total_w = base_hakim["bobot"].sum()
@@ -2437,12 +2515,10 @@ if is_admin:
                 with st.expander("🧐 Kenapa auto-pick ketua kosong? (pipeline debug)", expanded=False):
                     try:
                         # salin pipeline auto-pick tapi tanpa return
-                        cfg = get_config()
-                        special_re = cfg.get("hakim", {}).get("exclude_jabatan_regex", r"\b(ketua|wakil)\b")
-                        libur_set_dbg = _libur_set_from_df(libur_df)
+                        libur_set_dbg = _libur_set_from_df(D.libur)
 
                         # 0) awal
-                        dbg = hakim_df.copy()
+                        dbg = D.hakim.copy()
                         st.write("🟢 awal (hakim_df):", len(dbg))
 
                         # 1) aktif
@@ -2453,37 +2529,22 @@ if is_admin:
                         # 2) exclude jabatan khusus
                         jcol = next((c for c in _JBTN_COLS if c in dbg.columns), None)
                         if jcol:
-                            mask_sp = dbg[jcol].astype(str).str.contains(special_re, case=False, regex=True, na=False)
-                            dbg = dbg[~mask_sp]
+                            dbg = dbg[~_mask_jabatan_khusus(dbg[jcol])]
                         st.write("✅ setelah exclude jabatan khusus:", len(dbg))
 
                         # 3) hitung rencana tanggal sidang
-                        def _rencana_tgl_sidang_dbg(nama_hakim: str):
-                            hnum = _hari_sidang_num_for(nama_hakim)
-                            if hnum == 0: return None
-                            base_d = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
-                            d = _compute_tgl_sidang(
-                                base=(base_d if isinstance(base_d, date) else base_d.date()),
-                                jenis=jenis,
-                                hari_sidang_num=hnum,
-                                libur_set=libur_set_for_filter,
-                                klasifikasi=klas_final,
-                            )
-
-                            return pd.to_datetime(d) if d else None
-
                         dbg["__nama"] = dbg["nama"].astype(str).str.strip()
-                        dbg["__rencana"] = dbg["__nama"].map(_rencana_tgl_sidang_dbg)
+                        dbg["__rencana"] = _rencana_many(dbg["__nama"], tgl_register_input, jenis, klas_final, libur_set_for_filter)
                         st.write("📅 punya rencana (not null):", int(dbg["__rencana"].notna().sum()))
                         dbg = dbg[dbg["__rencana"].notna()]
                         st.dataframe(dbg[["__nama","hari","__rencana"]].reset_index(drop=True))
 
                         # 4) exclude cuti (hari ini & tgl rencana)
-                        cuti_df_dbg = _load_cuti_df(_cuti_mtime())
-                        if not cuti_df_dbg.empty:
+                        cuti_idx = _cuti_index()
+                        if len(cuti_idx):
                             today_pd = pd.to_datetime(date.today()).normalize()
-                            dbg["_cuti_today"]   = dbg.apply(lambda r: _is_hakim_cuti(r["__nama"], today_pd, cuti_df_dbg), axis=1)
-                            dbg["_cuti_rencana"] = dbg.apply(lambda r: _is_hakim_cuti(r["__nama"], r["__rencana"], cuti_df_dbg), axis=1)
+                            dbg["_cuti_today"]   = cuti_idx.is_on_leave(dbg["__nama"], today_pd)
+                            dbg["_cuti_rencana"] = cuti_idx.is_on_leave(dbg["__nama"], dbg["__rencana"])
                             st.write("🚫 cuti hari ini:", int(dbg["_cuti_today"].sum()),
                                     "• cuti di tgl rencana:", int(dbg["_cuti_rencana"].sum()))
                             dbg = dbg[~(dbg["_cuti_today"] | dbg["_cuti_rencana"])]
@@ -2493,10 +2554,10 @@ if is_admin:
                         # 5) hitung beban (window+decay) dan last_seen
                         now_for_load = tgl_register_input if isinstance(tgl_register_input, (datetime, date)) else date.today()
                         counts_dbg = _weighted_load_counts(
-                            rekap_df=rekap_df, now_date=now_for_load, window_days=90, half_life_days=30
+                            rekap_df=D.rekap, now_date=now_for_load, window_days=90, half_life_days=30
                         )
                         dbg["__load"] = dbg["__nama"].map(lambda n: float(counts_dbg.get(n, 0.0)))
-                        dbg["__last_seen_days"] = dbg["__nama"].map(lambda n: _last_seen_days_for(n, rekap_df, now_for_load))
+                        dbg["__last_seen_days"] = dbg["__nama"].map(lambda n: _last_seen_days_for(n, D.rekap, now_for_load))
                         st.write("📊 ringkas beban (top 10):")
                         st.dataframe(
                             dbg.sort_values(["__load","__last_seen_days","__nama"], ascending=[True, False, True])
@@ -2515,7 +2576,7 @@ if is_admin:
         
         # ============ MINI DEBUG: Elastic Cooldown (TOKEN-BASED, tanpa penalti lembut) ============
         with st.expander("🧪 Debug Elastic Cooldown (token-based, tanpa penalti lembut)", expanded=False):
-            beta_val_default = float(get_config().get("hakim", {}).get("elastic_beta", 0.20))
+            beta_val_default = get_config().elastic_beta
 
             # input kontrol baris 1
             dbg_col  = st.columns([1.1, 1.1, 1.2, 1.0, 1.0, 1.0])
@@ -2547,14 +2608,12 @@ if is_admin:
 
             # --- Konstruksi kandidat (mirror singkat dari _pick_ketua_by_beban) ---
             def _kandidat_for_debug(now_d: date, jenis: str, klas: str) -> pd.DataFrame:
-                cfg = get_config()
-                libur_set_local = _libur_set_from_df(libur_df)
-                cuti_df_local = _load_cuti_df(_cuti_mtime())
+                libur_set_local = _libur_set_from_df(D.libur)
 
-                if hakim_df is None or hakim_df.empty or "nama" not in hakim_df.columns:
+                if D.hakim is None or D.hakim.empty or "nama" not in D.hakim.columns:
                     return pd.DataFrame(columns=["__nama","__rencana"])
 
-                df = hakim_df.copy()
+                df = D.hakim.copy()
                 df["__aktif"] = df.get("aktif", 1).apply(_is_active_value)
                 df = df[df["__aktif"] == True]
                 if df.empty:
@@ -2563,12 +2622,7 @@ if is_admin:
                 # exclude jabatan khusus
                 jcol = next((c for c in _JBTN_COLS if c in df.columns), None)
                 if jcol:
-                    special_re = cfg.get("hakim", {}).get("exclude_jabatan_regex", r"\b(ketua|wakil)\b")
-                    try:
-                        mask_spesial = df[jcol].astype(str).str.contains(special_re, case=False, regex=True, na=False)
-                    except Exception:
-                        mask_spesial = df[jcol].astype(str).str.contains(r"\b(ketua|wakil)\b", case=False, regex=True, na=False)
-                    df = df[~mask_spesial]
+                    df = df[~_mask_jabatan_khusus(df[jcol])]
                 if df.empty:
                     return pd.DataFrame(columns=["__nama","__rencana"])
 
@@ -2579,32 +2633,14 @@ if is_admin:
 
                 base_d = now_d if isinstance(now_d, (datetime, date)) else date.today()
 
-                def _calc_rencana(nama_hakim: str):
-                    hnum = _hari_sidang_num_for(nama_hakim)
-                    if hnum == 0:
-                        return None
-                    d = _compute_tgl_sidang(
-                        base=(base_d if isinstance(base_d, date) else base_d.date()),
-                        jenis=dbg_jenis,
-                        hari_sidang_num=hnum,
-                        libur_set=libur_set_local,
-                        klasifikasi=dbg_klas,
-                    )
-                    return pd.to_datetime(d) if d else None
-
-                df["__rencana"] = df["__nama"].map(_calc_rencana)
+                df["__rencana"] = _rencana_many(df["__nama"], base_d, dbg_jenis, dbg_klas, libur_set_local)
                 df = df[df["__rencana"].notna()]
                 if df.empty:
                     return df
 
                 # exclude CUTI (hari ini & pada tanggal rencana)
-                if not cuti_df_local.empty:
-                    today_pd = pd.to_datetime(date.today()).normalize()
-                    df = df[~df.apply(
-                        lambda r: (_is_hakim_cuti(r["__nama"], r["__rencana"], cuti_df_local) or
-                                _is_hakim_cuti(r["__nama"], today_pd, cuti_df_local)),
-                        axis=1
-                    )]
+                today_pd = pd.to_datetime(date.today()).normalize()
+                df = df[~_cuti_mask(df["__nama"], df["__rencana"], today_pd)]
 
                 return df
 
@@ -2613,7 +2649,7 @@ if is_admin:
                 st.info("Tidak ada kandidat (cek master hakim, hari sidang, libur/cuti).")
             else:
                 # --- TOKEN-BASED cooldown filter ---
-                cand["_under_cd"] = cand["__nama"].map(_cool_v2_is_active)
+                cand["_under_cd"] = cand["__nama"].isin(_cool_v2_active_names())
                 cand2 = cand[~cand["_under_cd"]].copy()
 
                 # simulasi: jika semua under cooldown, tampilkan semua (tanpa filter) agar tetap bisa dianalisis
@@ -2623,7 +2659,7 @@ if is_admin:
 
                 # --- Hitung beban + fairness (HANYA window di-override) ---
                 counts = _weighted_load_counts(
-                    rekap_df=rekap_df,
+                    rekap_df=D.rekap,
                     now_date=dbg_day,
                     window_days=int(window_days),
                     half_life_days=int(bcfg.get("half_life_days", 30)),
@@ -2631,7 +2667,7 @@ if is_admin:
                     use_decay=bool(bcfg.get("use_decay", True)),
                 )
                 cand2["__load"] = cand2["__nama"].map(lambda n: float(counts.get(n, 0.0)))
-                cand2["__last_seen_days"] = cand2["__nama"].map(lambda n: _last_seen_days_for(n, rekap_df, dbg_day))
+                cand2["__last_seen_days"] = cand2["__nama"].map(lambda n: _last_seen_days_for(n, D.rekap, dbg_day))
                 cand2 = cand2.sort_values(by=["__load","__last_seen_days","__nama"], ascending=[True,False,True], kind="stable")
 
                 chosen = str(cand2.iloc[0]["__nama"]) if not cand2.empty else ""
@@ -2646,7 +2682,7 @@ if is_admin:
                 Lmax = float(s_sorted.iloc[-1]) if len(s_sorted) > 0 else float("nan")
                 tau = float(beta_val) * (Lmax - Lmin) if (not pd.isna(Lmax) and not pd.isna(Lmin)) else float("nan")
 
-                abs_gap_cfg = float(get_config().get("hakim", {}).get("elastic_min_gap_cool", 2.0))
+                abs_gap_cfg = get_config().elastic_min_gap_cool
                 gap = (L2 - L1) if (not pd.isna(L1) and not pd.isna(L2)) else float("nan")
 
                 need_cd = False
@@ -2679,7 +2715,7 @@ if is_admin:
                 if (cand["_under_cd"]).any():
                     ex = cand[cand["_under_cd"]][["__nama"]].copy()
                     ex["Load"] = ex["__nama"].map(lambda n: float(counts.get(n, 0.0)))
-                    ex["Last seen (hari)"] = ex["__nama"].map(lambda n: _last_seen_days_for(n, rekap_df, dbg_day))
+                    ex["Last seen (hari)"] = ex["__nama"].map(lambda n: _last_seen_days_for(n, D.rekap, dbg_day))
                     ex["Under cooldown?"] = True
                     ex = ex.rename(columns={"__nama":"Hakim"})
                     show = pd.concat([show, ex], ignore_index=True)
@@ -2711,14 +2747,16 @@ if is_admin:
 
                         
         with st.expander("🧾 Audit terakhir", expanded=False):
-            aud = _read_csv(Path(AUDIT_LOG_CSV))
-            if aud.empty:
+            alog = _audit_log()
+            aud_show = alog.tail(50)   # hanya ujung segmen terbaru yang dibaca
+            if aud_show.empty:
                 st.caption("Belum ada audit.")
             else:
-                aud_show = aud.copy()
-                aud_show = aud_show.sort_values("ts", ascending=False).head(50)
                 st.dataframe(aud_show, use_container_width=True)
-                st.download_button("⬇️ Unduh audit_log.csv", data=aud.to_csv(index=False).encode("utf-8-sig"),
+                a_st = alog.stats()
+                st.caption(f"{a_st['segmen']} segmen • {_human_size(a_st['bytes'])} • buffer {a_st['buffer']}")
+                # riwayat penuh dibangun hanya saat tombol diklik
+                st.download_button("⬇️ Unduh audit_log.csv", data=alog.export_csv,
                                 file_name="audit_log.csv", mime="text/csv")
 
     st.markdown("---")
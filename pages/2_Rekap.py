@@ -9,6 +9,9 @@ import calendar
 import pandas as pd
 import streamlit as st
 from app_core.login import _ensure_auth
+from app_core.registry import get_registry
+from app_core.rekap_summary import rekap_summary
+from app_core.search_index import search_index_for
 
 # ===== UI helper optional =====
 try:
@@ -103,12 +106,9 @@ LIBUR_FILE = Path("data/libur.csv")
 
 def _load_holidays() -> set[pd.Timestamp]:
     """Baca daftar hari libur dari data/libur.csv (kolom: tanggal)."""
-    if not LIBUR_FILE.exists():
+    dfh = get_registry().table(LIBUR_FILE)
+    if dfh.empty:
         return set()
-    try:
-        dfh = pd.read_csv(LIBUR_FILE, encoding="utf-8-sig")
-    except Exception:
-        dfh = pd.read_csv(LIBUR_FILE)
     # cari kolom tanggal yang tepat
     cand = [c for c in dfh.columns if str(c).strip().lower() in {"tanggal", "tgl", "date"}]
     if not cand:
@@ -119,20 +119,21 @@ def _load_holidays() -> set[pd.Timestamp]:
 DATA_FILE = Path("data/rekap.csv")
 
 def _to_dt_series(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s   # sudah bertipe dari store
     return pd.to_datetime(s.astype(str), errors="coerce")
 
-def _load_rekap_from_csv() -> pd.DataFrame:
-    if not DATA_FILE.exists():
-        return pd.DataFrame()
-    try:
-        df = pd.read_csv(DATA_FILE, encoding="utf-8-sig")
-    except Exception:
-        df = pd.read_csv(DATA_FILE)
+def _load_rekap_from_csv() -> tuple[tuple, pd.DataFrame]:
+    # base snapshot + jurnal append-only (TableRegistry bersama, view read-only);
+    # versi diambil bersama frame-nya → kunci indeks teks tidak tertukar dengan isi yang lebih baru
+    ver, df = get_registry().rekap_versioned(DATA_FILE)
+    if df.empty:
+        return ver, pd.DataFrame()
     # normalisasi tanggal
     for c in ("tgl_register", "tgl_sidang"):
         if c in df.columns:
             df[c] = _to_dt_series(df[c])
-    return df
+    return ver, df
 
 def _export_view_to_csv(df: pd.DataFrame, filename: str = "rekap_terfilter.csv") -> bytes:
     out = df.copy()
@@ -166,7 +167,7 @@ def _norm_metode(m: str) -> str:
 # =========================================================
 # Load data
 # =========================================================
-rekap = _load_rekap_from_csv()
+rekap_ver, rekap = _load_rekap_from_csv()
 st.caption(f"🗂️ Sumber data: **CSV** • Total baris: **{len(rekap):,}**")
 
 # ================== TABS ================================
@@ -198,7 +199,9 @@ with tab1:
             col1, col2, col3 = st.columns([1, 1, 2])
             from_day = pd.to_datetime(col1.date_input("Dari tanggal", key="rekap_from")).normalize()
             to_day   = pd.to_datetime(col2.date_input("Sampai tanggal", key="rekap_to")).normalize()
-            q = col3.text_input("Cari (nomor/hakim/PP/JS/klasifikasi/jenis)", key="q_text")
+            q = col3.text_input("Cari (nomor/hakim/PP/JS/klasifikasi/jenis)", key="q_text",
+                                help="Akhiri dengan * untuk awalan nomor perkara (mis. 12/Pdt.G*). "
+                                     "Nama dicocokkan juga tanpa gelar.")
 
         # pilih kolom tanggal acuan
         date_col = "tgl_register" if "tgl_register" in rekap.columns else "tgl_sidang"
@@ -209,20 +212,10 @@ with tab1:
         # filter range tanggal
         mask = (work["__ts"] >= from_day) & (work["__ts"] <= to_day)
 
-        # filter teks
+        # filter teks (indeks teks per versi rekap; posisi baris = posisi di `rekap`)
         if q.strip():
-            qq = q.strip().lower()
-            def _hit(row) -> bool:
-                fields = [
-                    str(row.get("nomor_perkara", "")),
-                    str(row.get("hakim", "")),
-                    str(row.get("pp", "")),
-                    str(row.get("js", "")),
-                    str(row.get("klasifikasi", "")),
-                    str(row.get("jenis_perkara", "")),
-                ]
-                return any(qq in s.lower() for s in fields)
-            mask = mask & work.apply(_hit, axis=1)
+            sidx = search_index_for(rekap, key=("rekap", DATA_FILE.as_posix(), rekap_ver))
+            mask = mask & sidx.mask(q, fields=["nomor_perkara", "hakim", "pp", "js", "klasifikasi", "jenis_perkara"])
 
         show_df = work.loc[mask].drop(columns=["__ts"], errors="ignore")
 
@@ -274,17 +267,18 @@ with tab2:
         st.info("Belum ada data untuk ringkasan.")
     else:
         date_col = "tgl_register" if "tgl_register" in rekap.columns else "tgl_sidang"
-        tmp = rekap.copy()
-        tmp["__tgl"] = pd.to_datetime(tmp[date_col], errors="coerce").dt.normalize()
-        tmp = tmp.dropna(subset=["__tgl"])
-        tmp["__metode"] = tmp["metode"].map(_norm_metode) if "metode" in tmp.columns else "Manual"
-        tmp["__tipe"] = tmp["nomor_perkara"].map(_detect_tipe_from_nomor) if "nomor_perkara" in tmp.columns else "G"
-
-        # label kategori
-        tmp["E_G"] = ((tmp["__metode"] == "E-Court") & (tmp["__tipe"] == "G")).astype(int)
-        tmp["E_P"] = ((tmp["__metode"] == "E-Court") & (tmp["__tipe"] == "P")).astype(int)
-        tmp["M_G"] = ((tmp["__metode"] == "Manual")  & (tmp["__tipe"] == "G")).astype(int)
-        tmp["M_P"] = ((tmp["__metode"] == "Manual")  & (tmp["__tipe"] == "P")).astype(int)
+        if date_col != "tgl_register":
+            tmp = rekap.copy()
+            tmp["__tgl"] = pd.to_datetime(tmp[date_col], errors="coerce").dt.normalize()
+            tmp = tmp.dropna(subset=["__tgl"])
+            tmp["__metode"] = tmp["metode"].map(_norm_metode) if "metode" in tmp.columns else "Manual"
+            tmp["__tipe"] = tmp["nomor_perkara"].map(_detect_tipe_from_nomor) if "nomor_perkara" in tmp.columns else "G"
+
+            # label kategori
+            tmp["E_G"] = ((tmp["__metode"] == "E-Court") & (tmp["__tipe"] == "G")).astype(int)
+            tmp["E_P"] = ((tmp["__metode"] == "E-Court") & (tmp["__tipe"] == "P")).astype(int)
+            tmp["M_G"] = ((tmp["__metode"] == "Manual")  & (tmp["__tipe"] == "G")).astype(int)
+            tmp["M_P"] = ((tmp["__metode"] == "Manual")  & (tmp["__tipe"] == "P")).astype(int)
 
         # pilih bulan & tahun
         _today = date.today()
@@ -317,11 +311,6 @@ with tab2:
                 return False
             return True
 
-        # filter data sumber ke hari kerja saja dalam bulan terpilih
-        in_month = (tmp["__tgl"] >= first_day) & (tmp["__tgl"] <= last_day)
-        is_workday = tmp["__tgl"].map(_is_kerja)
-        tmp_month = tmp.loc[in_month & is_workday].copy()
-
         # bangun index hanya hari kerja (tanpa Sabtu/Minggu/libur)
         all_days = pd.date_range(first_day, last_day, freq="D")
         workdays = [d for d in all_days if _is_kerja(d)]
@@ -330,11 +319,25 @@ with tab2:
             st.stop()
 
         # agregasi harian lalu reindex ke daftar hari kerja
-        grp = (
-            tmp_month.groupby("__tgl")[["E_G", "E_P", "M_G", "M_P"]]
-            .sum()
-            .reindex(workdays, fill_value=0)
-        )
+        if date_col == "tgl_register":
+            # ringkasan harian terwujud (hari = tgl_register) → tanpa memindai rekap
+            q = rekap_summary(DATA_FILE).query(("day", "metode", "tipe"), start=first_day, end=last_day).reset_index()
+            q["kat"] = q["metode"].map({"E-Court": "E", "Manual": "M"}) + "_" + q["tipe"]
+            grp = (
+                q.pivot_table(index="day", columns="kat", values="n", aggfunc="sum")
+                .reindex(index=workdays, columns=["E_G", "E_P", "M_G", "M_P"])
+                .fillna(0).astype(int)
+            )
+        else:
+            # filter data sumber ke hari kerja saja dalam bulan terpilih
+            in_month = (tmp["__tgl"] >= first_day) & (tmp["__tgl"] <= last_day)
+            is_workday = tmp["__tgl"].map(_is_kerja)
+            tmp_month = tmp.loc[in_month & is_workday].copy()
+            grp = (
+                tmp_month.groupby("__tgl")[["E_G", "E_P", "M_G", "M_P"]]
+                .sum()
+                .reindex(workdays, fill_value=0)
+            )
         grp.index.name = "Tanggal"
 
         # ringkasan bulanan
@@ -445,21 +448,27 @@ with tab3:
             start_ts = pd.Timestamp(tgl_awal)
             end_ts   = pd.Timestamp(tgl_akhir)  # inklusif
 
-            # --- filter & siapkan data ---
-            temp = rekap.copy()
-            temp["__tgl"] = pd.to_datetime(temp[date_col], errors="coerce")
-            temp = temp.dropna(subset=["__tgl"])
-            mask = (temp["__tgl"] >= start_ts) & (temp["__tgl"] <= end_ts)
-
             # --- agregasi per majelis/hakim ---
+            if date_col == "tgl_register" and hakim_col == "hakim":
+                # ringkasan harian terwujud (hari = tgl_register) → tanpa memindai rekap
+                q = rekap_summary(DATA_FILE).query(("hakim",), start=start_ts, end=end_ts)
+                q = q[q.index.astype(str) != ""]
+                per_majelis = q.rename_axis("Hakim").reset_index(name="Beban Perkara")
+            else:
+                temp = rekap.copy()
+                temp["__tgl"] = pd.to_datetime(temp[date_col], errors="coerce")
+                temp = temp.dropna(subset=["__tgl"])
+                mask = (temp["__tgl"] >= start_ts) & (temp["__tgl"] <= end_ts)
+                per_majelis = (
+                    temp.loc[mask & (temp[hakim_col].astype(str).str.strip() != "")]
+                        .groupby(temp[hakim_col].astype(str).str.strip())
+                        .size()
+                        .reset_index(name="Beban Perkara")
+                        .rename(columns={hakim_col: "Hakim"})
+                )
             per_majelis = (
-                temp.loc[mask & (temp[hakim_col].astype(str).str.strip() != "")]
-                    .groupby(temp[hakim_col].astype(str).str.strip())
-                    .size()
-                    .reset_index(name="Beban Perkara")
-                    .rename(columns={hakim_col: "Hakim"})
-                    .sort_values("Beban Perkara", ascending=False, kind="stable")
-                    .reset_index(drop=True)
+                per_majelis.sort_values(["Beban Perkara", "Hakim"], ascending=[False, True], kind="stable")
+                           .reset_index(drop=True)
             )
 
             st.caption(
@@ -12,9 +12,13 @@ import io, re, math
 from pathlib import Path
 from typing import Tuple, Dict, Set, Optional
 from app_core.login import _ensure_auth
+from app_core.io_csv import write_table
+from app_core.registry import get_registry
 import pandas as pd
 import streamlit as st
 from app_core.nav import render_top_nav
+from app_core.name_index import name_key
+from app_core.workload import get_workload_cache
 render_top_nav()  # tampilkan top bar
 
 # ============== PAGE CONFIG ==============
@@ -44,25 +48,17 @@ def U_safe_int(v) -> int:
         except Exception: return 0
 
 def U_read_csv(path: Path) -> pd.DataFrame:
-    if not path.exists(): return pd.DataFrame()
-    for enc in ["utf-8-sig","utf-8","cp1252"]:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            continue
-    return pd.read_csv(path)
+    # store bertipe (parquet) via TableRegistry bersama — CSV hanya mirror/impor
+    return get_registry().table(path)
 
 def U_write_csv(df: pd.DataFrame, path: Path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False, encoding="utf-8-sig")
+    write_table(df, path)   # parquet + CSV mirror
 
 def U_write_csv_atomic(df: pd.DataFrame, path: Path):
-    tmp = path.with_suffix(".tmp.csv")
-    df.to_csv(tmp, index=False, encoding="utf-8-sig")
-    tmp.replace(path)
+    write_table(df, path)   # parquet (atomic) + CSV mirror
 
 def U_name_key(s: str) -> str:
-    return re.sub(r"\s+"," ", str(s or "").strip().lower())
+    return name_key(str(s or ""))   # definisi bersama (app_core/name_index.py)
 
 # ========================================
 # ============= TAB 1: JS ================
@@ -134,48 +130,16 @@ def JS_delete_by_id(df: pd.DataFrame, row_id: int) -> pd.DataFrame:
     work = JS_ensure_cols(df)
     return work[work["id"] != int(row_id)].reset_index(drop=True)
 
-def JS_load_rekap() -> pd.DataFrame:
-    df = U_read_csv(REKAP_CSV)
-    if df.empty: return df
-    ren = {}
-    for c in df.columns:
-        k = re.sub(r"\s+"," ", str(c).replace("\ufeff","").strip().lower())
-        if   k in {"pp","panitera pengganti"}: new="pp"
-        elif k in {"js","jurusita"}: new="js"
-        elif k in {"metode","method"}: new="metode"
-        elif k in {"jenis_perkara","jenis"}: new="jenis_perkara"
-        else: new=c
-        ren[c]=new
-    return df.rename(columns=ren)
-
-def JS_build_metode_norm(s: pd.Series) -> pd.Series:
-    m = s.astype(str).str.strip().str.lower()
-    m = m.replace({"ecourt":"e-court","e court":"e-court"})
-    ok = m.isin(["e-court","manual"])
-    return m.where(ok, "e-court")
-
 def JS_compute_workload(js_df: pd.DataFrame) -> pd.DataFrame:
     if js_df.empty:
         return js_df.assign(**{"E-Court":0,"Manual":0,"Ghoib":0,"Total":0})
-    r = JS_load_rekap()
-    if r.empty or "js" not in r.columns:
-        return js_df.assign(**{"E-Court":0,"Manual":0,"Ghoib":0,"Total":0})
-
-    r = r.copy()
-    r["js_norm"] = r["js"].astype(str).map(U_name_key)
-    r["m_norm"] = JS_build_metode_norm(r.get("metode", pd.Series(index=r.index, dtype="string")))
-    r["jenis_u"] = r.get("jenis_perkara", pd.Series(index=r.index)).astype(str).str.upper().str.strip()
-
-    by_js_m = r.groupby(["js_norm","m_norm"]).size().unstack(fill_value=0)
-    ghoib_ct = r[r["jenis_u"]=="GHOIB"].groupby("js_norm").size() if "jenis_u" in r.columns else pd.Series(dtype=int)
-
+    # kubus statistik bersama (peran js, VERZET ikut dihitung) → posisi master via nama + alias;
+    # header rekap lama 'jurusita'/'jenis' sudah dibakukan ke js/jenis_perkara oleh normalize_rekap
+    wl = get_workload_cache().get(REKAP_CSV, js_df, role="js", exclude_verzet=False)
     js = js_df.copy()
-    js["__name_norm"] = js["nama"].map(U_name_key)
-    js["E-Court"] = js["__name_norm"].map(lambda k: int(by_js_m.loc[k, "e-court"]) if ("e-court" in by_js_m.columns and k in by_js_m.index) else 0)
-    js["Manual"]  = js["__name_norm"].map(lambda k: int(by_js_m.loc[k, "manual"])  if ("manual"  in by_js_m.columns and k in by_js_m.index) else 0)
-    js["Ghoib"]   = js["__name_norm"].map(lambda k: int(ghoib_ct.get(k, 0)))
-    js["Total"]   = js["E-Court"] + js["Manual"]
-    return js.drop(columns=["__name_norm"])
+    for c in ["E-Court","Manual","Ghoib","Total"]:
+        js[c] = wl.counts[c].to_numpy()
+    return js
 
 # Dialog state (JS)
 if "JS_dialog" not in st.session_state:
@@ -9,9 +9,13 @@ import math
 from pathlib import Path
 from typing import Optional, Dict
 from app_core.login import _ensure_auth
+from app_core.io_csv import write_table, parquet_path_for
+from app_core.mirror_all import mirror_csv
+from app_core.registry import get_registry
 import pandas as pd
 import streamlit as st
 from app_core.nav import render_top_nav
+from app_core.row_table import row_action_table
 render_top_nav()  # tampilkan top bar
 
 # ====== Setup dasar ======
@@ -52,6 +56,8 @@ def _has_rows(df: Optional[pd.DataFrame]) -> bool:
 def _parse_tanggal(x) -> pd.Timestamp:
     if pd.isna(x):
         return pd.NaT
+    if isinstance(x, pd.Timestamp):
+        return x   # sudah bertipe dari store
     s = str(x).strip()
     if not s:
         return pd.NaT
@@ -95,24 +101,21 @@ def _standardize_input_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 # ====== CSV I/O ======
 def load_csv() -> pd.DataFrame:
+    # libur.parquet (bertipe) sumber utama; libur_df.csv hanya cadangan lama
     for p in [LIBUR_PATH, LIBUR_DF_PATH]:
-        if p.exists():
-            try:
-                df = pd.read_csv(p)
-            except Exception:
-                df = pd.read_csv(p, encoding="utf-8-sig")
+        if p.exists() or parquet_path_for(p).exists():
+            df = get_registry().table(p)
             df = _standardize_input_columns(df)
             return df
     return pd.DataFrame(columns=["tanggal", "keterangan"])
 
 def save_csv(df: pd.DataFrame):
     if not _has_rows(df):
-        pd.DataFrame(columns=["tanggal", "keterangan"]).to_csv(LIBUR_PATH, index=False, encoding="utf-8-sig")
-        pd.DataFrame(columns=["tanggal", "keterangan"]).to_csv(LIBUR_DF_PATH, index=False, encoding="utf-8-sig")
-        return
-    out = _standardize_input_columns(df)
-    out.to_csv(LIBUR_PATH, index=False, encoding="utf-8-sig")
-    out.to_csv(LIBUR_DF_PATH, index=False, encoding="utf-8-sig")
+        out = pd.DataFrame(columns=["tanggal", "keterangan"])
+    else:
+        out = _standardize_input_columns(df)
+    write_table(out, LIBUR_PATH)                  # parquet + CSV mirror
+    mirror_csv(out, LIBUR_DF_PATH.as_posix())     # mirror untuk user/UI
 
 # ====== Info lokasi ======
 with st.expander("ℹ️ Lokasi Penyimpanan"):
@@ -306,41 +309,24 @@ else:
     end_idx = start_idx + page_size
     page_df = view.iloc[start_idx:end_idx].reset_index(drop=True)
 
-    COLS = [1.4, 1.8, 3.0, 0.9, 0.9]
-    h = st.columns(COLS)
-    h[0].markdown("**Tanggal (ISO)**")
-    h[1].markdown("**Tanggal (ID)**")
-    h[2].markdown("**Keterangan**")
-    h[3].markdown("**Edit**")
-    h[4].markdown("**Hapus**")
-    st.markdown("<hr/>", unsafe_allow_html=True)
-
-    base_unsorted = libur_df.reset_index(drop=True).copy()
-    for i, row in page_df.iterrows():
-        tgl_iso = str(row.get("tanggal", "")) or "-"
-        tgl_idn = str(row.get("__tgl_fmt", "")) or "-"
-        ket = str(row.get("keterangan", "")) or "-"
-
-        cols = st.columns(COLS)
-        cols[0].write(tgl_iso)
-        cols[1].write(tgl_idn)
-        cols[2].write(ket)
-
-        key_suffix = f"p{page}_i{i}"
+    shown = pd.DataFrame({
+        "Tanggal (ISO)": page_df["tanggal"].fillna("").astype(str).replace("", "-"),
+        "Tanggal (ID)": page_df["__tgl_fmt"].fillna("").astype(str).replace("", "-"),
+        "Keterangan": page_df["keterangan"].fillna("").astype(str).replace("", "-"),
+    })
+    act, i = row_action_table(shown, key=f"libur_rows_p{page}", label_col="Tanggal (ID)")
+    if act is not None:
+        base_unsorted = libur_df.reset_index(drop=True)
+        tgl_iso = str(page_df.iloc[i].get("tanggal", "")) or "-"
         try:
             orig_index = int(base_unsorted[base_unsorted["tanggal"] == tgl_iso].index[0])
         except Exception:
             orig_index = 0
 
-        with cols[3]:
-            if st.button("✏️", key=f"edit_libur_{key_suffix}"):
-                open_libur_dialog("edit", {"index": int(orig_index)})
-                st.rerun()
-        with cols[4]:
-            if st.button("🗑️", key=f"del_libur_{key_suffix}"):
-                open_libur_dialog("edit", {"index": int(orig_index)})
-                st.warning("Centang 'Konfirmasi hapus' lalu klik 🗑️ Hapus di dialog.")
-                st.rerun()
+        open_libur_dialog("edit", {"index": int(orig_index)})
+        if act == "delete":
+            st.warning("Centang 'Konfirmasi hapus' lalu klik 🗑️ Hapus di dialog.")
+        st.rerun()
 
     pc1, pc2, pc3 = st.columns([1, 2, 1])
     with pc1:
@@ -9,7 +9,10 @@ from app_core.login import _ensure_auth
 # --- Hilangkan impor DB ---
 # from db import get_conn, init_db     # (hapus)
 from app_core.exports import export_csv
+from app_core.io_csv import write_table
+from app_core.registry import get_registry
 from app_core.nav import render_top_nav
+from app_core.row_table import row_action_table
 render_top_nav()  # tampilkan top bar
 
 st.set_page_config(page_title="Data: SK Majelis", layout="wide", initial_sidebar_state="collapsed")
@@ -46,19 +49,11 @@ def _to_int(v, default=0) -> int:
         except Exception: return default
 
 def _read_csv(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        return pd.DataFrame()
-    for enc in ["utf-8-sig","utf-8","cp1252"]:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            continue
-    return pd.read_csv(path)
+    # store bertipe (parquet) via TableRegistry bersama — CSV hanya mirror/impor
+    return get_registry().table(path)
 
 def _write_csv_atomic(df: pd.DataFrame, path: Path):
-    tmp = path.with_suffix(".tmp.csv")
-    df.to_csv(tmp, index=False, encoding="utf-8-sig")
-    tmp.replace(path)
+    write_table(df, path)   # parquet (atomic) + CSV mirror
 
 # ==================== SK Majelis: load/save/upsert ====================
 SK_COLS = ["id","majelis","hari","ketua","anggota1","anggota2","pp1","pp2","js1","js2","aktif","catatan"]
@@ -502,16 +497,7 @@ page = min(max(1, page), pages)
 start, end = (page-1)*ps, (page-1)*ps + ps
 page_df = view.iloc[start:end].reset_index(drop=True)
 
-# Header
-COLS = [0.6, 1.5, 0.8, 1.4, 1.4, 1.1, 1.1, 1.1, 0.6, 0.6]
-h = st.columns(COLS)
-h[0].markdown("**ID**"); h[1].markdown("**Majelis**"); h[2].markdown("**Hari**"); h[3].markdown("**Ketua**")
-h[4].markdown("**Anggota 1**"); h[5].markdown("**Anggota 2**")
-h[6].markdown("**PP1**"); h[7].markdown("**PP2**"); h[8].markdown("**Aktif%s**"); h[9].markdown("**Aksi**")
-st.markdown("<hr/>", unsafe_allow_html=True)
-
 # Rows
-full_now = raw
 page_df_reset = page_df.reset_index(drop=True)
 
 def _valid_id(x):
@@ -520,66 +506,54 @@ def _valid_id(x):
     except Exception:
         return False
 
-for i, r in page_df_reset.iterrows():
-    cols = st.columns(COLS)
-
+def _txt(c: str) -> pd.Series:
+    s_ = page_df_reset[c] if c in page_df_reset.columns else pd.Series("", index=page_df_reset.index)
+    return s_.fillna("").astype(str).replace("", "-")
+
+shown = pd.DataFrame({
+    "ID": [str(int(x)) if _valid_id(x) else "-" for x in page_df_reset.get("id", pd.Series(None, index=page_df_reset.index))],
+    "Majelis": _txt("majelis"), "Hari": _txt("hari"), "Ketua": _txt("ketua"),
+    "Anggota 1": _txt("anggota1"), "Anggota 2": _txt("anggota2"),
+    "PP1": _txt("pp1"), "PP2": _txt("pp2"),
+    "Aktif%s": ["YA" if _is_active_value(v) else "TIDAK" for v in page_df_reset.get("aktif", pd.Series(1, index=page_df_reset.index))],
+})
+act, i = row_action_table(shown, key=f"sk_rows_p{page}", label_col="Majelis")
+if act is not None:
+    r = page_df_reset.iloc[i]
     rid_raw = r.get("id")
-    try:
-        rid = int(rid_raw);  rid = None if rid == 0 else rid
-    except Exception:
-        rid = None
 
-    safe_hash = abs(hash(
-        "|".join(str(r.get(c,"")) for c in ["majelis","hari","ketua","anggota1","anggota2","pp1","pp2","js1","js2"])
-    )) % 10_000_000
-    rowkey = f"id_{rid}" if _valid_id(rid_raw) else f"p{page}_i{start+i}_{safe_hash}"
-
-    cols[0].write(str(rid) if _valid_id(rid_raw) else "-")
-    cols[1].write(str(r.get("majelis","")) or "-")
-    cols[2].write(str(r.get("hari","")) or "-")
-    cols[3].write(str(r.get("ketua","")) or "-")
-    cols[4].write(str(r.get("anggota1","")) or "-")
-    cols[5].write(str(r.get("anggota2","")) or "-")
-    cols[6].write(str(r.get("pp1","")) or "-")
-    cols[7].write(str(r.get("pp2","")) or "-")
-    cols[8].write("YA" if _is_active_value(r.get("aktif",1)) else "TIDAK")
-
-    with cols[9]:
-        cA, cB = st.columns(2)
-        with cA:
-            if st.button("✏️", key=f"edit_{rowkey}"):
-                full = load_sk().reset_index(drop=True)
-                target_idx = None
-
-                if "id" in full.columns and _valid_id(rid_raw):
-                    match = full.index[full["id"] == int(rid_raw)]
-                    if len(match) > 0:
-                        target_idx = int(match[0])
-
-                if target_idx is None:
-                    keys = ["majelis","hari","ketua","anggota1","anggota2","pp1","pp2","js1","js2"]
-                    mask = pd.Series([True]*len(full))
-                    for k in keys:
-                        rv = str(r.get(k,"") or "")
-                        mask = mask & (full[k].astype(str).fillna("") == rv)
-                    m2 = full.index[mask]
-                    if len(m2) > 0:
-                        target_idx = int(m2[0])
-                    else:
-                        target_idx = int(start + i) if (start + i) < len(full) else 0
-
-                open_sk_dialog("edit", {"index": target_idx})
-
-        with cB:
-            if st.button("🗑️", key=f"del_{rowkey}"):
-                if _valid_id(rid_raw):
-                    df = load_sk()
-                    df = delete_sk_by_id(df, int(rid_raw))
-                    save_sk(df)
-                    export_sk_csv()
-                    st.success("Baris dihapus."); st.rerun()
-                else:
-                    st.warning("Tidak bisa hapus: baris ini tidak memiliki ID yang valid.")
+    if act == "edit":
+        full = load_sk().reset_index(drop=True)
+        target_idx = None
+
+        if "id" in full.columns and _valid_id(rid_raw):
+            match = full.index[full["id"] == int(rid_raw)]
+            if len(match) > 0:
+                target_idx = int(match[0])
+
+        if target_idx is None:
+            keys = ["majelis","hari","ketua","anggota1","anggota2","pp1","pp2","js1","js2"]
+            mask = pd.Series([True]*len(full))
+            for k in keys:
+                rv = str(r.get(k,"") or "")
+                mask = mask & (full[k].astype(str).fillna("") == rv)
+            m2 = full.index[mask]
+            if len(m2) > 0:
+                target_idx = int(m2[0])
+            else:
+                target_idx = int(start + i) if (start + i) < len(full) else 0
+
+        open_sk_dialog("edit", {"index": target_idx})
+
+    elif act == "delete":
+        if _valid_id(rid_raw):
+            df = load_sk()
+            df = delete_sk_by_id(df, int(rid_raw))
+            save_sk(df)
+            export_sk_csv()
+            st.success("Baris dihapus."); st.rerun()
+        else:
+            st.warning("Tidak bisa hapus: baris ini tidak memiliki ID yang valid.")
 
 # Pagination controls
 pc1, pc2, pc3 = st.columns([1,2,1])
@@ -3,11 +3,17 @@ from __future__ import annotations
 import re, math
 from pathlib import Path
 from datetime import date
-from typing import Dict, List, Set, Tuple
+from typing import List, Tuple
 import pandas as pd
 import streamlit as st
 from app_core.login import _ensure_auth
+from app_core.io_csv import write_table
+from app_core.registry import get_registry
 from app_core.nav import render_top_nav
+from app_core.name_index import NameIndex, name_key, alias_entries
+from app_core.workload import get_workload_cache
+from app_core.cuti_index import merge_ranges
+from app_core.row_table import row_action_table
 render_top_nav()  # tampilkan top bar
 
 # =================== Page meta ===================
@@ -56,51 +62,19 @@ def _to_dt(s: pd.Series) -> pd.Series:
     return iso_parsed.combine_first(other_parsed)
 
 def _read_csv(path: Path) -> pd.DataFrame:
-    if not path.exists(): return pd.DataFrame()
-    for enc in ("utf-8-sig","utf-8","cp1252"):
-        try: return pd.read_csv(path, encoding=enc)
-        except Exception: pass
-    return pd.read_csv(path)
+    # store bertipe (parquet) via TableRegistry bersama — CSV hanya mirror/impor
+    return get_registry().table(path)
 
 def _write_csv(df: pd.DataFrame, path: Path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False, encoding="utf-8-sig")
+    write_table(df, path)   # parquet + CSV mirror
 
 # =================== Normalisasi nama (shared) ===
-_PREFIX_RX = re.compile(r"^\s*((drs?|dra|prof|ir|apt|h|hj|kh|ust|ustadz|ustadzah)\.?\s+)+", flags=re.IGNORECASE)
-_SUFFIX_PATTERNS = [
-    r"s\.?\s*h\.?", r"s\.?\s*h\.?\s*i\.?", r"m\.?\s*h\.?", r"m\.?\s*h\.?\s*i\.?",
-    r"s\.?\s*ag", r"m\.?\s*ag", r"m\.?\s*kn", r"m\.?\s*hum",
-    r"s\.?\s*kom", r"s\.?\s*psi", r"s\.?\s*e", r"m\.?\s*m", r"m\.?\s*a",
-    r"llb", r"llm", r"phd", r"se", r"ssi", r"sh", r"mh"
-]
-_SUFFIX_RX = re.compile(r"(,?\s+(" + r"|".join(_SUFFIX_PATTERNS) + r"))+$", flags=re.IGNORECASE)
-
-def _clean_text(s: str) -> str:
-    x = str(s or "").replace("\u00A0"," ").strip()
-    x = re.sub(r"\s+"," ", x)
-    return x
-
-def _normalize_name_to_tokens(name: str) -> List[str]:
-    if not isinstance(name, str): return []
-    s = name.strip()
-    if not s: return []
-    s = s.replace(",", " ")
-    s = _SUFFIX_RX.sub("", s)
-    s = _PREFIX_RX.sub("", s)
-    s = s.replace(".", " ")
-    s = re.sub(r"\s+", " ", s).strip()
-    toks = [t.lower() for t in s.split() if t]
-    toks = [t for t in toks if t not in {"s","h","m","e"}]
-    return toks
-
+# satu definisi untuk semua halaman (app_core/name_index.py, di-memo per string)
 def _name_key_full(s: str) -> str:
-    return " ".join(_normalize_name_to_tokens(s))
+    return name_key(s)
 
 def _alias_entries(alias_text: str) -> List[str]:
-    if not isinstance(alias_text, str) or not alias_text.strip(): return []
-    parts = re.split(r"[;,\n]+", alias_text)
-    return [p.strip() for p in parts if p.strip()]
+    return alias_entries(alias_text)
 
 # =================== Loader/CRUD Hakim =============
 BASE_COLS_HAKIM = ["id","nama","hari","aktif","max_per_hari","alias","jabatan","catatan"]
@@ -154,14 +128,7 @@ def upsert_hakim_by_nama_csv(df: pd.DataFrame, nama: str, hari: str, aktif: int,
     work = _ensure_hakim_cols(df)
     key = _name_key_full(nama)
     if not key: return work, "skipped"
-    idx_match = None
-    for i, row in work.reset_index(drop=True).iterrows():
-        nm_key = _name_key_full(str(row["nama"]))
-        if key == nm_key: idx_match = i; break
-        for al in _alias_entries(str(row["alias"])):
-            if key == _name_key_full(al):
-                idx_match = i; break
-        if idx_match is not None: break
+    idx_match = NameIndex.from_df(work.reset_index(drop=True)).resolve_pos(nama, fuzzy=False)
 
     if idx_match is None:
         new_row = {
@@ -198,7 +165,7 @@ def delete_hakim_by_id_csv(df: pd.DataFrame, row_id: int) -> pd.DataFrame:
 
 # =================== Loader Rekap ====================
 def _load_rekap_csv() -> pd.DataFrame:
-    df = _read_csv(REKAP_CSV)
+    df = get_registry().rekap(REKAP_CSV)   # base + jurnal (cache bersama)
     if df.empty: return pd.DataFrame()
     if "register" in df.columns and "tgl_register" not in df.columns:
         df = df.rename(columns={"register":"tgl_register"})
@@ -242,24 +209,8 @@ def _standardize_cuti(df: pd.DataFrame) -> pd.DataFrame:
 
 def _merge_ranges(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty: return df
-    rows = []
-    for _, sub in df.groupby("_nama_norm", sort=True):
-        sub = sub.sort_values(["mulai","akhir"]).reset_index(drop=True)
-        cur_s, cur_e = None, None
-        show_name = sub.iloc[0]["nama"]
-        for _, r in sub.iterrows():
-            s, e = r["mulai"], r["akhir"]
-            if cur_s is None:
-                cur_s, cur_e = s, e
-            else:
-                if s <= (cur_e + pd.Timedelta(days=1)):
-                    cur_e = max(cur_e, e)
-                else:
-                    rows.append([r["_nama_norm"], show_name, cur_s, cur_e])
-                    cur_s, cur_e = s, e
-        rows.append([sub.iloc[0]["_nama_norm"], show_name, cur_s, cur_e])
-    out = pd.DataFrame(rows, columns=["_nama_norm","nama","mulai","akhir"])
-    return out.sort_values(["_nama_norm","mulai","akhir"]).reset_index(drop=True)
+    # gabung vektor bersama (aturan sama dengan indeks cuti di halaman Input)
+    return merge_ranges(df, "_nama_norm")
 
 def load_cuti() -> pd.DataFrame:
     return _standardize_cuti(_read_csv(CUTI_FILE))
@@ -286,7 +237,6 @@ tab1, tab2 = st.tabs(["🧑‍⚖️ Data Hakim", "🗓️ Cuti Hakim"])
 # ------------------- TAB 1: Data Hakim --------------
 with tab1:
     hakim_df = _load_hakim_csv()
-    rekap_df = _load_rekap_csv()
 
     st.caption(
         f"🗂️ Sumber data → **Hakim**: `{HAKIM_CSV.as_posix()}` • **Rekap**: `{REKAP_CSV.as_posix()}`"
@@ -432,94 +382,38 @@ with tab1:
                     st.success(f"Selesai impor: INSERTED={inserted}, UPDATED={updated}, SKIPPED={skipped}")
                     st.rerun()
 
-    # Hitung Beban dari rekap (exclude VERZET)
+    # Hitung Beban dari rekap (exclude VERZET) — vektor, cache per versi rekap
     hakim_df = _load_hakim_csv()
-    rekap_df = _load_rekap_csv()
-
-    def _build_metode_norm(df: pd.DataFrame) -> pd.Series:
-        if df.empty: return pd.Series(dtype="string", index=df.index)
-        m = df.get("metode", pd.Series(index=df.index, dtype="string")).astype(str).str.strip().str.lower()
-        m = m.replace({"ecourt": "e-court", "e court": "e-court"})
-        ok = m.isin(["e-court", "manual"])
-        m = m.where(ok, "e-court")
-        return m
-
-    def _is_verzet_row(x) -> bool:
-        return str(x).strip().upper() == "VERZET"
 
     if hakim_df.empty:
         st.info("Belum ada data Hakim. Klik ➕ Tambah Hakim atau gunakan Import CSV.")
     else:
-        # Map tokens nama+alias
-        name_to_idx: Dict[str, int] = {}
-        token_sets: Dict[int, Set[str]] = {}
         df_idx = hakim_df.reset_index(drop=True)
+        wl = get_workload_cache().get(REKAP_CSV, df_idx, role="hakim", exclude_verzet=True)
 
-        for i, row in df_idx.iterrows():
-            nm = str(row.get("nama",""))
-            key = _name_key_full(nm)
-            if key: name_to_idx.setdefault(key, i)
-            tset = set(key.split())
-            for al in _alias_entries(str(row.get("alias",""))):
-                k2 = _name_key_full(al)
-                if k2:
-                    name_to_idx.setdefault(k2, i)
-                    tset |= set(k2.split())
-            token_sets[i] = tset
-
-        rdx = rekap_df.copy()
-        if not rdx.empty and "klasifikasi" in rdx.columns:
-            rdx = rdx[~rdx["klasifikasi"].map(_is_verzet_row)].copy()
-        total_rekap = len(rekap_df)
-        total_dihitung = len(rdx)
-
-        ecount_per_idx = {i: 0 for i in range(len(df_idx))}
-        mcount_per_idx = {i: 0 for i in range(len(df_idx))}
-        unmatched_rows = []
-
-        if not rdx.empty and "hakim" in rdx.columns:
-            metode_norm = _build_metode_norm(rdx)
-            rdx = rdx.reset_index(drop=True)
-            for j, rec in rdx.iterrows():
-                raw_name = str(rec.get("hakim",""))
-                if not raw_name.strip():
-                    unmatched_rows.append((j, raw_name, "nama kosong")); continue
-                rec_key = _name_key_full(raw_name)
-                idx = name_to_idx.get(rec_key)
-                if idx is None:
-                    rset = set(rec_key.split())
-                    cands = [ii for ii, ts in token_sets.items() if rset.issubset(ts) or (rset & ts)]
-                    if cands:
-                        cands.sort(key=lambda ii: (-len(token_sets[ii] & rset), ii))
-                        idx = cands[0]
-                if idx is None:
-                    unmatched_rows.append((j, raw_name, "tidak cocok")); continue
-                if str(metode_norm.iloc[j]).lower() == "manual":
-                    mcount_per_idx[idx] += 1
-                else:
-                    ecount_per_idx[idx] += 1
-
-        st.caption(f"Total baris rekap: {total_rekap} • Dihitung: {total_dihitung} (exclude VERZET)")
+        st.caption(f"Total baris rekap: {wl.total_rekap} • Dihitung: {wl.total_dihitung} (exclude VERZET)")
+        if not wl.unmatched.empty:
+            with st.expander(f"⚠️ Nama hakim di rekap yang tidak cocok ({int(wl.unmatched['jumlah'].sum())} baris)"):
+                st.dataframe(wl.unmatched, width='stretch', hide_index=True)
 
         aktif_parsed = hakim_df.get("aktif", pd.Series(index=hakim_df.index)).apply(_is_active_value).reset_index(drop=True)
 
-        records = []
-        for i, row in df_idx.iterrows():
-            records.append({
-                "orig_i": i,
-                "row_id": _safe_int(row.get("id")),
-                "Nama": str(row.get("nama","")),
-                "Hari": str(row.get("hari","")),
-                "Aktif%s": "YA" if bool(aktif_parsed.iloc[i]) else "TIDAK",
-                "_aktif_bool": bool(aktif_parsed.iloc[i]),
-                "Max/Hari": _safe_int(row.get("max_per_hari")),
-                "Catatan": str(row.get("catatan","") or ""),
-                "Alias": str(row.get("alias","") or ""),
-                "E-Court": int(ecount_per_idx.get(i,0)),
-                "Manual": int(mcount_per_idx.get(i,0)),
-                "Total (−Verzet)": int(ecount_per_idx.get(i,0)) + int(mcount_per_idx.get(i,0)),
-            })
-        view_df = pd.DataFrame.from_records(records)
+        col = lambda c: df_idx[c] if c in df_idx.columns else pd.Series("", index=df_idx.index)
+        txt = lambda c: col(c).fillna("").astype(str)
+        view_df = pd.DataFrame({
+            "orig_i": range(len(df_idx)),
+            "row_id": col("id").map(_safe_int),
+            "Nama": txt("nama"),
+            "Hari": txt("hari"),
+            "Aktif%s": aktif_parsed.map({True: "YA", False: "TIDAK"}),
+            "_aktif_bool": aktif_parsed.astype(bool),
+            "Max/Hari": col("max_per_hari").map(_safe_int),
+            "Catatan": txt("catatan"),
+            "Alias": txt("alias"),
+            "E-Court": wl.counts["E-Court"].astype(int),
+            "Manual": wl.counts["Manual"].astype(int),
+            "Total (−Verzet)": wl.counts["Total"].astype(int),
+        })
 
         st.markdown("---")
         c1, c2, c3 = st.columns([1, 1.6, 0.9])
@@ -551,39 +445,24 @@ with tab1:
         end_idx = start_idx + page_size
         page_df = view_df.iloc[start_idx:end_idx].reset_index(drop=True)
 
-        # Header grid
-        COLS = [2.2,1.2,0.9,1.1,2.2,2.0,1.0,1.0,1.2,0.9,0.9]
-        h = st.columns(COLS)
-        h[0].markdown("**Nama**"); h[1].markdown("**Hari**"); h[2].markdown("**Aktif**"); h[3].markdown("**Max/Hari**")
-        h[4].markdown("**Catatan**"); h[5].markdown("**Alias**"); h[6].markdown("**E-Court**"); h[7].markdown("**Manual**")
-        h[8].markdown("**Total**"); h[9].markdown("**Edit**"); h[10].markdown("**Hapus**")
-        st.markdown("<hr/>", unsafe_allow_html=True)
-
-        for _, r in page_df.iterrows():
-            cols = st.columns(COLS)
-            cols[0].write(r["Nama"] or "-")
-            cols[1].write(r["Hari"] or "-")
-            cols[2].write(r["Aktif%s"])
-            cols[3].write(int(r["Max/Hari"]))
-            cols[4].write(r["Catatan"])
-            cols[5].write(r["Alias"])
-            cols[6].write(int(r["E-Court"]))
-            cols[7].write(int(r["Manual"]))
-            cols[8].write(int(r["Total (−Verzet)"]))
+        shown = page_df[["Nama", "Hari", "Aktif%s", "Max/Hari", "Catatan", "Alias",
+                         "E-Court", "Manual", "Total (−Verzet)"]].rename(columns={"Aktif%s": "Aktif", "Total (−Verzet)": "Total"})
+        act, pos = row_action_table(shown.replace({"Nama": {"": "-"}, "Hari": {"": "-"}}),
+                                    key=f"hakim_rows_p{page}", label_col="Nama")
+        if act is not None:
+            r = page_df.iloc[pos]
             orig_i = int(r["orig_i"]); row_id = int(r["row_id"]) if r["row_id"] else 0
-            with cols[9]:
-                if st.button("✏️", key=f"edit_hakim_{orig_i}"):
-                    open_hakim_dialog("edit_hakim", f"Edit Hakim: {r['Nama']}", {"index": orig_i})
-            with cols[10]:
-                if st.button("🗑️", key=f"del_hakim_{row_id or orig_i}"):
-                    df = _load_hakim_csv()
-                    if row_id:
-                        df = delete_hakim_by_id_csv(df, row_id)
-                    else:
-                        mask = df["nama"].astype(str).str.strip().str.lower() == str(r["Nama"]).strip().lower()
-                        df = df[~mask].reset_index(drop=True)
-                    _save_hakim_csv(df)
-                    st.success(f"Dihapus: {r['Nama']}"); st.rerun()
+            if act == "edit":
+                open_hakim_dialog("edit_hakim", f"Edit Hakim: {r['Nama']}", {"index": orig_i})
+            elif act == "delete":
+                df = _load_hakim_csv()
+                if row_id:
+                    df = delete_hakim_by_id_csv(df, row_id)
+                else:
+                    mask = df["nama"].astype(str).str.strip().str.lower() == str(r["Nama"]).strip().lower()
+                    df = df[~mask].reset_index(drop=True)
+                _save_hakim_csv(df)
+                st.success(f"Dihapus: {r['Nama']}"); st.rerun()
 
         pc1, pc2, pc3 = st.columns([1,2,1])
         with pc1:
@@ -644,23 +523,13 @@ with tab2:
         show["akhir"] = pd.to_datetime(show["akhir"]).dt.date
         show = show[["nama","mulai","akhir"]].reset_index(drop=True)
 
-        COLS = [2.8, 1.2, 1.2, 0.9, 0.9]
-        h = st.columns(COLS)
-        h[0].markdown("**Nama**")
-        h[1].markdown("**Mulai**")
-        h[2].markdown("**Akhir**")
-        h[3].markdown("**Edit**")
-        h[4].markdown("**Hapus**")
-        st.markdown("<hr/>", unsafe_allow_html=True)
-
-        for i, r in show.iterrows():
-            c = st.columns(COLS)
-            c[0].write(str(r["nama"]))
-            c[1].write(str(r["mulai"]))
-            c[2].write(str(r["akhir"]))
+        act, i = row_action_table(show.rename(columns={"nama": "Nama", "mulai": "Mulai", "akhir": "Akhir"}),
+                                  key="cuti_rows", label_col="Nama")
+        if act is not None:
+            r = show.iloc[i]
 
             # EDIT → munculkan form dengan prefill
-            if c[3].button("✏️", key=f"edit_cuti_{i}", width='stretch'):
+            if act == "edit":
                 st.session_state["cuti_form"] = {
                     "visible": True,
                     "mode": "edit",
@@ -671,7 +540,7 @@ with tab2:
                 st.rerun()
 
             # HAPUS baris langsung
-            if c[4].button("🗑️", key=f"del_cuti_{i}", width='stretch'):
+            elif act == "delete":
                 base = load_cuti()
                 m = (
                     (base["nama"].astype(str) == r["nama"]) &
@@ -5,6 +5,8 @@ import math
 from pathlib import Path
 from typing import List, Tuple
 from app_core.login import _ensure_auth
+from app_core.io_csv import write_table
+from app_core.registry import get_registry
 import pandas as pd
 import streamlit as st
 from app_core.nav import render_top_nav
@@ -34,17 +36,11 @@ def _safe_int(v) -> int:
         except Exception: return 0
 
 def _read_csv(path: Path) -> pd.DataFrame:
-    if not path.exists(): return pd.DataFrame()
-    for enc in ["utf-8-sig","utf-8","cp1252"]:
-        try:
-            return pd.read_csv(path, encoding=enc)
-        except Exception:
-            continue
-    return pd.read_csv(path)
+    # store bertipe (parquet) via TableRegistry bersama — CSV hanya mirror/impor
+    return get_registry().table(path)
 
 def _write_csv(df: pd.DataFrame, path: Path):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False, encoding="utf-8-sig")
+    write_table(df, path)   # parquet + CSV mirror
 
 # ===================== Loader PP (CSV) =====================
 BASE_COLS = ["id","nama","aktif","catatan","alias"]
@@ -1,20 +1,14 @@
-import re
 import pandas as pd
-from datetime import date, timedelta
+from datetime import date
 from typing import Dict, Tuple, Optional, List
 from db_io import load_table
 from db import get_conn
+from app_core.court_calendar import get_calendar
+from app_core.name_index import name_key
 
 # ================= Normalisasi Nama =================
-GELAR_PAT = re.compile(r'\b(Drs\.?|Dr\.?|H\.|Hj\.|S\.H\.?|S\.HI\.?|M\.H\.?|M\.H\.I\.?|S\.E\.?|S\.Kom\.?|Ir\.?|Sp\.|SH|MH|SE|MM|SAg|MSi|M\.Si\.?)\b', flags=re.IGNORECASE)
-
 def normalize_name(s: str) -> str:
-    if not isinstance(s, str):
-        return ""
-    s2 = GELAR_PAT.sub(" ", s)
-    s2 = re.sub(r"[.,]", " ", s2)
-    s2 = re.sub(r"\s+", " ", s2).strip()
-    return s2.lower()
+    return name_key(s)   # definisi bersama (app_core/name_index.py)
 
 # ================= Kalender & Format =================
 NAMA_BULAN = ["Januari","Februari","Maret","April","Mei","Juni","Juli","Agustus","September","Oktober","November","Desember"]
@@ -35,15 +29,8 @@ def load_libur_set() -> set:
     return set(str(x) for x in lib["tanggal"].astype(str).tolist())
 
 def next_judge_day(start: date, target_weekday: int, holidays: set) -> date:
-    # maju hingga ketemu weekday yang diminta, bukan libur/weekend
-    d = start
-    def ok(x: date) -> bool:
-        if x.weekday() >= 5: return False
-        if x.strftime("%Y-%m-%d") in holidays: return False
-        return True
-    while d.weekday() != target_weekday or not ok(d):
-        d += timedelta(days=1)
-    return d
+    # maju hingga ketemu weekday yang diminta (0=Senin), bukan libur/weekend — lookup tabel kalender
+    return get_calendar(holidays).next_judge_day(start, int(target_weekday) + 1)
 
 def exclude_weekends(df: pd.DataFrame, date_col: str="tgl_register") -> pd.DataFrame:
     if df.empty or date_col not in df.columns: return df
@@ -58,8 +45,10 @@ def exclude_libur(df: pd.DataFrame, date_col: str="tgl_register") -> pd.DataFram
     return df[~s.isin(lib)].copy()
 
 # ================= SK Majelis & Rotasi =================
+_SK_TTL = 15   # detik; choose_anggota_auto dipanggil per perkara → jangan load tabel tiap panggilan
+
 def build_sk_lookup() -> Dict[str, Dict[str, str]]:
-    sk = load_table("sk_majelis")
+    sk = load_table("sk_majelis", ttl=_SK_TTL)
     if sk.empty:
         return {}
     sk = sk.fillna("")
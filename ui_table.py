@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from typing import Dict, Optional, List
-from db_io import load_table, save_table, upsert, delete_by_id
+from db_io import load_table, sync_table, upsert, delete_by_id
 
 def render_editor_with_row_actions(
     table_name: str,
@@ -47,10 +47,14 @@ def render_editor_with_row_actions(
 
     c1, c2 = st.columns(2)
     with c1:
-        if st.button("💾 Simpan Semua ke SQLite", type="primary", key=f"save_all_{table_name}"):
-            save_table(table_name, edited)
-            st.success("Semua perubahan tersimpan ✅")
-            st.rerun()
+        if st.button("💾 Simpan Semua", type="primary", key=f"save_all_{table_name}"):
+            # hanya baris yang berubah terhadap df (dasar editor) yang ditulis
+            res = sync_table(table_name, edited, current=df)
+            if any(res.values()):
+                st.success(f"Tersimpan ✅ • baru {res['inserted']} • ubah {res['updated']} • hapus {res['deleted']}")
+                st.rerun()
+            else:
+                st.info("Tidak ada perubahan.")
     with c2:
         if st.button("🔄 Muat ulang", key=f"reload_{table_name}"):
             st.rerun()